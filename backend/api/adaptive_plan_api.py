@@ -6,13 +6,14 @@ and generating adaptive plans within the Oculus Dei system.
 """
 
 from typing import Dict, List, Optional
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uuid
 from datetime import datetime
 
 # Import required components from the Oculus Dei system
+from backend.api.conditional import not_modified, version_etag
 from backend.core.project_registry import Project, ProjectRegistry, ProjectImpactAnalysis
 from backend.agent.presence_controller import PresenceController
 from backend.core.life_optimizer import AdaptivePlan, LifeOptimizer
@@ -135,13 +136,19 @@ async def generate_adaptive_plan(impact: ProjectImpactAnalysis):
 
 
 @app.get("/projects", response_model=List[Dict])
-async def list_projects():
+async def list_projects(request: Request, response: Response):
     """
     List all registered projects
     
+    The ETag follows the registry version, so polling clients sending
+    If-None-Match get 304 until a project is registered.
+    
     Returns:
         List of all registered projects
     """
+    unchanged = not_modified(request, response, version_etag(registry.epoch, registry.version))
+    if unchanged is not None:
+        return unchanged
     projects = registry.list_projects()
     return [
         {
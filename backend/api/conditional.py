@@ -0,0 +1,71 @@
+"""
+Conditional Request Module for Oculus Dei Life Management System
+
+This module provides the ETag handling shared by the API apps. Read
+endpoints that polling clients hit derive a strong ETag from the version
+counters of the data they serve (the memory store's generation, the
+project registry's version) and answer a matching If-None-Match with 304
+Not Modified before running the query or serializing a body.
+"""
+
+import hashlib
+import json
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+# Clients may keep responses but must revalidate them (cheap with the ETag) before reuse
+REVALIDATE = "private, no-cache"
+
+
+def version_etag(*parts: Any) -> str:
+    """
+    Strong ETag of a response determined by the given parts (version
+    counters, the path and query parameters...).
+    """
+    digest = hashlib.sha1(json.dumps(parts, default=str, separators=(",", ":")).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches an ETag. As RFC 9110 requires
+    for If-None-Match, the comparison is weak: W/ prefixes are ignored.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(request: Request, response: Response, etag: str, cache_control: str = REVALIDATE,
+                 vary: Optional[str] = None) -> Optional[Response]:
+    """
+    Answer a conditional GET.
+
+    Args:
+        request: The incoming request
+        response: Response of the endpoint, which gets the ETag and
+            Cache-Control headers when the request has to be served
+        etag: ETag of the current representation
+        cache_control: Cache-Control header value
+        vary: Request headers, besides the URL, that select the representation
+
+    Returns:
+        A 304 response to return as is when the client's copy is current,
+        otherwise None
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if vary:
+        headers["Vary"] = vary
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -5,14 +5,23 @@ This module provides REST endpoints to interact with memory data in the Oculus D
 allowing retrieval, searching, and creation of memory entries.
 """
 
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Any, Sequence, Set, Tuple
 from enum import Enum
-from fastapi import FastAPI, HTTPException, Query, Path, Response, status
+import asyncio
+import json
+import re
+from fastapi import FastAPI, Header, HTTPException, Query, Path, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime
 
+from backend.api.conditional import not_modified, version_etag
 # Import memory components
+from backend.memory.change_feed import ChangeFeed
+from backend.memory.cursor import decode_cursor, decode_rank_cursor, encode_cursor
+from backend.memory.export import MEDIA_TYPES, ExportFormat, decoder_for, export_stream
 from backend.memory.memory_store import MemoryEntry
 from backend.memory.memory_writer import (
     get_memory_store,
@@ -21,12 +30,14 @@ from backend.memory.memory_writer import (
     log_insight,
     log_project,
     delete_entry as remove_entry,
+    tenant_stores,
 )
+from backend.memory.tenants import DEFAULT_TENANT, TENANT_HEADER, current_tenant, validate_tenant_id
 from backend.memory.memory_retriever import (
-    find_entries_by_keyword,
     semantic_search,
     summarize_recent_events,
     count_entries_by_type,
+    get_project_timeline,
 )
 
 # Create FastAPI app for memory routes
@@ -45,8 +56,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Access the memory store singleton
-memory_store = get_memory_store()
+# Requests for another tenant are prefixed with /tenants/{tenant_id} (or carry X-Tenant-ID)
+TENANT_PATH = re.compile(r"/tenants/([^/]+)(/.*)")
+
+
+@app.middleware("http")
+async def route_tenant(request: Request, call_next):
+    """
+    Run a request against its tenant's store.
+    
+    The tenant comes from a /tenants/{tenant_id} path prefix, which is
+    stripped before routing, or from the X-Tenant-ID header; requests with
+    neither use the default tenant. Endpoints reach the tenant's store
+    through get_memory_store(). The store is leased until the response body
+    has been sent, so it is not evicted while a stream is being read.
+    """
+    tenant_id = request.headers.get(TENANT_HEADER)
+    match = TENANT_PATH.fullmatch(request.scope["path"])
+    if match:
+        tenant_id = match.group(1)
+        request.scope["path"] = match.group(2)
+    if tenant_id is None or tenant_id == DEFAULT_TENANT:
+        return await call_next(request)
+    try:
+        validate_tenant_id(tenant_id)
+    except ValueError as e:
+        return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(e)})
+
+    await run_in_threadpool(tenant_stores.acquire, tenant_id)  # May load the tenant from disk
+    token = current_tenant.set(tenant_id)
+    try:
+        response = await call_next(request)
+    except BaseException:
+        tenant_stores.release(tenant_id)
+        raise
+    finally:
+        current_tenant.reset(token)
+
+    body = response.body_iterator
+
+    async def leased_body() -> AsyncIterator[bytes]:
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            tenant_stores.release(tenant_id)
+
+    response.body_iterator = leased_body()
+    return response
 
 
 # API Models
@@ -75,17 +132,345 @@ class MemoryCreateRequest(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional contextual information")
 
 
+class MemoryBulkItem(MemoryCreateRequest):
+    """One entry of a bulk import; imported history may carry its original timestamp"""
+    timestamp: Optional[datetime] = Field(None, description="When the entry happened (default: now)")
+
+
+class BulkItemError(BaseModel):
+    """Why one item of a bulk request was rejected"""
+    index: int
+    detail: str
+
+
+class BulkCreateResponse(BaseModel):
+    """Response model for a bulk import; ids[i] is None when item i was rejected"""
+    ids: List[Optional[str]]
+    errors: List[BulkItemError]
+
+
 class MemoryListResponse(BaseModel):
     """Response model for a list of memory entries"""
     total: int
     entries: List[MemoryEntryResponse]
 
 
+class MemoryPageResponse(MemoryListResponse):
+    """One page of a listing; pass next_cursor back as ?cursor= for the next page"""
+    next_cursor: Optional[str] = None
+
+
+class ListingOrder(str, Enum):
+    """Direction of a time-ordered listing"""
+    newest = "newest"
+    oldest = "oldest"
+
+
+class SearchOrder(str, Enum):
+    """How keyword search results are ordered"""
+    relevance = "relevance"
+    newest = "newest"
+
+
+class ListingFormat(str, Enum):
+    """Response body format of /memory/entries"""
+    json = "json"
+    ndjson = "ndjson"
+
+
+class HybridEntryResponse(MemoryEntryResponse):
+    """A memory entry with its fused and per-ranking scores"""
+    score: float
+    keyword_score: Optional[float] = None
+    semantic_score: Optional[float] = None
+
+
+class HybridSearchResponse(BaseModel):
+    """Response model for hybrid search"""
+    total: int
+    entries: List[HybridEntryResponse]
+
+
+class FusionMethod(str, Enum):
+    """How keyword and semantic rankings are combined"""
+    rrf = "rrf"
+    weighted = "weighted"
+
+
+class MemoryQueryRequest(BaseModel):
+    """Request model for a composable query; all clauses must hold"""
+    type: Optional[str] = Field(None, description="Only entries of this type")
+    start: Optional[datetime] = Field(None, description="Only entries at or after this time")
+    end: Optional[datetime] = Field(None, description="Only entries at or before this time")
+    metadata: Dict[str, Any] = Field(default_factory=dict, description="Metadata values to match exactly")
+    metadata_contains: Dict[str, str] = Field(
+        default_factory=dict, description="Substrings metadata values must contain (case-insensitive)"
+    )
+    keyword: Optional[str] = Field(None, description="Words the content must all contain; ranks by relevance")
+    regex: Optional[str] = Field(None, description="Regex the content must match (case-insensitive)")
+    similar_to: Optional[str] = Field(None, description="Text to rank the matches by semantic similarity to")
+    limit: int = Field(50, ge=1, le=500, description="Maximum number of entries to return")
+    nprobe: Optional[int] = Field(None, ge=1, le=1024, description="Index partitions to scan for similarity")
+
+
+class QueryPlanStep(BaseModel):
+    """One step of an executed query plan"""
+    operation: str
+    index: Optional[str] = None
+    detail: str
+    estimated_rows: Optional[int] = None
+    actual_rows: Optional[int] = None
+
+
+class QueryPlanResponse(BaseModel):
+    """How a query was executed"""
+    order: str
+    total_rows: int
+    steps: List[QueryPlanStep]
+
+
+class MemoryQueryResponse(MemoryListResponse):
+    """Response model for a composable query, with the plan when explain is requested"""
+    plan: Optional[QueryPlanResponse] = None
+
+
+class IndexStatusResponse(BaseModel):
+    """Response model for indexing freshness"""
+    committed: int
+    indexed: int
+    pending: int
+    async_indexing: bool
+
+
+class QueryCacheStatsResponse(BaseModel):
+    """Response model for query result cache metrics"""
+    enabled: bool
+    size: Optional[int] = None
+    max_entries: Optional[int] = None
+    ttl_seconds: Optional[float] = None
+    hits: Optional[int] = None
+    misses: Optional[int] = None
+    hit_rate: Optional[float] = None
+    evictions: Optional[int] = None
+    expirations: Optional[int] = None
+
+
+class StatsInterval(str, Enum):
+    """Bucket width of a statistics time series"""
+    hour = "hour"
+    day = "day"
+
+
+class TimeseriesBucket(BaseModel):
+    """Entry counts of one time bucket"""
+    start: str
+    count: int
+    by_type: Dict[str, int]
+
+
+class TimeseriesResponse(BaseModel):
+    """Response model for entry counts over time (non-empty buckets only)"""
+    interval: StatsInterval
+    total: int
+    buckets: List[TimeseriesBucket]
+
+
+class DuplicateGroup(BaseModel):
+    """A cluster of near-duplicate entries of one type, oldest first"""
+    type: str
+    count: int
+    entries: List[MemoryEntryResponse]
+
+
+class DuplicatesResponse(BaseModel):
+    """Response model for the near-duplicate report"""
+    policy: str
+    threshold: float
+    absorbed: int
+    groups: List[DuplicateGroup]
+
+
+class GraphNodeResponse(MemoryEntryResponse):
+    """A memory entry reached by a graph traversal"""
+    depth: int = Field(..., description="Links between this entry and the start")
+
+
+class GraphEdge(BaseModel):
+    """A related_to link: the source entry's metadata refers to the target"""
+    source: str
+    target: str
+
+
+class GraphResponse(BaseModel):
+    """Response model for a graph traversal; nodes are breadth first"""
+    root: str
+    depth: int
+    nodes: List[GraphNodeResponse]
+    edges: List[GraphEdge]
+
+
+class TenantPartition(BaseModel):
+    """An open tenant store"""
+    tenant: str
+    bytes: int
+    leases: int
+
+
+class TenantStatsResponse(BaseModel):
+    """Response model for the open tenant stores, least recently used first"""
+    resident: List[TenantPartition]
+    resident_bytes: int
+    memory_budget: int
+    loads: int
+    evictions: int
+
+
+class ImportResponse(BaseModel):
+    """Response model for an import"""
+    format: str
+    imported: int
+
+
 class EventSummaryResponse(BaseModel):
     """Response model for recent event summary"""
     summary: str
 
 
+# Longest a ?fresh=true search waits for background indexing to catch up
+FRESH_READ_TIMEOUT = 5.0
+
+FRESH_QUERY_DESCRIPTION = "Wait until every write committed before this request is indexed"
+
+CACHE_QUERY_DESCRIPTION = "Serve repeated queries from the result cache (false always runs the query)"
+
+
+async def apply_index_freshness(response: Response, fresh: bool) -> None:
+    """
+    Optionally wait for read-your-writes consistency, then report the
+    index watermark in X-Index-Committed / X-Index-Watermark headers.
+    """
+    if fresh and not await run_in_threadpool(get_memory_store().wait_for_index, None, FRESH_READ_TIMEOUT):
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Timed out waiting for background indexing")
+    index = get_memory_store().index_status()
+    response.headers["X-Index-Committed"] = str(index["committed"])
+    response.headers["X-Index-Watermark"] = str(index["indexed"])
+
+
+def store_etag(request: Request) -> str:
+    """
+    Strong ETag of a read from the current tenant's store: the store's
+    change feed epoch and generation, the path and the query parameters.
+    """
+    store = get_memory_store()
+    return version_etag(store.changes.epoch, store.generation, request.url.path,
+                        sorted(request.query_params.multi_items()))
+
+
+def unchanged_since(request: Request, response: Response) -> Optional[Response]:
+    """A 304 response if the client's copy of this read is current; otherwise tag the response."""
+    return not_modified(request, response, store_etag(request), vary=TENANT_HEADER)
+
+
+# Entries fetched per store call while streaming a listing
+STREAM_PAGE_SIZE = 1000
+
+CURSOR_QUERY_DESCRIPTION = "next_cursor of the previous page"
+
+
+def cursor_scope(endpoint: str, **filters: Any) -> str:
+    """Identify a listing (of the current tenant) so that its cursors are rejected by any other listing."""
+    return endpoint + json.dumps({**filters, "tenant": current_tenant.get()}, sort_keys=True, default=str)
+
+
+def parse_cursor(cursor: Optional[str], scope: str, decode: Callable[[str, str], Any] = decode_cursor) -> Any:
+    """Decode a ?cursor= parameter, answering 400 for a malformed or foreign cursor."""
+    if cursor is None:
+        return None
+    try:
+        return decode(cursor, scope)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+# Seconds between keepalive comments on an idle change stream
+STREAM_HEARTBEAT = 15.0
+
+
+def parse_event_id(event_id: Optional[str], feed: ChangeFeed) -> Tuple[Optional[int], bool]:
+    """
+    Decode a change stream event ID ("<epoch>-<seq>").
+
+    Returns:
+        The sequence number to resume after (None for "from now on"), and
+        whether the client must resync because the ID is from an earlier
+        feed (a server restart) or unreadable
+    """
+    if not event_id:
+        return None, False
+    epoch, _, seq = event_id.partition("-")
+    if epoch != feed.epoch or not seq.isdigit():
+        return None, True
+    return int(seq), False
+
+
+def sse_frame(change: Dict[str, Any], epoch: str) -> str:
+    """Format one change as a Server-Sent Events frame named after its op."""
+    data = json.dumps(change, default=str)
+    return f"id: {epoch}-{change['seq']}\nevent: {change['op']}\ndata: {data}\n\n"
+
+
+async def change_events(feed: ChangeFeed, after: Optional[int] = None, resync: bool = False,
+                        heartbeat: float = STREAM_HEARTBEAT,
+                        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None) -> AsyncIterator[str]:
+    """
+    Follow a change feed as Server-Sent Events frames.
+
+    Subscribes when iteration starts and unsubscribes when the generator is
+    closed (the client disconnected). Publishers only wake the event loop
+    when this subscriber's queue goes from empty to non-empty.
+
+    Args:
+        feed: The store's change feed
+        after: Sequence number to resume after, or None to start now
+        resync: Open with a resync event (the client's position is unknown)
+        heartbeat: Idle seconds between keepalive comments
+        is_disconnected: Optional check that ends the stream early
+    """
+    loop = asyncio.get_running_loop()
+    ready = asyncio.Event()
+    subscription = feed.subscribe(after, on_ready=lambda: loop.call_soon_threadsafe(ready.set))
+    try:
+        if resync:
+            yield sse_frame({"seq": feed.last_seq, "op": "resync"}, feed.epoch)
+        elif after is None:
+            yield f"id: {feed.epoch}-{feed.last_seq}\n\n"  # Sets the resume point without dispatching an event
+        while True:
+            try:
+                await asyncio.wait_for(ready.wait(), heartbeat)
+            except asyncio.TimeoutError:
+                if is_disconnected is not None and await is_disconnected():
+                    return
+                yield ": keepalive\n\n"
+                continue
+            ready.clear()
+            changes = subscription.drain()
+            if changes:
+                yield "".join(sse_frame(change, feed.epoch) for change in changes)
+    finally:
+        subscription.close()
+
+
+def page_response(entries: List[MemoryEntry], next_key: Optional[Sequence[Any]],
+                  scope: str) -> MemoryPageResponse:
+    """Build a MemoryPageResponse, encoding the key of the next page as a cursor."""
+    return MemoryPageResponse(
+        total=len(entries),
+        entries=[memory_entry_to_response(entry) for entry in entries],
+        next_cursor=None if next_key is None else encode_cursor(next_key, scope),
+    )
+
+
 # Helper function to convert MemoryEntry to MemoryEntryResponse
 def memory_entry_to_response(entry: MemoryEntry) -> MemoryEntryResponse:
     """Convert a MemoryEntry to a MemoryEntryResponse"""
@@ -112,9 +497,25 @@ async def root():
             "DELETE /memory/id/{entry_id}",
             "/memory/type/{entry_type}",
             "/memory/search",
+            "/memory/entries",
+            "/memory/stream",
+            "/memory/hybrid",
+            "POST /memory/query",
+            "/memory/index/status",
+            "/memory/cache/stats",
             "/memory/insights",
             "/memory/manual",
+            "POST /memory/bulk",
+            "/memory/export",
+            "POST /memory/import",
             "/memory/stats",
+            "/memory/stats/categories",
+            "/memory/stats/timeseries",
+            "/memory/duplicates",
+            "/memory/graph/{entry_id}",
+            "/memory/graph/{entry_id}/timeline",
+            "/memory/projects/{project_name}/timeline",
+            "/memory/tenants",
             "/memory/events/summary"
         ]
     }
@@ -122,29 +523,40 @@ async def root():
 
 @app.get(
     "/memory/last",
-    response_model=MemoryListResponse,
+    response_model=MemoryPageResponse,
     tags=["Memory Retrieval"],
     summary="Get the last N memory entries",
-    description="Retrieve the most recent memory entries stored in the system"
+    description="Retrieve the most recent memory entries stored in the system, one page at a time"
 )
-async def get_last_entries(n: int = Query(10, ge=1, le=100, description="Number of entries to retrieve")):
+async def get_last_entries(
+    request: Request,
+    response: Response,
+    n: int = Query(10, ge=1, le=100, description="Number of entries to retrieve"),
+    cursor: Optional[str] = Query(None, description=CURSOR_QUERY_DESCRIPTION),
+):
     """
     Get the last N memory entries.
     
     This endpoint retrieves the most recent entries from the memory store,
-    sorted by timestamp (newest first).
+    sorted by timestamp (newest first). Older entries are reached by
+    passing the returned next_cursor back. Responses carry an ETag that
+    changes with every write; a matching If-None-Match gets 304.
     
     Args:
+        request: Request, checked for If-None-Match
+        response: Response that receives the ETag
         n: Number of entries to retrieve (default: 10, max: 100)
+        cursor: Cursor of the previous page
         
     Returns:
-        MemoryListResponse with the retrieved entries
+        MemoryPageResponse with the retrieved entries
     """
-    entries = memory_store.get_last(n)
-    return MemoryListResponse(
-        total=len(entries),
-        entries=[memory_entry_to_response(entry) for entry in entries]
-    )
+    unchanged = unchanged_since(request, response)
+    if unchanged is not None:
+        return unchanged
+    scope = cursor_scope("last")
+    entries, next_key = get_memory_store().page(limit=n, after=parse_cursor(cursor, scope))
+    return page_response(entries, next_key, scope)
 
 
 @app.get(
@@ -156,7 +568,7 @@ async def get_last_entries(n: int = Query(10, ge=1, le=100, description="Number
 )
 async def get_entry_by_id(entry_id: str = Path(..., description="Memory entry ID")):
     """Get a specific memory entry by ID."""
-    entry = memory_store.get_by_id(entry_id)
+    entry = get_memory_store().get_by_id(entry_id)
     if not entry:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Entry not found")
     return memory_entry_to_response(entry)
@@ -179,115 +591,235 @@ async def delete_entry(entry_id: str = Path(..., description="Memory entry ID"))
 
 @app.get(
     "/memory/type/{entry_type}",
-    response_model=MemoryListResponse,
+    response_model=MemoryPageResponse,
     tags=["Memory Retrieval"],
     summary="Get memory entries by type",
     description="Retrieve memory entries of a specific type (e.g., 'decision', 'event', 'insight')"
 )
 async def get_entries_by_type(
     entry_type: MemoryCreateRequest.EntryType = Path(..., description="Type of memory entries to retrieve"),
-    limit: int = Query(50, ge=1, le=500, description="Maximum number of entries to return")
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of entries to return"),
+    cursor: Optional[str] = Query(None, description=CURSOR_QUERY_DESCRIPTION),
 ):
     """
     Get memory entries of a specific type.
     
     This endpoint retrieves entries matching the specified type,
-    sorted by timestamp (newest first).
+    sorted by timestamp (newest first), one page at a time.
     
     Args:
         entry_type: Type of entries to retrieve (e.g., 'decision', 'event')
         limit: Maximum number of entries to return
+        cursor: Cursor of the previous page
         
     Returns:
-        MemoryListResponse with the retrieved entries
+        MemoryPageResponse with the retrieved entries
     """
-    entries = memory_store.retrieve_by_type(entry_type.value)
-    
-    # Sort by timestamp (newest first) and apply limit
-    sorted_entries = sorted(entries, key=lambda x: x.timestamp, reverse=True)[:limit]
-    
-    return MemoryListResponse(
-        total=len(sorted_entries),
-        entries=[memory_entry_to_response(entry) for entry in sorted_entries]
-    )
+    # Newest first, straight from the time-ordered type index
+    scope = cursor_scope("type", type=entry_type.value)
+    entries, next_key = get_memory_store().page(entry_type.value, limit=limit, after=parse_cursor(cursor, scope))
+    return page_response(entries, next_key, scope)
 
 
 @app.get(
     "/memory/search",
-    response_model=MemoryListResponse,
+    response_model=MemoryPageResponse,
     tags=["Memory Retrieval"],
     summary="Search memory entries by keyword",
-    description="Search for memory entries containing the specified keyword in their content"
+    description=(
+        "Search for memory entries containing every word of the query, ranked by BM25 relevance "
+        "or newest first, one page at a time with cursor pagination"
+    )
 )
 async def search_entries(
+    response: Response,
     q: str = Query(..., min_length=2, description="Keyword to search for"),
-    type_filter: Optional[str] = Query(None, description="Optional type filter")
+    type_filter: Optional[str] = Query(None, description="Optional type filter"),
+    n: int = Query(50, ge=1, le=500, description="Entries per page"),
+    order: SearchOrder = Query(SearchOrder.relevance, description="Rank by relevance, or newest first"),
+    cursor: Optional[str] = Query(None, description=CURSOR_QUERY_DESCRIPTION),
+    fresh: bool = Query(False, description=FRESH_QUERY_DESCRIPTION),
+    cache: bool = Query(True, description=CACHE_QUERY_DESCRIPTION),
 ):
     """
     Search memory entries by keyword.
     
-    This endpoint searches for entries containing the specified keyword
-    in their content, with an optional type filter.
+    This endpoint searches for entries containing every word of the
+    keyword in their content, with an optional type filter, and returns
+    them most relevant first (or newest first with order=newest), one
+    page at a time. Every page carries a cursor to the next one; relevance
+    cursors hold the rank of the last entry, so scores that shift between
+    pages (writes change BM25 statistics) can move entries across a page
+    boundary.
     
     Args:
+        response: Response whose headers carry the index watermark
         q: Keyword to search for (minimum 2 characters)
         type_filter: Optional type to filter results
+        n: Maximum number of entries per page
+        order: relevance or newest
+        cursor: Cursor of the previous page
+        fresh: Wait for background indexing to include earlier writes
+        cache: Allow a cached result for order=relevance
         
     Returns:
-        MemoryListResponse with the matching entries
+        MemoryPageResponse with the matching entries
     """
-    entries = find_entries_by_keyword(q, type_filter)
+    await apply_index_freshness(response, fresh)
+    if order is SearchOrder.newest:
+        scope = cursor_scope("search", q=q, type=type_filter)
+        entries, next_key = get_memory_store().page(type_filter, keyword=q, limit=n,
+                                                    after=parse_cursor(cursor, scope))
+        return page_response(entries, next_key, scope)
+    scope = cursor_scope("search-relevance", q=q, type=type_filter)
+    entries, next_rank = get_memory_store().page_by_relevance(
+        q, entry_type=type_filter or None, limit=n, after=parse_cursor(cursor, scope, decode_rank_cursor),
+        use_cache=cache,
+    )
+    return page_response(entries, next_rank, scope)
 
-    return MemoryListResponse(
-        total=len(entries),
-        entries=[memory_entry_to_response(entry) for entry in entries]
+
+@app.get(
+    "/memory/entries",
+    response_model=MemoryPageResponse,
+    tags=["Memory Retrieval"],
+    summary="List memory entries with cursor pagination",
+    description=(
+        "Page through entries in time order with opaque cursors, optionally filtered by type, time range "
+        "and keyword; format=ndjson streams every remaining entry as newline-delimited JSON"
+    ),
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def list_entries(
+    type_filter: Optional[str] = Query(None, description="Optional type filter"),
+    start: Optional[datetime] = Query(None, description="Only entries at or after this time"),
+    end: Optional[datetime] = Query(None, description="Only entries at or before this time"),
+    q: Optional[str] = Query(None, min_length=2, description="Words every entry must contain"),
+    order: ListingOrder = Query(ListingOrder.newest, description="Newest or oldest first"),
+    limit: int = Query(100, ge=1, le=1000, description="Entries per page (JSON format)"),
+    cursor: Optional[str] = Query(None, description=CURSOR_QUERY_DESCRIPTION),
+    format: ListingFormat = Query(ListingFormat.json, description="json (one page) or ndjson (stream to the end)"),
+):
+    """
+    List memory entries one page at a time, or stream all of them.
+    
+    Cursors are keys into the time index, so every page costs the same
+    however deep it is and entries written meanwhile never shift pages.
+    The NDJSON stream reads the store in pages of STREAM_PAGE_SIZE, so
+    server memory stays constant however many entries it returns.
+    
+    Returns:
+        MemoryPageResponse, or an application/x-ndjson stream of entries
+    """
+    scope = cursor_scope("entries", type=type_filter, start=start, end=end, q=q, order=order.value)
+    after = parse_cursor(cursor, scope)
+    newest_first = order is ListingOrder.newest
+
+    def read_page(position, size):
+        return get_memory_store().page(type_filter, start, end, q, size, position, newest_first)
+
+    if format is ListingFormat.json:
+        entries, next_key = await run_in_threadpool(read_page, after, limit)
+        return page_response(entries, next_key, scope)
+
+    async def stream() -> AsyncIterator[bytes]:
+        position = after
+        while True:
+            entries, position = await run_in_threadpool(read_page, position, STREAM_PAGE_SIZE)
+            if entries:
+                # Same fields as MemoryEntryResponse, without building a model per entry
+                yield "".join(json.dumps(entry.to_dict(), default=str) + "\n" for entry in entries).encode("utf-8")
+            if position is None:
+                return
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.get(
+    "/memory/stream",
+    tags=["Memory Retrieval"],
+    summary="Follow memory writes as Server-Sent Events",
+    description=(
+        "Stream store, update, delete and clear events as they are committed; reconnecting with "
+        "Last-Event-ID (or ?after=) resumes without gaps, or sends a resync event when that is impossible"
+    ),
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_changes(
+    request: Request,
+    after: Optional[str] = Query(None, description="Event ID to resume after (overrides Last-Event-ID)"),
+    last_event_id: Optional[str] = Header(None, description="Set by EventSource when it reconnects"),
+):
+    """
+    Follow memory writes instead of polling.
+    
+    Each event is named after its operation (store, update, delete, clear)
+    and carries the same fields as the write-ahead log record, plus its
+    sequence number. A client that falls too far behind, or resumes from
+    a point no longer buffered, receives a single resync event and should
+    reload what it displays.
+    
+    Returns:
+        A text/event-stream response that stays open
+    """
+    feed = get_memory_store().changes
+    resume_after, resync = parse_event_id(after or last_event_id, feed)
+    return StreamingResponse(
+        change_events(feed, resume_after, resync, is_disconnected=request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
 @app.get(
     "/memory/search_regex",
-    response_model=MemoryListResponse,
+    response_model=MemoryPageResponse,
     tags=["Memory Retrieval"],
     summary="Regex search of memory entries",
-    description="Search entries using a regular expression pattern",
+    description="Search entries using a regular expression pattern, oldest first with cursor pagination",
 )
 async def regex_search_entries(
+    response: Response,
     pattern: str = Query(..., min_length=1, description="Regex pattern"),
     type_filter: Optional[str] = Query(None, description="Optional type filter"),
+    limit: int = Query(50, ge=1, le=500, description="Entries per page"),
+    cursor: Optional[str] = Query(None, description=CURSOR_QUERY_DESCRIPTION),
+    fresh: bool = Query(False, description=FRESH_QUERY_DESCRIPTION),
+    cache: bool = Query(True, description=CACHE_QUERY_DESCRIPTION),
 ):
-    """Return entries matching the regex pattern."""
+    """Return one page of the entries matching the regex pattern."""
+    await apply_index_freshness(response, fresh)
+    scope = cursor_scope("search_regex", pattern=pattern, type=type_filter)
+    after = parse_cursor(cursor, scope)
     try:
-        entries = memory_store.search_by_regex(pattern)
+        entries, next_key = get_memory_store().page(type_filter or None, limit=limit, after=after,
+                                                    newest_first=False, pattern=pattern, use_cache=cache)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-
-    if type_filter:
-        entries = [e for e in entries if e.type == type_filter]
-
-    return MemoryListResponse(
-        total=len(entries),
-        entries=[memory_entry_to_response(e) for e in entries],
-    )
+    return page_response(entries, next_key, scope)
 
 
 @app.get(
     "/memory/search_metadata",
-    response_model=MemoryListResponse,
+    response_model=MemoryPageResponse,
     tags=["Memory Retrieval"],
     summary="Search by metadata substring",
-    description="Search entries where a metadata value contains the given substring",
+    description="Search entries where a metadata value contains the given substring, oldest first with cursor pagination",
 )
 async def metadata_search_entries(
+    response: Response,
     key: str = Query(..., description="Metadata key"),
     value: str = Query(..., description="Substring to match"),
-    limit: int = Query(50, ge=1, le=500, description="Maximum number of entries"),
+    limit: int = Query(50, ge=1, le=500, description="Entries per page"),
+    cursor: Optional[str] = Query(None, description=CURSOR_QUERY_DESCRIPTION),
+    fresh: bool = Query(False, description=FRESH_QUERY_DESCRIPTION),
 ):
-    """Return entries matching the metadata substring."""
-    entries = memory_store.search_by_metadata_value(key, value)[:limit]
-    return MemoryListResponse(
-        total=len(entries),
-        entries=[memory_entry_to_response(e) for e in entries],
-    )
+    """Return one page of the entries matching the metadata substring."""
+    await apply_index_freshness(response, fresh)
+    scope = cursor_scope("search_metadata", key=key, value=value)
+    entries, next_key = get_memory_store().page(limit=limit, after=parse_cursor(cursor, scope),
+                                                newest_first=False, metadata=(key, value))
+    return page_response(entries, next_key, scope)
 
 
 @app.get(
@@ -298,18 +830,150 @@ async def metadata_search_entries(
     description="Retrieve entries most similar to the provided text using hashed embeddings",
 )
 async def semantic_search_entries(
+    response: Response,
     q: str = Query(..., min_length=2, description="Query text for semantic search"),
     n: int = Query(5, ge=1, le=50, description="Number of entries to return"),
     type_filter: Optional[str] = Query(None, description="Optional type filter"),
+    nprobe: Optional[int] = Query(
+        None, ge=1, le=1024,
+        description="Index partitions to scan; higher improves recall at the cost of latency",
+    ),
+    fresh: bool = Query(False, description=FRESH_QUERY_DESCRIPTION),
+    cache: bool = Query(True, description=CACHE_QUERY_DESCRIPTION),
 ):
     """Return entries semantically similar to the query text."""
-    entries = semantic_search(q, top_n=n, type_filter=type_filter)
+    await apply_index_freshness(response, fresh)
+    entries = semantic_search(q, top_n=n, type_filter=type_filter, nprobe=nprobe, use_cache=cache)
     return MemoryListResponse(
         total=len(entries),
         entries=[memory_entry_to_response(entry) for entry in entries],
     )
 
 
+@app.get(
+    "/memory/hybrid",
+    response_model=HybridSearchResponse,
+    tags=["Memory Retrieval"],
+    summary="Hybrid keyword and semantic search",
+    description=(
+        "Rank entries by BM25 keyword relevance and embedding similarity in one request, "
+        "fused with reciprocal rank fusion or weighted scores"
+    ),
+)
+async def hybrid_search_entries(
+    response: Response,
+    q: str = Query(..., min_length=2, description="Query text"),
+    n: int = Query(10, ge=1, le=100, description="Number of entries to return"),
+    type_filter: Optional[str] = Query(None, description="Optional type filter"),
+    start: Optional[datetime] = Query(None, description="Only entries at or after this time"),
+    end: Optional[datetime] = Query(None, description="Only entries at or before this time"),
+    fusion: FusionMethod = Query(FusionMethod.rrf, description="Rank fusion method"),
+    semantic_weight: float = Query(0.5, ge=0.0, le=1.0, description="Weight of the semantic ranking"),
+    nprobe: Optional[int] = Query(
+        None, ge=1, le=1024,
+        description="Index partitions to scan; higher improves recall at the cost of latency",
+    ),
+    fresh: bool = Query(False, description=FRESH_QUERY_DESCRIPTION),
+    cache: bool = Query(True, description=CACHE_QUERY_DESCRIPTION),
+):
+    """
+    Search memory entries by keyword and meaning at once.
+    
+    Replaces a /memory/search plus /memory/semantic round trip and a
+    client-side merge; each entry carries the fused score and the BM25 and
+    cosine scores it was fused from.
+    
+    Returns:
+        HybridSearchResponse with the best entries first
+    """
+    await apply_index_freshness(response, fresh)
+    hits = get_memory_store().search_hybrid(
+        q, top_n=n, entry_type=type_filter, start=start, end=end, fusion=fusion.value,
+        semantic_weight=semantic_weight, nprobe=nprobe, use_cache=cache,
+    )
+    return HybridSearchResponse(
+        total=len(hits),
+        entries=[
+            HybridEntryResponse(**memory_entry_to_response(entry).model_dump(), score=score,
+                                keyword_score=keyword_score, semantic_score=semantic_score)
+            for entry, score, keyword_score, semantic_score in hits
+        ],
+    )
+
+
+@app.post(
+    "/memory/query",
+    response_model=MemoryQueryResponse,
+    tags=["Memory Retrieval"],
+    summary="Composable memory query",
+    description=(
+        "Combine type, time range, metadata, keyword, regex and similarity clauses in one query; "
+        "the most selective index drives it and explain=true returns the executed plan"
+    ),
+)
+async def query_entries(
+    request: MemoryQueryRequest,
+    response: Response,
+    explain: bool = Query(False, description="Include the plan with estimated and actual row counts"),
+    fresh: bool = Query(False, description=FRESH_QUERY_DESCRIPTION),
+    cache: bool = Query(True, description=CACHE_QUERY_DESCRIPTION),
+):
+    """
+    Run a composable memory query.
+    
+    Results are ranked by similarity when similar_to is given, by keyword
+    relevance when keyword is given, and newest first otherwise.
+    
+    Args:
+        request: The query clauses
+        response: Response whose headers carry the index watermark
+        explain: Include the executed plan in the response
+        fresh: Wait for background indexing to include earlier writes
+        cache: Allow a cached result (and plan)
+        
+    Returns:
+        MemoryQueryResponse with the matching entries
+    """
+    await apply_index_freshness(response, fresh)
+    try:
+        entries, plan = await run_in_threadpool(
+            get_memory_store().query, request.type, request.start, request.end, request.metadata,
+            request.metadata_contains, request.keyword, request.regex, request.similar_to,
+            request.limit, request.nprobe, use_cache=cache,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return MemoryQueryResponse(
+        total=len(entries),
+        entries=[memory_entry_to_response(entry) for entry in entries],
+        plan=QueryPlanResponse(**plan.to_dict()) if explain else None,
+    )
+
+
+@app.get(
+    "/memory/index/status",
+    response_model=IndexStatusResponse,
+    tags=["Memory Retrieval"],
+    summary="Indexing freshness",
+    description="Last committed write, the watermark up to which every write is searchable, and the backlog",
+)
+async def get_index_status():
+    """Return the indexing watermark of the memory store."""
+    return IndexStatusResponse(**get_memory_store().index_status())
+
+
+@app.get(
+    "/memory/cache/stats",
+    response_model=QueryCacheStatsResponse,
+    tags=["Memory Retrieval"],
+    summary="Query result cache metrics",
+    description="Size, hits, misses, hit rate, evictions and expirations of the search result cache",
+)
+async def get_query_cache_stats():
+    """Return the result cache metrics of the memory store."""
+    return QueryCacheStatsResponse(**get_memory_store().query_cache_stats())
+
+
 @app.get(
     "/memory/insights",
     response_model=MemoryListResponse,
@@ -318,25 +982,30 @@ async def semantic_search_entries(
     description="Retrieve memory entries of type 'insight'"
 )
 async def get_insights(
-    limit: int = Query(20, ge=1, le=100, description="Maximum number of insights to return")
+    request: Request,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of insights to return"),
 ):
     """
     Get insight entries.
     
     This endpoint retrieves memory entries of type 'insight',
     which typically represent system observations, patterns,
-    or reflections.
+    or reflections. A matching If-None-Match gets 304.
     
     Args:
+        request: Request, checked for If-None-Match
+        response: Response that receives the ETag
         limit: Maximum number of insights to return
         
     Returns:
         MemoryListResponse with the retrieved insights
     """
-    insights = memory_store.retrieve_by_type("insight")
-    
-    # Sort by timestamp (newest first) and apply limit
-    sorted_insights = sorted(insights, key=lambda x: x.timestamp, reverse=True)[:limit]
+    unchanged = unchanged_since(request, response)
+    if unchanged is not None:
+        return unchanged
+    # Newest first, straight from the time-ordered type index
+    sorted_insights = get_memory_store().get_last(limit, entry_type="insight")
     
     return MemoryListResponse(
         total=len(sorted_insights),
@@ -351,8 +1020,11 @@ async def get_insights(
     summary="Get entry counts by type",
     description="Retrieve a summary of memory entry counts grouped by type",
 )
-async def get_memory_stats():
-    """Return counts of memory entries by type."""
+async def get_memory_stats(request: Request, response: Response):
+    """Return counts of memory entries by type, or 304 if the client's copy is current."""
+    unchanged = unchanged_since(request, response)
+    if unchanged is not None:
+        return unchanged
     try:
         return count_entries_by_type()
     except Exception as e:
@@ -362,6 +1034,164 @@ async def get_memory_stats():
         )
 
 
+@app.get(
+    "/memory/stats/categories",
+    response_model=Dict[str, int],
+    tags=["Memory Retrieval"],
+    summary="Get entry counts by category",
+    description="Retrieve memory entry counts grouped by the category metadata field",
+)
+async def get_category_stats():
+    """Return counts of memory entries by metadata category."""
+    return get_memory_store().count_by_category()
+
+
+@app.get(
+    "/memory/stats/timeseries",
+    response_model=TimeseriesResponse,
+    tags=["Memory Retrieval"],
+    summary="Get entry counts over time",
+    description="Roll up entry counts per hour or day, optionally for one type and a time range",
+)
+async def get_stats_timeseries(
+    interval: StatsInterval = Query(StatsInterval.day, description="Bucket width"),
+    type_filter: Optional[str] = Query(None, description="Optional type filter"),
+    start: Optional[datetime] = Query(None, description="Only buckets containing times at or after this time"),
+    end: Optional[datetime] = Query(None, description="Only buckets starting at or before this time"),
+):
+    """
+    Return entry counts per time bucket.
+    
+    Served from counters the store updates on every write and delete, so
+    the cost depends on the number of buckets, not of entries. Empty
+    buckets are omitted.
+    
+    Returns:
+        TimeseriesResponse with the non-empty buckets, oldest first
+    """
+    series = get_memory_store().timeseries(interval.value, type_filter, start, end)
+    buckets = [TimeseriesBucket(start=bucket.isoformat(), count=count, by_type=by_type)
+               for bucket, count, by_type in series]
+    return TimeseriesResponse(interval=interval, total=sum(b.count for b in buckets), buckets=buckets)
+
+
+@app.get(
+    "/memory/duplicates",
+    response_model=DuplicatesResponse,
+    tags=["Memory Retrieval"],
+    summary="Report near-duplicate entries",
+    description="List clusters of stored entries of the same type whose content is nearly identical",
+)
+async def get_duplicates(
+    type_filter: Optional[str] = Query(None, description="Optional type filter"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of clusters"),
+):
+    """
+    Return clusters of near-duplicate entries, largest first.
+    
+    Also reports the store's duplicate policy and how many writes it has
+    dropped, counted or merged so far. With the policy off the report has
+    to sign every entry, so it is slower than with a policy on.
+    
+    Returns:
+        DuplicatesResponse with the clusters
+    """
+    store = get_memory_store()
+    clusters = await run_in_threadpool(store.find_duplicates, type_filter, limit)
+    groups = [DuplicateGroup(type=members[0].type, count=len(members),
+                             entries=[memory_entry_to_response(entry) for entry in members])
+              for members in clusters]
+    return DuplicatesResponse(policy=store.duplicate_policy.value, threshold=store.duplicate_threshold,
+                              absorbed=store.duplicates_absorbed, groups=groups)
+
+
+@app.get(
+    "/memory/graph/{entry_id}",
+    response_model=GraphResponse,
+    tags=["Memory Retrieval"],
+    summary="Traverse links around an entry",
+    description=(
+        "Return the entries within `depth` related_to links of an entry (followed in either direction) "
+        "and the links between them"
+    ),
+)
+async def get_graph(
+    entry_id: str = Path(..., description="Memory entry ID"),
+    depth: int = Query(1, ge=1, le=10, description="Maximum number of links from the entry"),
+):
+    """
+    Breadth-first traversal of the related_to graph.
+    
+    Links are read from the maintained adjacency index, so the cost is
+    proportional to the entries and links returned.
+    
+    Returns:
+        GraphResponse with the entries (the start at depth 0) and links
+    """
+    result = await run_in_threadpool(get_memory_store().traverse, entry_id, depth)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Entry not found")
+    nodes, edges = result
+    return GraphResponse(
+        root=entry_id,
+        depth=depth,
+        nodes=[GraphNodeResponse(**memory_entry_to_response(entry).model_dump(), depth=hops)
+               for entry, hops in nodes],
+        edges=[GraphEdge(source=source, target=target) for source, target in edges],
+    )
+
+
+@app.get(
+    "/memory/graph/{entry_id}/timeline",
+    response_model=MemoryListResponse,
+    tags=["Memory Retrieval"],
+    summary="Get the timeline of an entry's connected entries",
+    description="Return every entry linked to an entry, directly or indirectly, oldest first",
+)
+async def get_graph_timeline(
+    entry_id: str = Path(..., description="Memory entry ID"),
+    type_filter: Optional[str] = Query(None, description="Optional type filter"),
+):
+    """Return the connected component of an entry in chronological order."""
+    store = get_memory_store()
+    entries = await run_in_threadpool(store.linked_component, [entry_id])
+    if not entries:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Entry not found")
+    if type_filter:
+        entries = [entry for entry in entries if entry.type == type_filter]
+    return MemoryListResponse(total=len(entries), entries=[memory_entry_to_response(entry) for entry in entries])
+
+
+@app.get(
+    "/memory/projects/{project_name}/timeline",
+    response_model=MemoryListResponse,
+    tags=["Memory Retrieval"],
+    summary="Get a project timeline",
+    description=(
+        "Return every entry naming the project or linked to one that does, directly or indirectly, oldest first"
+    ),
+)
+async def get_project_timeline_entries(
+    project_name: str = Path(..., description="Project name (project_name metadata)"),
+    type_filter: Optional[str] = Query(None, description="Optional type filter"),
+):
+    """Return a project's connected entries in chronological order."""
+    entries = await run_in_threadpool(get_project_timeline, project_name, type_filter or None)
+    return MemoryListResponse(total=len(entries), entries=[memory_entry_to_response(entry) for entry in entries])
+
+
+@app.get(
+    "/memory/tenants",
+    response_model=TenantStatsResponse,
+    tags=["Memory Retrieval"],
+    summary="Get open tenant stores",
+    description="List the tenant stores held in memory with their estimated sizes, against the memory budget",
+)
+async def get_tenant_stats():
+    """Return the open tenant stores and load/eviction counts."""
+    return tenant_stores.stats()
+
+
 @app.get(
     "/memory/events/summary",
     response_model=EventSummaryResponse,
@@ -425,10 +1255,10 @@ async def create_manual_entry(entry_request: MemoryCreateRequest):
                 content=entry_request.content,
                 metadata=entry_request.metadata
             )
-            entry_id = memory_store.store(entry)
+            entry_id = get_memory_store().store(entry)
         
         # Retrieve the created entry
-        created_entry = memory_store.get_by_id(entry_id)
+        created_entry = get_memory_store().get_by_id(entry_id)
         if not created_entry:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -444,12 +1274,274 @@ async def create_manual_entry(entry_request: MemoryCreateRequest):
         )
 
 
+# Entries handed to store_many at a time while a bulk request is parsed
+BULK_BATCH_SIZE = 1000
+
+
+def bulk_item_to_entry(item: MemoryBulkItem) -> MemoryEntry:
+    """
+    Build the entry a bulk item describes, with the same per-type metadata
+    defaults as /memory/manual.
+    """
+    metadata = dict(item.metadata)
+    if item.type == MemoryCreateRequest.EntryType.decision:
+        metadata["decision_time"] = datetime.now().isoformat()
+        metadata["decision_type"] = metadata.get("decision_type", "system")
+    elif item.type == MemoryCreateRequest.EntryType.insight:
+        metadata.setdefault("source", "manual_api")
+    elif item.type == MemoryCreateRequest.EntryType.project:
+        metadata.setdefault("project_name", "Unnamed Project")
+    fields = {"type": item.type.value, "content": item.content, "metadata": metadata}
+    if item.timestamp is not None:
+        fields["timestamp"] = item.timestamp
+    return MemoryEntry(**fields)
+
+
+def store_each(entries: List[MemoryEntry]) -> List[Any]:
+    """Store entries one at a time; returns each entry's ID or the ValueError that rejected it."""
+    store = get_memory_store()
+    results: List[Any] = []
+    for entry in entries:
+        try:
+            results.append(store.store(entry))
+        except ValueError as exc:
+            results.append(exc)
+    return results
+
+
+async def _ndjson_items(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield (line number, parsed JSON or the parse error) from an NDJSON body as it streams in."""
+    buffer = b""
+    index = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                try:
+                    yield index, json.loads(line)
+                except ValueError as exc:
+                    yield index, exc
+                index += 1
+    if buffer.strip():
+        try:
+            yield index, json.loads(buffer)
+        except ValueError as exc:
+            yield index, exc
+
+
+async def _json_array_items(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield (index, item) from a JSON array body."""
+    try:
+        items = json.loads(await request.body())
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid JSON body: {exc}")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Expected a JSON array of memory entries")
+    for index, item in enumerate(items):
+        yield index, item
+
+
+@app.post(
+    "/memory/bulk",
+    response_model=BulkCreateResponse,
+    status_code=status.HTTP_201_CREATED,
+    tags=["Memory Creation"],
+    summary="Import many memory entries",
+    description=(
+        "Create memory entries from a JSON array or, with Content-Type application/x-ndjson, "
+        "one JSON object per line. Returns only the new IDs and per-item errors."
+    )
+)
+async def create_bulk_entries(request: Request):
+    """
+    Import memory entries in batches.
+    
+    Items are validated one by one; valid ones are stored BULK_BATCH_SIZE
+    at a time with MemoryStore.store_many (one lock acquisition and one WAL
+    write per batch), so an NDJSON body is stored while it is still
+    arriving. A batch that store_many rejects (it stores all or nothing) is
+    retried one item at a time, so only the offending items fail.
+    
+    Args:
+        request: Request whose body holds the entries
+        
+    Returns:
+        BulkCreateResponse with one ID (or None) per item and the errors
+    """
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        items = _ndjson_items(request)
+    else:
+        items = _json_array_items(request)
+
+    ids: List[Optional[str]] = []
+    errors: List[BulkItemError] = []
+    batch: List[Tuple[int, MemoryEntry]] = []
+
+    async def flush() -> None:
+        entries = [entry for _, entry in batch]
+        try:
+            stored = await run_in_threadpool(get_memory_store().store_many, entries)
+        except ValueError:
+            stored = await run_in_threadpool(store_each, entries)
+        for (index, _), result in zip(batch, stored):
+            if isinstance(result, ValueError):
+                errors.append(BulkItemError(index=index, detail=str(result)))
+            else:
+                ids[index] = result
+        batch.clear()
+
+    async for index, item in items:
+        ids.append(None)
+        try:
+            if isinstance(item, Exception):
+                raise ValueError(f"Invalid JSON: {item}")
+            if not isinstance(item, dict):
+                raise ValueError("Expected a JSON object")
+            entry = bulk_item_to_entry(MemoryBulkItem(**item))
+            if not entry.content:
+                raise ValueError("Memory entry content cannot be empty")
+        except (ValidationError, ValueError) as exc:
+            errors.append(BulkItemError(index=index, detail=str(exc)))
+            continue
+        batch.append((index, entry))
+        if len(batch) >= BULK_BATCH_SIZE:
+            await flush()
+    if batch:
+        await flush()
+
+    errors.sort(key=lambda error: error.index)
+    return BulkCreateResponse(ids=ids, errors=errors)
+
+
+@app.get(
+    "/memory/export",
+    tags=["Memory Retrieval"],
+    summary="Export memory entries",
+    description=(
+        "Stream every entry, oldest first, as NDJSON or in the columnar binary format, "
+        "which also carries the embeddings"
+    ),
+    responses={200: {"content": {media_type: {} for media_type in MEDIA_TYPES.values()}}},
+)
+async def export_entries(
+    format: ExportFormat = Query(ExportFormat.columnar, description="columnar (binary, with embeddings) or ndjson"),
+    type_filter: Optional[str] = Query(None, description="Optional type filter"),
+):
+    """
+    Stream a backup of the store.
+    
+    The store is read a batch at a time and each batch is sent as soon as
+    it is encoded, so server memory stays constant however large the
+    export. Entries written while the export runs may or may not be in it.
+    
+    Returns:
+        A streaming response in the requested format
+    """
+    chunks = export_stream(get_memory_store(), format, type_filter)
+
+    async def stream() -> AsyncIterator[bytes]:
+        while True:
+            chunk = await run_in_threadpool(next, chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+
+    return StreamingResponse(
+        stream(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="memory.{format.value}"'},
+    )
+
+
+def import_rejection(store: Any, entries: List[MemoryEntry], first_record: int, error: ValueError) -> HTTPException:
+    """
+    Explain why store_many rejected an import batch.
+
+    Args:
+        store: Store the batch was imported into
+        entries: The rejected batch
+        first_record: Record number (1-based, in the export) of its first entry
+        error: What store_many raised
+
+    Returns:
+        409 for the first record whose ID is already stored, 400 for the
+        first invalid record (or the batch itself if no record is to blame)
+    """
+    seen: Set[str] = set()
+    for number, entry in enumerate(entries, first_record):
+        if not entry.content:
+            return HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                 detail=f"Record {number} (entry {entry.id}): content cannot be empty")
+        if entry.id in seen:
+            return HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                 detail=f"Record {number}: entry {entry.id} appears twice in the export")
+        seen.add(entry.id)
+        if store.get_by_id(entry.id) is not None:
+            return HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                 detail=f"Record {number}: entry {entry.id} already exists")
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                         detail=f"Records {first_record}-{first_record + len(entries) - 1}: {error}")
+
+
+@app.post(
+    "/memory/import",
+    response_model=ImportResponse,
+    status_code=status.HTTP_201_CREATED,
+    tags=["Memory Creation"],
+    summary="Import an export",
+    description=(
+        "Restore entries from a /memory/export body, keeping their IDs and timestamps; "
+        "embeddings in a columnar export are reused instead of recomputed"
+    ),
+)
+async def import_entries(
+    request: Request,
+    format: ExportFormat = Query(ExportFormat.columnar, description="Format of the body"),
+):
+    """
+    Import an export while it is still arriving.
+    
+    The body is decoded as it streams in and stored one chunk at a time
+    with store_many. The import stops at the first malformed chunk or
+    invalid record (400) or entry ID that is already stored (409), and the
+    error names the record; chunks stored before it stay imported.
+    
+    Returns:
+        ImportResponse with the number of entries imported
+    """
+    store = get_memory_store()
+    decoder = decoder_for(format, store.embedding_dim)
+    imported = 0
+
+    async def store_batches(decode: Callable[..., Any], *args: Any) -> None:
+        nonlocal imported
+        try:
+            batches = await run_in_threadpool(decode, *args)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=f"Invalid {format.value} export after {imported} entries: {exc}")
+        for entries, vectors in batches:
+            try:
+                stored = await run_in_threadpool(store.store_many, entries, deduplicate=False, vectors=vectors)
+            except ValueError as exc:
+                raise await run_in_threadpool(import_rejection, store, entries, imported + 1, exc)
+            imported += len(stored)
+
+    async for data in request.stream():
+        await store_batches(decoder.feed, data)
+    await store_batches(decoder.finish)
+    return ImportResponse(format=format.value, imported=imported)
+
+
 # Example usage
 if __name__ == "__main__":
     import uvicorn
     
     # Create some example entries if the memory store is empty
-    if not memory_store.entries:
+    if get_memory_store().count_entries() == 0:
         # Create sample entries
         log_event("User login detected", {"user_id": "user123", "login_time": datetime.now().isoformat()})
         log_decision("Scheduled daily reflection at 9 PM", {"confidence": 0.9, "schedule_time": "21:00"})
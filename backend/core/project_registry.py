@@ -9,6 +9,7 @@ goals, tasks, and time allocations.
 from enum import Enum
 from typing import Dict, List, Optional, Union
 from datetime import datetime
+import uuid
 from pydantic import BaseModel, Field
 
 
@@ -120,6 +121,8 @@ class ProjectRegistry:
     def __init__(self):
         """Initialize an empty project registry."""
         self.projects: Dict[str, Project] = {}
+        self.epoch = uuid.uuid4().hex[:8]  # Versions are only comparable within one registry instance
+        self.version = 0  # Bumped by every registration, for ETags of project listings
         # In a real implementation, we'd load existing goals, tasks and schedule
         # from a persistence layer. For now, we'll simulate with empty collections
         self.goals = []
@@ -138,6 +141,7 @@ class ProjectRegistry:
         """
         # Store the project
         self.projects[project.name] = project
+        self.version += 1
         
         # Perform impact analysis
         impact_analysis = self._analyze_impact(project)
@@ -0,0 +1,173 @@
+"""
+Change Feed Module for Oculus Dei Life Management System
+
+This module provides the in-process feed of memory store mutations that
+lets clients follow changes instead of polling. Every published change gets
+a monotonically increasing sequence number and is kept in a bounded replay
+buffer, so a subscriber that reconnects can resume after the last sequence
+it saw. Each subscriber has its own bounded queue; a subscriber that falls
+behind never slows down writers. Its backlog is dropped instead and it
+receives a single ``resync`` event telling it to reload its state.
+"""
+
+import threading
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set
+
+Change = Dict[str, Any]
+
+
+class Subscription:
+    """One consumer's queue of changes. Obtain with ChangeFeed.subscribe."""
+
+    def __init__(self, feed: "ChangeFeed", max_pending: int, on_ready: Optional[Callable[[], None]] = None):
+        self._feed = feed
+        self.max_pending = max_pending
+        self.on_ready = on_ready  # Called from the publishing thread when changes arrive in an empty queue
+        self._pending: Deque[Change] = deque()
+        self._resync = False
+        self._ready = threading.Condition(threading.Lock())
+        self.dropped = 0  # Changes discarded because this subscriber fell behind
+
+    def _deliver(self, change: Change) -> None:
+        """Queue one change, or drop the backlog if the queue is full. Caller holds the feed lock."""
+        with self._ready:
+            if self._resync:
+                self.dropped += 1
+                return
+            wake = not self._pending  # A non-empty queue has already woken its consumer
+            if len(self._pending) >= self.max_pending:
+                self.dropped += len(self._pending) + 1
+                self._pending.clear()
+                self._resync = True
+            else:
+                self._pending.append(change)
+            if wake:
+                self._ready.notify()
+        if wake and self.on_ready is not None:
+            self.on_ready()
+
+    def _replay(self, changes: Iterable[Change]) -> None:
+        with self._ready:
+            self._pending.extend(changes)
+            self._ready.notify()
+        if self.on_ready is not None:
+            self.on_ready()
+
+    def _flag_resync(self) -> None:
+        with self._ready:
+            self._pending.clear()
+            self._resync = True
+            self._ready.notify()
+        if self.on_ready is not None:
+            self.on_ready()
+
+    def drain(self) -> List[Change]:
+        """
+        Take every queued change without waiting.
+
+        Returns:
+            The queued changes, oldest first; or, if this subscriber fell
+            behind, a single ``{"op": "resync", "seq": n}`` change: reload
+            the state and treat every change up to ``n`` as applied
+        """
+        with self._feed._lock:  # Nothing is published between reading last_seq and clearing the flag
+            with self._ready:
+                if self._resync:
+                    self._resync = False
+                    return [{"seq": self._feed.last_seq, "op": "resync"}]
+                changes = list(self._pending)
+                self._pending.clear()
+                return changes
+
+    def get(self, timeout: Optional[float] = None) -> List[Change]:
+        """Wait up to ``timeout`` seconds for changes, then drain them (possibly none)."""
+        with self._ready:
+            self._ready.wait_for(lambda: self._pending or self._resync, timeout)
+        return self.drain()
+
+    def close(self) -> None:
+        """Stop receiving changes."""
+        self._feed._unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ChangeFeed:
+    """
+    Sequenced, replayable fan-out of store mutations.
+
+    Publishing never blocks on subscribers: delivery only appends to their
+    bounded queues.
+    """
+
+    def __init__(self, history: int = 10000, max_pending: int = 1000):
+        """
+        Initialize an empty feed.
+
+        Args:
+            history: Most recent changes kept for subscribers resuming after a sequence
+            max_pending: Default per-subscriber queue bound before it is dropped to a resync
+        """
+        self.max_pending = max_pending
+        self._history: Deque[Change] = deque(maxlen=history)
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self.epoch = uuid.uuid4().hex[:8]  # Sequence numbers are only comparable within one feed instance
+        self.last_seq = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, records: Iterable[Dict[str, Any]]) -> None:
+        """
+        Number the given mutation records and deliver them to every subscriber.
+
+        Args:
+            records: Mutation records (the store's WAL records: an ``op`` and its fields)
+        """
+        with self._lock:
+            for record in records:
+                self.last_seq += 1
+                change = {"seq": self.last_seq, **record}
+                self._history.append(change)
+                for subscription in self._subscribers:
+                    subscription._deliver(change)
+
+    def subscribe(self, after: Optional[int] = None, max_pending: Optional[int] = None,
+                  on_ready: Optional[Callable[[], None]] = None) -> Subscription:
+        """
+        Start receiving changes.
+
+        Args:
+            after: Resume after this sequence number: newer changes still in
+                the replay buffer are queued at once, and a resync is queued
+                if some of them have already left it. None starts with the
+                next change.
+            max_pending: Queue bound for this subscriber (default: the feed's)
+            on_ready: Callback run by publishers when changes become available
+
+        Returns:
+            The subscription; close it when done
+        """
+        subscription = Subscription(self, max_pending or self.max_pending, on_ready)
+        with self._lock:
+            if after is not None and after < self.last_seq:
+                oldest = self._history[0]["seq"] if self._history else self.last_seq + 1
+                if after + 1 < oldest:
+                    subscription._flag_resync()
+                else:
+                    # Replay is not bounded by max_pending: it is at most the history size
+                    subscription._replay(change for change in self._history if change["seq"] > after)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
@@ -0,0 +1,344 @@
+"""
+Columnar Storage Module for Oculus Dei Life Management System
+
+This module holds memory entries column by column instead of as one pydantic
+object per entry. Timestamps are int64 microseconds since the epoch, types
+are interned to small integer codes, and content and metadata (as compact
+JSON) are UTF-8 bytes in one shared arena. The store builds MemoryEntry
+objects from these columns only when an entry leaves it, either from the
+live columns or from an immutable ColumnsView taken under the store's lock.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from backend.memory.cow import CowColumn, FrozenColumn
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def time_key(timestamp: datetime) -> int:
+    """
+    Convert a timestamp to integer microseconds since the epoch.
+
+    Naive timestamps are taken as-is; aware ones are converted to UTC first.
+    """
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = timestamp - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def from_time_key(key: int, tz: Optional[tzinfo] = None) -> datetime:
+    """Inverse of time_key; pass the original tzinfo to get an aware datetime back."""
+    if tz is None:
+        return _EPOCH + timedelta(microseconds=key)
+    return (_EPOCH_UTC + timedelta(microseconds=key)).astimezone(tz)
+
+
+class _ColumnReader:
+    """Read access shared by EntryColumns and its frozen ColumnsView."""
+
+    # Set by both subclasses (live columns in EntryColumns, frozen ones in ColumnsView)
+    ids: Union[CowColumn, FrozenColumn]
+    seqs: Union[CowColumn, FrozenColumn]
+    time_keys: Union[CowColumn, FrozenColumn]
+    type_codes: Union[CowColumn, FrozenColumn]
+    _content_spans: Union[CowColumn, FrozenColumn]
+    _metadata_spans: Union[CowColumn, FrozenColumn]
+    _arena: bytearray
+    _type_names: Sequence[str]
+    _timezones: Dict[int, tzinfo]
+    _metadata_objects: Dict[int, Dict[str, Any]]
+
+    def __len__(self) -> int:
+        """Number of slots, including released ones."""
+        return len(self.ids)
+
+    @property
+    def arena_bytes(self) -> int:
+        """Size of the content/metadata arena."""
+        return len(self._arena)
+
+    def _read(self, spans, slot: int) -> bytes:
+        offset, length = spans[2 * slot], spans[2 * slot + 1]
+        return bytes(self._arena[offset: offset + length])
+
+    def content(self, slot: int) -> str:
+        return self._read(self._content_spans, slot).decode("utf-8")
+
+    def content_bytes(self, slot: int) -> bytes:
+        """A slot's content as stored (UTF-8)."""
+        return self._read(self._content_spans, slot)
+
+    def metadata_json(self, slot: int) -> bytes:
+        """A slot's metadata as compact UTF-8 JSON, without decoding it."""
+        obj = self._metadata_objects.get(slot)
+        if obj is not None:
+            return json.dumps(obj, default=str, separators=(",", ":")).encode("utf-8")
+        return self._read(self._metadata_spans, slot) or b"{}"
+
+    def utc_offset(self, slot: int) -> Optional[int]:
+        """UTC offset of an aware timestamp in seconds, or None for a naive one."""
+        if slot not in self._timezones:
+            return None
+        offset = self.timestamp(slot).utcoffset()
+        return None if offset is None else int(offset.total_seconds())
+
+    def metadata(self, slot: int) -> Dict[str, Any]:
+        """Return a fresh copy of a slot's metadata."""
+        obj = self._metadata_objects.get(slot)
+        if obj is not None:
+            return dict(obj)
+        raw = self._read(self._metadata_spans, slot)
+        # Decoding first skips json's per-call encoding sniffing of bytes input
+        return json.loads(raw.decode("utf-8")) if raw else {}
+
+    def type_of(self, slot: int) -> str:
+        return self._type_names[self.type_codes[slot]]
+
+    def timestamp(self, slot: int) -> datetime:
+        return from_time_key(self.time_keys[slot], self._timezones.get(slot))
+
+    def fields(self, slot: int) -> Dict[str, Any]:
+        """Return a slot's values as MemoryEntry field keyword arguments."""
+        return {
+            "id": self.ids[slot],
+            "timestamp": self.timestamp(slot),
+            "type": self.type_of(slot),
+            "content": self.content(slot),
+            "metadata": self.metadata(slot),
+        }
+
+    def compacted(self, slots: Iterable[int]) -> "EntryColumns":
+        """
+        Copy the given slots, renumbered densely in the given order, into
+        new columns with a garbage-free arena.
+        """
+        result = EntryColumns()
+        result._type_names = list(self._type_names)
+        result._type_codes = {name: code for code, name in enumerate(result._type_names)}
+        for new_slot, slot in enumerate(slots):
+            result.ids.append(self.ids[slot])
+            result.seqs.append(self.seqs[slot])
+            result.time_keys.append(self.time_keys[slot])
+            result.type_codes.append(self.type_codes[slot])
+            for spans, new_spans in ((self._content_spans, result._content_spans),
+                                     (self._metadata_spans, result._metadata_spans)):
+                offset, length = spans[2 * slot], spans[2 * slot + 1]
+                new_spans.extend(result._write(self._arena[offset: offset + length]) if length else (0, 0))
+            if slot in self._timezones:
+                result._timezones[new_slot] = self._timezones[slot]
+            if slot in self._metadata_objects:
+                result._metadata_objects[new_slot] = self._metadata_objects[slot]
+        return result
+
+
+class ColumnsView(_ColumnReader):
+    """
+    Immutable snapshot of EntryColumns.
+
+    Slot numbers and values stay exactly as they were when the snapshot was
+    taken, whatever the store writes afterwards, so readers can materialize
+    entries from it without holding the store's lock.
+    """
+
+    ids: FrozenColumn
+    seqs: FrozenColumn
+    time_keys: FrozenColumn
+    type_codes: FrozenColumn
+    _content_spans: FrozenColumn
+    _metadata_spans: FrozenColumn
+
+    def __init__(self, columns: "EntryColumns"):
+        self.ids = columns.ids.freeze()
+        self.seqs = columns.seqs.freeze()
+        self.time_keys = columns.time_keys.freeze()
+        self.type_codes = columns.type_codes.freeze()
+        self._content_spans = columns._content_spans.freeze()
+        self._metadata_spans = columns._metadata_spans.freeze()
+        self._arena = columns._arena  # Append-only; old spans are never overwritten
+        self._type_names = tuple(columns._type_names)
+        self._timezones = columns._timezones
+        self._metadata_objects = columns._metadata_objects
+
+
+class EntryColumns(_ColumnReader):
+    """
+    Column-oriented storage of memory entries addressed by slot number.
+
+    Released slots and replaced values keep their arena bytes until the
+    store swaps in ``compacted`` columns; the store decides which slots are
+    live. Columns are copy-on-write (see cow.py), so ``snapshot`` is cheap
+    and never blocks later writes.
+    """
+
+    ids: CowColumn
+    seqs: CowColumn
+    time_keys: CowColumn
+    type_codes: CowColumn
+    _content_spans: CowColumn
+    _metadata_spans: CowColumn
+    _type_names: List[str]
+
+    def __init__(self):
+        """Initialize empty columns."""
+        self.ids = CowColumn()  # None marks a released slot
+        self.seqs = CowColumn("q")
+        self.time_keys = CowColumn("q")
+        self.type_codes = CowColumn("I")
+        self._content_spans = CowColumn("Q")  # (offset, length) pairs into the arena
+        self._metadata_spans = CowColumn("Q")
+        self._arena = bytearray()
+        self._garbage = 0  # Arena bytes no longer referenced by a live slot
+        self._type_names = []
+        self._type_codes: Dict[str, int] = {}
+        self._timezones: Dict[int, tzinfo] = {}  # Slot -> tzinfo for aware timestamps
+        self._metadata_objects: Dict[int, Dict[str, Any]] = {}  # Metadata that JSON cannot round-trip
+        self._dicts_shared = False  # Whether the latest view holds the two dicts above
+        self._view: Optional[ColumnsView] = None
+
+    @property
+    def garbage_bytes(self) -> int:
+        """Arena bytes left behind by released slots and updates."""
+        return self._garbage
+
+    def snapshot(self) -> ColumnsView:
+        """Return an immutable view of the current columns; cached until the next write."""
+        if self._view is None:
+            self._view = ColumnsView(self)
+            self._dicts_shared = True
+        return self._view
+
+    def _modified(self) -> None:
+        """Drop the cached view and unshare the dicts a view may hold."""
+        self._view = None
+        if self._dicts_shared:
+            self._timezones = dict(self._timezones)
+            self._metadata_objects = dict(self._metadata_objects)
+            self._dicts_shared = False
+
+    def _intern_type(self, entry_type: str) -> int:
+        code = self._type_codes.get(entry_type)
+        if code is None:
+            code = len(self._type_names)
+            self._type_names.append(entry_type)
+            self._type_codes[entry_type] = code
+        return code
+
+    def _write(self, data: bytes) -> Tuple[int, int]:
+        offset = len(self._arena)
+        self._arena += data
+        return offset, len(data)
+
+    @staticmethod
+    def _set_span(spans: CowColumn, slot: int, span: Tuple[int, int]) -> None:
+        if 2 * slot == len(spans):
+            spans.extend(span)
+        else:
+            spans[2 * slot], spans[2 * slot + 1] = span
+
+    def put(self, slot: int, entry, seq: int) -> None:
+        """
+        Write an entry into a released slot or the next new slot.
+
+        Args:
+            slot: Slot number (``len(self)`` to append)
+            entry: Entry to copy into the columns
+            seq: Store-wide insertion sequence number
+        """
+        self._modified()
+        values = (seq, time_key(entry.timestamp), self._intern_type(entry.type))
+        if slot == len(self.ids):
+            self.ids.append(entry.id)
+            self.seqs.append(values[0])
+            self.time_keys.append(values[1])
+            self.type_codes.append(values[2])
+        else:
+            self.ids[slot] = entry.id
+            self.seqs[slot], self.time_keys[slot], self.type_codes[slot] = values
+        if entry.timestamp.tzinfo is not None:
+            self._timezones[slot] = entry.timestamp.tzinfo
+        self._set_span(self._content_spans, slot, self._write(entry.content.encode("utf-8")))
+        self._set_span(self._metadata_spans, slot, (0, 0))
+        self.set_metadata(slot, entry.metadata)
+
+    def release(self, slot: int) -> None:
+        """Mark a slot as free; its arena bytes become garbage."""
+        self._modified()
+        self.ids[slot] = None
+        self._garbage += self._content_spans[2 * slot + 1] + self._metadata_spans[2 * slot + 1]
+        self._timezones.pop(slot, None)
+        self._metadata_objects.pop(slot, None)
+
+    def set_content(self, slot: int, content: str) -> None:
+        """Replace the content of a slot."""
+        self._modified()
+        self._garbage += self._content_spans[2 * slot + 1]
+        self._set_span(self._content_spans, slot, self._write(content.encode("utf-8")))
+
+    def set_metadata(self, slot: int, metadata: Dict[str, Any]) -> None:
+        """Replace the metadata of a slot."""
+        self._modified()
+        self._garbage += self._metadata_spans[2 * slot + 1]
+        self._metadata_objects.pop(slot, None)
+        encoded = None
+        try:
+            text = json.dumps(metadata, ensure_ascii=False, separators=(",", ":"))
+            if json.loads(text) == metadata:
+                encoded = text.encode("utf-8")
+        except (TypeError, ValueError):
+            pass
+        if encoded is None:
+            # Tuples, datetimes and other values that JSON would change are kept as objects
+            self._metadata_objects[slot] = dict(metadata)
+            self._set_span(self._metadata_spans, slot, (0, 0))
+        else:
+            self._set_span(self._metadata_spans, slot, self._write(encoded))
+
+
+# utc_offsets value of a naive timestamp in an EntryBatch
+NAIVE_OFFSET = -(2 ** 31)
+
+
+class EntryBatch:
+    """
+    A run of entries as columns, the unit of export and import.
+
+    Content and metadata stay UTF-8 bytes (metadata as JSON) so they move
+    between a store and a file without being decoded. Timestamps are time
+    keys plus UTC offsets in seconds (NAIVE_OFFSET for naive timestamps).
+    """
+
+    __slots__ = ("ids", "types", "contents", "metadata", "time_keys", "utc_offsets", "embeddings")
+
+    def __init__(self, ids: List[str], types: List[str], contents: List[bytes], metadata: List[bytes],
+                 time_keys: np.ndarray, utc_offsets: np.ndarray, embeddings: Optional[np.ndarray] = None):
+        self.ids = ids
+        self.types = types
+        self.contents = contents
+        self.metadata = metadata
+        self.time_keys = time_keys  # int64
+        self.utc_offsets = utc_offsets  # int32
+        self.embeddings = embeddings  # float32 (len, dim), or None when not exported
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def timestamps(self) -> List[datetime]:
+        """The entries' timestamps, aware ones with a fixed-offset timezone."""
+        zones: Dict[int, tzinfo] = {}
+        timestamps = []
+        for key, offset in zip(self.time_keys.tolist(), self.utc_offsets.tolist()):
+            if offset == NAIVE_OFFSET:
+                timestamps.append(from_time_key(key))
+            else:
+                zone = zones.get(offset)
+                if zone is None:
+                    zone = zones[offset] = timezone(timedelta(seconds=offset))
+                timestamps.append(from_time_key(key, zone))
+        return timestamps
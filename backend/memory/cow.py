@@ -0,0 +1,125 @@
+"""
+Copy-on-Write Module for Oculus Dei Life Management System
+
+This module provides the segmented, copy-on-write columns that let readers
+of the MemoryStore work on an immutable snapshot while writers keep going.
+A column is split into fixed-size segments; ``freeze`` hands out the
+current list of segments in O(number of segments), and a writer copies a
+segment the first time it overwrites a position that a frozen view can see.
+Appends past the frozen length never copy, so the common write path is
+unaffected.
+"""
+
+from array import array
+from typing import Any, Iterator, List, Optional
+
+SEGMENT_SHIFT = 12
+SEGMENT_SIZE = 1 << SEGMENT_SHIFT  # Values per segment
+SEGMENT_MASK = SEGMENT_SIZE - 1
+
+
+class FrozenColumn:
+    """Read-only view of a CowColumn at the moment it was frozen."""
+
+    __slots__ = ("_segments", "_length")
+
+    def __init__(self, segments: List[Any], length: int):
+        self._segments = segments
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> Any:
+        if not 0 <= index < self._length:
+            raise IndexError("column index out of range")
+        return self._segments[index >> SEGMENT_SHIFT][index & SEGMENT_MASK]
+
+    def __iter__(self) -> Iterator[Any]:
+        remaining = self._length
+        for segment in self._segments:
+            if remaining <= 0:
+                break
+            yield from segment[:remaining] if remaining < len(segment) else segment
+            remaining -= len(segment)
+
+
+class CowColumn:
+    """
+    Growable column of values (a list, or an ``array`` for a typecode)
+    stored in copy-on-write segments.
+    """
+
+    def __init__(self, typecode: Optional[str] = None):
+        """
+        Initialize an empty column.
+
+        Args:
+            typecode: ``array`` typecode for fixed-width values, or None for
+                arbitrary Python objects
+        """
+        self.typecode = typecode
+        self._segments: List[Any] = []
+        self._gens: List[int] = []  # Generation in which each segment object was created
+        self._gen = 0
+        self._length = 0
+        self._frozen_length = 0  # Positions below this may be visible to a frozen view
+
+    def _new_segment(self) -> Any:
+        return [] if self.typecode is None else array(self.typecode)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> Any:
+        if not 0 <= index < self._length:
+            raise IndexError("column index out of range")
+        return self._segments[index >> SEGMENT_SHIFT][index & SEGMENT_MASK]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(FrozenColumn(self._segments, self._length))
+
+    def _writable(self, index: int) -> Any:
+        """Return the segment holding ``index``, copying it first if a frozen view shares it."""
+        number = index >> SEGMENT_SHIFT
+        segment = self._segments[number]
+        if index < self._frozen_length and self._gens[number] != self._gen:
+            segment = segment[:]
+            self._segments[number] = segment
+            self._gens[number] = self._gen
+        return segment
+
+    def __setitem__(self, index: int, value: Any) -> None:
+        if not 0 <= index < self._length:
+            raise IndexError("column index out of range")
+        self._writable(index)[index & SEGMENT_MASK] = value
+
+    def append(self, value: Any) -> None:
+        """Add a value at the end."""
+        if self._length == len(self._segments) * SEGMENT_SIZE:
+            self._segments.append(self._new_segment())
+            self._gens.append(self._gen)
+        self._writable(self._length).append(value)
+        self._length += 1
+
+    def extend(self, values) -> None:
+        for value in values:
+            self.append(value)
+
+    def pop(self) -> Any:
+        """Remove and return the last value."""
+        if not self._length:
+            raise IndexError("pop from empty column")
+        segment = self._writable(self._length - 1)
+        value = segment.pop()
+        self._length -= 1
+        if not segment:
+            self._segments.pop()
+            self._gens.pop()
+        return value
+
+    def freeze(self) -> FrozenColumn:
+        """Return an immutable view of the current contents."""
+        self._gen += 1
+        self._frozen_length = self._length
+        return FrozenColumn(list(self._segments), self._length)
@@ -0,0 +1,86 @@
+"""
+Cursor Module for Oculus Dei Life Management System
+
+This module encodes the opaque cursors used for keyset pagination over the
+time index. A cursor holds the (timestamp, sequence, entry ID) key of the
+last entry a page returned, so the next page starts right after it no
+matter how many entries were written or deleted in between. Relevance
+rankings page the same way on their (score, position) order. Each cursor is
+bound to the listing it came from (endpoint and filters) and is rejected if
+it is presented to a different one.
+"""
+
+import base64
+import hashlib
+import json
+from typing import Any, List, Sequence, Tuple
+
+CURSOR_VERSION = 1
+
+
+def _scope_tag(scope: str) -> str:
+    return hashlib.blake2b(scope.encode("utf-8"), digest_size=6).hexdigest()
+
+
+def encode_cursor(key: Sequence[Any], scope: str) -> str:
+    """
+    Encode a page boundary as an opaque, URL-safe token.
+
+    Args:
+        key: Time index key (or rank key) of the last entry on the page
+        scope: Description of the listing (endpoint and filters) the cursor belongs to
+
+    Returns:
+        The cursor string
+    """
+    payload = json.dumps([CURSOR_VERSION, _scope_tag(scope), *key], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, scope: str) -> Tuple[int, int, str]:
+    """
+    Decode a cursor produced by encode_cursor for the same listing.
+
+    Args:
+        token: The cursor string
+        scope: Description of the listing the cursor is used with
+
+    Returns:
+        The time index key to continue after
+
+    Raises:
+        ValueError: If the cursor is malformed or belongs to another listing
+    """
+    key = _decode(token, scope, 3)
+    ts_key, seq, entry_id = key
+    if not isinstance(ts_key, int) or not isinstance(seq, int) or not isinstance(entry_id, str):
+        raise ValueError("Malformed cursor")
+    return ts_key, seq, entry_id
+
+
+def decode_rank_cursor(token: str, scope: str) -> Tuple[float, int]:
+    """
+    Decode a cursor that encode_cursor produced from a (score, position)
+    rank key, for the same listing.
+
+    Raises:
+        ValueError: If the cursor is malformed or belongs to another listing
+    """
+    score, position = _decode(token, scope, 2)
+    if isinstance(score, bool) or not isinstance(score, (int, float)) or not isinstance(position, int):
+        raise ValueError("Malformed cursor")
+    return float(score), position
+
+
+def _decode(token: str, scope: str, length: int) -> List[Any]:
+    """Unpack a cursor's key, checking its version, length and listing."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        version, tag, *key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError, UnicodeError) as exc:
+        raise ValueError("Malformed cursor") from exc
+    if version != CURSOR_VERSION or len(key) != length:
+        raise ValueError("Malformed cursor")
+    if tag != _scope_tag(scope):
+        raise ValueError("Cursor does not belong to this listing")
+    return key
@@ -0,0 +1,123 @@
+"""
+Entry Counters Module for Oculus Dei Life Management System
+
+This module keeps the aggregate statistics of a memory store up to date as
+entries are written and deleted: counts per type, per metadata category and
+per hour and day bucket of entry time. Every update touches a fixed number
+of dictionary slots, so statistics and time series rollups are read without
+visiting a single entry.
+
+Buckets are aligned on the time keys of the time index (microseconds since
+the epoch; naive timestamps as stored, aware ones in UTC).
+"""
+
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from backend.memory.columnar import from_time_key
+
+# Bucket widths in time-key units (microseconds)
+INTERVALS = {"hour": 3600 * 1_000_000, "day": 86400 * 1_000_000}
+
+CATEGORY_KEY = "category"
+
+
+def entry_category(metadata: Mapping[str, Any]) -> Optional[str]:
+    """The category an entry is counted under, or None when it has none."""
+    value = metadata.get(CATEGORY_KEY)
+    return None if value is None else str(value)
+
+
+def _bump(counts: Dict[Any, int], key: Any, delta: int) -> None:
+    """Add delta to a count, dropping the key when it reaches zero."""
+    count = counts.get(key, 0) + delta
+    if count:
+        counts[key] = count
+    else:
+        counts.pop(key, None)
+
+
+class EntryCounters:
+    """Counts by type, category and time bucket, maintained on every write."""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget every count."""
+        self.by_type: Dict[str, int] = {}
+        self.by_category: Dict[str, int] = {}
+        self._buckets: Dict[str, Dict[int, Dict[str, int]]] = {name: {} for name in INTERVALS}  # Start -> type -> n
+        self._starts: Dict[str, List[int]] = {name: [] for name in INTERVALS}  # Sorted non-empty bucket starts
+
+    def add(self, entry_type: str, category: Optional[str], ts_key: int, delta: int = 1) -> None:
+        """
+        Count an entry in (or, with delta=-1, out of) every statistic.
+
+        Args:
+            entry_type: Entry type
+            category: Entry category (see entry_category)
+            ts_key: Time key of the entry's timestamp
+            delta: 1 when the entry is stored, -1 when it is removed
+        """
+        _bump(self.by_type, entry_type, delta)
+        if category is not None:
+            _bump(self.by_category, category, delta)
+        for name, width in INTERVALS.items():
+            start = ts_key - ts_key % width
+            buckets, starts = self._buckets[name], self._starts[name]
+            bucket = buckets.get(start)
+            if bucket is None:
+                bucket = buckets[start] = {}
+                insort(starts, start)
+            _bump(bucket, entry_type, delta)
+            if not bucket:
+                del buckets[start]
+                del starts[bisect_left(starts, start)]
+
+    def remove(self, entry_type: str, category: Optional[str], ts_key: int) -> None:
+        """Stop counting a removed entry."""
+        self.add(entry_type, category, ts_key, -1)
+
+    def recategorize(self, old: Optional[str], new: Optional[str]) -> None:
+        """Move an entry whose metadata was updated from one category to another."""
+        if old == new:
+            return
+        if old is not None:
+            _bump(self.by_category, old, -1)
+        if new is not None:
+            _bump(self.by_category, new, 1)
+
+    def timeseries(self, interval: str = "day", entry_type: Optional[str] = None,
+                   start_key: Optional[int] = None, end_key: Optional[int] = None) -> List[Tuple[Any, int, Dict[str, int]]]:
+        """
+        Roll up entry counts per time bucket.
+
+        Args:
+            interval: Bucket width, "hour" or "day"
+            entry_type: Only count entries of this type
+            start_key: Only buckets containing times at or after this time key
+            end_key: Only buckets starting at or before this time key
+
+        Returns:
+            (bucket start, count, count per type) for every non-empty bucket,
+            oldest first
+
+        Raises:
+            ValueError: If the interval is unknown
+        """
+        if interval not in INTERVALS:
+            raise ValueError(f"Unknown interval {interval!r}; expected one of {', '.join(INTERVALS)}")
+        width = INTERVALS[interval]
+        starts = self._starts[interval]
+        low = 0 if start_key is None else bisect_left(starts, start_key - start_key % width)
+        high = len(starts) if end_key is None else bisect_left(starts, end_key + 1)
+        buckets = self._buckets[interval]
+        series = []
+        for start in starts[low:high]:
+            by_type = buckets[start]
+            if entry_type is not None:
+                by_type = {entry_type: by_type[entry_type]} if entry_type in by_type else {}
+            if by_type:
+                series.append((from_time_key(start), sum(by_type.values()), dict(by_type)))
+        return series
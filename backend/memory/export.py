@@ -0,0 +1,292 @@
+"""
+Export Module for Oculus Dei Life Management System
+
+This module streams the contents of a memory store out and back in, for
+backups and for migrations between stores or backends. Entries are read
+in batches (see MemoryStore.export_batches) and written chunk by chunk,
+and imports are stored a chunk at a time, so neither side ever holds the
+whole store.
+
+Two formats are available:
+
+- NDJSON: one MemoryEntry.to_dict() object per line, readable by any
+  tool (and accepted by POST /memory/bulk).
+- Columnar: a chunked binary format that also carries the embeddings, so
+  an import does not recompute them.
+
+Columnar layout (little-endian):
+
+    header         b"ODMC", u8 format version, u16 embedding dimension (0: none)
+    chunk          u32 entry count n, u32 body length, body
+    body           ids, types, contents, metadata (JSON) as string columns,
+                   then int64[n] time keys, int32[n] UTC offsets in seconds
+                   (NAIVE_OFFSET for naive timestamps), float32[n, dimension]
+                   embeddings
+    string column  u32[n + 1] byte offsets into the UTF-8 data that follows
+    end            a chunk header with n = 0
+"""
+
+import json
+import struct
+from enum import Enum
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from backend.memory.columnar import EntryBatch
+from backend.memory.memory_store import MemoryEntry
+
+EXPORT_BATCH_SIZE = 1000
+
+COLUMNAR_MAGIC = b"ODMC"
+COLUMNAR_VERSION = 1
+_HEADER = struct.Struct("<4sBH")
+_CHUNK = struct.Struct("<II")
+
+# Entries and their embeddings (None when they must be computed), ready for store_many
+ImportBatch = Tuple[List[MemoryEntry], Optional[np.ndarray]]
+
+
+class ExportFormat(str, Enum):
+    """Serialization of an export"""
+    ndjson = "ndjson"
+    columnar = "columnar"
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.columnar: "application/vnd.oculus-dei.memory-columnar",
+}
+
+
+def ndjson_lines(batch: EntryBatch) -> bytes:
+    """One MemoryEntry.to_dict() JSON object per line; metadata JSON is copied, not re-encoded."""
+    dumps = json.dumps
+    lines = [
+        '{"id": %s, "timestamp": "%s", "type": %s, "content": %s, "metadata": %s}\n'
+        % (dumps(entry_id), timestamp.isoformat(), dumps(entry_type), dumps(content.decode("utf-8")),
+           metadata.decode("utf-8"))
+        for entry_id, timestamp, entry_type, content, metadata
+        in zip(batch.ids, batch.timestamps(), batch.types, batch.contents, batch.metadata)
+    ]
+    return "".join(lines).encode("utf-8")
+
+
+def _string_column(values: List[bytes]) -> bytes:
+    lengths = np.fromiter(map(len, values), dtype=np.uint32, count=len(values))
+    offsets = np.zeros(len(values) + 1, dtype="<u4")
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets.tobytes() + b"".join(values)
+
+
+def columnar_header(dim: int) -> bytes:
+    """Header of a columnar export whose chunks carry embeddings of this dimension (0: none)."""
+    return _HEADER.pack(COLUMNAR_MAGIC, COLUMNAR_VERSION, dim)
+
+
+def columnar_chunk(batch: EntryBatch) -> bytes:
+    """Encode one batch as a columnar chunk, header included."""
+    parts = [
+        _string_column([entry_id.encode("utf-8") for entry_id in batch.ids]),
+        _string_column([entry_type.encode("utf-8") for entry_type in batch.types]),
+        _string_column(batch.contents),
+        _string_column(batch.metadata),
+        batch.time_keys.astype("<i8", copy=False).tobytes(),
+        batch.utc_offsets.astype("<i4", copy=False).tobytes(),
+    ]
+    if batch.embeddings is not None:
+        parts.append(np.ascontiguousarray(batch.embeddings, dtype="<f4").tobytes())
+    body = b"".join(parts)
+    return _CHUNK.pack(len(batch), len(body)) + body
+
+
+def export_stream(store: Any, fmt: ExportFormat = ExportFormat.columnar, entry_type: Optional[str] = None,
+                  batch_size: int = EXPORT_BATCH_SIZE, embeddings: bool = True) -> Iterator[bytes]:
+    """
+    Serialize a store, oldest entry first, one chunk per batch.
+
+    Args:
+        store: MemoryStore or SQLiteMemoryStore
+        fmt: Output format
+        entry_type: Only export entries of this type
+        batch_size: Entries per chunk
+        embeddings: Include the embeddings (columnar format only)
+
+    Returns:
+        Iterator of byte chunks forming the export
+    """
+    fmt = ExportFormat(fmt)
+    if fmt is ExportFormat.ndjson:
+        for batch in store.export_batches(entry_type, batch_size, embeddings=False):
+            yield ndjson_lines(batch)
+        return
+    yield columnar_header(store.embedding_dim if embeddings else 0)
+    for batch in store.export_batches(entry_type, batch_size, embeddings=embeddings):
+        yield columnar_chunk(batch)
+    yield _CHUNK.pack(0, 0)
+
+
+def batch_entries(batch: EntryBatch) -> List[MemoryEntry]:
+    """Build the MemoryEntry objects of a decoded batch."""
+    entries = []
+    for entry_id, timestamp, entry_type, content, metadata in zip(
+            batch.ids, batch.timestamps(), batch.types, batch.contents, batch.metadata):
+        fields = json.loads(metadata.decode("utf-8"))
+        if not isinstance(fields, dict):
+            raise ValueError(f"Metadata of entry {entry_id} is not an object")
+        # Every field has been type-checked by the decoder, so pydantic validation is skipped
+        entries.append(MemoryEntry.model_construct(id=entry_id, timestamp=timestamp, type=entry_type,
+                                                   content=content.decode("utf-8"), metadata=fields))
+    return entries
+
+
+class NdjsonDecoder:
+    """Incrementally parse an NDJSON export into import batches."""
+
+    def __init__(self, batch_size: int = EXPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._buffer = b""
+        self._entries: List[MemoryEntry] = []
+        self.lines = 0
+
+    def _parse(self, lines: List[bytes]) -> List[ImportBatch]:
+        batches = []
+        for line in lines:
+            if not line.strip():
+                continue
+            self.lines += 1
+            try:
+                self._entries.append(MemoryEntry(**json.loads(line)))
+            except (ValueError, TypeError) as exc:
+                raise ValueError(f"Line {self.lines}: {exc}") from exc
+            if len(self._entries) >= self.batch_size:
+                batches.append((self._entries, None))
+                self._entries = []
+        return batches
+
+    def feed(self, data: bytes) -> List[ImportBatch]:
+        """Consume more of the stream; returns the batches completed by it."""
+        *lines, self._buffer = (self._buffer + data).split(b"\n")
+        return self._parse(lines)
+
+    def finish(self) -> List[ImportBatch]:
+        """Parse a final unterminated line and return what is left."""
+        batches = self._parse([self._buffer])
+        self._buffer = b""
+        if self._entries:
+            batches.append((self._entries, None))
+            self._entries = []
+        return batches
+
+
+class ColumnarDecoder:
+    """Incrementally parse a columnar export into import batches."""
+
+    def __init__(self, embedding_dim: Optional[int] = None):
+        """
+        Args:
+            embedding_dim: Dimension of the target store's embeddings; stored
+                embeddings of another dimension are dropped (and recomputed)
+        """
+        self.embedding_dim = embedding_dim
+        self._buffer = bytearray()
+        self._dim: Optional[int] = None  # From the header
+        self.done = False
+
+    def feed(self, data: bytes) -> List[ImportBatch]:
+        """Consume more of the stream; returns the batches completed by it."""
+        self._buffer += data
+        batches = []
+        if self._dim is None:
+            if len(self._buffer) < _HEADER.size:
+                return batches
+            magic, version, self._dim = _HEADER.unpack_from(self._buffer)
+            if magic != COLUMNAR_MAGIC:
+                raise ValueError("Not a columnar memory export")
+            if version != COLUMNAR_VERSION:
+                raise ValueError(f"Unsupported columnar export version {version}")
+            del self._buffer[:_HEADER.size]
+        while not self.done and len(self._buffer) >= _CHUNK.size:
+            count, length = _CHUNK.unpack_from(self._buffer)
+            if count == 0:
+                self.done = True
+                break
+            if len(self._buffer) < _CHUNK.size + length:
+                break
+            body = bytes(self._buffer[_CHUNK.size: _CHUNK.size + length])
+            del self._buffer[:_CHUNK.size + length]
+            batch = self._decode(count, body)
+            vectors = batch.embeddings
+            if vectors is not None and vectors.shape[1] != self.embedding_dim:
+                vectors = None
+            batches.append((batch_entries(batch), vectors))
+        return batches
+
+    def finish(self) -> List[ImportBatch]:
+        """Check that the stream ended with its end marker."""
+        if not self.done:
+            raise ValueError("Columnar export is truncated")
+        return []
+
+    def _decode(self, count: int, body: bytes) -> EntryBatch:
+        position = 0
+        columns = []
+        try:
+            for _ in range(4):
+                offsets = np.frombuffer(body, dtype="<u4", count=count + 1, offset=position).tolist()
+                position += 4 * (count + 1)
+                data = body[position: position + offsets[-1]]
+                position += offsets[-1]
+                columns.append([data[start:end] for start, end in zip(offsets, offsets[1:])])
+            time_keys = np.frombuffer(body, dtype="<i8", count=count, offset=position).astype(np.int64)
+            position += 8 * count
+            utc_offsets = np.frombuffer(body, dtype="<i4", count=count, offset=position).astype(np.int32)
+            position += 4 * count
+            embeddings = None
+            if self._dim:
+                embeddings = np.frombuffer(body, dtype="<f4", count=count * self._dim, offset=position)
+                embeddings = embeddings.astype(np.float32).reshape(count, self._dim)
+                position += 4 * count * self._dim
+        except ValueError as exc:
+            raise ValueError("Corrupt columnar chunk") from exc
+        if position != len(body):
+            raise ValueError("Corrupt columnar chunk")
+        ids, types, contents, metadata = columns
+        return EntryBatch([value.decode("utf-8") for value in ids], [value.decode("utf-8") for value in types],
+                          contents, metadata, time_keys, utc_offsets, embeddings)
+
+
+def decoder_for(fmt: ExportFormat, embedding_dim: Optional[int] = None, batch_size: int = EXPORT_BATCH_SIZE):
+    """A fresh decoder of the format (NdjsonDecoder or ColumnarDecoder)."""
+    if ExportFormat(fmt) is ExportFormat.ndjson:
+        return NdjsonDecoder(batch_size)
+    return ColumnarDecoder(embedding_dim)
+
+
+def import_stream(store: Any, chunks: Iterable[bytes], fmt: ExportFormat = ExportFormat.columnar) -> int:
+    """
+    Store the entries of an export, a batch at a time.
+
+    Entries keep their IDs and timestamps; the duplicate policy is not
+    applied. Embeddings carried by a columnar export are reused.
+
+    Args:
+        store: MemoryStore or SQLiteMemoryStore to import into
+        chunks: The export as byte chunks of any size (e.g. a file read in blocks)
+        fmt: Format of the export
+
+    Returns:
+        Number of entries imported
+
+    Raises:
+        ValueError: If the export is malformed or an entry ID already exists
+            (batches before the failing one stay imported)
+    """
+    decoder = decoder_for(fmt, store.embedding_dim)
+    imported = 0
+    for data in chunks:
+        for entries, vectors in decoder.feed(data):
+            imported += len(store.store_many(entries, deduplicate=False, vectors=vectors))
+    for entries, vectors in decoder.finish():
+        imported += len(store.store_many(entries, deduplicate=False, vectors=vectors))
+    return imported
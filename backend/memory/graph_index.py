@@ -0,0 +1,125 @@
+"""
+Graph Index Module for Oculus Dei Life Management System
+
+This module maintains the links between memory entries. An entry links to
+others through link metadata keys such as ``related_to``, whose value is an
+entry ID or a list of entry IDs. The index keeps forward edges (entry ->
+IDs it links to) and reverse edges (entry -> entries linking to it), so
+the neighbours of an entry are found without scanning the store, and a
+breadth-first traversal costs time proportional to the part of the graph it
+visits.
+
+Links are treated as undirected for traversal: a decision related to a
+project and an event related to that decision are all part of the
+project's connected component.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Metadata keys whose values are IDs of other entries
+LINK_KEYS = ("related_to",)
+
+Edge = Tuple[str, str]  # (source ID, target ID): the source's metadata links to the target
+
+
+def link_targets(metadata: Dict[str, Any]) -> List[str]:
+    """IDs an entry links to: string values, or string items of list values, of the link keys."""
+    targets = []
+    for key in LINK_KEYS:
+        value = metadata.get(key)
+        if isinstance(value, str):
+            targets.append(value)
+        elif isinstance(value, list):
+            targets.extend(item for item in value if isinstance(item, str))
+    return targets
+
+
+class GraphIndex:
+    """
+    Forward and reverse adjacency sets over link metadata.
+
+    Edges to IDs that are not stored (yet) are kept, so they resolve once
+    the target is written; traversals skip them until then.
+    """
+
+    def __init__(self):
+        self._forward: Dict[str, Set[str]] = {}
+        self._reverse: Dict[str, Set[str]] = {}
+
+    def add(self, entry_id: str, metadata: Dict[str, Any]) -> None:
+        """Index the links of an entry's metadata."""
+        for target in link_targets(metadata):
+            if target == entry_id:
+                continue
+            self._forward.setdefault(entry_id, set()).add(target)
+            self._reverse.setdefault(target, set()).add(entry_id)
+
+    def remove(self, entry_id: str) -> None:
+        """Remove the links of an entry."""
+        for target in self._forward.pop(entry_id, ()):
+            sources = self._reverse.get(target)
+            if sources is not None:
+                sources.discard(entry_id)
+                if not sources:
+                    del self._reverse[target]
+
+    def clear(self) -> None:
+        self._forward = {}
+        self._reverse = {}
+
+    def edges(self, entry_ids: Iterable[str], exists: Callable[[str], bool]) -> List[Edge]:
+        """
+        Edges touching any of the given entries, in either direction.
+
+        Args:
+            entry_ids: Entries whose edges to return
+            exists: Whether an ID is a stored entry; edges to other IDs are skipped
+
+        Returns:
+            (source, target) pairs
+        """
+        found = []
+        for entry_id in entry_ids:
+            found.extend((entry_id, target) for target in self._forward.get(entry_id, ()) if exists(target))
+            found.extend((source, entry_id) for source in self._reverse.get(entry_id, ()))
+        return found
+
+    def __len__(self) -> int:
+        """Number of edges (including edges to IDs not stored)."""
+        return sum(len(targets) for targets in self._forward.values())
+
+
+def breadth_first(starts: Iterable[str], edges_of: Callable[[List[str]], Iterable[Edge]],
+                  depth: Optional[int] = None) -> Tuple[Dict[str, int], List[Edge]]:
+    """
+    Traverse the graph around some entries, one level at a time.
+
+    Each level's edges are fetched in one call, so a store can answer it
+    with a single batched lookup.
+
+    Args:
+        starts: IDs of the (existing) entries to start from
+        edges_of: Returns the edges touching a list of entries (see GraphIndex.edges)
+        depth: Maximum number of hops from a start (None: whole components)
+
+    Returns:
+        ({entry ID: hops from the nearest start} in visiting order, edges
+        between visited entries)
+    """
+    hops = dict.fromkeys(starts, 0)
+    frontier = list(hops)
+    seen_edges: Dict[Edge, None] = {}
+    level = 0
+    while frontier:
+        expand = depth is None or level < depth
+        level += 1
+        next_frontier = []
+        for edge in edges_of(frontier):
+            for node in edge:
+                if node not in hops and expand:
+                    hops[node] = level
+                    next_frontier.append(node)
+            if edge[0] in hops and edge[1] in hops:
+                seen_edges[edge] = None
+        frontier = next_frontier
+    return hops, list(seen_edges)
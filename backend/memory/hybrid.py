@@ -0,0 +1,64 @@
+"""
+Hybrid Retrieval Module for Oculus Dei Life Management System
+
+This module fuses a lexical (BM25) ranking and a semantic (cosine
+similarity) ranking of memory entries into one list. Reciprocal rank fusion
+only looks at positions, so the two incomparable score scales never have to
+be calibrated; weighted fusion blends the normalized scores themselves.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+FUSION_METHODS = ("rrf", "weighted")
+
+# Rank offset of reciprocal rank fusion; 60 is the value from the original paper
+RRF_K = 60
+
+# (entry ID, fused score, keyword score or None, semantic score or None)
+FusedHit = Tuple[str, float, Optional[float], Optional[float]]
+
+
+def fuse_rankings(keyword: Sequence[Tuple[str, float]], semantic: Sequence[Tuple[str, float]],
+                  method: str = "rrf", semantic_weight: float = 0.5, rrf_k: int = RRF_K) -> List[FusedHit]:
+    """
+    Merge a keyword and a semantic ranking.
+
+    With ``rrf`` an entry scores ``w / (rrf_k + rank)`` for each list it
+    appears in (ranks start at 1). With ``weighted`` it scores the weighted
+    sum of its BM25 score divided by the best BM25 score and its cosine
+    similarity. The keyword weight is ``1 - semantic_weight``.
+
+    Args:
+        keyword: (entry ID, BM25 score) pairs, best first
+        semantic: (entry ID, cosine similarity) pairs, best first
+        method: "rrf" or "weighted"
+        semantic_weight: Weight of the semantic ranking, between 0 and 1
+        rrf_k: Rank offset for reciprocal rank fusion
+
+    Returns:
+        (entry ID, fused score, keyword score, semantic score) tuples, best
+        first; a component score is None if the entry was not in that list
+    """
+    if method not in FUSION_METHODS:
+        raise ValueError(f"Unknown fusion method: {method}")
+    if not 0.0 <= semantic_weight <= 1.0:
+        raise ValueError("semantic_weight must be between 0 and 1")
+    keyword_weight = 1.0 - semantic_weight
+
+    fused: Dict[str, float] = {}
+    keyword_scores = dict(keyword)
+    semantic_scores = dict(semantic)
+    if method == "rrf":
+        for weight, ranking in ((keyword_weight, keyword), (semantic_weight, semantic)):
+            for rank, (entry_id, _) in enumerate(ranking, start=1):
+                fused[entry_id] = fused.get(entry_id, 0.0) + weight / (rrf_k + rank)
+    else:
+        best = max(keyword_scores.values(), default=0.0) or 1.0
+        for entry_id, score in keyword:
+            fused[entry_id] = fused.get(entry_id, 0.0) + keyword_weight * score / best
+        for entry_id, score in semantic:
+            fused[entry_id] = fused.get(entry_id, 0.0) + semantic_weight * max(score, 0.0)
+
+    ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)
+    return [(entry_id, score, keyword_scores.get(entry_id), semantic_scores.get(entry_id))
+            for entry_id, score in ranked]
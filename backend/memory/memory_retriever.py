@@ -23,50 +23,50 @@ def get_last_decisions(n: int = 5) -> List[MemoryEntry]:
         List of the n most recent decision MemoryEntry objects
     """
     memory_store = get_memory_store()
-    decisions = memory_store.retrieve_by_type("decision")
-    
-    # Sort by timestamp (newest first) and take the first n
-    sorted_decisions = sorted(decisions, key=lambda x: x.timestamp, reverse=True)
-    return sorted_decisions[:n]
+    return memory_store.get_last(n, entry_type="decision")
 
 
-def find_entries_by_keyword(keyword: str, type_filter: Optional[str] = None) -> List[MemoryEntry]:
+def find_entries_by_keyword(keyword: str, type_filter: Optional[str] = None,
+                            use_cache: bool = True) -> List[MemoryEntry]:
     """
-    Search for memory entries containing the specified keyword,
+    Search for memory entries containing every word of the keyword,
     optionally filtered by entry type.
     
     Args:
         keyword: Text to search for in memory entries
         type_filter: Optional type to filter results (e.g., "decision", "event")
+        use_cache: Allow a result from the store's query cache
         
     Returns:
-        List of MemoryEntry objects matching the search criteria
+        List of MemoryEntry objects matching the search criteria, ranked by relevance
     """
     if not keyword:
         return []
     
     memory_store = get_memory_store()
     
-    # First, search by text
-    matching_entries = memory_store.search_by_text(keyword)
-    
-    # Apply type filter if specified
-    if type_filter:
-        matching_entries = [entry for entry in matching_entries if entry.type == type_filter]
-    
-    return matching_entries
+    # The type filter is applied inside the index, before ranking
+    return memory_store.search_by_text(keyword, entry_type=type_filter or None, use_cache=use_cache)
 
 
-def semantic_search(query: str, top_n: int = 5, type_filter: Optional[str] = None) -> List[MemoryEntry]:
-    """Search memory entries semantically using hashed embeddings."""
+def semantic_search(query: str, top_n: int = 5, type_filter: Optional[str] = None,
+                    nprobe: Optional[int] = None, use_cache: bool = True) -> List[MemoryEntry]:
+    """Search memory entries semantically using hashed embeddings.
+
+    ``nprobe`` is the recall/latency knob of the approximate index: the number
+    of partitions scanned once the store is large enough to be clustered.
+    A type filter is planned with the query (see MemoryStore.query), so up
+    to ``top_n`` entries of that type come back rather than the matching
+    part of the unfiltered top ``top_n``.
+    """
     if not query:
         return []
 
     memory_store = get_memory_store()
-    results = memory_store.search_by_similarity(query, top_n)
     if type_filter:
-        results = [entry for entry in results if entry.type == type_filter]
-    return results
+        return memory_store.query(entry_type=type_filter, similar_to=query, limit=top_n, nprobe=nprobe,
+                                  use_cache=use_cache)[0]
+    return memory_store.search_by_similarity(query, top_n, nprobe=nprobe, use_cache=use_cache)
 
 
 def get_related_entries(metadata_key: str, metadata_value: Any) -> List[MemoryEntry]:
@@ -89,6 +89,30 @@ def get_related_entries(metadata_key: str, metadata_value: Any) -> List[MemoryEn
     return memory_store.search_by_metadata(metadata_key, metadata_value)
 
 
+def get_project_timeline(project_name: str, entry_type: Optional[str] = None) -> List[MemoryEntry]:
+    """
+    Retrieve everything linked to a project, in chronological order.
+    
+    Starts from the entries naming the project (project_name metadata) and
+    follows related_to links in both directions through the graph index,
+    so decisions about the project, events related to those decisions and
+    so on are all included. Cost grows with the number of entries linked to
+    the project, not with the store.
+    
+    Args:
+        project_name: Name of the project
+        entry_type: Optional type to filter by
+        
+    Returns:
+        List of MemoryEntry objects in the project's connected component, oldest first
+    """
+    memory_store = get_memory_store()
+    project_ids = [entry.id for entry in memory_store.search_by_metadata("project_name", project_name)]
+    if not project_ids:
+        return []
+    return memory_store.linked_component(project_ids, entry_type)
+
+
 def get_decision_history_for_project(project_name: str) -> List[MemoryEntry]:
     """
     Retrieve the decision history for a specific project.
@@ -105,30 +129,22 @@ def get_decision_history_for_project(project_name: str) -> List[MemoryEntry]:
     """
     memory_store = get_memory_store()
     
-    # Get all decisions
-    all_decisions = memory_store.retrieve_by_type("decision")
-    
-    # Find project entries matching the project name
-    project_entries = memory_store.search_by_metadata("project_name", project_name)
+    # Find project entries matching the project name (metadata index lookup)
+    project_ids = {entry.id for entry in memory_store.search_by_metadata("project_name", project_name)}
     
-    if not project_entries:
+    if not project_ids:
         return []
     
-    # Get the IDs of the project entries
-    project_ids = [entry.id for entry in project_entries]
-    
-    # Find decisions related to any of these project entries
-    related_decisions = []
-    for decision in all_decisions:
-        # Check if the decision is related to any of the project entries
-        if "related_to" in decision.metadata and decision.metadata["related_to"] in project_ids:
-            related_decisions.append(decision)
-        # Also check if project_name is directly in the decision metadata
-        elif "project_name" in decision.metadata and decision.metadata["project_name"] == project_name:
-            related_decisions.append(decision)
+    # Decisions linked to any of the project entries, or naming the project directly
+    related_decisions = {}
+    for project_id in project_ids:
+        for decision in memory_store.search_by_metadata("related_to", project_id, entry_type="decision"):
+            related_decisions[decision.id] = decision
+    for decision in memory_store.search_by_metadata("project_name", project_name, entry_type="decision"):
+        related_decisions[decision.id] = decision
     
     # Sort by timestamp (oldest first) to get chronological history
-    return sorted(related_decisions, key=lambda x: x.timestamp)
+    return sorted(related_decisions.values(), key=lambda x: x.timestamp)
 
 
 def summarize_recent_events(n: int = 3) -> str:
@@ -145,13 +161,9 @@ def summarize_recent_events(n: int = 3) -> str:
         Bullet-point formatted string summary of recent events
     """
     memory_store = get_memory_store()
-    events = memory_store.retrieve_by_type("event")
     
-    if not events:
-        return "No recent events recorded."
-    
-    # Sort by timestamp (newest first) and take the first n
-    recent_events = sorted(events, key=lambda x: x.timestamp, reverse=True)[:n]
+    # Newest first, straight from the time-ordered type index
+    recent_events = memory_store.get_last(n, entry_type="event")
     
     if not recent_events:
         return "No recent events recorded."
@@ -193,19 +205,8 @@ def get_entries_in_timeframe(start_time: datetime, end_time: Optional[datetime]
     
     memory_store = get_memory_store()
     
-    # Start with all entries or filtered by type
-    if type_filter:
-        entries = memory_store.retrieve_by_type(type_filter)
-    else:
-        entries = memory_store.entries
-    
-    # Filter by timeframe
-    timeframe_entries = [
-        entry for entry in entries
-        if start_time <= entry.timestamp <= end_time
-    ]
-    
-    return sorted(timeframe_entries, key=lambda x: x.timestamp)
+    # Range lookup on the time index (per-type when filtered), oldest first
+    return memory_store.get_range(start_time, end_time, entry_type=type_filter)
 
 
 def count_entries_by_type() -> Dict[str, int]:
@@ -217,13 +218,8 @@ def count_entries_by_type() -> Dict[str, int]:
     """
     memory_store = get_memory_store()
     
-    type_counts = {}
-    for entry in memory_store.entries:
-        if entry.type not in type_counts:
-            type_counts[entry.type] = 0
-        type_counts[entry.type] += 1
-    
-    return type_counts
+    # Maintained by the store on every write, no entries are visited
+    return memory_store.count_by_type()
 
 
 def find_patterns_in_events(window_days: int = 7) -> List[Dict]:
@@ -7,14 +7,39 @@ Currently implemented as in-memory storage with plans to extend to
 vector databases (ChromaDB or Qdrant) in the future.
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Any, Set, Tuple
 from datetime import datetime
 import uuid
 import re
 import hashlib
+import heapq
+import logging
+import queue
 import threading
+from functools import lru_cache
+from itertools import islice, repeat
+import numpy as np
 from pydantic import BaseModel, Field
 
+from backend.memory.change_feed import ChangeFeed
+from backend.memory.columnar import NAIVE_OFFSET, ColumnsView, EntryBatch, EntryColumns, time_key
+from backend.memory.entry_counters import EntryCounters, entry_category
+from backend.memory.hybrid import RRF_K, fuse_rankings
+from backend.memory.persistence import DurabilityMode, MemoryPersistence
+from backend.memory.query_planner import (AccessPath, MemoryQuery, QueryPlan, choose_access_path, describe,
+                                          order_filters)
+from backend.memory.graph_index import Edge, GraphIndex, breadth_first
+from backend.memory.metadata_index import DEFAULT_INDEXED_METADATA_KEYS, MetadataIndex
+from backend.memory.near_duplicates import DEFAULT_THRESHOLD, DuplicatePolicy, NearDuplicateIndex, band_keys, cluster
+from backend.memory.query_cache import (DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTL, QueryCache, cached_query,
+                                        make_query_cache)
+from backend.memory.text_index import InvertedIndex
+from backend.memory.time_index import TimeIndex, TimeKey
+from backend.memory.trigram_index import TrigramIndex, fold_case, required_literals
+from backend.memory.vector_index import EmbeddingMatrix, VectorIndex, train_outside_lock
+
+logger = logging.getLogger(__name__)
+
 
 class MemoryEntry(BaseModel):
     """
@@ -45,6 +70,66 @@ class MemoryEntry(BaseModel):
         }
 
 
+# Distinct tokens and bigrams whose hash buckets are remembered
+EMBEDDING_CACHE_SIZE = 1 << 16
+
+# Heap bytes per entry outside the arena (indexes, embedding, slot columns);
+# bench_memory_footprint measures about 10 KB for short entries, most of it trigram postings
+ENTRY_OVERHEAD_BYTES = 10 * 1024
+
+# Filter that page() checks on a slot of a pinned snapshot
+SlotCheck = Callable[[ColumnsView, int], bool]
+
+_WORD_RE = re.compile(r"\w+")
+
+try:  # CPython's built-in md5 skips OpenSSL's per-call setup, which dominates on short strings
+    from _md5 import md5 as _md5
+except ImportError:  # pragma: no cover - interpreters without the builtin module
+    _md5 = hashlib.md5
+
+
+@lru_cache(maxsize=EMBEDDING_CACHE_SIZE)
+def _token_bucket(token: str, dim: int) -> int:
+    """Hash bucket of a token; md5 keeps vectors identical to stored ones."""
+    return int.from_bytes(_md5(token.encode("utf-8")).digest(), "big") % dim
+
+
+@lru_cache(maxsize=EMBEDDING_CACHE_SIZE)
+def _bigram_bucket(bigram: str, dim: int) -> int:
+    """Hash bucket of a bigram (kept in its own cache so bigrams cannot evict tokens)."""
+    return int.from_bytes(_md5(bigram.encode("utf-8")).digest(), "big") % dim
+
+
+def hashed_embedding(text: str, dim: int) -> np.ndarray:
+    """
+    Generate a hashed bag-of-words/bigram embedding for the given text.
+
+    Each token adds 1.0 and each adjacent pair 0.5 to the bucket its md5
+    hash selects. Buckets come from bounded LRU caches, so repeated words
+    skip hashing, and the weights are accumulated in one vectorized call.
+    """
+    if not text:
+        return np.zeros(dim, dtype=np.float32)
+    tokens = _WORD_RE.findall(text.lower())
+    if not tokens:
+        return np.zeros(dim, dtype=np.float32)
+
+    dims = repeat(dim)
+    buckets = list(map(_token_bucket, tokens, dims))
+    buckets.extend(map(_bigram_bucket, map("_".join, zip(tokens, tokens[1:])), dims))
+    weights = np.full(len(buckets), 0.5)
+    weights[: len(tokens)] = 1.0
+    return np.bincount(buckets, weights, minlength=dim).astype(np.float32)
+
+
+def embedding_source(entry: MemoryEntry) -> str:
+    """Build the text that is embedded for an entry (content plus metadata values)."""
+    source = entry.content
+    if entry.metadata:
+        source += " " + " ".join(str(v) for v in entry.metadata.values())
+    return source
+
+
 class MemoryStore:
     """
     Core memory store for the Oculus Dei system.
@@ -52,73 +137,568 @@ class MemoryStore:
     Provides methods to store and retrieve memory entries. Currently
     implements a simple in-memory storage mechanism, but designed to be 
     extended to support vector databases in the future.
+
+    Writers serialize on one lock. Readers hold it only to look up their
+    candidates in the indexes and pin an immutable snapshot of the columns
+    (and of the vector index for similarity search); building entries,
+    running regexes, scanning metadata and scoring vectors all happen on
+    that snapshot after the lock is released.
+
+    With ``async_indexing`` a write only stores the entry and its time/type
+    index positions before returning (so ID, recency and range lookups see
+    it at once); embeddings and the text, metadata and trigram indexes are
+    built by background workers. Every write gets a sequence number, and
+    ``index_status``/``wait_for_index`` expose how far indexing has caught up.
+
+    Keyword, regex, similarity, hybrid and composed queries are served from
+    a bounded result cache keyed on their arguments and the store's
+    ``generation``, which every mutation (and indexing progress) changes.
     """
     
-    def __init__(self):
-        """Initialize an empty memory store."""
-        self.entries: List[MemoryEntry] = []
-        self.type_index: Dict[str, List[MemoryEntry]] = {}  # Index for faster type-based retrieval
-        self.embeddings: Dict[str, List[float]] = {}
+    def __init__(self, ann_index: Optional[VectorIndex] = None,
+                 indexed_metadata_keys: Iterable[str] = DEFAULT_INDEXED_METADATA_KEYS,
+                 async_indexing: bool = False, index_workers: int = 2, index_queue_size: int = 10000,
+                 duplicate_policy: DuplicatePolicy = DuplicatePolicy.OFF,
+                 duplicate_threshold: float = DEFAULT_THRESHOLD,
+                 query_cache_size: int = DEFAULT_CACHE_SIZE, query_cache_ttl: float = DEFAULT_CACHE_TTL):
+        """
+        Initialize an empty memory store.
+
+        Args:
+            ann_index: Optional approximate nearest-neighbour index (e.g. an
+                IVFFlatIndex) consulted by search_by_similarity once trained.
+                The exact embedding matrix is always maintained alongside it,
+                and the index is trained on a background thread when it asks to be.
+            indexed_metadata_keys: Metadata keys with hash indexes for
+                equality lookups (more can be added with declare_metadata_index)
+            async_indexing: Index new entries on background workers instead
+                of inside store()/store_many()
+            index_workers: Number of background indexing threads
+            index_queue_size: Writes that may wait for indexing before
+                store() blocks (backpressure)
+            duplicate_policy: What store() does with near duplicates of a
+                stored entry of the same type ("off", "drop", "count" or "merge")
+            duplicate_threshold: Content similarity (Jaccard index of
+                shingles) at or above which an entry is a near duplicate
+            query_cache_size: Query results kept in the result cache (0 disables it)
+            query_cache_ttl: Seconds a cached query result may be served
+        """
+        self._columns = EntryColumns()  # Entry storage by slot; deleted slots are tombstoned
+        self._slot_of: Dict[str, int] = {}  # Entry ID -> slot, for constant-time lookups
+        self._free_slots: List[int] = []  # Tombstoned slots available for reuse
+        self._next_seq = 0  # Insertion sequence, breaks timestamp ties
+        self.time_index = TimeIndex()  # All entry IDs in timestamp order
+        self.type_index: Dict[str, TimeIndex] = {}  # Type -> entry IDs in timestamp order
         self.embedding_dim: int = 128
+        self.embeddings = EmbeddingMatrix(self.embedding_dim)  # Normalized float32 rows keyed by entry ID
+        self.ann_index = ann_index
+        self.text_index = InvertedIndex()  # Token postings for ranked keyword search
+        self.metadata_index = MetadataIndex(indexed_metadata_keys)  # (key, value) -> entry IDs
+        self.graph_index = GraphIndex()  # related_to links, forward and reverse
+        self.content_trigrams = TrigramIndex()  # Prefilter for regex search over content
+        self.metadata_trigrams: Dict[str, TrigramIndex] = {}  # Metadata key -> trigrams of string values
+        self.counters = EntryCounters()  # Counts by type, category and time bucket
+        self.duplicate_policy = DuplicatePolicy(duplicate_policy)
+        self.duplicate_threshold = duplicate_threshold
+        self.near_duplicates: Optional[NearDuplicateIndex] = None  # LSH buckets of content, unless the policy is off
+        if self.duplicate_policy is not DuplicatePolicy.OFF:
+            self.near_duplicates = NearDuplicateIndex(duplicate_threshold)
+        self.duplicates_absorbed = 0  # Writes dropped, counted or merged as near duplicates
         self._lock = threading.RLock()
+        self.compaction_threshold: int = 1024  # Minimum tombstones before background compaction
+        self.arena_compaction_bytes: int = 1 << 20  # Minimum garbage arena bytes before compaction
+        self.hybrid_exact_limit: int = 50000  # Largest time window hybrid search scores exhaustively
+        self._compaction_scheduled = False
+        self.persistence: Optional[MemoryPersistence] = None  # Attached by MemoryStore.open
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._ann_training_thread: Optional[threading.Thread] = None
+        self.changes = ChangeFeed()  # Sequenced mutations for subscribers (GET /memory/stream)
+        self.query_cache: Optional[QueryCache] = make_query_cache(query_cache_size, query_cache_ttl)
+        self.async_indexing = async_indexing
+        self._committed_seq = 0  # Writes whose entries are stored
+        self._indexed_seq = 0  # Every write up to this one is fully indexed (the freshness watermark)
+        self._indexed_ahead: Set[int] = set()  # Writes indexed out of order, above the watermark
+        self._unindexed: Dict[str, int] = {}  # Entry ID -> write still waiting for indexing
+        self._index_progress = threading.Condition(self._lock)
+        self._index_queue: Optional[queue.Queue] = None
+        self._index_threads: List[threading.Thread] = []
+        if async_indexing:
+            self._index_queue = queue.Queue(maxsize=index_queue_size)
+            for number in range(index_workers):
+                thread = threading.Thread(target=self._index_worker, name=f"memory-store-indexer-{number}",
+                                          daemon=True)
+                thread.start()
+                self._index_threads.append(thread)
 
-    def _compute_embedding(self, text: str) -> List[float]:
-        """Generate a hashed bag-of-words/bigram embedding for the given text."""
-        vector = [0.0] * self.embedding_dim
-        if not text:
-            return vector
+    @classmethod
+    def open(cls, directory: str, durability: DurabilityMode = DurabilityMode.BATCH,
+             snapshot_every: int = 50000, **kwargs) -> "MemoryStore":
+        """
+        Open a durable memory store backed by a snapshot and write-ahead log.
+        
+        Existing data in the directory is loaded (snapshot first, then the
+        WAL tail) and every index is rebuilt before the store is returned.
+        
+        Args:
+            directory: Persistence directory (created if missing)
+            durability: WAL fsync policy ("always", "batch" or "os")
+            snapshot_every: WAL records between automatic background snapshots
+            **kwargs: Passed to the MemoryStore constructor
+            
+        Returns:
+            A MemoryStore that logs every mutation
+        """
+        store = cls(**kwargs)
+        persistence = MemoryPersistence(directory, durability=durability, snapshot_every=snapshot_every)
+        persistence.restore(store)
+        store.persistence = persistence
+        return store
+
+    def _log(self, record: Dict[str, Any]) -> None:
+        """Record a mutation (WAL when persistence is attached, then the change feed). Caller holds the lock."""
+        self._log_many([record])
+
+    def _log_many(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Record several mutations: one WAL write, then publication on the
+        change feed. Caller holds the lock, so feed order is commit order.
+        """
+        if self.persistence is not None:
+            self.persistence.append_many(records)
+            if self.persistence.snapshot_due and not (self._snapshot_thread and self._snapshot_thread.is_alive()):
+                self._snapshot_thread = threading.Thread(target=self.snapshot, name="memory-store-snapshot",
+                                                         daemon=True)
+                self._snapshot_thread.start()
+        self.changes.publish(records)
+
+    def snapshot(self) -> None:
+        """
+        Write a snapshot of all live entries and drop the WAL segments it covers.
+        
+        A column snapshot is pinned under the lock together with a WAL
+        rotation; ordering, serialization and the disk write happen outside
+        it, so writers are only blocked for the capture.
+        """
+        if self.persistence is None:
+            raise ValueError("Memory store has no persistence attached")
+        with self._lock:
+            seq = self.persistence.begin_snapshot()
+            view = self._columns.snapshot()
+        slots = self._in_time_order(view, self._live_slots(view))
+        self.persistence.write_snapshot([entry.to_dict() for entry in self._build(view, slots)], seq)
 
-        tokens = re.findall(r"\w+", text.lower())
-        for i, token in enumerate(tokens):
-            idx = int(hashlib.md5(token.encode("utf-8")).hexdigest(), 16) % self.embedding_dim
-            vector[idx] += 1.0
+    def close(self) -> None:
+        """
+        Finish queued indexing and stop the workers, wait for a running ANN
+        training and snapshot, then flush and close the write-ahead log.
+        """
+        if self._index_threads:
+            for _ in self._index_threads:
+                self._index_queue.put(None)
+            for thread in self._index_threads:
+                thread.join()
+            self._index_threads = []
+        self.wait_for_ann_training()
+        if self.persistence is None:
+            return
+        thread = self._snapshot_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.persistence.close()
 
-            if i + 1 < len(tokens):
-                bigram = f"{token}_{tokens[i + 1]}"
-                b_idx = int(hashlib.md5(bigram.encode("utf-8")).hexdigest(), 16) % self.embedding_dim
-                vector[b_idx] += 0.5
+    @property
+    def entries(self) -> List[MemoryEntry]:
+        """All live entries in slot order (a copy; prefer the indexed accessors)."""
+        with self._lock:
+            view = self._columns.snapshot()
+        return self._build(view, self._live_slots(view))
+
+    @staticmethod
+    def _live_slots(columns) -> List[int]:
+        """Slots of the given columns or view that are not tombstones."""
+        return [slot for slot, entry_id in enumerate(columns.ids) if entry_id is not None]
 
-        return vector
+    def _materialize(self, slot: int) -> MemoryEntry:
+        """Build a MemoryEntry from the live columns. Caller holds the lock."""
+        return MemoryEntry.model_construct(**self._columns.fields(slot))
 
     @staticmethod
-    def _cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
-        """Compute cosine similarity between two vectors."""
-        dot = sum(a * b for a, b in zip(vec1, vec2))
-        norm1 = sum(a * a for a in vec1) ** 0.5
-        norm2 = sum(b * b for b in vec2) ** 0.5
-        if norm1 == 0.0 or norm2 == 0.0:
-            return 0.0
-        return dot / (norm1 * norm2)
+    def _build(view: ColumnsView, slots: Iterable[int]) -> List[MemoryEntry]:
+        """Build MemoryEntry objects from a pinned snapshot; needs no lock."""
+        return [MemoryEntry.model_construct(**view.fields(slot)) for slot in slots]
+
+    def _pin(self, entry_ids: Iterable[str]) -> Tuple[ColumnsView, List[int]]:
+        """Map IDs to live slots and pin a snapshot of the columns. Caller holds the lock."""
+        slot_of = self._slot_of
+        return self._columns.snapshot(), [slot_of[entry_id] for entry_id in entry_ids if entry_id in slot_of]
+
+    def _compute_embedding(self, text: str) -> np.ndarray:
+        """Generate a hashed bag-of-words/bigram embedding for the given text."""
+        return hashed_embedding(text, self.embedding_dim)
+
+    @staticmethod
+    def _embedding_source(entry: MemoryEntry) -> str:
+        """Build the text that is embedded for an entry (content plus metadata values)."""
+        return embedding_source(entry)
     
-    def store(self, entry: MemoryEntry) -> str:
+    def _index_embedding(self, entry_id: str, vector: np.ndarray) -> None:
+        """Write an entry's embedding to the vector indexes. Caller holds the lock."""
+        self.embeddings.upsert(entry_id, vector)
+        if self.ann_index is not None:
+            self.ann_index.upsert(entry_id, vector)
+            self._maybe_schedule_ann_training()
+
+    def _unindex_embedding(self, entry_id: str) -> None:
+        """Remove an entry's embedding from the vector indexes."""
+        self.embeddings.remove(entry_id)
+        if self.ann_index is not None:
+            self.ann_index.remove(entry_id)
+
+    def _index_metadata_trigrams(self, entry: MemoryEntry) -> None:
+        """Add an entry's string metadata values to the per-key trigram indexes."""
+        for key, value in entry.metadata.items():
+            if isinstance(value, str):
+                if key not in self.metadata_trigrams:
+                    self.metadata_trigrams[key] = TrigramIndex()
+                self.metadata_trigrams[key].add(entry.id, value)
+
+    def _unindex_metadata_trigrams(self, entry_id: str, metadata: Dict[str, Any]) -> None:
+        """Remove an entry's string metadata values from the per-key trigram indexes."""
+        for key, value in metadata.items():
+            index = self.metadata_trigrams.get(key)
+            if index is not None and isinstance(value, str):
+                index.remove(entry_id, value)
+                if not len(index):
+                    del self.metadata_trigrams[key]
+
+    @staticmethod
+    def _in_time_order(view: ColumnsView, slots: List[int]) -> List[int]:
+        """Sort slots of a pinned snapshot oldest first."""
+        slots.sort(key=lambda slot: (view.time_keys[slot], view.seqs[slot]))
+        return slots
+
+    def store(self, entry: MemoryEntry, deduplicate: bool = True) -> str:
         """
         Store a new memory entry in the memory store.
         
+        Unless the duplicate policy is off, an entry whose content nearly
+        duplicates a stored entry of the same type is dropped, counted or
+        merged into that entry instead, and its ID is returned.
+        
         Args:
             entry: MemoryEntry object to store
+            deduplicate: Apply the duplicate policy (replays pass False)
             
         Returns:
-            ID of the stored entry
+            ID of the stored entry, or of the entry it duplicates
         """
         if not entry.content:
             raise ValueError("Memory entry content cannot be empty")
+        keys = self._band_keys(entry)
+
+        if self.async_indexing:
+            with self._lock:
+                if entry.id in self._slot_of:
+                    raise ValueError(f"Memory entry {entry.id} already exists")
+                existing = self._find_duplicate(entry, keys, deduplicate)
+                if existing is not None:
+                    return self._absorb_duplicate(existing, entry)
+                self._insert(entry, keys)
+                write_seq = self._begin_write([entry.id])
+                self._log({"op": "store", "entry": entry.to_dict()})
+            self._index_queue.put((write_seq, [entry]))
+            return entry.id
+
+        # Generate the embedding for semantic search before taking the lock
+        vector = self._compute_embedding(self._embedding_source(entry))
+        with self._lock:
+            if entry.id in self._slot_of:
+                raise ValueError(f"Memory entry {entry.id} already exists")
+            existing = self._find_duplicate(entry, keys, deduplicate)
+            if existing is not None:
+                return self._absorb_duplicate(existing, entry)
+
+            self._insert(entry, keys)
+            self._index_embedding(entry.id, vector)
+            self._index_secondary(entry)
+            self._mark_indexed(self._begin_write())
+            self._log({"op": "store", "entry": entry.to_dict()})
+            return entry.id
+
+    def store_many(self, entries: Iterable[MemoryEntry], deduplicate: bool = True,
+                   vectors: Optional[np.ndarray] = None) -> List[str]:
+        """
+        Store a batch of new memory entries.
+        
+        The whole batch is validated first, so either every entry is stored
+        or none is. Embeddings are computed before the lock is taken and
+        appended to the vector indexes as one block; the lock is acquired
+        once and the WAL is written once for the batch. With async indexing
+        the batch is indexed by one worker as a single write. Near
+        duplicates (of stored entries or of earlier entries in the batch)
+        are handled as in store().
+        
+        Args:
+            entries: MemoryEntry objects to store
+            deduplicate: Apply the duplicate policy (replays pass False)
+            vectors: Embeddings already computed for the entries, e.g. by an
+                export (ignored with async indexing, whose workers embed)
+            
+        Returns:
+            IDs of the stored entries (or of the entries they duplicate), in input order
+        """
+        entries = list(entries)
+        if not entries:
+            return []
+        entry_ids = [entry.id for entry in entries]
+        for entry in entries:
+            if not entry.content:
+                raise ValueError("Memory entry content cannot be empty")
+        if len(set(entry_ids)) != len(entry_ids):
+            raise ValueError("Memory entry IDs must be unique within a batch")
+        if self.async_indexing:
+            vectors = None
+        elif vectors is None:
+            vectors = np.stack([self._compute_embedding(self._embedding_source(entry)) for entry in entries])
+        elif vectors.shape != (len(entries), self.embedding_dim):
+            raise ValueError(f"Expected embeddings of shape ({len(entries)}, {self.embedding_dim})")
+        batch_keys = [self._band_keys(entry) for entry in entries]
 
         with self._lock:
-            # Add to main entries list
-            self.entries.append(entry)
+            for entry_id in entry_ids:
+                if entry_id in self._slot_of:
+                    raise ValueError(f"Memory entry {entry_id} already exists")
+            stored, duplicates = [], []
+            for position, (entry, keys) in enumerate(zip(entries, batch_keys)):
+                existing = self._find_duplicate(entry, keys, deduplicate)
+                if existing is None:
+                    self._insert(entry, keys)
+                    stored.append(position)
+                else:
+                    entry_ids[position] = existing
+                    duplicates.append((existing, entry))
+            if len(stored) < len(entries):
+                entries = [entries[position] for position in stored]
+                if vectors is not None:
+                    vectors = vectors[stored]
+            if entries:  # Unless every entry was a near duplicate
+                if vectors is None:
+                    write_seq = self._begin_write([entry.id for entry in entries])
+                else:
+                    self._index_embeddings([entry.id for entry in entries], vectors)
+                    for entry in entries:
+                        self._index_secondary(entry)
+                    self._mark_indexed(self._begin_write())
+                self._log_many([{"op": "store", "entry": entry.to_dict()} for entry in entries])
+            # Once the batch is indexed: a duplicate may be of an entry earlier in the batch
+            for existing, entry in duplicates:
+                self._absorb_duplicate(existing, entry)
+        if vectors is None and entries:
+            self._index_queue.put((write_seq, entries))
+        return entry_ids
 
-            # Generate and store embedding for semantic search
-            embedding_source = entry.content
-            if entry.metadata:
-                embedding_source += " " + " ".join(str(v) for v in entry.metadata.values())
-            self.embeddings[entry.id] = self._compute_embedding(embedding_source)
+    def _band_keys(self, entry: MemoryEntry) -> Optional[List[int]]:
+        """Near-duplicate band keys of an entry's content, when they are kept; needs no lock."""
+        return None if self.near_duplicates is None else band_keys(entry.content)
 
-            # Update type index
-            if entry.type not in self.type_index:
-                self.type_index[entry.type] = []
-            self.type_index[entry.type].append(entry)
+    def _find_duplicate(self, entry: MemoryEntry, keys: Optional[List[int]], deduplicate: bool) -> Optional[str]:
+        """ID of the stored entry a new one nearly duplicates, if any. Caller holds the lock."""
+        if keys is None or not deduplicate:
+            return None
+        match = self.near_duplicates.find(entry.type, keys, entry.content, self._content_of)
+        return None if match is None else match[0]
 
-            return entry.id
+    def _absorb_duplicate(self, existing_id: str, entry: MemoryEntry) -> str:
+        """
+        Apply the duplicate policy to a new entry instead of storing it. Caller holds the lock.
+
+        Returns:
+            ID of the stored entry it was absorbed into
+        """
+        self.duplicates_absorbed += 1
+        if self.duplicate_policy is not DuplicatePolicy.DROP:
+            stored = self._columns.metadata(self._slot_of[existing_id])
+            patch = dict(entry.metadata) if self.duplicate_policy is DuplicatePolicy.MERGE else {}
+            patch.update(duplicate_count=stored.get("duplicate_count", 0) + 1,
+                         last_seen=entry.timestamp.isoformat())
+            self.update_entry(existing_id, metadata=patch)  # Re-entrant: the count cannot race
+        return existing_id
+
+    def _content_of(self, entry_id: str) -> Optional[str]:
+        """Current content of an entry, or None if it is gone. Caller holds the lock."""
+        slot = self._slot_of.get(entry_id)
+        return None if slot is None else self._columns.content(slot)
+
+    def _insert(self, entry: MemoryEntry, keys: Optional[List[int]] = None) -> None:
+        """Copy an entry into the columns and the time-ordered indexes. Caller holds the lock."""
+        # Copy the entry into a free slot (or a new one)
+        seq = self._next_seq
+        self._next_seq += 1
+        slot = self._free_slots.pop() if self._free_slots else len(self._columns)
+        self._columns.put(slot, entry, seq)
+        self._slot_of[entry.id] = slot
+        ts_key = self._columns.time_keys[slot]
+
+        # Update time-ordered indexes (overall and per type)
+        self.time_index.add(entry.id, ts_key, seq)
+        if entry.type not in self.type_index:
+            self.type_index[entry.type] = TimeIndex()
+        self.type_index[entry.type].add(entry.id, ts_key, seq)
+        self.counters.add(entry.type, entry_category(entry.metadata), ts_key)
+        if keys is not None:
+            self.near_duplicates.add(entry.id, entry.type, keys)
+
+    def _index_secondary(self, entry: MemoryEntry) -> None:
+        """Add an entry to the text, metadata, graph and trigram indexes. Caller holds the lock."""
+        self.text_index.add(entry.id, entry.type, entry.content)
+        self.metadata_index.add(entry.id, entry.metadata)
+        self.graph_index.add(entry.id, entry.metadata)
+        self.content_trigrams.add(entry.id, entry.content)
+        self._index_metadata_trigrams(entry)
+
+    def _index_embeddings(self, entry_ids: List[str], vectors: np.ndarray) -> None:
+        """Append embeddings of new entries to the vector indexes as one block. Caller holds the lock."""
+        self.embeddings.extend(entry_ids, vectors)
+        if self.ann_index is not None:
+            self.ann_index.extend(entry_ids, vectors)
+            self._maybe_schedule_ann_training()
+
+    def _maybe_schedule_ann_training(self) -> None:
+        """Start a background training once the ANN index reports it is due. Caller holds the lock."""
+        if not getattr(self.ann_index, "training_due", False):
+            return
+        if self._ann_training_thread is not None and self._ann_training_thread.is_alive():
+            return
+        self._ann_training_thread = threading.Thread(target=self.train_ann_index, name="memory-store-ann-training",
+                                                     daemon=True)
+        self._ann_training_thread.start()
+
+    def train_ann_index(self) -> bool:
+        """
+        Train the ANN index (k-means for an IVFFlatIndex) and swap it in.
+
+        The index is snapshotted under the lock and clustered outside it;
+        only installing the partitions blocks writers. Scheduled on a
+        background thread by the write that makes the index due for
+        (re)training; it can also be called directly from maintenance jobs.
+
+        Returns:
+            True if a trained index was swapped in
+        """
+        if not hasattr(self.ann_index, "begin_training"):
+            return False
+        return train_outside_lock(self.ann_index, self._lock)
+
+    def wait_for_ann_training(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until a background ANN training (if any) has finished.
+
+        Returns:
+            True if no training is running, False on timeout
+        """
+        thread = self._ann_training_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def _begin_write(self, pending_ids: Iterable[str] = ()) -> int:
+        """
+        Assign the next write sequence number, recording entries that still
+        need indexing under it. Caller holds the lock.
+        """
+        self._committed_seq += 1
+        for entry_id in pending_ids:
+            self._unindexed[entry_id] = self._committed_seq
+        return self._committed_seq
+
+    def _mark_indexed(self, write_seq: int) -> None:
+        """Record that a write is fully indexed and advance the watermark. Caller holds the lock."""
+        if write_seq != self._indexed_seq + 1:
+            self._indexed_ahead.add(write_seq)
+            return
+        self._indexed_seq = write_seq
+        while self._indexed_seq + 1 in self._indexed_ahead:
+            self._indexed_ahead.remove(self._indexed_seq + 1)
+            self._indexed_seq += 1
+        self._index_progress.notify_all()
+
+    def _index_worker(self) -> None:
+        """Background loop that indexes queued writes until it receives None."""
+        while True:
+            item = self._index_queue.get()
+            if item is None:
+                return
+            write_seq, entries = item
+            try:
+                sources = [self._embedding_source(entry) for entry in entries]
+                vectors = [self._compute_embedding(source) for source in sources]
+                with self._lock:
+                    ids, rows = [], []
+                    for entry, source, vector in zip(entries, sources, vectors):
+                        if self._unindexed.get(entry.id) != write_seq:
+                            continue  # Deleted (or cleared) before it was indexed
+                        del self._unindexed[entry.id]
+                        current = self._materialize(self._slot_of[entry.id])
+                        current_source = self._embedding_source(current)
+                        ids.append(entry.id)
+                        # Updated while queued: index what is stored now
+                        rows.append(vector if current_source == source else self._compute_embedding(current_source))
+                        self._index_secondary(current)
+                    if ids:
+                        self._index_embeddings(ids, np.stack(rows))
+            except Exception:  # pragma: no cover - keep the worker and the watermark alive
+                logger.exception("Background indexing of write %d failed", write_seq)
+            finally:
+                with self._lock:
+                    self._mark_indexed(write_seq)
+
+    def index_status(self) -> Dict[str, Any]:
+        """
+        Report indexing freshness.
+        
+        Returns:
+            Dict with the last committed write sequence number, the
+            watermark below which every write is searchable, the number of
+            writes still waiting and whether indexing is asynchronous
+        """
+        with self._lock:
+            return {
+                "committed": self._committed_seq,
+                "indexed": self._indexed_seq,
+                "pending": self._committed_seq - self._indexed_seq,
+                "async_indexing": self.async_indexing,
+            }
+
+    @property
+    def generation(self) -> Tuple[int, int]:
+        """
+        Version of the searchable state: the change feed sequence, bumped by
+        every store, update, delete and clear, and the indexing watermark.
+        Query results computed at one generation are exact until it changes.
+        """
+        return self.changes.last_seq, self._indexed_seq
+
+    def query_cache_stats(self) -> Dict[str, Any]:
+        """Hit, miss and eviction counts of the query result cache."""
+        if self.query_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.query_cache.stats()}
+
+    def wait_for_index(self, write_seq: Optional[int] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Block until a write (default: every write committed so far) is indexed.
+        
+        Args:
+            write_seq: Write sequence number to wait for
+            timeout: Maximum seconds to wait (None waits indefinitely)
+            
+        Returns:
+            True if the watermark reached the write, False on timeout
+        """
+        with self._index_progress:
+            target = self._committed_seq if write_seq is None else write_seq
+            return self._index_progress.wait_for(lambda: self._indexed_seq >= target, timeout)
     
     def retrieve_by_type(self, entry_type: str) -> List[MemoryEntry]:
         """
@@ -128,73 +708,587 @@ class MemoryStore:
             entry_type: Type of entries to retrieve
             
         Returns:
-            List of MemoryEntry objects matching the specified type
+            List of MemoryEntry objects matching the specified type, oldest first
         """
         with self._lock:
-            return list(self.type_index.get(entry_type, []))
+            bucket = self.type_index.get(entry_type)
+            if bucket is None:
+                return []
+            view, slots = self._pin(bucket)
+        return self._build(view, slots)
 
     def get_all(self) -> List[MemoryEntry]:
         """Return all entries sorted chronologically (newest first)."""
         with self._lock:
-            return sorted(self.entries, key=lambda e: e.timestamp, reverse=True)
+            view, slots = self._pin(self.time_index.latest())
+        return self._build(view, slots)
+
+    def get_range(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                  entry_type: Optional[str] = None, limit: Optional[int] = None) -> List[MemoryEntry]:
+        """
+        Retrieve entries with start <= timestamp <= end using the time index.
+        
+        Args:
+            start: Inclusive lower bound (default: unbounded)
+            end: Inclusive upper bound (default: unbounded)
+            entry_type: Optional type to filter by
+            limit: Optional maximum number of entries to return
+            
+        Returns:
+            List of MemoryEntry objects in the timeframe, oldest first
+        """
+        with self._lock:
+            index = self.type_index.get(entry_type) if entry_type else self.time_index
+            if index is None:
+                return []
+            view, slots = self._pin(index.between(
+                None if start is None else time_key(start), None if end is None else time_key(end), limit
+            ))
+        return self._build(view, slots)
     
-    def search_by_text(self, keyword: str) -> List[MemoryEntry]:
+    @cached_query("text")
+    def search_by_text(self, keyword: str, entry_type: Optional[str] = None,
+                       limit: Optional[int] = None) -> List[MemoryEntry]:
         """
-        Search for memory entries containing the specified keyword in their content.
+        Search for memory entries whose content contains every word of the keyword.
         
-        This is a simple text-based search. In future vector database implementations,
-        this would be replaced with semantic search capabilities.
+        Candidates come from the inverted index (posting-list intersection,
+        restricted to one type partition when entry_type is given) and are
+        ranked by BM25 relevance.
         
         Args:
-            keyword: Text to search for in memory entry content
+            keyword: Word or words to search for in memory entry content
+            entry_type: Optional type to restrict the search to
+            limit: Optional maximum number of entries to return
             
         Returns:
-            List of MemoryEntry objects matching the search criteria
+            List of MemoryEntry objects matching the search criteria, most relevant first
         """
         if not keyword:
             return []
 
-        pattern = re.compile(keyword, re.IGNORECASE)
         with self._lock:
-            return [entry for entry in self.entries if pattern.search(entry.content)]
+            ranked = self.text_index.search(keyword, entry_type=entry_type, limit=limit)
+            view, slots = self._pin(entry_id for entry_id, _ in ranked)
+        return self._build(view, slots)
+
+    @cached_query("text_page")
+    def page_by_relevance(self, keyword: str, entry_type: Optional[str] = None, limit: int = 50,
+                          after: Optional[Tuple[float, int]] = None
+                          ) -> Tuple[List[MemoryEntry], Optional[Tuple[float, int]]]:
+        """
+        Read one page of the keyword matches in BM25 order (keyset pagination).
+
+        Pages are delimited by the (score, position) rank of their last
+        entry, ties broken by indexing order. Scores are recomputed for each
+        page, so a write between pages can move entries across the boundary.
+
+        Args:
+            keyword: Word or words that every entry must contain
+            entry_type: Optional type to restrict the search to
+            limit: Maximum number of entries on the page
+            after: Rank returned with the previous page (None for the first page)
+
+        Returns:
+            The page of entries, most relevant first, and the rank to pass as
+            ``after`` for the next page, or None if this was the last page
+
+        Raises:
+            ValueError: If limit is not positive
+        """
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        if not keyword:
+            return [], None
+
+        with self._lock:
+            ranked = self.text_index.search(keyword, entry_type=entry_type, limit=limit + 1, after=after)
+            view, slots = self._pin(entry_id for entry_id, _ in ranked[:limit])
+            if len(ranked) > limit:
+                last_id, last_score = ranked[limit - 1]
+                next_rank: Optional[Tuple[float, int]] = (last_score, self.text_index.position(last_id))
+            else:
+                next_rank = None
+        return self._build(view, slots), next_rank
 
-    def search_by_similarity(self, text: str, top_n: int = 5) -> List[MemoryEntry]:
-        """Return entries most similar to the provided text."""
+    def _resolve_ids(self, entry_ids: List[str]) -> List[MemoryEntry]:
+        """Materialize entries by ID, preserving the order of the IDs and skipping deleted ones."""
+        with self._lock:
+            view, slots = self._pin(entry_ids)
+        return self._build(view, slots)
+
+    @cached_query("similarity")
+    def search_by_similarity(self, text: str, top_n: int = 5, nprobe: Optional[int] = None) -> List[MemoryEntry]:
+        """
+        Return entries most similar to the provided text.
+
+        Uses the approximate index when one is configured and trained,
+        otherwise an exact scan of the embedding matrix.
+
+        Args:
+            text: Query text
+            top_n: Maximum number of entries to return
+            nprobe: Number of ANN partitions to scan; higher values improve
+                recall at the cost of latency (ignored for exact search)
+
+        Returns:
+            List of MemoryEntry objects, most similar first
+        """
         if not text:
             return []
         if top_n <= 0:
             raise ValueError("top_n must be positive")
+        if nprobe is not None and nprobe <= 0:
+            raise ValueError("nprobe must be positive")
 
         query_vec = self._compute_embedding(text)
         with self._lock:
-            scored = [
-                (
-                    self._cosine_similarity(
-                        query_vec, self.embeddings.get(entry.id, [])
-                    ),
-                    entry,
-                )
-                for entry in self.entries
-            ]
-
-        scored.sort(key=lambda x: x[0], reverse=True)
-        return [entry for score, entry in scored[:top_n] if score > 0]
+            if self.ann_index is not None and getattr(self.ann_index, "is_trained", True):
+                index = self.ann_index.snapshot()
+            else:
+                index = self.embeddings.snapshot()
+        # Score on the snapshot without the lock; entries deleted meanwhile are skipped
+        scored = index.search(query_vec, top_n, nprobe=nprobe)
+        return self._resolve_ids([entry_id for entry_id, score in scored if score > 0])
     
-    def get_last(self, n: int = 10) -> List[MemoryEntry]:
+    @cached_query("hybrid")
+    def search_hybrid(self, query: str, top_n: int = 10, entry_type: Optional[str] = None,
+                      start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      fusion: str = "rrf", semantic_weight: float = 0.5, depth: int = 100,
+                      rrf_k: int = RRF_K, nprobe: Optional[int] = None
+                      ) -> List[Tuple[MemoryEntry, float, Optional[float], Optional[float]]]:
+        """
+        Rank entries by keyword relevance and semantic similarity at once.
+        
+        Keyword candidates match any query word (BM25) and semantic ones
+        come from the vector index; both rankings are cut to ``depth`` and
+        fused (see hybrid.fuse_rankings). Type and time filters are applied
+        before fusion. A time window of at most ``hybrid_exact_limit``
+        entries is used as the shared candidate set and scored exactly;
+        wider windows search the whole store and filter afterwards.
+        
+        Args:
+            query: Query text
+            top_n: Maximum number of entries to return
+            entry_type: Optional type to restrict the search to
+            start: Optional inclusive lower timestamp bound
+            end: Optional inclusive upper timestamp bound
+            fusion: "rrf" (reciprocal rank fusion) or "weighted"
+            semantic_weight: Weight of the semantic ranking, between 0 and 1
+            depth: Candidates taken from each ranking
+            rrf_k: Rank offset for reciprocal rank fusion
+            nprobe: ANN partitions to scan for the semantic ranking
+            
+        Returns:
+            (entry, fused score, BM25 score or None, cosine similarity or
+            None) tuples, best first
+        """
+        if not query:
+            return []
+        if top_n <= 0:
+            raise ValueError("top_n must be positive")
+        depth = max(depth, top_n)
+        low = None if start is None else time_key(start)
+        high = None if end is None else time_key(end)
+        query_vec = self._compute_embedding(query)
+
+        vectors = None
+        with self._lock:
+            candidates = None
+            if low is not None or high is not None:
+                index = self.type_index.get(entry_type) if entry_type else self.time_index
+                window = index.between(low, high) if index is not None else []
+                if len(window) <= self.hybrid_exact_limit:
+                    candidates = set(window)
+            keyword = self.text_index.search(query, entry_type=entry_type, limit=depth, match_all=False,
+                                             candidates=candidates)
+            if candidates is not None:
+                semantic = heapq.nlargest(depth, self.embeddings.score_ids(query_vec, candidates),
+                                          key=lambda item: item[1])
+            elif self.ann_index is not None and getattr(self.ann_index, "is_trained", True):
+                vectors = self.ann_index.snapshot()
+            else:
+                vectors = self.embeddings.snapshot()
+        if vectors is not None:
+            # Over-fetch so that filtering still leaves enough semantic candidates
+            filtered = entry_type is not None or low is not None or high is not None
+            semantic = vectors.search(query_vec, depth * 4 if filtered else depth, nprobe=nprobe)
+
+        with self._lock:
+            view = self._columns.snapshot()
+            slots = {entry_id: self._slot_of.get(entry_id) for entry_id, _ in keyword + semantic}
+
+        def keep(entry_id: str) -> bool:
+            slot = slots[entry_id]
+            if slot is None:
+                return False
+            if entry_type is not None and view.type_of(slot) != entry_type:
+                return False
+            ts_key = view.time_keys[slot]
+            return (low is None or ts_key >= low) and (high is None or ts_key <= high)
+
+        keyword = [hit for hit in keyword if keep(hit[0])]
+        semantic = [hit for hit in semantic if hit[1] > 0 and keep(hit[0])][:depth]
+        fused = fuse_rankings(keyword, semantic, fusion, semantic_weight, rrf_k)[:top_n]
+        return [(MemoryEntry.model_construct(**view.fields(slots[entry_id])), score, keyword_score, semantic_score)
+                for entry_id, score, keyword_score, semantic_score in fused]
+
+    @cached_query("query")
+    def query(self, entry_type: Optional[str] = None, start: Optional[datetime] = None,
+              end: Optional[datetime] = None, metadata: Optional[Dict[str, Any]] = None,
+              metadata_contains: Optional[Dict[str, str]] = None, keyword: Optional[str] = None,
+              regex: Optional[str] = None, similar_to: Optional[str] = None, limit: int = 50,
+              nprobe: Optional[int] = None) -> Tuple[List[MemoryEntry], QueryPlan]:
+        """
+        Run a query combining any of the supported clauses.
+        
+        Each clause an index can answer is costed (type/time index window,
+        metadata hash index, trigram prefilters, keyword postings, vector
+        top-k); the cheapest drives the query and the remaining clauses
+        are checked on its rows, most selective first. Time-ordered scans
+        stop as soon as ``limit`` entries pass, and only the returned
+        entries are materialized.
+        
+        Args:
+            entry_type: Only entries of this type
+            start: Only entries at or after this time
+            end: Only entries at or before this time
+            metadata: Metadata values the entries must equal, by key
+            metadata_contains: Substrings metadata values must contain, by key
+            keyword: Words the content must all contain (ranks by BM25)
+            regex: Regular expression the content must match
+            similar_to: Text to rank matches by similarity to
+            limit: Maximum number of entries to return
+            nprobe: ANN partitions to scan if the vector index drives the query
+            
+        Returns:
+            The matching entries (most similar, most relevant or newest
+            first) and the executed plan with estimated and actual row counts
+        """
+        query = MemoryQuery(entry_type, start, end, metadata, metadata_contains, keyword, regex,
+                            similar_to, limit, nprobe)
+        query_vec = None if query.similar_to is None else self._compute_embedding(query.similar_to)
+        with self._lock:
+            plan = QueryPlan(query.order, len(self._slot_of))
+            paths, estimates = self._access_paths(query)
+        path = choose_access_path(paths, query, self.hybrid_exact_limit)
+        return self._run_query(query, path, paths, estimates, plan, query_vec), plan
+
+    def _access_paths(self, query: MemoryQuery) -> Tuple[List[AccessPath], Dict[Any, int]]:
+        """Cost every index that can answer a clause of the query. Caller holds the lock."""
+        estimates: Dict[Any, int] = {}
+        if query.entry_type is not None:
+            index = self.type_index.get(query.entry_type)
+            estimates[("type", None)] = 0 if index is None else len(index)
+        else:
+            index = self.time_index
+        if query.has_time_range:
+            estimates[("time", None)] = self.time_index.count_between(query.low, query.high)
+        covers = [clause for clause in (("type", None), ("time", None)) if clause in estimates]
+        paths = [AccessPath(
+            "type_index" if query.entry_type is not None else "time_index",
+            " and ".join(describe(query, clause) for clause in covers) or "all entries",
+            0 if index is None else index.count_between(query.low, query.high), covers,
+        )]
+
+        for key, value in query.metadata.items():
+            if self.metadata_index.is_indexed(key):
+                clause = ("metadata", key)
+                estimates[clause] = self.metadata_index.count(key, value)
+                paths.append(AccessPath("metadata_index", describe(query, clause), estimates[clause],
+                                        [clause], clause))
+        for key, value in query.metadata_contains.items():
+            clause = ("contains", key)
+            trigrams = self.metadata_trigrams.get(key)
+            estimate = 0 if trigrams is None else trigrams.estimate([fold_case(value)])
+            if estimate is not None:
+                estimates[clause] = estimate
+                paths.append(AccessPath("metadata_trigrams", f"trigrams of metadata.{key}", estimate,
+                                        clause=clause))
+        if query.keyword:
+            clause = ("keyword", None)
+            estimates[clause] = self.text_index.estimate(query.keyword, query.entry_type)
+            covers = [clause] + ([("type", None)] if query.entry_type is not None else [])
+            paths.append(AccessPath("text_index", " and ".join(describe(query, c) for c in covers),
+                                    estimates[clause], covers, clause))
+        if query.regex is not None:
+            estimate = self.content_trigrams.estimate(query.literals)
+            if estimate is not None:
+                estimates[("regex", None)] = estimate
+                paths.append(AccessPath("content_trigrams", f"trigrams of {query.literals}", estimate,
+                                        clause=("regex", None)))
+        if query.similar_to is not None:
+            fetch = query.limit * 4 if query.clauses() else query.limit
+            paths.append(AccessPath("vector_index", f"top {fetch} by similarity", fetch, exact=False))
+        return paths, estimates
+
+    def _candidates(self, query: MemoryQuery, path: AccessPath) -> Tuple[List[str], Optional[Dict[str, float]]]:
+        """IDs produced by an exact access path, with BM25 scores for the text index. Caller holds the lock."""
+        if path.index in ("type_index", "time_index"):
+            index = self.type_index.get(query.entry_type) if query.entry_type is not None else self.time_index
+            return ([] if index is None else index.between(query.low, query.high)), None
+        kind, key = path.clause
+        if path.index == "metadata_index":
+            return self.metadata_index.lookup(key, query.metadata[key]), None
+        if path.index == "metadata_trigrams":
+            trigrams = self.metadata_trigrams.get(key)
+            return ([] if trigrams is None else list(trigrams.candidates([fold_case(query.metadata_contains[key])]))), None
+        if path.index == "text_index":
+            # With nothing left to check, the text index can apply the limit itself
+            limit = query.limit if len(path.covers) == len(query.clauses()) else None
+            scores = dict(self.text_index.search(query.keyword, query.entry_type, limit))
+            return list(scores), scores
+        return list(self.content_trigrams.candidates(query.literals)), None
+
+    @staticmethod
+    def _apply_filters(query: MemoryQuery, filters, view: ColumnsView, slots: List[int],
+                       counts: List[int]) -> List[int]:
+        """Check residual clauses in order on a pinned snapshot, adding the survivors of each to counts."""
+        for position, (clause, _) in enumerate(filters):
+            check = query.predicate(clause, view)
+            slots = [slot for slot in slots if check(slot)]
+            counts[position] += len(slots)
+        return slots
+
+    def _run_query(self, query: MemoryQuery, path: AccessPath, paths: List[AccessPath], estimates: Dict[Any, int],
+                   plan: QueryPlan, query_vec: Optional[np.ndarray]) -> List[MemoryEntry]:
+        """Execute a query along the chosen access path, recording each step in the plan."""
+        filters = order_filters(query, [c for c in query.clauses() if c not in path.covers], estimates,
+                                plan.total_rows)
+        access = plan.add("access", path.detail, path.estimate, path.index)
+        steps = []
+        estimate = path.estimate
+        for clause, selectivity in filters:
+            if clause != path.clause:  # A prefilter's estimate already accounts for its own clause
+                estimate = round(estimate * selectivity)
+            steps.append(plan.add("filter", describe(query, clause), estimate))
+        counts = [0] * len(filters)
+
+        if query.order == "time" and path.index in ("type_index", "time_index"):
+            # The index yields newest first, so the scan can stop at the limit
+            found: List[MemoryEntry] = []
+            after = None
+            batch = max(2 * query.limit, 256)
+            access.actual_rows = 0
+            while len(found) < query.limit:
+                with self._lock:
+                    index = self.type_index.get(query.entry_type) if query.entry_type is not None else self.time_index
+                    keys = [] if index is None else list(islice(index.scan(query.low, query.high, reverse=True,
+                                                                          after=after), batch))
+                    view, slots = self._pin(key[2] for key in keys)
+                if not keys:
+                    break
+                access.actual_rows += len(keys)
+                after = keys[-1]
+                slots = self._apply_filters(query, filters, view, slots, counts)
+                found.extend(self._build(view, slots[:query.limit - len(found)]))
+                batch = min(batch * 4, 65536)
+            for step, count in zip(steps, counts):
+                step.actual_rows = count
+            plan.add("limit", f"first {query.limit} newest first", min(query.limit, estimate)).actual_rows = len(found)
+            return found
+
+        hits = None
+        if path.exact:
+            with self._lock:
+                entry_ids, scores = self._candidates(query, path)
+                view, slots = self._pin(entry_ids)
+        else:
+            with self._lock:
+                if self.ann_index is not None and getattr(self.ann_index, "is_trained", True):
+                    vectors = self.ann_index.snapshot()
+                else:
+                    vectors = self.embeddings.snapshot()
+            hits = vectors.search(query_vec, path.estimate, nprobe=query.nprobe)
+            scores = {entry_id: score for entry_id, score in hits if score > 0}
+            with self._lock:
+                view, slots = self._pin(scores)
+        access.actual_rows = len(slots)
+        slots = self._apply_filters(query, filters, view, slots, counts)
+        for step, count in zip(steps, counts):
+            step.actual_rows = count
+
+        if hits is not None and len(slots) < query.limit and len(hits) == path.estimate and filters:
+            # The approximate top-k lost too many rows to the filters: rerun exactly
+            plan.add("fallback", "too few vector candidates passed the filters", None)
+            exact = choose_access_path([p for p in paths if p.exact], query, self.hybrid_exact_limit)
+            return self._run_query(query, exact, paths, estimates, plan, query_vec)
+
+        rank = plan.add("rank", f"by {query.order}", estimate)
+        ids = view.ids
+        if query.order == "time":
+            def key(slot):
+                return view.time_keys[slot], view.seqs[slot]
+        else:
+            if scores is None or (query.order == "similarity" and path.exact):
+                with self._lock:
+                    if query.order == "relevance":
+                        scores = dict(self.text_index.search(query.keyword, query.entry_type,
+                                                             candidates={ids[slot] for slot in slots}))
+                    else:
+                        scores = {entry_id: score for entry_id, score
+                                  in self.embeddings.score_ids(query_vec, [ids[slot] for slot in slots]) if score > 0}
+            slots = [slot for slot in slots if ids[slot] in scores]
+
+            def key(slot):
+                return scores[ids[slot]]
+        rank.actual_rows = len(slots)
+        ranked = heapq.nlargest(query.limit, slots, key=key)
+        plan.add("limit", f"top {query.limit}", min(query.limit, estimate)).actual_rows = len(ranked)
+        return self._build(view, ranked)
+
+    def get_last(self, n: int = 10, entry_type: Optional[str] = None) -> List[MemoryEntry]:
         """
         Retrieve the n most recent memory entries.
         
         Args:
             n: Number of entries to retrieve (default: 10)
+            entry_type: Optional type to filter by
             
         Returns:
             List of the n most recent MemoryEntry objects, sorted by timestamp (newest first)
         """
-        # Sort entries by timestamp (newest first) and return the top n
         with self._lock:
-            sorted_entries = sorted(self.entries, key=lambda x: x.timestamp, reverse=True)
-            return sorted_entries[:n]
-    
+            index = self.type_index.get(entry_type) if entry_type else self.time_index
+            if index is None:
+                return []
+            view, slots = self._pin(index.latest(n))
+        return self._build(view, slots)
+
+    @cached_query("page", default=False)
+    def page(self, entry_type: Optional[str] = None, start: Optional[datetime] = None,
+             end: Optional[datetime] = None, keyword: Optional[str] = None, limit: int = 100,
+             after: Optional[TimeKey] = None, newest_first: bool = True, pattern: Optional[str] = None,
+             metadata: Optional[Tuple[str, str]] = None) -> Tuple[List[MemoryEntry], Optional[TimeKey]]:
+        """
+        Read one page of entries in time order (keyset pagination).
+        
+        Pages are delimited by time index keys rather than offsets, so a page
+        costs O(log N + limit) however deep into the listing it is (plus
+        the keyword matches, when a keyword is given), and writes between
+        pages never shift or repeat entries. A regex or metadata filter
+        takes its candidates from the trigram indexes (or walks the time
+        index in chunks when they cannot narrow it) and is only checked
+        until the page is full. Not cached unless use_cache=True is passed.
+        
+        Args:
+            entry_type: Optional type to restrict the listing to
+            start: Optional inclusive lower timestamp bound
+            end: Optional inclusive upper timestamp bound
+            keyword: Optional words every entry must contain
+            limit: Maximum number of entries on the page
+            after: Key returned with the previous page (None for the first page)
+            newest_first: Walk from the newest entry backwards
+            pattern: Optional regular expression the content must match (case-insensitively)
+            metadata: Optional (key, substring) that a metadata value must contain (case-insensitively)
+            
+        Returns:
+            The page of entries and the key to pass as ``after`` for the
+            next page, or None if this was the last page
+            
+        Raises:
+            ValueError: If limit is not positive or the pattern is invalid
+        """
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        low = None if start is None else time_key(start)
+        high = None if end is None else time_key(end)
+        checks = self._page_checks(pattern, metadata)
+        with self._lock:
+            if keyword is None and not checks:
+                index = self.type_index.get(entry_type) if entry_type else self.time_index
+                if index is None:
+                    return [], None
+                keys = list(islice(index.scan(low, high, reverse=newest_first, after=after), limit + 1))
+                view, slots = self._pin(key[2] for key in keys[:limit])
+                return self._build(view, slots), (keys[limit - 1] if len(keys) > limit else None)
+            if keyword is not None:
+                candidates: Optional[Iterable[str]] = [entry_id for entry_id, _ in
+                                                       self.text_index.search(keyword, entry_type=entry_type)]
+            else:
+                candidates = self._page_candidates(pattern, metadata)
+                if entry_type:
+                    checks.append(lambda view, slot: view.type_of(slot) == entry_type)
+            if candidates is not None:
+                view, slots = self._pin(candidates)
+        if candidates is None:
+            return self._page_walk(entry_type, low, high, limit, after, newest_first, checks)
+
+        def key(slot: int) -> TimeKey:
+            return view.time_keys[slot], view.seqs[slot], view.ids[slot]
+
+        keyed = [(key(slot), slot) for slot in slots]
+        keyed = [(k, slot) for k, slot in keyed if (low is None or k[0] >= low) and (high is None or k[0] <= high)
+                 and (after is None or (k < after if newest_first else k > after))]
+        if checks:
+            keyed.sort(reverse=newest_first)
+            matching = (item for item in keyed if all(check(view, item[1]) for check in checks))
+            keyed = list(islice(matching, limit + 1))
+        else:
+            keyed = (heapq.nlargest if newest_first else heapq.nsmallest)(limit + 1, keyed)
+        next_key = keyed[limit - 1][0] if len(keyed) > limit else None
+        return self._build(view, [slot for _, slot in keyed[:limit]]), next_key
+
+    @staticmethod
+    def _page_checks(pattern: Optional[str], metadata: Optional[Tuple[str, str]]) -> List[SlotCheck]:
+        """Predicates for the regex and metadata filters of page()."""
+        checks: List[SlotCheck] = []
+        if pattern is not None:
+            try:
+                search = re.compile(pattern, re.IGNORECASE).search
+            except re.error as exc:
+                raise ValueError(f"Invalid regex: {exc}") from exc
+            checks.append(lambda view, slot: search(view.content(slot)) is not None)
+        if metadata is not None:
+            meta_key, needle = metadata[0], metadata[1].lower()
+
+            def contains(view: ColumnsView, slot: int) -> bool:
+                value = view.metadata(slot).get(meta_key)
+                return isinstance(value, str) and needle in value.lower()
+
+            checks.append(contains)
+        return checks
+
+    def _page_candidates(self, pattern: Optional[str], metadata: Optional[Tuple[str, str]]
+                         ) -> Optional[Iterable[str]]:
+        """
+        Entry IDs that may pass the regex or metadata filter of page(), or
+        None when the trigram indexes cannot narrow the listing. Caller holds the lock.
+        """
+        if metadata is not None:
+            index = self.metadata_trigrams.get(metadata[0])
+            if index is None:
+                return []
+            candidates = index.candidates([fold_case(metadata[1])])
+            return index.documents() if candidates is None else candidates
+        return self.content_trigrams.candidates(required_literals(pattern, re.IGNORECASE))
+
+    def _page_walk(self, entry_type: Optional[str], low: Optional[int], high: Optional[int], limit: int,
+                   after: Optional[TimeKey], newest_first: bool, checks: List[SlotCheck]
+                   ) -> Tuple[List[MemoryEntry], Optional[TimeKey]]:
+        """
+        Fill a page of page() by walking the time index a chunk at a time,
+        checking each chunk outside the lock, until limit + 1 entries match.
+        """
+        chunk = max(256, 4 * limit)
+        entries: List[MemoryEntry] = []
+        found: List[TimeKey] = []  # Keys of the matches, up to limit + 1
+        position = after
+        while len(found) <= limit:
+            with self._lock:
+                index = self.type_index.get(entry_type) if entry_type else self.time_index
+                keys = [] if index is None else list(islice(
+                    index.scan(low, high, reverse=newest_first, after=position), chunk))
+                view, slots = self._pin(key[2] for key in keys)
+            matches = [slot for slot in slots if all(check(view, slot) for check in checks)]
+            matches = matches[:limit + 1 - len(found)]
+            entries.extend(self._build(view, matches[:limit - len(found)]))
+            found.extend((view.time_keys[slot], view.seqs[slot], view.ids[slot]) for slot in matches)
+            if len(keys) < chunk:
+                break
+            position = keys[-1]
+        return entries, (found[limit - 1] if len(found) > limit else None)
+
     def get_by_id(self, entry_id: str) -> Optional[MemoryEntry]:
         """
         Retrieve a specific memory entry by its ID.
@@ -206,29 +1300,149 @@ class MemoryStore:
             MemoryEntry object if found, None otherwise
         """
         with self._lock:
-            for entry in self.entries:
-                if entry.id == entry_id:
-                    return entry
-            return None
+            view, slots = self._pin((entry_id,))
+        return self._build(view, slots)[0] if slots else None
+
+    def _remove(self, entry_id: str) -> bool:
+        """Tombstone an entry's slot and drop it from every index. Caller holds the lock."""
+        slot = self._slot_of.pop(entry_id, None)
+        if slot is None:
+            return False
+        columns = self._columns
+        ts_key, seq, entry_type = columns.time_keys[slot], columns.seqs[slot], columns.type_of(slot)
+        metadata = columns.metadata(slot)
+        indexed = self._unindexed.pop(entry_id, None) is None
+        if indexed:
+            self.content_trigrams.remove(entry_id, columns.content(slot))
+        if self.near_duplicates is not None and entry_type in self.near_duplicates:
+            self.near_duplicates.remove(entry_id, entry_type, band_keys(columns.content(slot)))
+        columns.release(slot)
+        self._free_slots.append(slot)
+
+        self.time_index.remove(entry_id, ts_key, seq)
+        self.counters.remove(entry_type, entry_category(metadata), ts_key)
+        bucket = self.type_index.get(entry_type)
+        if bucket is not None:
+            bucket.remove(entry_id, ts_key, seq)
+            if not len(bucket):
+                del self.type_index[entry_type]
+        if not indexed:
+            return True  # The indexing worker will skip it
+        self._unindex_embedding(entry_id)
+        self.text_index.remove(entry_id)
+        self.metadata_index.remove(entry_id, metadata)
+        self.graph_index.remove(entry_id)
+        self._unindex_metadata_trigrams(entry_id, metadata)
+        return True
 
     def delete(self, entry_id: str) -> bool:
         """Delete a memory entry by its ID."""
         with self._lock:
-            for i, entry in enumerate(self.entries):
-                if entry.id == entry_id:
-                    del self.entries[i]
-                    if entry_id in self.embeddings:
-                        del self.embeddings[entry_id]
-                    if entry.type in self.type_index:
-                        try:
-                            self.type_index[entry.type].remove(entry)
-                            if not self.type_index[entry.type]:
-                                del self.type_index[entry.type]
-                        except ValueError:
-                            pass
-                    return True
-            return False
+            if not self._remove(entry_id):
+                return False
+            self._log({"op": "delete", "id": entry_id})
+            self._maybe_schedule_compaction()
+            return True
+
+    def _maybe_schedule_compaction(self) -> None:
+        """
+        Start a background compaction once most slots are tombstones or most
+        of the arena is garbage. Caller holds the lock.
+        """
+        if self._compaction_scheduled:
+            return
+        tombstones = len(self._free_slots)
+        garbage = self._columns.garbage_bytes
+        slots_due = tombstones >= self.compaction_threshold and tombstones * 2 >= len(self._columns)
+        arena_due = garbage >= self.arena_compaction_bytes and garbage * 2 >= self._columns.arena_bytes
+        if not (slots_due or arena_due):
+            return
+        self._compaction_scheduled = True
+        threading.Thread(target=self.compact, name="memory-store-compaction", daemon=True).start()
+
+    def compact(self) -> int:
+        """
+        Drop tombstoned slots, renumber the live entries densely and rewrite
+        the content arena without garbage.
+
+        Scheduled on a background thread by delete() and clear() so the
+        request that crossed the threshold does not pay for it; it can also
+        be called directly from maintenance jobs.
+
+        Returns:
+            Number of slots reclaimed
+        """
+        with self._lock:
+            self._compaction_scheduled = False
+            reclaimed = len(self._free_slots)
+            if not (reclaimed or self._columns.garbage_bytes):
+                return 0
+            view = self._columns.snapshot()
+
+        # Copy from the snapshot without the lock, then swap in the result
+        # unless a write got in first, in which case compact under the lock.
+        columns = view.compacted(self._live_slots(view))
+        with self._lock:
+            if self._columns.snapshot() is not view:
+                reclaimed = len(self._free_slots)
+                columns = self._columns.compacted(self._live_slots(self._columns))
+            self._columns = columns
+            self._slot_of = {entry_id: slot for slot, entry_id in enumerate(columns.ids)}
+            self._free_slots = []
+            return reclaimed
     
+    def export_batches(self, entry_type: Optional[str] = None, batch_size: int = 1000,
+                       embeddings: bool = True) -> Iterator[EntryBatch]:
+        """
+        Read every entry (of a type) oldest first, as column batches.
+        
+        Each batch is pinned under the lock and built outside it, and the
+        next one resumes after the last time index key, so only one batch
+        is held at a time and concurrent writers are never blocked for
+        long. Entries written during the export appear if they sort after
+        the current position.
+        
+        Args:
+            entry_type: Only export entries of this type
+            batch_size: Entries per batch
+            embeddings: Include the stored (normalized) embeddings
+            
+        Returns:
+            Iterator of EntryBatch objects
+        """
+        after = None
+        while True:
+            with self._lock:
+                index = self.type_index.get(entry_type) if entry_type else self.time_index
+                if index is None:
+                    return
+                keys = list(islice(index.scan(after=after), batch_size))
+                view, slots = self._pin(key[2] for key in keys)
+                ids = [view.ids[slot] for slot in slots]
+                vectors, missing = self.embeddings.get_many(ids) if embeddings else (None, [])
+            if not keys:
+                return
+            for position in missing:  # Not indexed yet (async indexing): embed it here
+                entry = MemoryEntry(**view.fields(slots[position]))
+                vectors[position] = EmbeddingMatrix.normalize(self._compute_embedding(self._embedding_source(entry)))
+            offsets = [view.utc_offset(slot) for slot in slots]
+            yield EntryBatch(
+                ids,
+                [view.type_of(slot) for slot in slots],
+                [view.content_bytes(slot) for slot in slots],
+                [view.metadata_json(slot) for slot in slots],
+                np.fromiter((view.time_keys[slot] for slot in slots), dtype=np.int64, count=len(slots)),
+                np.array([NAIVE_OFFSET if offset is None else offset for offset in offsets], dtype=np.int32),
+                vectors,
+            )
+            if len(keys) < batch_size:
+                return
+            after = keys[-1]
+
+    def approximate_bytes(self) -> int:
+        """Estimated heap footprint of the store, for memory budgets (see backend.memory.tenants)."""
+        return self._columns.arena_bytes + len(self._slot_of) * ENTRY_OVERHEAD_BYTES
+
     def count_entries(self, entry_type: Optional[str] = None) -> int:
         """
         Count the number of entries in the memory store, optionally filtered by type.
@@ -241,9 +1455,96 @@ class MemoryStore:
         """
         with self._lock:
             if entry_type:
-                return len(self.retrieve_by_type(entry_type))
-            return len(self.entries)
+                return len(self.type_index.get(entry_type, ()))
+            return len(self._slot_of)
     
+    def find_duplicates(self, entry_type: Optional[str] = None, limit: int = 50) -> List[List[MemoryEntry]]:
+        """
+        Report clusters of near-duplicate entries currently stored.
+
+        With a duplicate policy on, only the LSH buckets shared by several
+        entries are examined. With the policy off no signatures are kept,
+        so they are computed for every entry (of the type) here.
+
+        Args:
+            entry_type: Only report entries of this type
+            limit: Maximum number of clusters
+
+        Returns:
+            Clusters of two or more entries, largest first, each oldest first
+        """
+        with self._lock:
+            if self.near_duplicates is not None:
+                shared = self.near_duplicates.shared_buckets(entry_type)
+                view, slots = self._pin({entry_id for _, members in shared for entry_id in members})
+                index = None
+            else:
+                view, slots = self._pin(self.time_index if entry_type is None else self.type_index.get(entry_type, ()))
+                index = NearDuplicateIndex(self.duplicate_threshold)
+        slot_of = {view.ids[slot]: slot for slot in slots}
+        if index is not None:
+            for slot in slots:
+                index.add(view.ids[slot], view.type_of(slot), band_keys(view.content(slot)))
+            shared = index.shared_buckets(entry_type)
+
+        def content_of(entry_id: str) -> Optional[str]:
+            slot = slot_of.get(entry_id)
+            return None if slot is None else view.content(slot)
+
+        clusters = cluster(shared, content_of, self.duplicate_threshold)
+        clusters.sort(key=lambda item: len(item[1]), reverse=True)
+        report = []
+        for _, members in clusters[:limit]:
+            member_slots = sorted((slot_of[entry_id] for entry_id in members),
+                                  key=lambda slot: (view.time_keys[slot], view.seqs[slot]))
+            report.append(self._build(view, member_slots))
+        return report
+
+    def count_by_type(self) -> Dict[str, int]:
+        """
+        Count entries per type.
+
+        Read from counters maintained on every write, without visiting entries.
+
+        Returns:
+            Dictionary mapping entry types to counts
+        """
+        with self._lock:
+            return dict(self.counters.by_type)
+
+    def count_by_category(self) -> Dict[str, int]:
+        """
+        Count entries per metadata category (entries without one are not counted).
+
+        Returns:
+            Dictionary mapping categories to counts
+        """
+        with self._lock:
+            return dict(self.counters.by_category)
+
+    def timeseries(self, interval: str = "day", entry_type: Optional[str] = None,
+                   start: Optional[datetime] = None, end: Optional[datetime] = None
+                   ) -> List[Tuple[datetime, int, Dict[str, int]]]:
+        """
+        Count entries per hour or day from the maintained bucket counters.
+
+        Args:
+            interval: Bucket width, "hour" or "day"
+            entry_type: Only count entries of this type
+            start: Only buckets containing times at or after this time
+            end: Only buckets starting at or before this time
+
+        Returns:
+            (bucket start, count, count per type) for every non-empty bucket, oldest first
+
+        Raises:
+            ValueError: If the interval is unknown
+        """
+        start_key = None if start is None else time_key(start)
+        end_key = None if end is None else time_key(end)
+        with self._lock:
+            return self.counters.timeseries(interval, entry_type, start_key, end_key)
+
     def clear(self, entry_type: Optional[str] = None) -> int:
         """
         Clear entries from the memory store, optionally filtered by type.
@@ -256,80 +1557,266 @@ class MemoryStore:
         """
         with self._lock:
             if not entry_type:
-                count = len(self.entries)
-                self.entries = []
+                count = len(self._slot_of)
+                self._columns = EntryColumns()
+                self._slot_of = {}
+                self._free_slots = []
+                self.time_index = TimeIndex()
                 self.type_index = {}
-                self.embeddings = {}
+                self.embeddings.clear()
+                if self.ann_index is not None:
+                    self.ann_index.clear()
+                self.text_index.clear()
+                self.metadata_index.clear()
+                self.graph_index.clear()
+                self.content_trigrams.clear()
+                self.metadata_trigrams = {}
+                self.counters.clear()
+                if self.near_duplicates is not None:
+                    self.near_duplicates.clear()
+                self._unindexed = {}  # Queued writes are skipped by the indexing workers
+                self._log({"op": "clear", "entry_type": None})
                 return count
 
-            entries_to_remove = self.retrieve_by_type(entry_type)
-            count = len(entries_to_remove)
-            self.entries = [entry for entry in self.entries if entry.type != entry_type]
-            if entry_type in self.type_index:
-                del self.type_index[entry_type]
-            for entry in entries_to_remove:
-                self.embeddings.pop(entry.id, None)
+            entry_ids = list(self.type_index.get(entry_type, ()))
+            if self.near_duplicates is not None:
+                self.near_duplicates.clear(entry_type)  # Spares _remove recomputing every entry's keys
+            for entry_id in entry_ids:
+                self._remove(entry_id)
+            self._log({"op": "clear", "entry_type": entry_type})
+            self._maybe_schedule_compaction()
 
-            return count
+            return len(entry_ids)
     
-    def search_by_metadata(self, key: str, value: Any) -> List[MemoryEntry]:
+    def declare_metadata_index(self, key: str) -> None:
+        """
+        Start maintaining a hash index for a metadata key.
+        
+        Existing entries are indexed immediately; later writes, updates and
+        deletes keep the index current.
+        
+        Args:
+            key: Metadata key to index
+        """
+        with self._lock:
+            if self.metadata_index.declare(key):
+                for slot in self._live_slots(self._columns):
+                    if self._columns.ids[slot] in self._unindexed:
+                        continue  # Indexed under every declared key once its worker runs
+                    self.metadata_index.add(self._columns.ids[slot], self._columns.metadata(slot), keys=(key,))
+
+    def search_by_metadata(self, key: str, value: Any, entry_type: Optional[str] = None) -> List[MemoryEntry]:
         """
         Search for memory entries with matching metadata.
         
+        Indexed keys are answered from the metadata index in O(matches);
+        other keys fall back to a scan.
+        
         Args:
             key: Metadata key to match
             value: Metadata value to match
+            entry_type: Optional type to filter by
             
         Returns:
             List of MemoryEntry objects with matching metadata
         """
         with self._lock:
-            return [
-                entry for entry in self.entries
-                if key in entry.metadata and entry.metadata[key] == value
-            ]
+            if self.metadata_index.is_indexed(key):
+                view, slots = self._pin(self.metadata_index.lookup(key, value))
+            else:
+                view, slots = self._columns.snapshot(), None
+        if slots is None:
+            slots = []
+            for slot in self._live_slots(view):
+                metadata = view.metadata(slot)
+                if key in metadata and metadata[key] == value:
+                    slots.append(slot)
+        if entry_type:
+            slots = [slot for slot in slots if view.type_of(slot) == entry_type]
+        return self._build(view, slots)
 
     def search_by_metadata_value(self, key: str, value_substr: str) -> List[MemoryEntry]:
-        """Search for entries where a metadata value contains the given substring."""
+        """
+        Search for entries where a metadata value contains the given substring.
+        
+        Candidates come from the trigram index of that metadata key and are
+        verified with a case-insensitive substring check.
+        
+        Args:
+            key: Metadata key to search
+            value_substr: Substring to look for (case-insensitive)
+            
+        Returns:
+            List of matching MemoryEntry objects, oldest first
+        """
         if not key or value_substr is None:
             return []
+        needle = value_substr.lower()
         with self._lock:
-            return [
-                entry
-                for entry in self.entries
-                if isinstance(entry.metadata.get(key), str)
-                and value_substr.lower() in entry.metadata.get(key, "").lower()
-            ]
+            index = self.metadata_trigrams.get(key)
+            if index is None:
+                return []
+            candidates = index.candidates([fold_case(value_substr)])
+            view, slots = self._pin(index.documents() if candidates is None else candidates)
+        matches = []
+        for slot in self._in_time_order(view, slots):
+            value = view.metadata(slot).get(key)
+            if isinstance(value, str) and needle in value.lower():
+                matches.append(slot)
+        return self._build(view, matches)
 
-    def search_by_regex(self, pattern: str) -> List[MemoryEntry]:
-        """Search entry content using a regular expression pattern."""
+    @cached_query("regex")
+    def search_by_regex(self, pattern: str, entry_type: Optional[str] = None) -> List[MemoryEntry]:
+        """
+        Search entry content using a regular expression pattern.
+        
+        Literal strings that every match must contain are extracted from the
+        pattern and looked up in the content trigram index; the full regex
+        only runs on the candidates that contain all of them (and are of
+        entry_type, whose partition of the time index is scanned instead
+        when the pattern has no literals).
+        
+        Args:
+            pattern: Regular expression (matched case-insensitively)
+            entry_type: Optional type to restrict the search to
+            
+        Returns:
+            List of matching MemoryEntry objects, oldest first
+        """
         if not pattern:
             return []
         try:
             regex = re.compile(pattern, re.IGNORECASE)
         except re.error as exc:
             raise ValueError(f"Invalid regex: {exc}") from exc
+        literals = required_literals(pattern, re.IGNORECASE)
+
+        with self._lock:
+            candidates = self.content_trigrams.candidates(literals)
+            if candidates is None:
+                scope = self.time_index if entry_type is None else self.type_index.get(entry_type, ())
+                view, slots = self._pin(scope)
+            else:
+                view, slots = self._pin(candidates)
+        if candidates is not None:
+            if entry_type is not None:
+                slots = [slot for slot in slots if view.type_of(slot) == entry_type]
+            self._in_time_order(view, slots)
+        content = view.content
+        return self._build(view, [slot for slot in slots if regex.search(content(slot))])
+
+    def _linked(self, entry_ids: Iterable[str], depth: Optional[int]) -> Tuple[Dict[str, int], List[Edge]]:
+        """Breadth-first traversal of the graph index from existing entries. Caller holds the lock."""
+        exists = self._slot_of.__contains__
+        starts = [entry_id for entry_id in entry_ids if exists(entry_id)]
+        return breadth_first(starts, lambda frontier: self.graph_index.edges(frontier, exists), depth)
+
+    def traverse(self, entry_id: str, depth: Optional[int] = 1
+                 ) -> Optional[Tuple[List[Tuple[MemoryEntry, int]], List[Edge]]]:
+        """
+        Find the entries linked to an entry within some hops.
+        
+        Links (related_to metadata) are followed in both directions through
+        the graph index, so the cost is proportional to the entries and
+        links visited, not to the store size.
+        
+        Args:
+            entry_id: ID of the entry to start from
+            depth: Maximum number of hops (None: the whole connected component)
+            
+        Returns:
+            ([(entry, hops from the start)] breadth first, links between those
+            entries as (source ID, target ID)), or None if the entry does not exist
+        """
+        with self._lock:
+            if entry_id not in self._slot_of:
+                return None
+            hops, edges = self._linked((entry_id,), depth)
+            view, slots = self._pin(hops)
+        return [(entry, hops[entry.id]) for entry in self._build(view, slots)], edges
 
+    def linked_component(self, entry_ids: Iterable[str], entry_type: Optional[str] = None) -> List[MemoryEntry]:
+        """
+        Every entry connected to the given entries through links, oldest first.
+        
+        Args:
+            entry_ids: IDs of the entries to start from (included; missing IDs are ignored)
+            entry_type: Optional type to filter by
+            
+        Returns:
+            List of MemoryEntry objects in chronological order
+        """
         with self._lock:
-            return [entry for entry in self.entries if regex.search(entry.content)]
+            hops, _ = self._linked(entry_ids, None)
+            view, slots = self._pin(hops)
+        if entry_type:
+            slots = [slot for slot in slots if view.type_of(slot) == entry_type]
+        return self._build(view, self._in_time_order(view, slots))
 
     def update_entry(self, entry_id: str, content: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> bool:
-        """Update an existing entry and refresh its embedding."""
+        """
+        Update an existing entry and refresh its embedding.
+
+        The new embedding is computed from the entry as read before the lock
+        is taken; it is only recomputed under the lock if another writer
+        changed the entry in between.
+        """
+        current = self.get_by_id(entry_id)
+        if current is None:
+            return False
+        if content is not None and not content:
+            raise ValueError("Updated content cannot be empty")
+        if content is not None:
+            current.content = content
+        if metadata is not None:
+            current.metadata.update(metadata)
+        source = self._embedding_source(current)
+        vector = self._compute_embedding(source)
+        keys = None if content is None else self._band_keys(current)
+
         with self._lock:
-            entry = self.get_by_id(entry_id)
-            if not entry:
+            slot = self._slot_of.get(entry_id)
+            if slot is None:
                 return False
+            entry = self._materialize(slot)
+            if keys is not None:
+                self.near_duplicates.remove(entry_id, entry.type, band_keys(entry.content))
+                self.near_duplicates.add(entry_id, entry.type, keys)
+            if entry_id in self._unindexed:
+                # Not indexed yet: the queued worker indexes the stored values
+                if content is not None:
+                    self._columns.set_content(slot, content)
+                if metadata is not None:
+                    category = entry_category(entry.metadata)
+                    entry.metadata.update(metadata)
+                    self._columns.set_metadata(slot, entry.metadata)
+                    self.counters.recategorize(category, entry_category(entry.metadata))
+                self._log({"op": "update", "id": entry_id, "content": content, "metadata": metadata})
+                self._maybe_schedule_compaction()
+                return True
             if content is not None:
-                if not content:
-                    raise ValueError("Updated content cannot be empty")
+                self.content_trigrams.remove(entry_id, entry.content)
                 entry.content = content
+                self._columns.set_content(slot, content)
+                self.text_index.add(entry_id, entry.type, content)
+                self.content_trigrams.add(entry_id, content)
             if metadata is not None:
+                self.metadata_index.remove(entry_id, entry.metadata)
+                self.graph_index.remove(entry_id)
+                self._unindex_metadata_trigrams(entry_id, entry.metadata)
+                category = entry_category(entry.metadata)
                 entry.metadata.update(metadata)
+                self._columns.set_metadata(slot, entry.metadata)
+                self.counters.recategorize(category, entry_category(entry.metadata))
+                self.metadata_index.add(entry_id, entry.metadata)
+                self.graph_index.add(entry_id, entry.metadata)
+                self._index_metadata_trigrams(entry)
 
-            embedding_source = entry.content
-            if entry.metadata:
-                embedding_source += " " + " ".join(str(v) for v in entry.metadata.values())
-            self.embeddings[entry.id] = self._compute_embedding(embedding_source)
+            if self._embedding_source(entry) != source:
+                vector = self._compute_embedding(self._embedding_source(entry))
+            self._index_embedding(entry_id, vector)
+            self._log({"op": "update", "id": entry_id, "content": content, "metadata": metadata})
+            self._maybe_schedule_compaction()
             return True
 
 
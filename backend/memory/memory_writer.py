@@ -6,13 +6,133 @@ into the system's MemoryStore, making it easier to log decisions, events, and ot
 important information with consistent formatting and metadata.
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, cast
+import atexit
 import datetime
+import os
+import tempfile
 from backend.memory.memory_store import MemoryEntry, MemoryStore
+from backend.memory.near_duplicates import DEFAULT_THRESHOLD, DuplicatePolicy
+from backend.memory.persistence import DurabilityMode
+from backend.memory.query_cache import DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTL
+from backend.memory.tenants import DEFAULT_MEMORY_BUDGET, DEFAULT_TENANT, TenantStores, current_tenant
+from backend.memory.vector_index import DEFAULT_NPROBE, IVFFlatIndex
 
 # Singleton instance of MemoryStore for the system
-# In a real app, this would be injected or accessed through a service locator
-memory_store = MemoryStore()
+# In a real app, this would be injected or accessed through a service locator.
+# Semantic search is an exact scan unless OCULUS_MEMORY_ANN=1 layers the approximate
+# IVF index over it (used once a store is large enough to be clustered), scanning
+# OCULUS_MEMORY_ANN_NPROBE partitions per query; see bench_ann_recall for its recall.
+# Setting OCULUS_MEMORY_DIR makes the store durable (snapshot + write-ahead log);
+# OCULUS_MEMORY_DURABILITY selects the fsync policy: always, batch (default) or os.
+# OCULUS_MEMORY_BACKEND=sqlite keeps entries on disk in an SQLite database instead.
+# OCULUS_MEMORY_ASYNC_INDEXING=1 indexes new entries on background workers.
+# OCULUS_MEMORY_DEDUP handles near-duplicate writes: off (default), drop, count or merge;
+# OCULUS_MEMORY_DEDUP_THRESHOLD sets the similarity at which content counts as a duplicate.
+# OCULUS_QUERY_CACHE_SIZE bounds the search result cache (0 disables it) and
+# OCULUS_QUERY_CACHE_TTL sets how many seconds a cached result may be served.
+_ann = os.getenv("OCULUS_MEMORY_ANN", "").lower() in ("1", "true", "yes")
+_ann_nprobe = int(os.getenv("OCULUS_MEMORY_ANN_NPROBE", DEFAULT_NPROBE))
+_async_indexing = os.getenv("OCULUS_MEMORY_ASYNC_INDEXING", "").lower() in ("1", "true", "yes")
+_durability = DurabilityMode(os.getenv("OCULUS_MEMORY_DURABILITY", "batch").lower())
+_duplicate_policy = DuplicatePolicy(os.getenv("OCULUS_MEMORY_DEDUP", "off").lower())
+_duplicate_threshold = float(os.getenv("OCULUS_MEMORY_DEDUP_THRESHOLD", DEFAULT_THRESHOLD))
+_query_cache_size = int(os.getenv("OCULUS_QUERY_CACHE_SIZE", DEFAULT_CACHE_SIZE))
+_query_cache_ttl = float(os.getenv("OCULUS_QUERY_CACHE_TTL", DEFAULT_CACHE_TTL))
+_sqlite_backend = os.getenv("OCULUS_MEMORY_BACKEND", "memory").lower() == "sqlite"
+_memory_dir = os.getenv("OCULUS_MEMORY_DIR")
+# Where the stores live on disk: the SQLite backend always keeps its databases on disk,
+# in the working directory unless OCULUS_MEMORY_DIR is set
+_data_dir = _memory_dir or ("." if _sqlite_backend else None)
+
+
+def _ann_index() -> Optional[IVFFlatIndex]:
+    """A new IVF index for a store when approximate search is enabled, otherwise None (exact search)."""
+    return IVFFlatIndex(dim=128, nprobe=_ann_nprobe) if _ann else None
+
+
+def _sqlite_store(path: str) -> MemoryStore:
+    """An SQLite-backed store; it offers the same methods as MemoryStore, so it is typed as one."""
+    from backend.memory.sqlite_store import SQLiteMemoryStore
+
+    return cast(MemoryStore, SQLiteMemoryStore(
+        path,
+        ann_index=_ann_index(),
+        duplicate_policy=_duplicate_policy,
+        duplicate_threshold=_duplicate_threshold,
+        query_cache_size=_query_cache_size,
+        query_cache_ttl=_query_cache_ttl,
+    ))
+
+
+def _durable_store(directory: str, durability: DurabilityMode) -> MemoryStore:
+    """An in-memory store persisted to a directory (snapshot + write-ahead log)."""
+    return MemoryStore.open(
+        directory,
+        durability=durability,
+        ann_index=_ann_index(),
+        async_indexing=_async_indexing,
+        duplicate_policy=_duplicate_policy,
+        duplicate_threshold=_duplicate_threshold,
+        query_cache_size=_query_cache_size,
+        query_cache_ttl=_query_cache_ttl,
+    )
+
+
+memory_store: MemoryStore
+if _sqlite_backend:
+    memory_store = _sqlite_store(os.path.join(_data_dir or ".", "memory.sqlite3"))
+elif _memory_dir:
+    memory_store = _durable_store(_memory_dir, _durability)
+else:
+    memory_store = MemoryStore(
+        ann_index=_ann_index(),
+        async_indexing=_async_indexing,
+        duplicate_policy=_duplicate_policy,
+        duplicate_threshold=_duplicate_threshold,
+        query_cache_size=_query_cache_size,
+        query_cache_ttl=_query_cache_ttl,
+    )
+
+# Other tenants get their own store under tenants/<tenant ID> next to the default one (or
+# in a temporary directory, removed on exit, when memory is not durable), so every
+# tenant outlives a restart exactly when the default tenant does. They are opened on
+# first use; idle tenants are written back and closed once the open ones exceed
+# OCULUS_TENANT_MEMORY_MB.
+_tenant_root = os.path.join(_data_dir, "tenants") if _data_dir else None
+_temporary_tenant_root: Optional[tempfile.TemporaryDirectory] = None
+
+
+def _open_tenant_store(tenant_id: str) -> MemoryStore:
+    """Open (or create) the store of a tenant other than the default one."""
+    global _tenant_root, _temporary_tenant_root
+    if _tenant_root is None:
+        _temporary_tenant_root = tempfile.TemporaryDirectory(prefix="oculus-tenants-")
+        _tenant_root = _temporary_tenant_root.name
+    directory = os.path.join(_tenant_root, tenant_id)
+    if _sqlite_backend:
+        os.makedirs(directory, exist_ok=True)
+        return _sqlite_store(os.path.join(directory, "memory.sqlite3"))
+    return _durable_store(directory, _durability if _memory_dir else DurabilityMode.OS)
+
+
+def _remove_temporary_tenants() -> None:
+    """Delete the tenant stores of a non-durable process (after they are closed)."""
+    if _temporary_tenant_root is not None:
+        _temporary_tenant_root.cleanup()
+
+
+tenant_stores = TenantStores(
+    _open_tenant_store,
+    memory_store,
+    memory_budget=int(os.getenv("OCULUS_TENANT_MEMORY_MB", DEFAULT_MEMORY_BUDGET // (1024 * 1024))) * 1024 * 1024,
+)
+
+# Flush the process-wide stores on interpreter exit (run in reverse: tenants first,
+# then their temporary directory, then the default store)
+atexit.register(memory_store.close)
+atexit.register(_remove_temporary_tenants)
+atexit.register(tenant_stores.close)
 
 
 def log_decision(content: str, metadata: Dict = None) -> str:
@@ -44,7 +164,7 @@ def log_decision(content: str, metadata: Dict = None) -> str:
         metadata=metadata
     )
     
-    return memory_store.store(entry)
+    return get_memory_store().store(entry)
 
 
 def log_event(content: str, metadata: Dict = None) -> str:
@@ -70,7 +190,7 @@ def log_event(content: str, metadata: Dict = None) -> str:
         metadata=metadata
     )
     
-    return memory_store.store(entry)
+    return get_memory_store().store(entry)
 
 
 def log_project(content: str, project_name: str, metadata: Dict = None) -> str:
@@ -99,7 +219,7 @@ def log_project(content: str, project_name: str, metadata: Dict = None) -> str:
         metadata=metadata
     )
     
-    return memory_store.store(entry)
+    return get_memory_store().store(entry)
 
 
 def log_insight(content: str, source: str = None, metadata: Dict = None) -> str:
@@ -129,7 +249,7 @@ def log_insight(content: str, source: str = None, metadata: Dict = None) -> str:
         metadata=metadata
     )
     
-    return memory_store.store(entry)
+    return get_memory_store().store(entry)
 
 
 def log_error(content: str, severity: str = "info", metadata: Dict = None) -> str:
@@ -159,22 +279,24 @@ def log_error(content: str, severity: str = "info", metadata: Dict = None) -> st
         metadata=metadata
     )
     
-    return memory_store.store(entry)
+    return get_memory_store().store(entry)
 
 
 def delete_entry(entry_id: str) -> bool:
     """Remove an entry from the memory store by ID."""
-    return memory_store.delete(entry_id)
+    return get_memory_store().delete(entry_id)
 
 
 def get_memory_store() -> MemoryStore:
     """
-    Get the global memory store instance.
+    Get the memory store of the current tenant.
     
     Returns:
-        The singleton MemoryStore instance
+        The singleton MemoryStore instance for the default tenant, otherwise
+        the tenant's own store (see backend.memory.tenants)
     """
-    return memory_store
+    tenant_id = current_tenant.get()
+    return memory_store if tenant_id == DEFAULT_TENANT else tenant_stores.get(tenant_id)
 
 
 # Example usage
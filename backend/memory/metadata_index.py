@@ -0,0 +1,124 @@
+"""
+Metadata Index Module for Oculus Dei Life Management System
+
+This module provides hash indexes over selected metadata keys so that
+equality lookups such as "all entries for project X" or "all entries related
+to entry Y" cost O(matches) instead of a scan over every entry's metadata.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+# Metadata keys written by memory_writer and used by the retriever
+DEFAULT_INDEXED_METADATA_KEYS = ("project_name", "related_to", "category", "source")
+
+
+def _is_hashable(value: Any) -> bool:
+    """Check whether a value can be used as a dictionary key."""
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+class MetadataIndex:
+    """
+    Hash index from (metadata key, value) to the IDs of entries carrying it.
+
+    Only declared keys are indexed. Values that cannot be hashed (lists,
+    dicts) are tracked separately per key and compared directly on lookup.
+    """
+
+    def __init__(self, keys: Iterable[str] = ()):
+        """
+        Initialize the index for the given metadata keys.
+
+        Args:
+            keys: Metadata keys to index
+        """
+        self._postings: Dict[str, Dict[Any, Dict[str, None]]] = {}
+        self._unhashable: Dict[str, Dict[str, Any]] = {}  # key -> {entry ID: value}
+        for key in keys:
+            self.declare(key)
+
+    @property
+    def keys(self) -> List[str]:
+        """The metadata keys currently indexed."""
+        return list(self._postings)
+
+    def is_indexed(self, key: str) -> bool:
+        """Check whether a metadata key is indexed."""
+        return key in self._postings
+
+    def declare(self, key: str) -> bool:
+        """
+        Start indexing a metadata key.
+
+        Returns:
+            True if the key was newly declared (the caller must backfill it)
+        """
+        if key in self._postings:
+            return False
+        self._postings[key] = {}
+        self._unhashable[key] = {}
+        return True
+
+    def add(self, entry_id: str, metadata: Dict[str, Any], keys: Optional[Iterable[str]] = None) -> None:
+        """
+        Index the declared keys present in an entry's metadata.
+
+        Args:
+            entry_id: ID of the memory entry
+            metadata: The entry's metadata
+            keys: Optional subset of declared keys to index
+        """
+        for key in (self._postings if keys is None else keys):
+            if key not in metadata or key not in self._postings:
+                continue
+            value = metadata[key]
+            if _is_hashable(value):
+                self._postings[key].setdefault(value, {})[entry_id] = None
+            else:
+                self._unhashable[key][entry_id] = value
+
+    def remove(self, entry_id: str, metadata: Dict[str, Any]) -> None:
+        """Remove an entry, given the metadata it was indexed with."""
+        for key, values in self._postings.items():
+            if key not in metadata:
+                continue
+            value = metadata[key]
+            if _is_hashable(value):
+                ids = values.get(value)
+                if ids is not None:
+                    ids.pop(entry_id, None)
+                    if not ids:
+                        del values[value]
+            else:
+                self._unhashable[key].pop(entry_id, None)
+
+    def clear(self) -> None:
+        """Remove all postings while keeping the declared keys."""
+        for key in self._postings:
+            self._postings[key] = {}
+            self._unhashable[key] = {}
+
+    def count(self, key: str, value: Any) -> int:
+        """Return the number of entries whose metadata[key] equals value (a declared key)."""
+        if _is_hashable(value):
+            return len(self._postings[key].get(value, ()))
+        return sum(1 for stored in self._unhashable[key].values() if stored == value)
+
+    def lookup(self, key: str, value: Any) -> List[str]:
+        """
+        Return the IDs of entries whose metadata[key] equals value.
+
+        Args:
+            key: A declared metadata key
+            value: Value to match
+
+        Returns:
+            Entry IDs in the order they were indexed
+        """
+        if _is_hashable(value):
+            return list(self._postings[key].get(value, ()))
+        return [entry_id for entry_id, stored in self._unhashable[key].items() if stored == value]
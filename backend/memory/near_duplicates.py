@@ -0,0 +1,245 @@
+"""
+Near Duplicates Module for Oculus Dei Life Management System
+
+This module detects entries whose content is nearly identical to an entry
+already stored, such as repeated reflection events or insights. Content is
+normalized (lowercase words separated by single spaces) and broken into
+5-byte shingles. Similarity is the Jaccard index of two shingle sets.
+
+Each text gets a MinHash signature, split into LSH bands. Two texts share
+a band key with a probability that rises steeply with their similarity.
+Looking up the bands of a new text therefore returns only likely
+duplicates, whatever the store size. Each candidate is then confirmed with
+its exact Jaccard similarity.
+"""
+
+from enum import Enum
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from backend.memory.text_index import tokenize
+
+SHINGLE_SIZE = 5
+NUM_BANDS = 8
+ROWS_PER_BAND = 4  # 8 bands of 4 rows: pairs at 0.8 similarity share a band ~98% of the time, at 0.5 ~40%
+DEFAULT_THRESHOLD = 0.8
+
+_rng = np.random.default_rng(0x0C0D)  # Fixed seed: band keys are persisted by the SQLite store
+_HASH_MULTIPLIERS = _rng.integers(1, 2 ** 63, NUM_BANDS * ROWS_PER_BAND, dtype=np.uint64) | np.uint64(1)
+_HASH_OFFSETS = _rng.integers(0, 2 ** 63, NUM_BANDS * ROWS_PER_BAND, dtype=np.uint64)
+_BAND_MULTIPLIERS = _rng.integers(1, 2 ** 63, (NUM_BANDS, ROWS_PER_BAND), dtype=np.uint64) | np.uint64(1)
+
+
+class DuplicatePolicy(str, Enum):
+    """What a store does with a write that nearly duplicates a stored entry of the same type"""
+    OFF = "off"  # Store it; no signatures are kept
+    DROP = "drop"  # Discard it and return the existing entry's ID
+    COUNT = "count"  # Discard it, bump the existing entry's duplicate_count and last_seen
+    MERGE = "merge"  # As COUNT, and merge its metadata into the existing entry (new values win)
+
+
+def shingle_hashes(text: str) -> np.ndarray:
+    """
+    Shingles of a normalized text, each packed into an integer (repeats included).
+
+    A shingle is SHINGLE_SIZE consecutive UTF-8 bytes, so packing them is exact.
+    """
+    data = np.frombuffer(" ".join(tokenize(text)).encode("utf-8"), dtype=np.uint8).astype(np.uint64)
+    if len(data) < SHINGLE_SIZE:
+        data = np.concatenate([data, np.zeros(SHINGLE_SIZE - len(data), dtype=np.uint64)])
+    count = len(data) - SHINGLE_SIZE + 1
+    packed = data[:count].copy()
+    for offset in range(1, SHINGLE_SIZE):
+        packed |= data[offset: offset + count] << np.uint64(8 * offset)
+    return packed
+
+
+def shingle_set(text: str) -> FrozenSet[int]:
+    """Shingles of a text as a set, for exact similarity checks."""
+    return frozenset(shingle_hashes(text).tolist())
+
+
+def similarity(a: FrozenSet[int], b: FrozenSet[int]) -> float:
+    """Jaccard similarity of two shingle sets."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def band_keys(text: str) -> List[int]:
+    """
+    LSH band keys of a text's MinHash signature.
+
+    Returns:
+        NUM_BANDS signed 64-bit integers (signed so SQLite can store them)
+    """
+    hashes = shingle_hashes(text)
+    with np.errstate(over="ignore"):
+        # Multiply-shift hashing: one permutation per signature row, minimum over the shingles
+        signature = ((hashes[:, None] * _HASH_MULTIPLIERS + _HASH_OFFSETS) >> np.uint64(32)).min(axis=0)
+        keys = (signature.reshape(NUM_BANDS, ROWS_PER_BAND) * _BAND_MULTIPLIERS).sum(axis=1)
+    return keys.view(np.int64).tolist()
+
+
+def most_similar(content: str, candidates: Iterable[Tuple[str, Optional[str]]],
+                 threshold: float = DEFAULT_THRESHOLD) -> Optional[Tuple[str, float]]:
+    """
+    Confirm LSH candidates by their exact similarity to some content.
+
+    Args:
+        content: The new content
+        candidates: (entry ID, content) pairs; None content is skipped
+        threshold: Minimum Jaccard similarity of a near duplicate
+
+    Returns:
+        (entry ID, similarity) of the most similar candidate at or above
+        the threshold, or None
+    """
+    shingles = None
+    best = None
+    for entry_id, other in candidates:
+        if other is None:
+            continue
+        if shingles is None:
+            shingles = shingle_set(content)  # Only computed once there is a candidate
+        score = similarity(shingles, shingle_set(other))
+        if score >= threshold and (best is None or score > best[1]):
+            best = (entry_id, score)
+    return best
+
+
+class NearDuplicateIndex:
+    """
+    LSH buckets of band keys, partitioned by entry type.
+
+    Most buckets hold a single entry, stored as a bare ID; a bucket becomes
+    a set once a second entry shares it.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        """
+        Initialize an empty index.
+
+        Args:
+            threshold: Jaccard similarity at or above which content counts as a near duplicate
+        """
+        self.threshold = threshold
+        self._buckets: Dict[str, Dict[int, Union[str, Set[str]]]] = {}
+
+    def add(self, entry_id: str, entry_type: str, keys: Iterable[int]) -> None:
+        buckets = self._buckets.setdefault(entry_type, {})
+        for key in keys:
+            members = buckets.get(key)
+            if members is None:
+                buckets[key] = entry_id
+            elif isinstance(members, set):
+                members.add(entry_id)
+            elif members != entry_id:
+                buckets[key] = {members, entry_id}
+
+    def remove(self, entry_id: str, entry_type: str, keys: Iterable[int]) -> None:
+        buckets = self._buckets.get(entry_type)
+        if buckets is None:
+            return
+        for key in keys:
+            members = buckets.get(key)
+            if members == entry_id:
+                del buckets[key]
+            elif isinstance(members, set):
+                members.discard(entry_id)
+                if len(members) == 1:
+                    buckets[key] = members.pop()
+        if not buckets:
+            del self._buckets[entry_type]
+
+    def clear(self, entry_type: Optional[str] = None) -> None:
+        if entry_type is None:
+            self._buckets = {}
+        else:
+            self._buckets.pop(entry_type, None)
+
+    def candidates(self, entry_type: str, keys: Iterable[int]) -> Set[str]:
+        """IDs of entries of the type sharing at least one band with the given keys."""
+        buckets = self._buckets.get(entry_type, {})
+        found: Set[str] = set()
+        for key in keys:
+            members = buckets.get(key)
+            if isinstance(members, set):
+                found |= members
+            elif members is not None:
+                found.add(members)
+        return found
+
+    def find(self, entry_type: str, keys: Iterable[int], content: str,
+             content_of: Callable[[str], Optional[str]]) -> Optional[Tuple[str, float]]:
+        """
+        The most similar indexed entry at or above the threshold.
+
+        Args:
+            entry_type: Type of the new entry
+            keys: Band keys of the new content
+            content: The new content
+            content_of: Returns the current content of a candidate entry
+
+        Returns:
+            (entry ID, similarity), or None when there is no near duplicate
+        """
+        candidates = self.candidates(entry_type, keys)
+        return most_similar(content, ((entry_id, content_of(entry_id)) for entry_id in candidates), self.threshold)
+
+    def __contains__(self, entry_type: str) -> bool:
+        return entry_type in self._buckets
+
+    def shared_buckets(self, entry_type: Optional[str] = None) -> List[Tuple[str, List[str]]]:
+        """(entry type, member IDs) of every bucket holding more than one entry."""
+        types = [entry_type] if entry_type is not None else list(self._buckets)
+        return [(name, sorted(members)) for name in types
+                for members in self._buckets.get(name, {}).values() if isinstance(members, set)]
+
+
+def cluster(shared_buckets: Iterable[Tuple[str, List[str]]], content_of: Callable[[str], Optional[str]],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Tuple[str, List[str]]]:
+    """
+    Group entries into clusters of near duplicates.
+
+    Only entries sharing a bucket are compared, each with the first member
+    of the bucket; clusters are joined transitively.
+
+    Args:
+        shared_buckets: Output of NearDuplicateIndex.shared_buckets
+        content_of: Returns the content of an entry (None if it is gone)
+        threshold: Minimum Jaccard similarity of a near duplicate
+
+    Returns:
+        (entry type, member IDs) for every cluster of two or more entries
+    """
+    shingles: Dict[str, Optional[FrozenSet[int]]] = {}
+
+    def shingles_of(entry_id: str) -> Optional[FrozenSet[int]]:
+        if entry_id not in shingles:
+            content = content_of(entry_id)
+            shingles[entry_id] = None if content is None else shingle_set(content)
+        return shingles[entry_id]
+
+    parent: Dict[Tuple[str, str], Tuple[str, str]] = {}  # Union-find forest over (type, ID)
+
+    def root(node: Tuple[str, str]) -> Tuple[str, str]:
+        while parent.get(node, node) != node:
+            node = parent[node]
+        return node
+
+    for entry_type, (first, *rest) in shared_buckets:
+        first_shingles = shingles_of(first)
+        if first_shingles is None:
+            continue
+        for other in rest:
+            a, b = root((entry_type, first)), root((entry_type, other))
+            other_shingles = shingles_of(other)
+            if a != b and other_shingles is not None and similarity(first_shingles, other_shingles) >= threshold:
+                parent[b] = a
+    members_of: Dict[Tuple[str, str], List[str]] = {}
+    for node in parent:
+        top = root(node)
+        members_of.setdefault(top, [top[1]]).append(node[1])
+    return [(top[0], members) for top, members in members_of.items()]
@@ -0,0 +1,410 @@
+"""
+Persistence Module for Oculus Dei Life Management System
+
+This module makes the in-process MemoryStore durable. Every mutation is
+appended to a write-ahead log (one JSON record per store/update/delete/clear),
+and compact snapshots of the live entries bound how much log has to be
+replayed on startup.
+
+On disk a persistence directory holds:
+
+    snapshot.jsonl           header line {"format", "seq", "count"} + one entry per line
+    wal-<first seq>.log      WAL segments, one JSON record per line
+
+Taking a snapshot rotates the WAL to a new segment first, so writes continue
+while the snapshot is written; segments fully covered by the snapshot are
+deleted afterwards.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = "snapshot.jsonl"
+SNAPSHOT_FORMAT = 1
+WAL_PREFIX = "wal-"
+WAL_SUFFIX = ".log"
+RESTORE_BATCH_SIZE = 10000  # Snapshot entries loaded per store_many call
+
+
+class DurabilityMode(str, Enum):
+    """When WAL appends are forced to stable storage"""
+    ALWAYS = "always"  # fsync after every record
+    BATCH = "batch"  # group commit: one fsync per batch_size records or batch_interval seconds
+    OS = "os"  # flush to the OS page cache only; survives process crashes, not power loss
+
+
+class WriteAheadLog:
+    """
+    Append-only log of JSON records split into segments.
+
+    Records are assigned increasing sequence numbers. In batch mode a
+    background flusher issues the fsync for everything appended during the
+    last interval, so concurrent writers share one fsync (group commit).
+    """
+
+    def __init__(self, directory: str, durability: DurabilityMode = DurabilityMode.BATCH,
+                 batch_size: int = 256, batch_interval: float = 0.05, next_seq: int = 1):
+        """
+        Open the log for appending, starting a new segment.
+
+        Args:
+            directory: Directory holding the WAL segments
+            durability: fsync policy
+            batch_size: Records per forced fsync in batch mode
+            batch_interval: Maximum seconds between fsyncs in batch mode
+            next_seq: Sequence number of the next record
+        """
+        self.directory = directory
+        self.durability = DurabilityMode(durability)
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.next_seq = next_seq
+        self._lock = threading.Lock()
+        self._pending = 0  # Records written but not yet fsynced
+        self._file: Optional[TextIO] = None  # Current segment, None once closed
+        self._closed = False
+        self._open_segment()
+
+        self._flusher: Optional[threading.Thread] = None
+        if self.durability == DurabilityMode.BATCH:
+            self._flusher = threading.Thread(target=self._flush_loop, name="memory-wal-flusher", daemon=True)
+            self._flusher.start()
+
+    @staticmethod
+    def segment_name(first_seq: int) -> str:
+        """File name of the segment whose first record has the given sequence."""
+        return f"{WAL_PREFIX}{first_seq:020d}{WAL_SUFFIX}"
+
+    @staticmethod
+    def list_segments(directory: str) -> List[Tuple[int, str]]:
+        """Return (first seq, path) for every WAL segment, oldest first."""
+        segments = []
+        for name in os.listdir(directory):
+            if name.startswith(WAL_PREFIX) and name.endswith(WAL_SUFFIX):
+                first_seq = int(name[len(WAL_PREFIX): -len(WAL_SUFFIX)])
+                segments.append((first_seq, os.path.join(directory, name)))
+        return sorted(segments)
+
+    @staticmethod
+    def read_segment(path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the records of a segment.
+
+        A torn final line (from a crash mid-append) is ignored.
+        """
+        with open(path, "r", encoding="utf-8") as handle:
+            for line in handle:
+                if not line.endswith("\n"):
+                    logger.warning("Ignoring torn record at the end of %s", path)
+                    break
+                yield json.loads(line)
+
+    @staticmethod
+    def truncate_torn_tail(path: str) -> bool:
+        """
+        Cut a segment back to its last complete record.
+
+        Restore calls this before reopening the log, because the next
+        segment may have the same name (no record got a sequence number
+        past the torn one) and appends would otherwise extend the torn line.
+
+        Returns:
+            True if a torn record was removed
+        """
+        with open(path, "rb+") as handle:
+            end = handle.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                start = max(0, position - 4096)
+                handle.seek(start)
+                newline = handle.read(position - start).rfind(b"\n")
+                if newline != -1:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position == end:
+                return False
+            handle.truncate(position)
+            handle.flush()
+            os.fsync(handle.fileno())
+        logger.warning("Truncated torn record at the end of %s", path)
+        return True
+
+    def _open_segment(self) -> None:
+        """Start a new segment beginning at the next sequence number."""
+        path = os.path.join(self.directory, self.segment_name(self.next_seq))
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _segment(self) -> TextIO:
+        """The open segment file. Caller holds the lock."""
+        if self._file is None:
+            raise ValueError("Write-ahead log is closed")
+        return self._file
+
+    def _sync_locked(self) -> None:
+        """Flush and fsync the current segment. Caller holds the lock."""
+        segment = self._segment()
+        segment.flush()
+        os.fsync(segment.fileno())
+        self._pending = 0
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """
+        Append one record to the log.
+
+        Returns:
+            The sequence number assigned to the record
+        """
+        return self.append_many([record])
+
+    def append_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Append several records with a single flush/fsync decision.
+
+        Returns:
+            The sequence number of the last record
+        """
+        with self._lock:
+            lines = []
+            for record in records:
+                record = dict(record, seq=self.next_seq)
+                self.next_seq += 1
+                lines.append(json.dumps(record, default=str))
+            if not lines:
+                return self.next_seq - 1
+            segment = self._segment()
+            segment.write("\n".join(lines) + "\n")
+            self._pending += len(lines)
+
+            if self.durability == DurabilityMode.ALWAYS:
+                self._sync_locked()
+            elif self.durability == DurabilityMode.BATCH and self._pending >= self.batch_size:
+                self._sync_locked()
+            else:
+                segment.flush()
+            return self.next_seq - 1
+
+    def rotate(self) -> int:
+        """
+        Close the current segment and start a new one.
+
+        Returns:
+            The sequence number of the last record in the closed segments
+        """
+        with self._lock:
+            self._sync_locked()
+            self._segment().close()
+            self._open_segment()
+            return self.next_seq - 1
+
+    def sync(self) -> None:
+        """Force all appended records to stable storage."""
+        with self._lock:
+            if not self._closed and self._pending:
+                self._sync_locked()
+
+    def _flush_loop(self) -> None:
+        """Background group-commit loop for batch mode."""
+        while not self._closed:
+            time.sleep(self.batch_interval)
+            try:
+                self.sync()
+            except (OSError, ValueError):  # pragma: no cover - file closed underneath us
+                return
+
+    def close(self) -> None:
+        """Sync and close the log."""
+        with self._lock:
+            if self._closed:
+                return
+            self._sync_locked()
+            self._segment().close()
+            self._file = None
+            self._closed = True
+
+
+class MemoryPersistence:
+    """
+    Snapshot plus WAL persistence for a MemoryStore.
+
+    The store calls ``append`` for every mutation while holding its own lock,
+    so log order always matches the order mutations were applied.
+    """
+
+    def __init__(self, directory: str, durability: DurabilityMode = DurabilityMode.BATCH,
+                 snapshot_every: int = 50000, batch_size: int = 256, batch_interval: float = 0.05):
+        """
+        Prepare a persistence directory.
+
+        Args:
+            directory: Directory for the snapshot and WAL segments (created if missing)
+            durability: fsync policy for the WAL
+            snapshot_every: Number of WAL records after which a snapshot is due
+            batch_size: Records per forced fsync in batch mode
+            batch_interval: Maximum seconds between fsyncs in batch mode
+        """
+        self.directory = directory
+        self.durability = DurabilityMode(durability)
+        self.snapshot_every = snapshot_every
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.snapshot_seq = 0
+        self.wal: Optional[WriteAheadLog] = None
+        self._records_since_snapshot = 0
+        self._snapshot_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.join(self.directory, SNAPSHOT_FILE)
+
+    def restore(self, store) -> int:
+        """
+        Rebuild a store from the snapshot and the WAL tail, then open the WAL.
+
+        The store must not have persistence attached yet, so replayed
+        operations are not logged again. All of the store's indexes are
+        rebuilt through its normal write path, the snapshot in batches of
+        RESTORE_BATCH_SIZE entries.
+
+        Args:
+            store: An empty MemoryStore
+
+        Returns:
+            Number of WAL records replayed
+        """
+        from backend.memory.memory_store import MemoryEntry
+
+        last_seq = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r", encoding="utf-8") as handle:
+                header = json.loads(handle.readline())
+                if header.get("format") != SNAPSHOT_FORMAT:
+                    raise ValueError(f"Unsupported snapshot format: {header.get('format')}")
+                last_seq = self.snapshot_seq = header["seq"]
+                batch = []
+                for line in handle:
+                    batch.append(MemoryEntry(**json.loads(line)))
+                    if len(batch) == RESTORE_BATCH_SIZE:
+                        store.store_many(batch, deduplicate=False)
+                        batch = []
+                store.store_many(batch, deduplicate=False)
+
+        replayed = 0
+        for _, path in WriteAheadLog.list_segments(self.directory):
+            WriteAheadLog.truncate_torn_tail(path)
+            for record in WriteAheadLog.read_segment(path):
+                if record["seq"] <= self.snapshot_seq:
+                    continue
+                self.apply(store, record)
+                last_seq = record["seq"]
+                replayed += 1
+
+        self._records_since_snapshot = replayed
+        self.wal = WriteAheadLog(
+            self.directory, self.durability, self.batch_size, self.batch_interval, next_seq=last_seq + 1
+        )
+        return replayed
+
+    @staticmethod
+    def apply(store, record: Dict[str, Any]) -> None:
+        """Apply one WAL record to a store. Replays are idempotent."""
+        from backend.memory.memory_store import MemoryEntry
+
+        op = record["op"]
+        if op == "store":
+            entry = MemoryEntry(**record["entry"])
+            store.delete(entry.id)  # A snapshot taken concurrently may already contain it
+            store.store(entry, deduplicate=False)
+        elif op == "update":
+            store.update_entry(record["id"], content=record.get("content"), metadata=record.get("metadata"))
+        elif op == "delete":
+            store.delete(record["id"])
+        elif op == "clear":
+            store.clear(record.get("entry_type"))
+        else:
+            raise ValueError(f"Unknown WAL operation: {op}")
+
+    def _log(self) -> WriteAheadLog:
+        """The write-ahead log opened by restore."""
+        if self.wal is None:
+            raise ValueError("Persistence has not been restored yet")
+        return self.wal
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """Log one mutation record and return its sequence number."""
+        self._records_since_snapshot += 1
+        return self._log().append(record)
+
+    def append_many(self, records: List[Dict[str, Any]]) -> int:
+        """Log several mutation records with one flush/fsync decision."""
+        self._records_since_snapshot += len(records)
+        return self._log().append_many(records)
+
+    @property
+    def records_since_snapshot(self) -> int:
+        """WAL records a restore would replay on top of the snapshot."""
+        return self._records_since_snapshot
+
+    @property
+    def snapshot_due(self) -> bool:
+        """Whether enough records were logged since the last snapshot."""
+        return self._records_since_snapshot >= self.snapshot_every and not self._snapshot_lock.locked()
+
+    def begin_snapshot(self) -> int:
+        """
+        Rotate the WAL so a snapshot can be cut at the current position.
+
+        Must be called while the store lock is held, together with capturing
+        the entries to write.
+
+        Returns:
+            The sequence number the snapshot will cover
+        """
+        self._records_since_snapshot = 0
+        return self._log().rotate()
+
+    def write_snapshot(self, entries: List[Dict[str, Any]], seq: int) -> None:
+        """
+        Atomically write a snapshot covering the WAL up to ``seq``, then drop
+        the segments it makes obsolete.
+
+        Args:
+            entries: Entry dictionaries (as produced by MemoryEntry.to_dict)
+            seq: Last WAL sequence number reflected in the entries
+        """
+        with self._snapshot_lock:
+            if seq <= self.snapshot_seq:
+                return  # A newer snapshot was written concurrently
+            tmp_path = self.snapshot_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                handle.write(json.dumps({"format": SNAPSHOT_FORMAT, "seq": seq, "count": len(entries)}) + "\n")
+                for entry in entries:
+                    handle.write(json.dumps(entry, default=str) + "\n")
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+            self.snapshot_seq = seq
+
+            segments = WriteAheadLog.list_segments(self.directory)
+            for (first_seq, path), following in zip(segments, segments[1:] + [(None, None)]):
+                next_first = following[0]
+                if next_first is not None and next_first - 1 <= seq:
+                    os.remove(path)
+
+    def sync(self) -> None:
+        """Force all logged records to stable storage."""
+        if self.wal is not None:
+            self.wal.sync()
+
+    def close(self) -> None:
+        """Sync and close the WAL."""
+        if self.wal is not None:
+            self.wal.close()
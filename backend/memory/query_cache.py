@@ -0,0 +1,195 @@
+"""
+Query Cache Module for Oculus Dei Life Management System
+
+This module caches the results of expensive read queries (keyword, regex,
+semantic and hybrid searches) that dashboards and the assistant repeat
+verbatim. Every result is stored under the store's generation, a counter
+the store bumps on each store, update, delete and clear (and, with
+background indexing, whenever indexing catches up). A lookup only hits an
+entry computed at the current generation, so a hit is always the exact
+answer and a write invalidates the whole cache in O(1) without touching
+it; stale entries simply age out of the LRU order or expire after the TTL.
+"""
+
+import copy
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from pydantic import BaseModel
+
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_CACHE_TTL = 300.0
+
+
+def cache_key(name: str, params: Dict[str, Any]) -> str:
+    """
+    Normalized key of a query: its name and parameters, with None values
+    dropped and keys sorted, so argument order and omitted defaults do not
+    split the cache.
+    """
+    present = {key: value for key, value in params.items() if value is not None}
+    return name + json.dumps(present, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class QueryCache:
+    """
+    Bounded LRU cache of query results keyed by (store generation, query).
+
+    Values are shared between callers, so they must not be mutated
+    (cached_query hands out deep copies). Two
+    concurrent misses for the same query both compute it; the last one to
+    finish is kept.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE, ttl_seconds: float = DEFAULT_CACHE_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_entries: Results kept before the least recently used is evicted
+            ttl_seconds: Age after which a result is no longer served
+            clock: Time source, in seconds
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries: "OrderedDict[Tuple[Hashable, str], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0  # Results dropped to stay within max_entries
+        self.expirations = 0  # Results dropped because they were older than the TTL
+
+    def get(self, generation: Hashable, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a result computed at a generation.
+
+        Returns:
+            (True, result) on a hit, (False, None) on a miss
+        """
+        with self._lock:
+            item = self._entries.get((generation, key))
+            if item is not None:
+                if self.clock() - item[0] <= self.ttl_seconds:
+                    self._entries.move_to_end((generation, key))
+                    self.hits += 1
+                    return True, item[1]
+                del self._entries[(generation, key)]
+                self.expirations += 1
+            self.misses += 1
+            return False, None
+
+    def put(self, generation: Hashable, key: str, value: Any) -> None:
+        """Store a result computed at a generation, evicting the least recently used beyond max_entries."""
+        with self._lock:
+            self._entries[(generation, key)] = (self.clock(), value)
+            self._entries.move_to_end((generation, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, generation: Hashable, name: str, params: Dict[str, Any],
+                       compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Return the cached result of a query, computing and caching it on a miss.
+
+        The generation must be read before the query runs: a result that
+        raced with a write is then filed under the older generation, which
+        no later lookup asks for.
+
+        Args:
+            generation: The store's generation when the query started
+            name: Query name (e.g. the endpoint)
+            params: Query parameters, normalized by the caller where needed
+            compute: Runs the query; exceptions propagate and nothing is cached
+
+        Returns:
+            (result, whether it came from the cache)
+        """
+        key = cache_key(name, params)
+        hit, value = self.get(generation, key)
+        if hit:
+            return value, True
+        value = compute()
+        self.put(generation, key, value)
+        return value, False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit, miss, eviction and expiration counts, and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def make_query_cache(max_entries: int, ttl_seconds: float) -> Optional[QueryCache]:
+    """A QueryCache, or None when max_entries is 0 (caching disabled)."""
+    return QueryCache(max_entries, ttl_seconds) if max_entries > 0 else None
+
+
+def _detach(result: Any) -> Any:
+    """
+    Deep-copy a result for a caller, lists and entries included, so callers
+    may reorder the lists or edit the entries without touching the cache.
+    """
+    if isinstance(result, list):
+        return [_detach(item) for item in result]
+    if isinstance(result, tuple):
+        return tuple(_detach(item) for item in result)
+    if isinstance(result, BaseModel):
+        return result.model_copy(deep=True)
+    if isinstance(result, (str, int, float, type(None))):
+        return result
+    return copy.deepcopy(result)
+
+
+def cached_query(name: str, default: bool = True) -> Callable[[Callable], Callable]:
+    """
+    Serve a store method from the store's query cache.
+
+    The store must have ``query_cache`` (a QueryCache or None) and
+    ``generation`` attributes. The wrapped method accepts an extra
+    keyword-only ``use_cache`` argument; False bypasses the cache for that
+    call, and callers that omit it get ``default`` (False for methods,
+    like listing pages, that only some callers should cache). Arguments
+    are bound to the method signature with defaults applied, so
+    positional and keyword spellings of a query share an entry. The
+    cache keeps the computed result and every caller, the first included,
+    gets its own deep copy.
+    """
+    def decorate(method: Callable) -> Callable:
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, use_cache: Optional[bool] = None, **kwargs):
+            cache = self.query_cache
+            if cache is None or not (default if use_cache is None else use_cache):
+                return method(self, *args, **kwargs)
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            params = dict(bound.arguments)
+            del params["self"]
+            value, _ = cache.get_or_compute(self.generation, name, params, lambda: method(self, *args, **kwargs))
+            return _detach(value)
+
+        return wrapper
+
+    return decorate
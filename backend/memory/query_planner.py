@@ -0,0 +1,270 @@
+"""
+Query Planner Module for Oculus Dei Life Management System
+
+This module describes composable memory queries (type, time range, metadata
+predicates, keyword, regex and vector clauses) and decides how to run them.
+Every clause that an index can answer becomes a candidate access path with
+an estimated row count; the cheapest one drives the query and the remaining
+clauses are checked on its rows, most selective first. Each step records its
+estimated and actual row counts so callers can ask for an explain plan.
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.memory.columnar import ColumnsView, time_key
+from backend.memory.text_index import tokenize
+from backend.memory.trigram_index import required_literals
+
+# A clause is identified by its kind and, for metadata clauses, the key
+Clause = Tuple[str, Optional[str]]
+
+# Clauses whose check reads and scans the entry's content
+EXPENSIVE_CLAUSES = ("keyword", "regex")
+
+_MISSING = object()
+
+
+class MemoryQuery:
+    """
+    A validated conjunction of query clauses.
+
+    Results are ordered by similarity when a vector clause is given, by
+    BM25 relevance when a keyword clause is given, and newest first
+    otherwise.
+    """
+
+    def __init__(self, entry_type: Optional[str] = None, start=None, end=None,
+                 metadata: Optional[Dict[str, Any]] = None, metadata_contains: Optional[Dict[str, str]] = None,
+                 keyword: Optional[str] = None, regex: Optional[str] = None, similar_to: Optional[str] = None,
+                 limit: int = 50, nprobe: Optional[int] = None):
+        """
+        Initialize and validate a query.
+
+        Args:
+            entry_type: Only entries of this type
+            start: Only entries at or after this time
+            end: Only entries at or before this time
+            metadata: Metadata values the entries must equal, by key
+            metadata_contains: Substrings metadata values must contain, by key (case-insensitive)
+            keyword: Words the content must all contain
+            regex: Regular expression the content must match (case-insensitive)
+            similar_to: Text to rank the matches by embedding similarity to
+            limit: Maximum number of entries to return
+            nprobe: ANN partitions to scan when the vector index drives the query
+
+        Raises:
+            ValueError: If the limit is not positive or the regex is invalid
+        """
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        if nprobe is not None and nprobe <= 0:
+            raise ValueError("nprobe must be positive")
+        self.entry_type = entry_type
+        self.start = start
+        self.end = end
+        self.low = None if start is None else time_key(start)
+        self.high = None if end is None else time_key(end)
+        self.metadata = dict(metadata or {})
+        self.metadata_contains = dict(metadata_contains or {})
+        self.keyword = keyword or None
+        self.terms = set(tokenize(keyword)) if keyword else set()
+        self.regex = None
+        self.literals: List[str] = []
+        if regex:
+            try:
+                self.regex = re.compile(regex, re.IGNORECASE)
+            except re.error as exc:
+                raise ValueError(f"Invalid regex: {exc}") from exc
+            self.literals = required_literals(regex, re.IGNORECASE)
+        self.similar_to = similar_to or None
+        self.limit = limit
+        self.nprobe = nprobe
+
+    @property
+    def order(self) -> str:
+        """How results are ranked: "similarity", "relevance" or "time"."""
+        if self.similar_to:
+            return "similarity"
+        if self.keyword:
+            return "relevance"
+        return "time"
+
+    @property
+    def has_time_range(self) -> bool:
+        return self.low is not None or self.high is not None
+
+    def clauses(self) -> List[Clause]:
+        """All filtering clauses of the query (the vector clause only ranks)."""
+        clauses: List[Clause] = []
+        if self.entry_type is not None:
+            clauses.append(("type", None))
+        if self.has_time_range:
+            clauses.append(("time", None))
+        clauses.extend(("metadata", key) for key in self.metadata)
+        clauses.extend(("contains", key) for key in self.metadata_contains)
+        if self.keyword:
+            clauses.append(("keyword", None))
+        if self.regex is not None:
+            clauses.append(("regex", None))
+        return clauses
+
+    def predicate(self, clause: Clause, view: ColumnsView) -> Callable[[int], bool]:
+        """Build a check of one clause against slots of a pinned snapshot."""
+        kind, key = clause
+        if kind == "type":
+            return lambda slot: view.type_of(slot) == self.entry_type
+        if kind == "time":
+            low, high, time_keys = self.low, self.high, view.time_keys
+            return lambda slot: (low is None or time_keys[slot] >= low) and (high is None or time_keys[slot] <= high)
+        if kind == "metadata":
+            value = self.metadata[key]
+            return lambda slot: view.metadata(slot).get(key, _MISSING) == value
+        if kind == "contains":
+            needle = self.metadata_contains[key].lower()
+
+            def contains(slot: int) -> bool:
+                value = view.metadata(slot).get(key)
+                return isinstance(value, str) and needle in value.lower()
+            return contains
+        if kind == "keyword":
+            terms = self.terms
+            return lambda slot: terms.issubset(tokenize(view.content(slot)))
+        if kind == "regex":
+            search = self.regex.search
+            return lambda slot: search(view.content(slot)) is not None
+        raise ValueError(f"Unknown clause: {kind}")
+
+
+def describe(query: MemoryQuery, clause: Clause) -> str:
+    """Human-readable form of a clause for explain output."""
+    kind, key = clause
+    if kind == "type":
+        return f"type = {query.entry_type!r}"
+    if kind == "time":
+        start = "-inf" if query.start is None else query.start.isoformat()
+        end = "+inf" if query.end is None else query.end.isoformat()
+        return f"time in [{start}, {end}]"
+    if kind == "metadata":
+        return f"metadata.{key} = {query.metadata[key]!r}"
+    if kind == "contains":
+        return f"metadata.{key} contains {query.metadata_contains[key]!r}"
+    if kind == "keyword":
+        return f"content has all of {sorted(query.terms)}"
+    return f"content matches /{query.regex.pattern}/"
+
+
+class AccessPath:
+    """An index that can produce the candidate rows for some of a query's clauses."""
+
+    def __init__(self, index: str, detail: str, estimate: int, covers: Optional[List[Clause]] = None,
+                 clause: Optional[Clause] = None, exact: bool = True):
+        """
+        Initialize an access path.
+
+        Args:
+            index: Name of the index ("time_index", "metadata_index", ...)
+            detail: What the path looks up, for explain output
+            estimate: Estimated (upper bound) number of rows it returns
+            covers: Clauses fully answered by the rows it returns; prefilter
+                paths (trigrams) cover none, since their rows still need checking
+            clause: The clause the path was built from
+            exact: False for approximate paths (vector top-k), whose rows may
+                miss matches
+        """
+        self.index = index
+        self.detail = detail
+        self.estimate = estimate
+        self.covers = covers or []
+        self.clause = clause
+        self.exact = exact
+
+
+class PlanStep:
+    """One step of an executed query plan with its row counts."""
+
+    def __init__(self, operation: str, detail: str, estimated_rows: Optional[int], index: Optional[str] = None):
+        self.operation = operation
+        self.detail = detail
+        self.index = index
+        self.estimated_rows = estimated_rows
+        self.actual_rows: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "operation": self.operation,
+            "index": self.index,
+            "detail": self.detail,
+            "estimated_rows": self.estimated_rows,
+            "actual_rows": self.actual_rows,
+        }
+
+
+class QueryPlan:
+    """The steps a query ran, in order."""
+
+    def __init__(self, order: str, total_rows: int):
+        self.order = order
+        self.total_rows = total_rows  # Entries in the store when the query was planned
+        self.steps: List[PlanStep] = []
+
+    def add(self, operation: str, detail: str, estimated_rows: Optional[int],
+            index: Optional[str] = None) -> PlanStep:
+        step = PlanStep(operation, detail, estimated_rows, index)
+        self.steps.append(step)
+        return step
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "order": self.order,
+            "total_rows": self.total_rows,
+            "steps": [step.to_dict() for step in self.steps],
+        }
+
+
+def choose_access_path(paths: List[AccessPath], query: MemoryQuery, exact_limit: int) -> AccessPath:
+    """
+    Pick the access path that drives a query.
+
+    The exact path with the fewest estimated rows wins. An approximate
+    path (vector top-k) is only preferred when the query is ranked by
+    similarity and even the best exact path would have to score more than
+    ``exact_limit`` rows.
+
+    Args:
+        paths: Candidate access paths; at least one must be exact
+        query: The query being planned
+        exact_limit: Largest candidate set that is scored exhaustively
+
+    Returns:
+        The chosen access path
+    """
+    exact = min((path for path in paths if path.exact), key=lambda path: path.estimate)
+    approximate = [path for path in paths if not path.exact]
+    if approximate and query.order == "similarity" and exact.estimate > exact_limit:
+        return approximate[0]
+    return exact
+
+
+def order_filters(query: MemoryQuery, clauses: List[Clause],
+                  estimates: Dict[Clause, int], total: int) -> List[Tuple[Clause, float]]:
+    """
+    Order residual clauses for checking: cheap before expensive, then most selective first.
+
+    Args:
+        query: The query being planned
+        clauses: Clauses not covered by the access path
+        estimates: Estimated matching rows per clause, where an index knows
+        total: Number of entries in the store
+
+    Returns:
+        (clause, estimated selectivity) pairs in checking order; clauses
+        without an estimate are assumed to keep half of the rows
+    """
+    ranked = []
+    for clause in clauses:
+        estimate = estimates.get(clause)
+        selectivity = 0.5 if estimate is None or not total else min(1.0, estimate / total)
+        ranked.append((clause[0] in EXPENSIVE_CLAUSES, selectivity, clause))
+    ranked.sort(key=lambda item: (item[0], item[1]))
+    return [(clause, selectivity) for _, selectivity, clause in ranked]
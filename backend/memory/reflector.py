@@ -16,7 +16,6 @@ from backend.memory.memory_retriever import (
     get_entries_in_timeframe,
     find_patterns_in_events,
     get_last_decisions,
-    count_entries_by_type,
     get_recent_errors,
 )
 
@@ -96,9 +95,7 @@ class MemoryReflector:
                 return True
         
         # Skip if there are very few entries to reflect on
-        entry_counts = count_entries_by_type()
-        total_entries = sum(entry_counts.values())
-        if total_entries < 5:  # Need a minimum number of entries for meaningful reflection
+        if self.memory_store.count_entries() < 5:  # Need a minimum number of entries for meaningful reflection
             return True
         
         return False
@@ -212,7 +212,7 @@ def _should_run_reflection() -> bool:
     
     # For now, just use a random factor to occasionally skip even when interval has passed
     memory_store = get_memory_store()
-    entry_count = len(memory_store.entries)
+    entry_count = memory_store.count_entries()
     
     # More entries = higher chance of reflection
     reflection_chance = min(0.8, 0.2 + (entry_count / 100))
@@ -0,0 +1,1312 @@
+"""
+SQLite Store Module for Oculus Dei Life Management System
+
+This module provides a disk-backed alternative to the in-memory MemoryStore,
+built on the standard library sqlite3 module. Entries live in a single table
+(WAL journal mode) with B-tree indexes for type and time ordering, an FTS5
+table for ranked keyword search, JSON1 expression indexes for declared
+metadata keys, and embeddings stored as float32 BLOBs.
+
+Only the embedding matrix used for semantic search is held in RAM (loaded on
+the first similarity query); MemoryEntry objects are built per query from
+the rows that match.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from backend.memory.change_feed import ChangeFeed
+from backend.memory.columnar import NAIVE_OFFSET, EntryBatch, from_time_key, time_key
+from backend.memory.entry_counters import CATEGORY_KEY, INTERVALS
+from backend.memory.graph_index import LINK_KEYS, Edge, breadth_first
+from backend.memory.hybrid import RRF_K, fuse_rankings
+from backend.memory.memory_store import MemoryEntry, embedding_source, hashed_embedding
+from backend.memory.metadata_index import DEFAULT_INDEXED_METADATA_KEYS
+from backend.memory.near_duplicates import (DEFAULT_THRESHOLD, DuplicatePolicy, NearDuplicateIndex, band_keys,
+                                            cluster, most_similar)
+from backend.memory.query_cache import (DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTL, QueryCache, cached_query,
+                                        make_query_cache)
+from backend.memory.query_planner import MemoryQuery, QueryPlan
+from backend.memory.text_index import tokenize
+from backend.memory.vector_index import EmbeddingMatrix, VectorIndex, train_outside_lock
+
+_COLUMNS = "id, ts, type, content, metadata"
+_TIME_ORDER = "ts_key, seq"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    ts TEXT NOT NULL,
+    ts_key INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    content TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    embedding BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_time ON entries (ts_key, seq);
+CREATE INDEX IF NOT EXISTS entries_type_time ON entries (type, ts_key, seq);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5 (
+    content, content='entries', content_rowid='seq',
+    tokenize="unicode61 remove_diacritics 0 tokenchars '_'"
+);
+CREATE TRIGGER IF NOT EXISTS entries_fts_insert AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts (rowid, content) VALUES (new.seq, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_fts_delete AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, content) VALUES ('delete', old.seq, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_fts_update AFTER UPDATE OF content ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, content) VALUES ('delete', old.seq, old.content);
+    INSERT INTO entries_fts (rowid, content) VALUES (new.seq, new.content);
+END;
+
+CREATE TABLE IF NOT EXISTS entry_bands (
+    type TEXT NOT NULL,
+    band INTEGER NOT NULL,
+    entry_id TEXT NOT NULL,
+    PRIMARY KEY (type, band, entry_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entry_bands_entry ON entry_bands (entry_id);
+CREATE TRIGGER IF NOT EXISTS entry_bands_delete AFTER DELETE ON entries BEGIN
+    DELETE FROM entry_bands WHERE entry_id = old.id;
+END;
+"""
+
+
+def _count_keys(row: str) -> str:
+    """
+    SELECT of the (kind, bucket, key) counters a row of entries is counted
+    under; ``row`` is "new" or "old" inside a trigger, or "entries".
+    """
+    category = f"json_extract({row}.metadata, '$.{CATEGORY_KEY}')"
+    selects = [f"SELECT 'type' AS kind, 0 AS bucket, {row}.type AS key"]
+    for name, width in INTERVALS.items():
+        # Floor to the bucket start; % truncates towards zero for pre-1970 keys
+        selects.append(f"SELECT '{name}', {row}.ts_key - (({row}.ts_key % {width}) + {width}) % {width}, {row}.type")
+    selects.append(f"SELECT 'category', 0, {category}")
+    if row == "entries":
+        selects = [select + " FROM entries" for select in selects]
+    return " UNION ALL ".join(selects)
+
+
+def _count_delta(keys: str, delta: int) -> str:
+    """Statements adding delta to the counters selected by keys (dropping counts that reach zero)."""
+    if delta > 0:
+        return (f"INSERT INTO entry_counts (kind, bucket, key, n) SELECT kind, bucket, key, {delta} "
+                f"FROM ({keys}) WHERE key IS NOT NULL ON CONFLICT (kind, bucket, key) DO UPDATE SET n = n + {delta};")
+    return (f"UPDATE entry_counts SET n = n - {-delta} WHERE (kind, bucket, key) IN ({keys}); "
+            f"DELETE FROM entry_counts WHERE n <= 0 AND (kind, bucket, key) IN ({keys});")
+
+
+_OLD_CATEGORY = f"SELECT 'category' AS kind, 0 AS bucket, json_extract(old.metadata, '$.{CATEGORY_KEY}') AS key"
+_NEW_CATEGORY = f"SELECT 'category' AS kind, 0 AS bucket, json_extract(new.metadata, '$.{CATEGORY_KEY}') AS key"
+
+# Counts by type, category and time bucket, kept current by triggers
+_COUNTS_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS entry_counts (
+    kind TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (kind, bucket, key)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS entry_counts_insert AFTER INSERT ON entries BEGIN
+    {_count_delta(_count_keys("new"), 1)}
+END;
+CREATE TRIGGER IF NOT EXISTS entry_counts_delete AFTER DELETE ON entries BEGIN
+    {_count_delta(_count_keys("old"), -1)}
+END;
+CREATE TRIGGER IF NOT EXISTS entry_counts_recategorize AFTER UPDATE OF metadata ON entries
+WHEN json_extract(old.metadata, '$.{CATEGORY_KEY}') IS NOT json_extract(new.metadata, '$.{CATEGORY_KEY}') BEGIN
+    {_count_delta(_OLD_CATEGORY, -1)}
+    {_count_delta(_NEW_CATEGORY, 1)}
+END;
+"""
+
+
+def _metadata_path(key: str) -> str:
+    """SQL string literal of the JSON path for a metadata key."""
+    if '"' in key:
+        raise ValueError(f"Unsupported metadata key: {key!r}")
+    return "'" + ('$."' + key + '"').replace("'", "''") + "'"
+
+
+def _link_rows(row: str) -> str:
+    """
+    SELECT of the (source, target) links in the link keys of a row of
+    entries; ``row`` is "new" inside a trigger, or "entries".
+    """
+    tables = "" if row == "new" else "entries, "
+    return " UNION ".join(
+        f"SELECT {row}.id, json_each.value FROM {tables}json_each({row}.metadata, {_metadata_path(key)}) "
+        f"WHERE json_each.type = 'text' AND json_each.value != {row}.id"
+        for key in LINK_KEYS
+    )
+
+
+# related_to links between entries, kept current by triggers; indexed both ways
+_LINKS_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS entry_links (
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    PRIMARY KEY (source, target)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entry_links_target ON entry_links (target, source);
+CREATE TRIGGER IF NOT EXISTS entry_links_insert AFTER INSERT ON entries BEGIN
+    INSERT OR IGNORE INTO entry_links (source, target) {_link_rows("new")};
+END;
+CREATE TRIGGER IF NOT EXISTS entry_links_delete AFTER DELETE ON entries BEGIN
+    DELETE FROM entry_links WHERE source = old.id;
+END;
+CREATE TRIGGER IF NOT EXISTS entry_links_update AFTER UPDATE OF metadata ON entries BEGIN
+    DELETE FROM entry_links WHERE source = old.id;
+    INSERT OR IGNORE INTO entry_links (source, target) {_link_rows("new")};
+END;
+"""
+
+
+def _metadata_expr(key: str) -> str:
+    """SQL expression extracting a metadata key; identical text lets SQLite use the expression index."""
+    return f"json_extract(metadata, {_metadata_path(key)})"
+
+
+def _metadata_condition(key: str, value: Any) -> Tuple[str, List[Any]]:
+    """SQL condition (and parameters) for metadata[key] == value."""
+    if value is None:
+        return f"json_type(metadata, {_metadata_path(key)}) = 'null'", []
+    if isinstance(value, (list, dict)):
+        return f"{_metadata_expr(key)} = json(?)", [json.dumps(value)]
+    return f"{_metadata_expr(key)} = ?", [value]
+
+
+@lru_cache(maxsize=64)
+def _compile(pattern: str) -> "re.Pattern":
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def _regexp(pattern: str, value: Optional[str]) -> bool:
+    """Implementation of the SQL REGEXP operator (case-insensitive)."""
+    return value is not None and _compile(pattern).search(value) is not None
+
+
+def _lower(value: Optional[str]) -> Optional[str]:
+    """Unicode-aware lower(); SQLite's built-in only folds ASCII."""
+    return value.lower() if isinstance(value, str) else None
+
+
+class SQLiteMemoryStore:
+    """
+    Memory store persisted in an SQLite database.
+
+    Offers the same methods as MemoryStore so it can be used wherever the
+    in-memory store is. All access goes through one connection guarded by a
+    lock, which makes the store safe to share between API worker threads.
+    """
+
+    def __init__(self, path: str, ann_index: Optional[VectorIndex] = None,
+                 indexed_metadata_keys: Iterable[str] = DEFAULT_INDEXED_METADATA_KEYS,
+                 synchronous: str = "NORMAL", duplicate_policy: DuplicatePolicy = DuplicatePolicy.OFF,
+                 duplicate_threshold: float = DEFAULT_THRESHOLD,
+                 query_cache_size: int = DEFAULT_CACHE_SIZE, query_cache_ttl: float = DEFAULT_CACHE_TTL):
+        """
+        Open (or create) a database.
+
+        Args:
+            path: Database file path (":memory:" for a throwaway store)
+            ann_index: Optional approximate nearest-neighbour index consulted
+                by search_by_similarity once trained (on a background thread)
+            indexed_metadata_keys: Metadata keys with JSON1 expression indexes
+                (more can be added with declare_metadata_index)
+            synchronous: SQLite synchronous pragma; NORMAL survives process
+                crashes, FULL also survives power loss
+            duplicate_policy: What store() does with near duplicates of a
+                stored entry of the same type ("off", "drop", "count" or "merge")
+            duplicate_threshold: Content similarity (Jaccard index of
+                shingles) at or above which an entry is a near duplicate
+            query_cache_size: Query results kept in the result cache (0 disables it)
+            query_cache_ttl: Seconds a cached query result may be served
+        """
+        self.path = path
+        self.embedding_dim: int = 128
+        self.ann_index = ann_index
+        self.embeddings: Optional[EmbeddingMatrix] = None  # Loaded on the first similarity search
+        self._lock = threading.RLock()
+        self._ann_training_thread: Optional[threading.Thread] = None
+        self.changes = ChangeFeed()  # Mutations committed through this handle, for GET /memory/stream
+        self.query_cache: Optional[QueryCache] = make_query_cache(query_cache_size, query_cache_ttl)
+        self.duplicate_policy = DuplicatePolicy(duplicate_policy)
+        self.duplicate_threshold = duplicate_threshold
+        self.duplicates_absorbed = 0  # Writes dropped, counted or merged as near duplicates
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={synchronous}")
+        self._conn.create_function("regexp", 2, _regexp, deterministic=True)
+        self._conn.create_function("py_lower", 1, _lower, deterministic=True)
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+            counted = self._conn.execute("SELECT name FROM sqlite_master WHERE name = 'entry_counts'").fetchone()
+            self._conn.executescript(_COUNTS_SCHEMA)
+            if not counted:  # Database created before the counters: count its existing rows once
+                self._conn.execute(
+                    f"INSERT INTO entry_counts (kind, bucket, key, n) SELECT kind, bucket, key, COUNT(*) "
+                    f"FROM ({_count_keys('entries')}) WHERE key IS NOT NULL GROUP BY kind, bucket, key"
+                )
+            linked = self._conn.execute("SELECT name FROM sqlite_master WHERE name = 'entry_links'").fetchone()
+            self._conn.executescript(_LINKS_SCHEMA)
+            if not linked:  # Database created before the link table: index its existing links once
+                self._conn.execute(f"INSERT OR IGNORE INTO entry_links (source, target) {_link_rows('entries')}")
+            if self.duplicate_policy is not DuplicatePolicy.OFF:  # Band rows missing while the policy was off
+                unbanded = self._conn.execute(
+                    "SELECT id, type, content FROM entries WHERE id NOT IN (SELECT entry_id FROM entry_bands)"
+                ).fetchall()
+                self._conn.executemany("INSERT OR IGNORE INTO entry_bands (type, band, entry_id) VALUES (?, ?, ?)",
+                                       [(entry_type, key, entry_id) for entry_id, entry_type, content in unbanded
+                                        for key in band_keys(content)])
+        for key in indexed_metadata_keys:
+            self.declare_metadata_index(key)
+
+    def close(self) -> None:
+        """Wait for a running ANN training, then close the database connection."""
+        self.wait_for_ann_training()
+        with self._lock:
+            self._conn.close()
+
+    def _compute_embedding(self, text: str) -> np.ndarray:
+        """Generate a hashed bag-of-words/bigram embedding for the given text."""
+        return hashed_embedding(text, self.embedding_dim)
+
+    @staticmethod
+    def _row_to_entry(row: Tuple) -> MemoryEntry:
+        entry_id, ts, entry_type, content, metadata = row
+        return MemoryEntry(
+            id=entry_id,
+            timestamp=datetime.fromisoformat(ts),
+            type=entry_type,
+            content=content,
+            metadata=json.loads(metadata),
+        )
+
+    def _query(self, sql: str, params: Iterable[Any] = ()) -> List[MemoryEntry]:
+        """Run a SELECT of _COLUMNS and build entries from the rows."""
+        with self._lock:
+            rows = self._conn.execute(sql, tuple(params)).fetchall()
+        return [self._row_to_entry(row) for row in rows]
+
+    def _cache_embedding(self, entry_id: str, vector: np.ndarray) -> None:
+        """Keep the in-RAM vector indexes current once they are loaded. Caller holds the lock."""
+        if self.embeddings is not None:
+            self.embeddings.upsert(entry_id, vector)
+            if self.ann_index is not None:
+                self.ann_index.upsert(entry_id, vector)
+                self._maybe_schedule_ann_training()
+
+    def _uncache_embeddings(self, entry_ids: Iterable[str]) -> None:
+        """Drop entries from the in-RAM vector indexes. Caller holds the lock."""
+        if self.embeddings is not None:
+            for entry_id in entry_ids:
+                self.embeddings.remove(entry_id)
+                if self.ann_index is not None:
+                    self.ann_index.remove(entry_id)
+
+    def _load_embeddings(self) -> EmbeddingMatrix:
+        """Read every embedding BLOB into the matrix (and ANN index). Caller holds the lock."""
+        if self.embeddings is None:
+            rows = self._conn.execute("SELECT id, embedding FROM entries").fetchall()
+            matrix = EmbeddingMatrix(self.embedding_dim, initial_capacity=max(1024, len(rows)))
+            if rows:
+                ids = [row[0] for row in rows]
+                vectors = np.frombuffer(b"".join(row[1] for row in rows), dtype=np.float32)
+                vectors = vectors.reshape(len(rows), self.embedding_dim)
+                matrix.extend(ids, vectors)
+                if self.ann_index is not None:
+                    self.ann_index.clear()
+                    self.ann_index.extend(ids, vectors)
+                    self._maybe_schedule_ann_training()
+            self.embeddings = matrix
+        return self.embeddings
+
+    def _maybe_schedule_ann_training(self) -> None:
+        """Start a background training once the ANN index reports it is due. Caller holds the lock."""
+        if not getattr(self.ann_index, "training_due", False):
+            return
+        if self._ann_training_thread is not None and self._ann_training_thread.is_alive():
+            return
+        self._ann_training_thread = threading.Thread(target=self.train_ann_index, name="sqlite-store-ann-training",
+                                                     daemon=True)
+        self._ann_training_thread.start()
+
+    def train_ann_index(self) -> bool:
+        """
+        Train the ANN index on a snapshot outside the lock and swap it in
+        (see MemoryStore.train_ann_index).
+
+        Returns:
+            True if a trained index was swapped in
+        """
+        if not hasattr(self.ann_index, "begin_training"):
+            return False
+        return train_outside_lock(self.ann_index, self._lock)
+
+    def wait_for_ann_training(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until a background ANN training (if any) has finished.
+
+        Returns:
+            True if no training is running, False on timeout
+        """
+        thread = self._ann_training_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    @property
+    def entries(self) -> List[MemoryEntry]:
+        """All entries in insertion order (a copy; prefer the indexed accessors)."""
+        return self._query(f"SELECT {_COLUMNS} FROM entries ORDER BY seq")
+
+    def store(self, entry: MemoryEntry, deduplicate: bool = True) -> str:
+        """
+        Store a new memory entry in the database.
+
+        Unless the duplicate policy is off, an entry whose content nearly
+        duplicates a stored entry of the same type is dropped, counted or
+        merged into that entry instead, and its ID is returned.
+
+        Args:
+            entry: MemoryEntry object to store
+            deduplicate: Apply the duplicate policy (replays pass False)
+
+        Returns:
+            ID of the stored entry, or of the entry it duplicates
+        """
+        if not entry.content:
+            raise ValueError("Memory entry content cannot be empty")
+
+        keys = self._band_keys(entry)
+        vector = self._compute_embedding(embedding_source(entry))
+        with self._lock:
+            existing = self._find_duplicate(entry, keys, deduplicate)
+            if existing is not None:
+                return self._absorb_duplicate(existing, entry)
+            try:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT INTO entries (id, ts, ts_key, type, content, metadata, embedding) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (entry.id, entry.timestamp.isoformat(), time_key(entry.timestamp), entry.type,
+                         entry.content, json.dumps(entry.metadata, default=str), vector.tobytes()),
+                    )
+                    if keys is not None:
+                        self._insert_bands(entry.id, entry.type, keys)
+            except sqlite3.IntegrityError as exc:
+                raise ValueError(f"Memory entry {entry.id} already exists") from exc
+            self._cache_embedding(entry.id, vector)
+            self.changes.publish([{"op": "store", "entry": entry.to_dict()}])
+        return entry.id
+
+    def store_many(self, entries: Iterable[MemoryEntry], deduplicate: bool = True,
+                   vectors: Optional[np.ndarray] = None) -> List[str]:
+        """
+        Store a batch of new entries in one transaction.
+
+        Either every entry is stored or none is. Near duplicates (of stored
+        entries or of earlier entries in the batch) are handled as in store().
+
+        Args:
+            entries: MemoryEntry objects to store
+            deduplicate: Apply the duplicate policy (replays pass False)
+            vectors: Embeddings already computed for the entries, e.g. by an export
+
+        Returns:
+            IDs of the stored entries (or of the entries they duplicate), in input order
+        """
+        entries = list(entries)
+        if not entries:
+            return []
+        for entry in entries:
+            if not entry.content:
+                raise ValueError("Memory entry content cannot be empty")
+        if vectors is None:
+            vectors = np.stack([self._compute_embedding(embedding_source(entry)) for entry in entries])
+        elif vectors.shape != (len(entries), self.embedding_dim):
+            raise ValueError(f"Expected embeddings of shape ({len(entries)}, {self.embedding_dim})")
+        vectors = np.asarray(vectors, dtype=np.float32)
+        batch_keys = [self._band_keys(entry) for entry in entries]
+        entry_ids = [entry.id for entry in entries]
+        with self._lock:
+            duplicates = []
+            if batch_keys[0] is not None and deduplicate:
+                batch = NearDuplicateIndex(self.duplicate_threshold)  # Kept entries of this batch
+                contents: Dict[str, str] = {}
+                stored = []
+                for position, (entry, keys) in enumerate(zip(entries, batch_keys)):
+                    existing = self._find_duplicate(entry, keys, deduplicate, batch, contents)
+                    if existing is None:
+                        batch.add(entry.id, entry.type, keys)
+                        contents[entry.id] = entry.content
+                        stored.append(position)
+                    else:
+                        entry_ids[position] = existing
+                        duplicates.append((existing, entry))
+                if len(stored) < len(entries):
+                    entries = [entries[position] for position in stored]
+                    vectors = vectors[stored]
+                    batch_keys = [batch_keys[position] for position in stored]
+            if entries:  # Unless every entry was a near duplicate
+                rows = [
+                    (entry.id, entry.timestamp.isoformat(), time_key(entry.timestamp), entry.type,
+                     entry.content, json.dumps(entry.metadata, default=str), vector.tobytes())
+                    for entry, vector in zip(entries, vectors)
+                ]
+                stored_ids = [entry.id for entry in entries]
+                try:
+                    with self._conn:
+                        self._conn.executemany(
+                            "INSERT INTO entries (id, ts, ts_key, type, content, metadata, embedding) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            rows,
+                        )
+                        for entry, keys in zip(entries, batch_keys):
+                            if keys is not None:
+                                self._insert_bands(entry.id, entry.type, keys)
+                except sqlite3.IntegrityError as exc:
+                    raise ValueError("Memory entry IDs must be new and unique within a batch") from exc
+                if self.embeddings is not None:
+                    self.embeddings.extend(stored_ids, vectors)
+                    if self.ann_index is not None:
+                        self.ann_index.extend(stored_ids, vectors)
+                        self._maybe_schedule_ann_training()
+                self.changes.publish([{"op": "store", "entry": entry.to_dict()} for entry in entries])
+            # Once the batch is committed: a duplicate may be of an entry earlier in the batch
+            for existing, entry in duplicates:
+                self._absorb_duplicate(existing, entry)
+        return entry_ids
+
+    def _band_keys(self, entry: MemoryEntry) -> Optional[List[int]]:
+        """Near-duplicate band keys of an entry's content, when they are kept; needs no lock."""
+        return None if self.duplicate_policy is DuplicatePolicy.OFF else band_keys(entry.content)
+
+    def _insert_bands(self, entry_id: str, entry_type: str, keys: List[int]) -> None:
+        """Record an entry's band keys. Caller holds the lock inside a transaction."""
+        self._conn.executemany("INSERT OR IGNORE INTO entry_bands (type, band, entry_id) VALUES (?, ?, ?)",
+                               [(entry_type, key, entry_id) for key in keys])
+
+    def _find_duplicate(self, entry: MemoryEntry, keys: Optional[List[int]], deduplicate: bool,
+                        batch: Optional[NearDuplicateIndex] = None,
+                        contents: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """
+        ID of the stored entry a new one nearly duplicates, if any. Caller holds the lock.
+
+        Args:
+            entry: The new entry
+            keys: Its band keys (None when the policy is off)
+            deduplicate: False skips the check
+            batch: Index of entries kept earlier in the same batch, not yet written
+            contents: Content of the entries in batch
+        """
+        if keys is None or not deduplicate:
+            return None
+        placeholders = ", ".join("?" * len(keys))
+        candidates = self._conn.execute(
+            f"SELECT DISTINCT e.id, e.content FROM entry_bands b JOIN entries e ON e.id = b.entry_id "
+            f"WHERE b.type = ? AND b.band IN ({placeholders})",
+            (entry.type, *keys),
+        ).fetchall()
+        if batch is not None:
+            candidates += [(entry_id, contents[entry_id]) for entry_id in batch.candidates(entry.type, keys)]
+        match = most_similar(entry.content, candidates, self.duplicate_threshold)
+        return None if match is None else match[0]
+
+    def _absorb_duplicate(self, existing_id: str, entry: MemoryEntry) -> str:
+        """
+        Apply the duplicate policy to a new entry instead of storing it. Caller holds the lock.
+
+        Returns:
+            ID of the stored entry it was absorbed into
+        """
+        self.duplicates_absorbed += 1
+        if self.duplicate_policy is not DuplicatePolicy.DROP:
+            row = self._conn.execute("SELECT metadata FROM entries WHERE id = ?", (existing_id,)).fetchone()
+            stored = json.loads(row[0])
+            patch = dict(entry.metadata) if self.duplicate_policy is DuplicatePolicy.MERGE else {}
+            patch.update(duplicate_count=stored.get("duplicate_count", 0) + 1,
+                         last_seen=entry.timestamp.isoformat())
+            self.update_entry(existing_id, metadata=patch)  # Re-entrant: the count cannot race
+        return existing_id
+
+    def index_status(self) -> Dict[str, Any]:
+        """Report indexing freshness; SQLite indexes every write in its transaction."""
+        with self._lock:
+            last_seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM entries").fetchone()[0]
+        return {"committed": last_seq, "indexed": last_seq, "pending": 0, "async_indexing": False}
+
+    @property
+    def generation(self) -> int:
+        """
+        Version of the searchable state: the change feed sequence, bumped by
+        every mutation committed through this handle. Writes by other
+        connections to the same file are not seen, so share a database
+        between processes only with the query cache disabled.
+        """
+        return self.changes.last_seq
+
+    def query_cache_stats(self) -> Dict[str, Any]:
+        """Hit, miss and eviction counts of the query result cache."""
+        if self.query_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.query_cache.stats()}
+
+    def wait_for_index(self, write_seq: Optional[int] = None, timeout: Optional[float] = None) -> bool:
+        """Writes are searchable as soon as they commit, so there is nothing to wait for."""
+        return True
+
+    def retrieve_by_type(self, entry_type: str) -> List[MemoryEntry]:
+        """Retrieve all entries of a type, oldest first."""
+        return self._query(
+            f"SELECT {_COLUMNS} FROM entries WHERE type = ? ORDER BY {_TIME_ORDER}", (entry_type,)
+        )
+
+    def get_all(self) -> List[MemoryEntry]:
+        """Return all entries sorted chronologically (newest first)."""
+        return self._query(f"SELECT {_COLUMNS} FROM entries ORDER BY ts_key DESC, seq DESC")
+
+    def get_range(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                  entry_type: Optional[str] = None, limit: Optional[int] = None) -> List[MemoryEntry]:
+        """
+        Retrieve entries with start <= timestamp <= end using the time indexes.
+
+        Args:
+            start: Inclusive lower bound (default: unbounded)
+            end: Inclusive upper bound (default: unbounded)
+            entry_type: Optional type to filter by
+            limit: Optional maximum number of entries to return
+
+        Returns:
+            List of MemoryEntry objects in the timeframe, oldest first
+        """
+        clauses, params = [], []
+        if entry_type:
+            clauses.append("type = ?")
+            params.append(entry_type)
+        if start is not None:
+            clauses.append("ts_key >= ?")
+            params.append(time_key(start))
+        if end is not None:
+            clauses.append("ts_key <= ?")
+            params.append(time_key(end))
+        sql = f"SELECT {_COLUMNS} FROM entries"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {_TIME_ORDER}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._query(sql, params)
+
+    @cached_query("text")
+    def search_by_text(self, keyword: str, entry_type: Optional[str] = None,
+                       limit: Optional[int] = None) -> List[MemoryEntry]:
+        """
+        Search for entries whose content contains every word of the keyword,
+        ranked by the FTS5 BM25 score.
+
+        Args:
+            keyword: Word or words to search for in memory entry content
+            entry_type: Optional type to restrict the search to
+            limit: Optional maximum number of entries to return
+
+        Returns:
+            List of MemoryEntry objects matching the search criteria, most relevant first
+        """
+        tokens = tokenize(keyword)
+        if not tokens:
+            return []
+        match = " ".join('"' + token.replace('"', '""') + '"' for token in tokens)
+        sql = (
+            "SELECT e.id, e.ts, e.type, e.content, e.metadata FROM entries_fts "
+            "JOIN entries e ON e.seq = entries_fts.rowid WHERE entries_fts MATCH ?"
+        )
+        params: List[Any] = [match]
+        if entry_type:
+            sql += " AND e.type = ?"
+            params.append(entry_type)
+        sql += " ORDER BY bm25(entries_fts), e.seq"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._query(sql, params)
+
+    @cached_query("text_page")
+    def page_by_relevance(self, keyword: str, entry_type: Optional[str] = None, limit: int = 50,
+                          after: Optional[Tuple[float, int]] = None
+                          ) -> Tuple[List[MemoryEntry], Optional[Tuple[float, int]]]:
+        """
+        Read one page of the keyword matches in BM25 order (keyset
+        pagination on the (score, seq) rank). See MemoryStore.page_by_relevance
+        for the arguments.
+        """
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        tokens = tokenize(keyword)
+        if not tokens:
+            return [], None
+        match = " ".join('"' + token.replace('"', '""') + '"' for token in tokens)
+        sql = (
+            "SELECT e.id, e.ts, e.type, e.content, e.metadata, bm25(entries_fts) AS rank, e.seq FROM entries_fts "
+            "JOIN entries e ON e.seq = entries_fts.rowid WHERE entries_fts MATCH ?"
+        )
+        params: List[Any] = [match]
+        if entry_type:
+            sql += " AND e.type = ?"
+            params.append(entry_type)
+        sql = f"SELECT * FROM ({sql})"
+        if after is not None:
+            # FTS5's bm25() is lower for better matches, so the score is its negation
+            sql += " WHERE (rank, seq) > (?, ?)"
+            params.extend((-after[0], after[1]))
+        sql += " ORDER BY rank, seq LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(sql, [*params, limit + 1]).fetchall()
+        entries = [self._row_to_entry(row[:5]) for row in rows[:limit]]
+        if len(rows) <= limit:
+            return entries, None
+        last = rows[limit - 1]
+        return entries, (-last[5], last[6])
+
+    @cached_query("similarity")
+    def search_by_similarity(self, text: str, top_n: int = 5, nprobe: Optional[int] = None) -> List[MemoryEntry]:
+        """
+        Return entries most similar to the provided text.
+
+        Args:
+            text: Query text
+            top_n: Maximum number of entries to return
+            nprobe: Number of ANN partitions to scan (ignored for exact search)
+
+        Returns:
+            List of MemoryEntry objects, most similar first
+        """
+        if not text:
+            return []
+        if top_n <= 0:
+            raise ValueError("top_n must be positive")
+        if nprobe is not None and nprobe <= 0:
+            raise ValueError("nprobe must be positive")
+
+        query_vec = self._compute_embedding(text)
+        with self._lock:
+            matrix = self._load_embeddings()
+            if self.ann_index is not None and getattr(self.ann_index, "is_trained", True):
+                scored = self.ann_index.search(query_vec, top_n, nprobe=nprobe)
+            else:
+                scored = matrix.search(query_vec, top_n)
+            return self._resolve_ids([entry_id for entry_id, score in scored if score > 0])
+
+    @cached_query("hybrid")
+    def search_hybrid(self, query: str, top_n: int = 10, entry_type: Optional[str] = None,
+                      start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      fusion: str = "rrf", semantic_weight: float = 0.5, depth: int = 100,
+                      rrf_k: int = RRF_K, nprobe: Optional[int] = None
+                      ) -> List[Tuple[MemoryEntry, float, Optional[float], Optional[float]]]:
+        """
+        Rank entries by keyword relevance and semantic similarity at once.
+
+        The keyword ranking is an FTS5 query matching any word, filtered by
+        type and time in SQL; the semantic ranking is over-fetched from the
+        in-RAM vector index and filtered against the same conditions. See
+        MemoryStore.search_hybrid for the arguments.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        if top_n <= 0:
+            raise ValueError("top_n must be positive")
+        depth = max(depth, top_n)
+        filters, params = [], []
+        if entry_type:
+            filters.append("e.type = ?")
+            params.append(entry_type)
+        if start is not None:
+            filters.append("e.ts_key >= ?")
+            params.append(time_key(start))
+        if end is not None:
+            filters.append("e.ts_key <= ?")
+            params.append(time_key(end))
+        where = "".join(" AND " + condition for condition in filters)
+        match = " OR ".join('"' + token.replace('"', '""') + '"' for token in dict.fromkeys(tokens))
+
+        query_vec = self._compute_embedding(query)
+        with self._lock:
+            keyword = self._conn.execute(
+                "SELECT e.id, -bm25(entries_fts) FROM entries_fts JOIN entries e ON e.seq = entries_fts.rowid "
+                f"WHERE entries_fts MATCH ?{where} ORDER BY bm25(entries_fts), e.seq LIMIT ?",
+                [match, *params, depth],
+            ).fetchall()
+            matrix = self._load_embeddings()
+            fetch = depth * 4 if filters else depth
+            if self.ann_index is not None and getattr(self.ann_index, "is_trained", True):
+                semantic = self.ann_index.search(query_vec, fetch, nprobe=nprobe)
+            else:
+                semantic = matrix.search(query_vec, fetch)
+            semantic = [(entry_id, score) for entry_id, score in semantic if score > 0]
+            if filters and semantic:
+                placeholders = ",".join("?" * len(semantic))
+                allowed = {row[0] for row in self._conn.execute(
+                    f"SELECT e.id FROM entries e WHERE e.id IN ({placeholders}){where}",
+                    [entry_id for entry_id, _ in semantic] + params,
+                )}
+                semantic = [hit for hit in semantic if hit[0] in allowed]
+        fused = fuse_rankings(keyword, semantic[:depth], fusion, semantic_weight, rrf_k)[:top_n]
+        entries = {entry.id: entry for entry in self._resolve_ids([hit[0] for hit in fused])}
+        return [(entries[entry_id], score, keyword_score, semantic_score)
+                for entry_id, score, keyword_score, semantic_score in fused if entry_id in entries]
+
+    @cached_query("query")
+    def query(self, entry_type: Optional[str] = None, start: Optional[datetime] = None,
+              end: Optional[datetime] = None, metadata: Optional[Dict[str, Any]] = None,
+              metadata_contains: Optional[Dict[str, str]] = None, keyword: Optional[str] = None,
+              regex: Optional[str] = None, similar_to: Optional[str] = None, limit: int = 50,
+              nprobe: Optional[int] = None) -> Tuple[List[MemoryEntry], QueryPlan]:
+        """
+        Run a query combining any of the supported clauses.
+
+        All filtering clauses become one SELECT, so SQLite's planner picks
+        the index (type/time, metadata expression index or FTS5); the plan
+        lists its EXPLAIN QUERY PLAN rows, which carry no row estimates.
+        Similarity ranking scores the filtered rows with the in-RAM vectors.
+        See MemoryStore.query for the arguments.
+        """
+        query = MemoryQuery(entry_type, start, end, metadata, metadata_contains, keyword, regex,
+                            similar_to, limit, nprobe)
+        conditions, params = [], []
+        if query.entry_type is not None:
+            conditions.append("e.type = ?")
+            params.append(query.entry_type)
+        if query.low is not None:
+            conditions.append("e.ts_key >= ?")
+            params.append(query.low)
+        if query.high is not None:
+            conditions.append("e.ts_key <= ?")
+            params.append(query.high)
+        for key, value in query.metadata.items():
+            condition, values = _metadata_condition(key, value)
+            conditions.append(condition)
+            params.extend(values)
+        for key, value in query.metadata_contains.items():
+            conditions.append(f"instr(py_lower({_metadata_expr(key)}), ?) > 0")
+            params.append(value.lower())
+        if query.regex is not None:
+            conditions.append("e.content REGEXP ?")
+            params.append(query.regex.pattern)
+
+        source = "entries e"
+        if query.keyword:
+            if not query.terms:
+                return [], QueryPlan(query.order, self.count_entries())
+            source = "entries_fts JOIN entries e ON e.seq = entries_fts.rowid"
+            conditions.insert(0, "entries_fts MATCH ?")
+            params.insert(0, " ".join('"' + term.replace('"', '""') + '"' for term in sorted(query.terms)))
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+
+        with self._lock:
+            plan = QueryPlan(query.order, self.count_entries())
+            if query.order == "similarity":
+                if not conditions:
+                    entries = self.search_by_similarity(query.similar_to, query.limit, query.nprobe,
+                                                        use_cache=False)
+                    plan.add("rank", "vector index top-k", query.limit).actual_rows = len(entries)
+                    return entries, plan
+                sql = f"SELECT e.id FROM {source}{where}"
+            else:
+                order = "bm25(entries_fts), e.seq" if query.order == "relevance" else "e.ts_key DESC, e.seq DESC"
+                sql = f"SELECT e.id, e.ts, e.type, e.content, e.metadata FROM {source}{where} ORDER BY {order} LIMIT ?"
+                params.append(query.limit)
+            for row in self._conn.execute("EXPLAIN QUERY PLAN " + sql, params):
+                plan.add("sqlite", row[-1], None)
+            rows = self._conn.execute(sql, params).fetchall()
+            if query.order != "similarity":
+                plan.add("limit", f"first {query.limit} by {query.order}", None).actual_rows = len(rows)
+                return [self._row_to_entry(row) for row in rows], plan
+
+            plan.steps[-1].actual_rows = len(rows)
+            scored = self._load_embeddings().score_ids(self._compute_embedding(query.similar_to),
+                                                       [row[0] for row in rows])
+            ranked = sorted((hit for hit in scored if hit[1] > 0), key=lambda hit: hit[1], reverse=True)
+            plan.add("rank", "by similarity", len(rows)).actual_rows = len(ranked)
+            entries = self._resolve_ids([entry_id for entry_id, _ in ranked[:query.limit]])
+        plan.add("limit", f"top {query.limit}", None).actual_rows = len(entries)
+        return entries, plan
+
+    def _resolve_ids(self, entry_ids: List[str]) -> List[MemoryEntry]:
+        """Fetch entries by ID, preserving the order of the IDs."""
+        if not entry_ids:
+            return []
+        placeholders = ",".join("?" * len(entry_ids))
+        found = {
+            entry.id: entry
+            for entry in self._query(f"SELECT {_COLUMNS} FROM entries WHERE id IN ({placeholders})", entry_ids)
+        }
+        return [found[entry_id] for entry_id in entry_ids if entry_id in found]
+
+    def get_last(self, n: int = 10, entry_type: Optional[str] = None) -> List[MemoryEntry]:
+        """
+        Retrieve the n most recent memory entries, newest first.
+
+        Args:
+            n: Number of entries to retrieve (default: 10)
+            entry_type: Optional type to filter by
+        """
+        if entry_type:
+            return self._query(
+                f"SELECT {_COLUMNS} FROM entries WHERE type = ? ORDER BY ts_key DESC, seq DESC LIMIT ?",
+                (entry_type, max(0, n)),
+            )
+        return self._query(
+            f"SELECT {_COLUMNS} FROM entries ORDER BY ts_key DESC, seq DESC LIMIT ?", (max(0, n),)
+        )
+
+    @cached_query("page", default=False)
+    def page(self, entry_type: Optional[str] = None, start: Optional[datetime] = None,
+             end: Optional[datetime] = None, keyword: Optional[str] = None, limit: int = 100,
+             after: Optional[Tuple[int, int, str]] = None, newest_first: bool = True,
+             pattern: Optional[str] = None, metadata: Optional[Tuple[str, str]] = None
+             ) -> Tuple[List[MemoryEntry], Optional[Tuple[int, int, str]]]:
+        """
+        Read one page of entries in time order (keyset pagination on the
+        (ts_key, seq) index). See MemoryStore.page for the arguments.
+        """
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        source = "entries e"
+        conditions: List[str] = []
+        params: List[Any] = []
+        if pattern is not None:
+            try:
+                _compile(pattern)
+            except re.error as exc:
+                raise ValueError(f"Invalid regex: {exc}") from exc
+            conditions.append("e.content REGEXP ?")
+            params.append(pattern)
+        if metadata is not None:
+            conditions.append(f"instr(py_lower({_metadata_expr(metadata[0])}), ?) > 0")
+            params.append(metadata[1].lower())
+        if keyword is not None:
+            tokens = tokenize(keyword)
+            if not tokens:
+                return [], None
+            source = "entries_fts JOIN entries e ON e.seq = entries_fts.rowid"
+            conditions.append("entries_fts MATCH ?")
+            params.append(" ".join('"' + token.replace('"', '""') + '"' for token in dict.fromkeys(tokens)))
+        if entry_type:
+            conditions.append("e.type = ?")
+            params.append(entry_type)
+        if start is not None:
+            conditions.append("e.ts_key >= ?")
+            params.append(time_key(start))
+        if end is not None:
+            conditions.append("e.ts_key <= ?")
+            params.append(time_key(end))
+        if after is not None:
+            conditions.append(f"(e.ts_key, e.seq) {'<' if newest_first else '>'} (?, ?)")
+            params.extend(after[:2])
+        direction = "DESC" if newest_first else "ASC"
+        sql = f"SELECT e.id, e.ts, e.type, e.content, e.metadata, e.ts_key, e.seq FROM {source}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY e.ts_key {direction}, e.seq {direction} LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(sql, [*params, limit + 1]).fetchall()
+        entries = [self._row_to_entry(row[:5]) for row in rows[:limit]]
+        if len(rows) <= limit:
+            return entries, None
+        last = rows[limit - 1]
+        return entries, (last[5], last[6], last[0])
+
+    def get_by_id(self, entry_id: str) -> Optional[MemoryEntry]:
+        """Retrieve a specific memory entry by its ID."""
+        entries = self._query(f"SELECT {_COLUMNS} FROM entries WHERE id = ?", (entry_id,))
+        return entries[0] if entries else None
+
+    def delete(self, entry_id: str) -> bool:
+        """Delete a memory entry by its ID."""
+        with self._lock:
+            with self._conn:
+                deleted = self._conn.execute("DELETE FROM entries WHERE id = ?", (entry_id,)).rowcount
+            if deleted:
+                self._uncache_embeddings([entry_id])
+                self.changes.publish([{"op": "delete", "id": entry_id}])
+            return bool(deleted)
+
+    def export_batches(self, entry_type: Optional[str] = None, batch_size: int = 1000,
+                       embeddings: bool = True) -> Iterator[EntryBatch]:
+        """
+        Read every entry (of a type) oldest first, as column batches.
+
+        Batches are read with keyset pagination over the time index, so
+        writers are only blocked while one batch is fetched.
+
+        Args:
+            entry_type: Only export entries of this type
+            batch_size: Entries per batch
+            embeddings: Include the stored embeddings
+
+        Returns:
+            Iterator of EntryBatch objects
+        """
+        type_clause, type_params = (" AND type = ?", (entry_type,)) if entry_type else ("", ())
+        embedding_column = "embedding" if embeddings else "NULL"
+        after = (-(2 ** 63), 0)
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT id, ts, ts_key, type, content, metadata, {embedding_column}, seq FROM entries "
+                    f"WHERE (ts_key, seq) > (?, ?){type_clause} ORDER BY {_TIME_ORDER} LIMIT ?",
+                    (*after, *type_params, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            offsets = []
+            for row in rows:
+                offset = datetime.fromisoformat(row[1]).utcoffset()
+                offsets.append(NAIVE_OFFSET if offset is None else int(offset.total_seconds()))
+            vectors = None
+            if embeddings:
+                vectors = np.frombuffer(b"".join(row[6] for row in rows), dtype=np.float32)
+                vectors = vectors.reshape(len(rows), self.embedding_dim)
+            yield EntryBatch(
+                [row[0] for row in rows],
+                [row[3] for row in rows],
+                [row[4].encode("utf-8") for row in rows],
+                [row[5].encode("utf-8") for row in rows],
+                np.array([row[2] for row in rows], dtype=np.int64),
+                np.array(offsets, dtype=np.int32),
+                vectors,
+            )
+            if len(rows) < batch_size:
+                return
+            after = (rows[-1][2], rows[-1][7])
+
+    def approximate_bytes(self) -> int:
+        """Estimated heap footprint: the embeddings held in RAM once loaded (rows live on disk)."""
+        embeddings = self.embeddings
+        return 0 if embeddings is None else len(embeddings) * self.embedding_dim * 4
+
+    def count_entries(self, entry_type: Optional[str] = None) -> int:
+        """Count entries, optionally filtered by type."""
+        with self._lock:
+            if entry_type:
+                row = self._conn.execute("SELECT COUNT(*) FROM entries WHERE type = ?", (entry_type,)).fetchone()
+            else:
+                row = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+            return row[0]
+
+    def find_duplicates(self, entry_type: Optional[str] = None, limit: int = 50) -> List[List[MemoryEntry]]:
+        """
+        Report clusters of near-duplicate entries currently stored.
+
+        With a duplicate policy on, only the bands shared by several entries
+        are examined. With the policy off no band rows are kept, so they are
+        computed for every entry (of the type) here.
+
+        Args:
+            entry_type: Only report entries of this type
+            limit: Maximum number of clusters
+
+        Returns:
+            Clusters of two or more entries, largest first, each oldest first
+        """
+        type_clause, params = ("WHERE type = ?", (entry_type,)) if entry_type else ("", ())
+        with self._lock:
+            if self.duplicate_policy is not DuplicatePolicy.OFF:
+                rows = self._conn.execute(
+                    f"SELECT type, group_concat(entry_id, char(31)) FROM entry_bands {type_clause} "
+                    f"GROUP BY type, band HAVING COUNT(*) > 1",
+                    params,
+                ).fetchall()
+                shared = [(name, sorted(members.split("\x1f"))) for name, members in rows]
+                ids = sorted({entry_id for _, members in shared for entry_id in members})
+                placeholders = ", ".join("?" * len(ids))
+                contents = dict(self._conn.execute(
+                    f"SELECT id, content FROM entries WHERE id IN ({placeholders})", ids
+                ).fetchall()) if ids else {}
+                index = None
+            else:
+                rows = self._conn.execute(f"SELECT id, type, content FROM entries {type_clause}", params).fetchall()
+                contents = {entry_id: content for entry_id, _, content in rows}
+                index = NearDuplicateIndex(self.duplicate_threshold)
+        if index is not None:
+            for entry_id, name, content in rows:
+                index.add(entry_id, name, band_keys(content))
+            shared = index.shared_buckets(entry_type)
+
+        clusters = cluster(shared, contents.get, self.duplicate_threshold)
+        clusters.sort(key=lambda item: len(item[1]), reverse=True)
+        report = []
+        for _, members in clusters[:limit]:
+            placeholders = ", ".join("?" * len(members))
+            report.append(self._query(
+                f"SELECT {_COLUMNS} FROM entries WHERE id IN ({placeholders}) ORDER BY {_TIME_ORDER}", members
+            ))
+        return report
+
+    def count_by_type(self) -> Dict[str, int]:
+        """Count entries per type, from the trigger-maintained counters."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT key, n FROM entry_counts WHERE kind = 'type'").fetchall())
+
+    def count_by_category(self) -> Dict[str, int]:
+        """Count entries per metadata category, from the trigger-maintained counters."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT key, n FROM entry_counts WHERE kind = 'category'").fetchall())
+
+    def timeseries(self, interval: str = "day", entry_type: Optional[str] = None,
+                   start: Optional[datetime] = None, end: Optional[datetime] = None
+                   ) -> List[Tuple[datetime, int, Dict[str, int]]]:
+        """
+        Count entries per hour or day from the trigger-maintained counters.
+
+        Args:
+            interval: Bucket width, "hour" or "day"
+            entry_type: Only count entries of this type
+            start: Only buckets containing times at or after this time
+            end: Only buckets starting at or before this time
+
+        Returns:
+            (bucket start, count, count per type) for every non-empty bucket, oldest first
+
+        Raises:
+            ValueError: If the interval is unknown
+        """
+        if interval not in INTERVALS:
+            raise ValueError(f"Unknown interval {interval!r}; expected one of {', '.join(INTERVALS)}")
+        width = INTERVALS[interval]
+        sql, params = "SELECT bucket, key, n FROM entry_counts WHERE kind = ?", [interval]
+        if entry_type:
+            sql += " AND key = ?"
+            params.append(entry_type)
+        if start is not None:
+            start_key = time_key(start)
+            sql += " AND bucket >= ?"
+            params.append(start_key - start_key % width)
+        if end is not None:
+            sql += " AND bucket <= ?"
+            params.append(time_key(end))
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY bucket", params).fetchall()
+        series: List[Tuple[datetime, int, Dict[str, int]]] = []
+        for bucket, key, count in rows:
+            bucket_start = from_time_key(bucket)
+            if not series or series[-1][0] != bucket_start:
+                series.append((bucket_start, 0, {}))
+            series[-1][2][key] = count
+            series[-1] = (bucket_start, series[-1][1] + count, series[-1][2])
+        return series
+
+    def clear(self, entry_type: Optional[str] = None) -> int:
+        """
+        Clear entries from the database, optionally filtered by type.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            if not entry_type:
+                with self._conn:
+                    count = self._conn.execute("DELETE FROM entries").rowcount
+                self.embeddings = None
+                self.changes.publish([{"op": "clear", "entry_type": None}])
+                return count
+
+            ids = [row[0] for row in self._conn.execute("SELECT id FROM entries WHERE type = ?", (entry_type,))]
+            with self._conn:
+                self._conn.execute("DELETE FROM entries WHERE type = ?", (entry_type,))
+            self._uncache_embeddings(ids)
+            self.changes.publish([{"op": "clear", "entry_type": entry_type}])
+            return len(ids)
+
+    def declare_metadata_index(self, key: str) -> None:
+        """
+        Create a JSON1 expression index for equality lookups on a metadata key.
+
+        Args:
+            key: Metadata key to index
+        """
+        index_name = "entries_meta_" + key.encode("utf-8").hex()
+        with self._lock:
+            with self._conn:
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON entries ({_metadata_expr(key)})")
+
+    def search_by_metadata(self, key: str, value: Any, entry_type: Optional[str] = None) -> List[MemoryEntry]:
+        """
+        Search for memory entries with matching metadata.
+
+        Declared keys are answered from their expression index; other keys
+        are evaluated with a table scan.
+
+        Args:
+            key: Metadata key to match
+            value: Metadata value to match
+            entry_type: Optional type to filter by
+
+        Returns:
+            List of MemoryEntry objects with matching metadata, in insertion order
+        """
+        clause, params = _metadata_condition(key, value)
+        sql = f"SELECT {_COLUMNS} FROM entries WHERE {clause}"
+        if entry_type:
+            sql += " AND type = ?"
+            params.append(entry_type)
+        return self._query(sql + " ORDER BY seq", params)
+
+    def search_by_metadata_value(self, key: str, value_substr: str) -> List[MemoryEntry]:
+        """
+        Search for entries where a metadata value contains the given substring.
+
+        Args:
+            key: Metadata key to search
+            value_substr: Substring to look for (case-insensitive)
+
+        Returns:
+            List of matching MemoryEntry objects, oldest first
+        """
+        if not key or value_substr is None:
+            return []
+        expr = _metadata_expr(key)
+        return self._query(
+            f"SELECT {_COLUMNS} FROM entries WHERE instr(py_lower({expr}), ?) > 0 ORDER BY {_TIME_ORDER}",
+            (value_substr.lower(),),
+        )
+
+    @cached_query("regex")
+    def search_by_regex(self, pattern: str, entry_type: Optional[str] = None) -> List[MemoryEntry]:
+        """
+        Search entry content using a regular expression pattern.
+
+        Args:
+            pattern: Regular expression (matched case-insensitively)
+            entry_type: Optional type to restrict the search to (the type
+                index narrows the rows before the regex runs)
+
+        Returns:
+            List of matching MemoryEntry objects, oldest first
+        """
+        if not pattern:
+            return []
+        try:
+            _compile(pattern)
+        except re.error as exc:
+            raise ValueError(f"Invalid regex: {exc}") from exc
+        if entry_type is None:
+            return self._query(
+                f"SELECT {_COLUMNS} FROM entries WHERE content REGEXP ? ORDER BY {_TIME_ORDER}", (pattern,)
+            )
+        return self._query(
+            f"SELECT {_COLUMNS} FROM entries WHERE type = ? AND content REGEXP ? ORDER BY {_TIME_ORDER}",
+            (entry_type, pattern),
+        )
+
+    def _link_edges(self, entry_ids: List[str]) -> List[Edge]:
+        """Links touching any of the entries, to or from stored entries. Caller holds the lock."""
+        ids = json.dumps(entry_ids)
+        return self._conn.execute(
+            "SELECT l.source, l.target FROM json_each(?) f JOIN entry_links l ON l.source = f.value "
+            "JOIN entries e ON e.id = l.target "
+            "UNION ALL SELECT l.source, l.target FROM json_each(?) f JOIN entry_links l ON l.target = f.value",
+            (ids, ids),
+        ).fetchall()
+
+    def _linked(self, entry_ids: Iterable[str], depth: Optional[int]) -> Tuple[Dict[str, int], List[Edge]]:
+        """Breadth-first traversal of the link table, one query per level. Caller holds the lock."""
+        starts = [row[0] for row in self._conn.execute(
+            "SELECT e.id FROM json_each(?) f JOIN entries e ON e.id = f.value", (json.dumps(list(entry_ids)),)
+        )]
+        return breadth_first(starts, self._link_edges, depth)
+
+    def _entries_by_ids(self, entry_ids: Iterable[str]) -> List[MemoryEntry]:
+        """Fetch entries by ID, oldest first, however many IDs there are. Caller holds the lock."""
+        rows = self._conn.execute(
+            f"SELECT {_COLUMNS} FROM entries WHERE id IN (SELECT value FROM json_each(?)) ORDER BY {_TIME_ORDER}",
+            (json.dumps(list(entry_ids)),),
+        ).fetchall()
+        return [self._row_to_entry(row) for row in rows]
+
+    def traverse(self, entry_id: str, depth: Optional[int] = 1
+                 ) -> Optional[Tuple[List[Tuple[MemoryEntry, int]], List[Edge]]]:
+        """
+        Find the entries linked to an entry within some hops.
+
+        Links are read from the entry_links table (indexed by source and by
+        target) with one query per hop, so the cost is proportional to the
+        entries and links visited.
+
+        Args:
+            entry_id: ID of the entry to start from
+            depth: Maximum number of hops (None: the whole connected component)
+
+        Returns:
+            ([(entry, hops from the start)] breadth first, links between those
+            entries as (source ID, target ID)), or None if the entry does not exist
+        """
+        with self._lock:
+            hops, edges = self._linked((entry_id,), depth)
+            if not hops:
+                return None
+            entries = self._entries_by_ids(hops)
+        position = {linked_id: index for index, linked_id in enumerate(hops)}
+        entries.sort(key=lambda entry: position[entry.id])  # Breadth first, as visited
+        return [(entry, hops[entry.id]) for entry in entries], edges
+
+    def linked_component(self, entry_ids: Iterable[str], entry_type: Optional[str] = None) -> List[MemoryEntry]:
+        """
+        Every entry connected to the given entries through links, oldest first.
+
+        Args:
+            entry_ids: IDs of the entries to start from (included; missing IDs are ignored)
+            entry_type: Optional type to filter by
+
+        Returns:
+            List of MemoryEntry objects in chronological order
+        """
+        with self._lock:
+            hops, _ = self._linked(entry_ids, None)
+            entries = self._entries_by_ids(hops)
+        return [entry for entry in entries if not entry_type or entry.type == entry_type]
+
+    def update_entry(self, entry_id: str, content: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """Update an existing entry and refresh its embedding."""
+        with self._lock:
+            entry = self.get_by_id(entry_id)
+            if not entry:
+                return False
+            if content is not None:
+                if not content:
+                    raise ValueError("Updated content cannot be empty")
+                entry.content = content
+            if metadata is not None:
+                entry.metadata.update(metadata)
+
+            vector = self._compute_embedding(embedding_source(entry))
+            keys = None if content is None else self._band_keys(entry)
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE entries SET content = ?, metadata = ?, embedding = ? WHERE id = ?",
+                    (entry.content, json.dumps(entry.metadata, default=str), vector.tobytes(), entry_id),
+                )
+                if content is not None:  # Bands of the old content are stale, whatever the policy
+                    self._conn.execute("DELETE FROM entry_bands WHERE entry_id = ?", (entry_id,))
+                    if keys is not None:
+                        self._insert_bands(entry_id, entry.type, keys)
+            self._cache_embedding(entry_id, vector)
+            self.changes.publish([{"op": "update", "id": entry_id, "content": content, "metadata": metadata}])
+            return True
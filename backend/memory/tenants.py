@@ -0,0 +1,244 @@
+"""
+Tenants Module for Oculus Dei Life Management System
+
+This module partitions memory by tenant (a user or workspace). Every tenant
+has its own store, so its own indexes, lock and change feed: one tenant's
+writes never contend with, or lengthen the scans of, another's. Partitions
+are opened lazily on first use from their directory and kept in LRU order.
+When the estimated footprint of the open partitions exceeds the memory
+budget, the least recently used idle ones are written to disk and closed.
+
+The tenant of the running request lives in the ``current_tenant`` context
+variable; ``memory_writer.get_memory_store()`` returns that tenant's store.
+The default tenant is the process-wide store and is never evicted.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+TENANT_HEADER = "X-Tenant-ID"
+DEFAULT_TENANT = "default"
+DEFAULT_MEMORY_BUDGET = 512 * 1024 * 1024
+
+_TENANT_ID = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]{0,63}")  # Also used as a directory name
+
+current_tenant: ContextVar[str] = ContextVar("current_tenant", default=DEFAULT_TENANT)
+
+
+def validate_tenant_id(tenant_id: str) -> str:
+    """
+    Check that a tenant ID is safe to use as a directory name.
+
+    Raises:
+        ValueError: If it is empty, too long or has characters other than
+            letters, digits, "_", "-" and "." (not first)
+    """
+    if not isinstance(tenant_id, str) or not _TENANT_ID.fullmatch(tenant_id):
+        raise ValueError(f"Invalid tenant ID {tenant_id!r}")
+    return tenant_id
+
+
+class _Partition:
+    """An open tenant store and its bookkeeping. Guarded by the manager lock."""
+
+    __slots__ = ("store", "size", "leases", "last_used")
+
+    def __init__(self, store: Any):
+        self.store = store
+        self.size = 0  # Estimated bytes when last accounted
+        self.leases = 0  # Requests currently using the store
+        self.last_used = time.monotonic()
+
+
+class TenantStores:
+    """
+    Lazily opened tenant stores under a global memory budget.
+
+    A store's footprint is its ``approximate_bytes()``, re-read each time
+    the tenant is used, so the manager's total lags a tenant's writes by at
+    most one request. A store is evicted only when it has no lease, no
+    change stream subscriber and has not been used for idle_seconds.
+    """
+
+    def __init__(self, open_store: Callable[[str], Any], default_store: Any,
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET, idle_seconds: float = 30.0):
+        """
+        Initialize the manager.
+
+        Args:
+            open_store: Opens (or creates) the durable store of a tenant ID
+            default_store: Store of the default tenant (never evicted)
+            memory_budget: Estimated bytes the open tenant stores may use
+            idle_seconds: Minimum time since a store's last use before it may be evicted
+        """
+        self.open_store = open_store
+        self.default_store = default_store
+        self.memory_budget = memory_budget
+        self.idle_seconds = idle_seconds
+        self._partitions: "OrderedDict[str, _Partition]" = OrderedDict()  # Least recently used first
+        self._tenant_locks: Dict[str, threading.Lock] = {}  # Serialize opening and closing one tenant
+        self._lock = threading.Lock()
+        self.resident_bytes = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, tenant_id: str) -> Any:
+        """
+        The store of a tenant, opening it if needed.
+
+        Args:
+            tenant_id: Tenant ID (validated with validate_tenant_id)
+
+        Returns:
+            The tenant's store
+        """
+        return self._use(tenant_id, lease=False)
+
+    @contextmanager
+    def lease(self, tenant_id: str) -> Iterator[Any]:
+        """Use a tenant's store, keeping it from being evicted until the block exits."""
+        store = self._use(tenant_id, lease=True)
+        try:
+            yield store
+        finally:
+            self.release(tenant_id)
+
+    def acquire(self, tenant_id: str) -> Any:
+        """Lease a tenant's store; pair with release()."""
+        return self._use(tenant_id, lease=True)
+
+    def release(self, tenant_id: str) -> None:
+        """End a lease taken with acquire()."""
+        with self._lock:
+            partition = self._partitions.get(tenant_id)
+            if partition is not None:
+                partition.leases -= 1
+                partition.last_used = time.monotonic()
+
+    def _use(self, tenant_id: str, lease: bool) -> Any:
+        if tenant_id == DEFAULT_TENANT:
+            return self.default_store
+        with self._lock:
+            partition = self._touch(tenant_id, lease)
+            if partition is not None:
+                victims = self._account(tenant_id, partition)
+        if partition is None:
+            validate_tenant_id(tenant_id)
+            partition, victims = self._load(tenant_id, lease)
+        self._close(victims)
+        return partition.store
+
+    def _touch(self, tenant_id: str, lease: bool) -> Any:
+        """Mark an open partition as just used. Caller holds the lock."""
+        partition = self._partitions.get(tenant_id)
+        if partition is not None:
+            self._partitions.move_to_end(tenant_id)
+            partition.last_used = time.monotonic()
+            partition.leases += lease
+        return partition
+
+    def _load(self, tenant_id: str, lease: bool) -> Tuple[_Partition, List[Tuple[str, Any, threading.Lock]]]:
+        """Open a tenant's store; other tenants stay usable while it loads."""
+        with self._lock:
+            tenant_lock = self._tenant_locks.setdefault(tenant_id, threading.Lock())
+        with tenant_lock:  # Waits for an eviction of this tenant to finish closing
+            with self._lock:
+                partition = self._touch(tenant_id, lease)
+            if partition is None:  # Not opened by another thread meanwhile
+                store = self.open_store(tenant_id)
+                with self._lock:
+                    partition = self._partitions[tenant_id] = _Partition(store)
+                    partition.leases += lease
+                    self.loads += 1
+        with self._lock:
+            return partition, self._account(tenant_id, partition)
+
+    def _account(self, tenant_id: str, partition: _Partition) -> List[Tuple[str, Any, threading.Lock]]:
+        """
+        Refresh a partition's size and pick the stores to evict. Caller holds the lock.
+
+        Returns:
+            (tenant ID, store, tenant lock held for the eviction) of each
+            victim, already removed from the partitions
+        """
+        if self._partitions.get(tenant_id) is not partition:  # Evicted by another thread meanwhile
+            return []
+        size = partition.store.approximate_bytes()
+        self.resident_bytes += size - partition.size
+        partition.size = size
+        victims = []
+        if self.resident_bytes <= self.memory_budget:
+            return victims
+        idle_before = time.monotonic() - self.idle_seconds
+        for victim_id, victim in list(self._partitions.items()):
+            if self.resident_bytes <= self.memory_budget:
+                break
+            if (victim_id == tenant_id or victim.leases or victim.last_used > idle_before
+                    or victim.store.changes.subscriber_count):
+                continue
+            tenant_lock = self._tenant_locks[victim_id]
+            if not tenant_lock.acquire(blocking=False):  # Being opened or closed right now
+                continue
+            del self._partitions[victim_id]
+            self.resident_bytes -= victim.size
+            self.evictions += 1
+            victims.append((victim_id, victim.store, tenant_lock))
+        return victims
+
+    @staticmethod
+    def _close(victims: List[Tuple[str, Any, threading.Lock]]) -> None:
+        """Write evicted stores to disk and close them, outside the manager lock."""
+        for _, store, tenant_lock in victims:
+            try:
+                persistence = getattr(store, "persistence", None)
+                if persistence is not None and persistence.records_since_snapshot:
+                    store.snapshot()  # Reopening then reads one snapshot instead of replaying the WAL
+                store.close()
+            finally:
+                tenant_lock.release()
+
+    def evict(self, tenant_id: str) -> bool:
+        """
+        Close a tenant's store now, whatever the budget (unless it is leased or subscribed).
+
+        Returns:
+            True if the store was open and has been closed
+        """
+        with self._lock:
+            partition = self._partitions.get(tenant_id)
+            if partition is None or partition.leases or partition.store.changes.subscriber_count:
+                return False
+            tenant_lock = self._tenant_locks[tenant_id]
+            if not tenant_lock.acquire(blocking=False):
+                return False
+            del self._partitions[tenant_id]
+            self.resident_bytes -= partition.size
+            self.evictions += 1
+        self._close([(tenant_id, partition.store, tenant_lock)])
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Open tenants (least recently used first) with their estimated sizes, and totals."""
+        with self._lock:
+            return {
+                "resident": [{"tenant": tenant_id, "bytes": partition.size, "leases": partition.leases}
+                             for tenant_id, partition in self._partitions.items()],
+                "resident_bytes": self.resident_bytes,
+                "memory_budget": self.memory_budget,
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
+
+    def close(self) -> None:
+        """Close every open tenant store (the default store is left to its owner)."""
+        with self._lock:
+            partitions = list(self._partitions.items())
+            self._partitions.clear()
+            self.resident_bytes = 0
+        for _, partition in partitions:
+            partition.store.close()
@@ -0,0 +1,233 @@
+"""
+Text Index Module for Oculus Dei Life Management System
+
+This module provides the token-level inverted index used by the MemoryStore
+for keyword search. Posting lists are partitioned by entry type so a type
+filter only touches the matching partition, multi-term queries are answered
+by posting-list intersection (or union, for hybrid retrieval), and matches
+are ranked with Okapi BM25.
+"""
+
+import heapq
+import math
+import re
+from typing import Collection, Dict, Iterable, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class InvertedIndex:
+    """
+    Inverted index from tokens to the entries containing them.
+
+    Postings are stored as ``type -> token -> {entry_id: term_frequency}``.
+    Document frequencies and the average document length used for BM25
+    are computed across all partitions.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize an empty inverted index.
+
+        Args:
+            k1: BM25 term-frequency saturation parameter
+            b: BM25 document-length normalization parameter
+        """
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self._doc_terms: Dict[str, Tuple[str, ...]] = {}  # entry ID -> distinct tokens
+        self._doc_lengths: Dict[str, int] = {}
+        self._doc_types: Dict[str, str] = {}
+        self._doc_positions: Dict[str, int] = {}  # entry ID -> order in which it was (re)indexed
+        self._next_position = 0
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def __contains__(self, entry_id: str) -> bool:
+        return entry_id in self._doc_lengths
+
+    def add(self, entry_id: str, entry_type: str, text: str) -> None:
+        """
+        Index the text of an entry, replacing any previous version.
+
+        Args:
+            entry_id: ID of the memory entry
+            entry_type: Type of the entry (selects the posting partition)
+            text: Text to index
+        """
+        if entry_id in self._doc_lengths:
+            self.remove(entry_id)
+
+        tokens = tokenize(text)
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+
+        partition = self._postings.setdefault(entry_type, {})
+        for token, tf in counts.items():
+            partition.setdefault(token, {})[entry_id] = tf
+
+        self._doc_terms[entry_id] = tuple(counts)
+        self._doc_lengths[entry_id] = len(tokens)
+        self._doc_types[entry_id] = entry_type
+        self._doc_positions[entry_id] = self._next_position
+        self._next_position += 1
+        self._total_length += len(tokens)
+
+    def remove(self, entry_id: str) -> bool:
+        """
+        Remove an entry from the index.
+
+        Returns:
+            True if the entry was indexed, False otherwise
+        """
+        length = self._doc_lengths.pop(entry_id, None)
+        if length is None:
+            return False
+        entry_type = self._doc_types.pop(entry_id)
+        del self._doc_positions[entry_id]
+        partition = self._postings.get(entry_type, {})
+        for token in self._doc_terms.pop(entry_id):
+            postings = partition.get(token)
+            if postings is None:
+                continue
+            postings.pop(entry_id, None)
+            if not postings:
+                del partition[token]
+        if not partition:
+            self._postings.pop(entry_type, None)
+        self._total_length -= length
+        return True
+
+    def clear(self, entry_type: Optional[str] = None) -> None:
+        """Remove all entries, or only the entries of one type."""
+        if entry_type is None:
+            self._postings = {}
+            self._doc_terms = {}
+            self._doc_lengths = {}
+            self._doc_types = {}
+            self._doc_positions = {}
+            self._total_length = 0
+            return
+
+        for entry_id in [e for e, t in self._doc_types.items() if t == entry_type]:
+            self.remove(entry_id)
+
+    def position(self, entry_id: str) -> int:
+        """Order in which an indexed entry was last indexed (breaks ties between equal scores)."""
+        return self._doc_positions[entry_id]
+
+    def _document_frequency(self, token: str) -> int:
+        """Number of indexed entries containing the token, across all types."""
+        return sum(len(partition.get(token, ())) for partition in self._postings.values())
+
+    def estimate(self, query: str, entry_type: Optional[str] = None) -> int:
+        """
+        Upper bound on the number of entries containing every query token.
+
+        Args:
+            query: Free-text query
+            entry_type: Optional type to restrict the estimate to
+
+        Returns:
+            Length of the shortest posting list among the query tokens
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return 0
+        if entry_type is not None:
+            partition = self._postings.get(entry_type, {})
+            return min(len(partition.get(term, ())) for term in terms)
+        return min(self._document_frequency(term) for term in terms)
+
+    def search(self, query: str, entry_type: Optional[str] = None,
+               limit: Optional[int] = None, match_all: bool = True,
+               candidates: Optional[Collection[str]] = None,
+               after: Optional[Tuple[float, int]] = None) -> List[Tuple[str, float]]:
+        """
+        Find entries containing the query tokens, ranked by BM25.
+
+        Ties are broken by indexing order, so the ranking is a total order
+        and ``after`` can resume it (keyset pagination by rank).
+
+        Args:
+            query: Free-text query
+            entry_type: Optional type to restrict the search to
+            limit: Optional maximum number of results
+            match_all: Whether every token must match (False scores any
+                entry containing at least one token)
+            candidates: Optional set of entry IDs to restrict the search to
+            after: Optional (score, position) of the last result already
+                returned; only results ranked after it are returned
+
+        Returns:
+            List of (entry ID, score) pairs, best match first
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self._doc_lengths:
+            return []
+
+        if entry_type is not None:
+            partitions: Iterable[Dict[str, Dict[str, int]]] = [self._postings.get(entry_type, {})]
+        else:
+            partitions = self._postings.values()
+
+        doc_count = len(self._doc_lengths)
+        avg_length = self._total_length / doc_count if doc_count else 0.0
+        idf = {}
+        for term in terms:
+            df = self._document_frequency(term)
+            idf[term] = math.log(1.0 + (doc_count - df + 0.5) / (df + 0.5))
+
+        def term_score(entry_id: str, term: str, tf: int) -> float:
+            length_norm = self.k1 * (1.0 - self.b + self.b * self._doc_lengths[entry_id] / (avg_length or 1.0))
+            return idf[term] * tf * (self.k1 + 1.0) / (tf + length_norm)
+
+        scored: List[Tuple[str, float]] = []
+        if not match_all:
+            totals: Dict[str, float] = {}
+            for partition in partitions:
+                for term in terms:
+                    for entry_id, tf in partition.get(term, {}).items():
+                        if candidates is None or entry_id in candidates:
+                            totals[entry_id] = totals.get(entry_id, 0.0) + term_score(entry_id, term, tf)
+            scored = list(totals.items())
+            partitions = ()
+
+        for partition in partitions:
+            posting_lists = [partition.get(term) for term in terms]
+            if not all(posting_lists):
+                continue
+            # Intersect starting from the shortest posting list
+            ordered = sorted(zip(terms, posting_lists), key=lambda item: len(item[1]))
+            shortest = ordered[0][1]
+            others = ordered[1:]
+            for entry_id in shortest:
+                if candidates is not None and entry_id not in candidates:
+                    continue
+                if all(entry_id in postings for _, postings in others):
+                    score = sum(term_score(entry_id, term, postings[entry_id]) for term, postings in ordered)
+                    scored.append((entry_id, score))
+
+        positions = self._doc_positions
+
+        def rank(item: Tuple[str, float]) -> Tuple[float, int]:
+            return -item[1], positions[item[0]]
+
+        if after is not None:
+            last = (-after[0], after[1])
+            scored = [item for item in scored if rank(item) > last]
+        if limit is not None:
+            return heapq.nsmallest(limit, scored, key=rank)
+        scored.sort(key=rank)
+        return scored
@@ -0,0 +1,224 @@
+"""
+Time Index Module for Oculus Dei Life Management System
+
+This module keeps memory entry IDs ordered by timestamp so that "latest N"
+and "between t1 and t2" queries are answered with a binary search instead of
+sorting the whole store. Keys are held in a list of bounded sorted chunks:
+appends of new entries are O(1), back-dated inserts and deletes only shift
+one chunk, and range lookups cost O(log N + k).
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Iterator, List, Optional, Tuple
+
+# (timestamp, insertion sequence, entry ID); the sequence breaks timestamp ties.
+# Timestamps may be any ordered type; the MemoryStore uses epoch microseconds.
+TimeKey = Tuple[Any, int, str]
+
+
+class TimeIndex:
+    """
+    Sorted index of entry IDs by (timestamp, insertion sequence).
+
+    Entries with equal timestamps are ordered by the sequence number the
+    store assigned when they were inserted, so the most recently stored
+    entry wins ties.
+    """
+
+    def __init__(self, chunk_size: int = 512):
+        """
+        Initialize an empty time index.
+
+        Args:
+            chunk_size: Target number of keys per chunk; chunks split at twice this size
+        """
+        self.chunk_size = chunk_size
+        self._chunks: List[List[TimeKey]] = []
+        self._maxes: List[TimeKey] = []  # Last key of each chunk
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over entry IDs from oldest to newest."""
+        for chunk in self._chunks:
+            for key in chunk:
+                yield key[2]
+
+    def add(self, entry_id: str, timestamp: Any, seq: int) -> None:
+        """
+        Insert an entry into the index.
+
+        Args:
+            entry_id: ID of the memory entry
+            timestamp: Timestamp of the entry
+            seq: Store-wide insertion sequence number
+        """
+        key = (timestamp, seq, entry_id)
+        self._count += 1
+        if not self._chunks:
+            self._chunks.append([key])
+            self._maxes.append(key)
+            return
+
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._chunks):
+            # Newer than everything indexed: the common, append-only case
+            pos -= 1
+            self._chunks[pos].append(key)
+            self._maxes[pos] = key
+        else:
+            insort(self._chunks[pos], key)
+
+        chunk = self._chunks[pos]
+        if len(chunk) > 2 * self.chunk_size:
+            half = len(chunk) // 2
+            self._chunks[pos: pos + 1] = [chunk[:half], chunk[half:]]
+            self._maxes[pos: pos + 1] = [chunk[half - 1], chunk[-1]]
+
+    def remove(self, entry_id: str, timestamp: Any, seq: int) -> bool:
+        """
+        Remove an entry from the index.
+
+        Returns:
+            True if the entry was indexed under this key, False otherwise
+        """
+        key = (timestamp, seq, entry_id)
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._chunks):
+            return False
+        chunk = self._chunks[pos]
+        idx = bisect_left(chunk, key)
+        if idx == len(chunk) or chunk[idx] != key:
+            return False
+
+        del chunk[idx]
+        self._count -= 1
+        if not chunk:
+            del self._chunks[pos]
+            del self._maxes[pos]
+        else:
+            self._maxes[pos] = chunk[-1]
+        return True
+
+    def latest(self, n: Optional[int] = None) -> List[str]:
+        """
+        Return the IDs of the n newest entries, newest first.
+
+        Args:
+            n: Number of IDs to return (default: all)
+        """
+        limit = self._count if n is None else max(0, n)
+        result: List[str] = []
+        for chunk in reversed(self._chunks):
+            if len(result) >= limit:
+                break
+            take = min(limit - len(result), len(chunk))
+            result.extend(key[2] for key in reversed(chunk[len(chunk) - take:]))
+        return result
+
+    def between(self, start: Optional[Any] = None, end: Optional[Any] = None,
+                limit: Optional[int] = None) -> List[str]:
+        """
+        Return the IDs of entries with start <= timestamp <= end, oldest first.
+
+        Args:
+            start: Inclusive lower bound (default: unbounded)
+            end: Inclusive upper bound (default: unbounded)
+            limit: Optional maximum number of IDs to return
+        """
+        if not self._chunks:
+            return []
+        if start is None:
+            pos, idx = 0, 0
+        else:
+            low = (start,)
+            pos = bisect_left(self._maxes, low)
+            if pos == len(self._chunks):
+                return []
+            idx = bisect_left(self._chunks[pos], low)
+
+        high = None if end is None else (end, float("inf"))
+        result: List[str] = []
+        while pos < len(self._chunks):
+            chunk = self._chunks[pos]
+            stop = len(chunk) if high is None else bisect_right(chunk, high, lo=idx)
+            result.extend(key[2] for key in chunk[idx:stop])
+            if limit is not None and len(result) >= limit:
+                return result[:limit]
+            if stop < len(chunk):
+                break
+            pos, idx = pos + 1, 0
+        return result
+
+    def _position(self, key: Tuple, right: bool = False) -> Tuple[int, int]:
+        """(chunk, offset) of the first indexed key >= key, or > key when right is set."""
+        find = bisect_right if right else bisect_left
+        pos = find(self._maxes, key)
+        if pos == len(self._chunks):
+            return pos, 0
+        return pos, find(self._chunks[pos], key)
+
+    def count_between(self, start: Optional[Any] = None, end: Optional[Any] = None) -> int:
+        """
+        Count entries with start <= timestamp <= end without collecting them.
+
+        Costs O(log N) plus one step per chunk spanned by the range.
+        """
+        first = (0, 0) if start is None else self._position((start,))
+        last = (len(self._chunks), 0) if end is None else self._position((end, float("inf")), right=True)
+        if last <= first:
+            return 0
+        if first[0] == last[0]:
+            return last[1] - first[1]
+        count = len(self._chunks[first[0]]) - first[1] + last[1]
+        for pos in range(first[0] + 1, last[0]):
+            count += len(self._chunks[pos])
+        return count
+
+    def scan(self, start: Optional[Any] = None, end: Optional[Any] = None, reverse: bool = False,
+             after: Optional[TimeKey] = None) -> Iterator[TimeKey]:
+        """
+        Iterate over the keys with start <= timestamp <= end.
+
+        The iterator reads the live chunks, so it must be consumed before the
+        index is modified; resume a scan later by passing the last key seen as
+        ``after``.
+
+        Args:
+            start: Inclusive lower bound (default: unbounded)
+            end: Inclusive upper bound (default: unbounded)
+            reverse: Iterate newest first instead of oldest first
+            after: Exclusive key to continue from, in the scan direction
+        """
+        low = None if start is None else (start,)
+        high = None if end is None else (end, float("inf"))
+        if not reverse:
+            if after is not None and (low is None or after >= low):
+                pos, idx = self._position(after, right=True)
+            else:
+                pos, idx = (0, 0) if low is None else self._position(low)
+            while pos < len(self._chunks):
+                chunk = self._chunks[pos]
+                for key in chunk[idx:]:
+                    if high is not None and key > high:
+                        return
+                    yield key
+                pos, idx = pos + 1, 0
+            return
+
+        if after is not None and (high is None or after <= high):
+            pos, idx = self._position(after)
+        else:
+            pos, idx = (len(self._chunks), 0) if high is None else self._position(high, right=True)
+        while pos >= 0:
+            if pos < len(self._chunks):
+                chunk = self._chunks[pos]
+                for key in reversed(chunk[:idx]):
+                    if low is not None and key < low:
+                        return
+                    yield key
+            pos -= 1
+            if pos >= 0:
+                idx = len(self._chunks[pos])
@@ -0,0 +1,196 @@
+"""
+Trigram Index Module for Oculus Dei Life Management System
+
+This module provides a trigram index used to prefilter substring and regular
+expression searches. Every indexed text is split into overlapping
+three-character grams; a query is answered by intersecting the posting lists
+of its own trigrams and then verifying only the surviving candidates.
+
+For regular expressions, the literal runs that every match must contain are
+extracted from the parsed pattern, so only the full regex runs on candidates
+that contain all of them.
+"""
+
+from typing import Dict, Hashable, Iterable, List, Optional, Set
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+    from re import _constants as sre_constants
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_parse
+    import sre_constants
+
+# Non-ASCII characters that re.IGNORECASE treats as equal to ASCII letters
+# (dotted/dotless i, long s, Kelvin sign). Folding them keeps the index a
+# superset of what a case-insensitive regex can match.
+_CASE_FOLD = str.maketrans({"İ": "i", "ı": "i", "ſ": "s", "K": "k"})
+
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+if hasattr(sre_constants, "POSSESSIVE_REPEAT"):
+    _REPEATS.add(sre_constants.POSSESSIVE_REPEAT)
+
+
+def fold_case(text: str) -> str:
+    """Normalize text for case-insensitive trigram matching."""
+    return text.translate(_CASE_FOLD).lower()
+
+
+def trigrams(text: str) -> Set[str]:
+    """Return the set of three-character substrings of already-normalized text."""
+    return {text[i: i + 3] for i in range(len(text) - 2)}
+
+
+def required_literals(pattern: str, flags: int = 0) -> List[str]:
+    """
+    Extract literal strings that every match of a regex must contain.
+
+    Only ASCII literals are collected, and alternations, optional repeats
+    and character classes end a literal run, so the result is conservative:
+    it may miss requirements but never invents one.
+
+    Args:
+        pattern: Regular expression source
+        flags: Flags the pattern is compiled with
+
+    Returns:
+        List of required literal strings (case-folded)
+    """
+    return [fold_case(run) for run in _literal_runs(sre_parse.parse(pattern, flags))]
+
+
+def _literal_runs(parsed) -> List[str]:
+    """Walk a parsed regex and collect the literal runs it requires."""
+    runs: List[str] = []
+    current: List[str] = []
+
+    def flush() -> None:
+        if current:
+            runs.append("".join(current))
+            current.clear()
+
+    for op, av in parsed:
+        if op is sre_constants.LITERAL and av < 128:
+            current.append(chr(av))
+        elif op is sre_constants.AT:
+            continue  # Anchors are zero-width and do not break adjacency
+        elif op is sre_constants.SUBPATTERN:
+            flush()
+            runs.extend(_literal_runs(av[-1]))
+        elif op in _REPEATS:
+            flush()
+            low, _high, sub = av
+            if low >= 1:
+                runs.extend(_literal_runs(sub))
+        else:
+            flush()
+    flush()
+    return runs
+
+
+class TrigramIndex:
+    """
+    Inverted index from trigrams to the documents containing them.
+
+    Documents are keyed by any hashable ID. Text is case-folded before it
+    is split. Per-document trigram sets are not kept (they would cost more
+    than the postings themselves), so removal takes the indexed text again.
+    """
+
+    def __init__(self):
+        """Initialize an empty trigram index."""
+        self._postings: Dict[str, Set[Hashable]] = {}
+        self._docs: Set[Hashable] = set()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._docs
+
+    def add(self, doc_id: Hashable, text: str) -> None:
+        """Index a document's text. A document that is already indexed must be removed first."""
+        self._docs.add(doc_id)
+        postings = self._postings
+        for gram in trigrams(fold_case(text)):
+            ids = postings.get(gram)
+            if ids is None:
+                postings[gram] = {doc_id}
+            else:
+                ids.add(doc_id)
+
+    def remove(self, doc_id: Hashable, text: str) -> bool:
+        """
+        Remove a document from the index.
+
+        Args:
+            doc_id: ID of the document
+            text: The text the document was indexed with
+
+        Returns:
+            True if the document was indexed, False otherwise
+        """
+        if doc_id not in self._docs:
+            return False
+        self._docs.discard(doc_id)
+        for gram in trigrams(fold_case(text)):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[gram]
+        return True
+
+    def clear(self) -> None:
+        """Remove all documents."""
+        self._postings = {}
+        self._docs = set()
+
+    def documents(self) -> List[Hashable]:
+        """Return the IDs of all indexed documents."""
+        return list(self._docs)
+
+    def estimate(self, literals: Iterable[str]) -> Optional[int]:
+        """
+        Upper bound on the number of candidates for the given literals.
+
+        Returns:
+            Size of the shortest posting list among their trigrams, or None
+            if the literals do not constrain the search
+        """
+        grams: Set[str] = set()
+        for literal in literals:
+            grams |= trigrams(literal)
+        if not grams:
+            return None
+        return min(len(self._postings.get(gram, ())) for gram in grams)
+
+    def candidates(self, literals: Iterable[str]) -> Optional[Set[Hashable]]:
+        """
+        Return documents containing every trigram of the given literals.
+
+        Args:
+            literals: Case-folded strings that a match must contain
+
+        Returns:
+            Candidate document IDs, or None if the literals are too short to
+            constrain the search (the caller must then check every document)
+        """
+        grams: Set[str] = set()
+        for literal in literals:
+            grams |= trigrams(literal)
+        if not grams:
+            return None
+
+        posting_lists = []
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if not postings:
+                return set()
+            posting_lists.append(postings)
+        posting_lists.sort(key=len)
+        result = set(posting_lists[0])
+        for postings in posting_lists[1:]:
+            result &= postings
+            if not result:
+                break
+        return result
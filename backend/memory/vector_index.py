@@ -0,0 +1,706 @@
+"""
+Vector Index Module for Oculus Dei Life Management System
+
+This module provides the dense embedding storage used by the MemoryStore for
+semantic search. Embeddings are kept L2-normalized in a contiguous float32
+matrix so that a similarity query is a single matrix-vector product followed
+by a partial sort for the top-k rows. Rows live in fixed-size blocks so a
+search can run on a snapshot while writers continue (see cow.py).
+
+For large stores an approximate IVF-flat index (k-means centroids with one
+inverted list per centroid) can be layered on top, so a query only scans the
+few lists closest to it instead of every row. Its k-means training runs on a
+snapshot outside the owner's lock (see train_outside_lock) and the trained
+partitions are swapped in afterwards, so writes never wait for clustering.
+"""
+
+import abc
+import heapq
+import math
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from backend.memory.cow import SEGMENT_MASK, SEGMENT_SHIFT, SEGMENT_SIZE, CowColumn, FrozenColumn
+
+
+class VectorIndex(abc.ABC):
+    """
+    Interface for vector indexes used by the MemoryStore.
+
+    Implementations store L2-normalized embeddings keyed by entry ID and
+    answer cosine-similarity top-k queries. ``snapshot`` returns a read-only
+    view that can be searched without holding the store's lock while writers
+    keep modifying the index.
+    """
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """Number of stored embeddings."""
+
+    @abc.abstractmethod
+    def upsert(self, entry_id: str, vector: Sequence[float]) -> None:
+        """Insert or replace the embedding for an entry."""
+
+    @abc.abstractmethod
+    def remove(self, entry_id: str) -> bool:
+        """Remove the embedding for an entry, returning True if it was present."""
+
+    def extend(self, entry_ids: Sequence[str], vectors: np.ndarray) -> None:
+        """Add many new embeddings (IDs must not already be present)."""
+        for entry_id, vector in zip(entry_ids, vectors):
+            self.upsert(entry_id, vector)
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """Remove all embeddings."""
+
+    @abc.abstractmethod
+    def search(self, query: Sequence[float], top_n: int, **kwargs) -> List[Tuple[str, float]]:
+        """Return up to top_n (entry ID, similarity) pairs, best match first."""
+
+    @abc.abstractmethod
+    def snapshot(self):
+        """Return an immutable view with the same ``search`` method."""
+
+
+def _top_k(blocks: List[np.ndarray], count: int, ids, q: np.ndarray, top_n: int) -> List[Tuple[str, float]]:
+    """Top-k rows of a block-partitioned matrix for a unit-length query."""
+    if count == 0 or top_n <= 0:
+        return []
+
+    parts = []
+    remaining = count
+    for block in blocks:
+        if remaining <= 0:
+            break
+        rows = min(remaining, block.shape[0])
+        parts.append(block[:rows] @ q)
+        remaining -= rows
+    scores = parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    k = min(top_n, count)
+    if k < count:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(count)
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return [(ids[int(row)], float(scores[row])) for row in top]
+
+
+def _rows(blocks: List[np.ndarray], count: int, dim: int) -> np.ndarray:
+    """The first ``count`` rows of a block-partitioned matrix as one array."""
+    if count == 0:
+        return np.zeros((0, dim), dtype=np.float32)
+    parts, remaining = [], count
+    for block in blocks:
+        if remaining <= 0:
+            break
+        parts.append(block[: min(remaining, block.shape[0])])
+        remaining -= parts[-1].shape[0]
+    return np.concatenate(parts)
+
+
+class MatrixView:
+    """Read-only snapshot of an EmbeddingMatrix."""
+
+    def __init__(self, blocks: List[np.ndarray], ids: FrozenColumn):
+        self._blocks = blocks
+        self._ids = ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def items(self, dim: int) -> Tuple[List[str], np.ndarray]:
+        """Return the IDs in the snapshot and a copy of their normalized rows."""
+        return list(self._ids), _rows(self._blocks, len(self._ids), dim)
+
+    def search(self, query: Sequence[float], top_n: int, **kwargs) -> List[Tuple[str, float]]:
+        """Return the entries with the highest cosine similarity to the query."""
+        return self._search_normalized(EmbeddingMatrix.normalize(query), top_n)
+
+    def _search_normalized(self, q: np.ndarray, top_n: int) -> List[Tuple[str, float]]:
+        return _top_k(self._blocks, len(self._ids), self._ids, q, top_n)
+
+
+class EmbeddingMatrix(VectorIndex):
+    """
+    Float32 matrix of pre-normalized embeddings keyed by entry ID.
+
+    Rows are packed densely: deleting a row moves the last row into the freed
+    slot (swap-remove), so the live rows are always ``0..len(self)-1`` and
+    the matrix never needs to be rebuilt after a delete. Rows are stored in
+    blocks of SEGMENT_SIZE so that snapshots are cheap: a block is copied
+    only when a writer overwrites a row a snapshot can still see.
+    """
+
+    def __init__(self, dim: int, initial_capacity: int = 1024):
+        """
+        Initialize an empty embedding matrix.
+
+        Args:
+            dim: Dimensionality of the stored embeddings
+            initial_capacity: Number of rows to preallocate (up to one block)
+        """
+        self.dim = dim
+        self._initial_capacity = max(1, min(initial_capacity, SEGMENT_SIZE))
+        self._blocks: List[np.ndarray] = []
+        self._block_gens: List[int] = []  # Generation in which each block object was created
+        self._gen = 0
+        self._frozen_length = 0  # Rows below this may be visible to a snapshot
+        self._ids = CowColumn()  # row -> entry ID
+        self._rows: Dict[str, int] = {}  # entry ID -> row
+        self._view: Optional[MatrixView] = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, entry_id: str) -> bool:
+        return entry_id in self._rows
+
+    @staticmethod
+    def normalize(vector: Sequence[float]) -> np.ndarray:
+        """Return the vector as a float32 array scaled to unit length."""
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        if norm == 0.0:
+            return vec
+        return vec / norm
+
+    def _capacity(self) -> int:
+        return sum(block.shape[0] for block in self._blocks)
+
+    def _reserve(self, extra: int) -> None:
+        """Ensure there is room for ``extra`` more rows."""
+        needed = len(self._ids) + extra
+        while self._capacity() < needed:
+            if not self._blocks:
+                self._blocks.append(np.zeros((self._initial_capacity, self.dim), dtype=np.float32))
+                self._block_gens.append(self._gen)
+            elif self._blocks[0].shape[0] < SEGMENT_SIZE:
+                # Grow the first block by doubling until it is a full segment
+                first = self._blocks[0]
+                grown = np.zeros((min(SEGMENT_SIZE, max(2 * first.shape[0], needed)), self.dim), dtype=np.float32)
+                grown[: first.shape[0]] = first
+                self._blocks[0] = grown
+                self._block_gens[0] = self._gen
+            else:
+                self._blocks.append(np.zeros((SEGMENT_SIZE, self.dim), dtype=np.float32))
+                self._block_gens.append(self._gen)
+
+    def _writable(self, row: int) -> np.ndarray:
+        """Return the block holding ``row``, copying it first if a snapshot shares it."""
+        number = row >> SEGMENT_SHIFT
+        block = self._blocks[number]
+        if row < self._frozen_length and self._block_gens[number] != self._gen:
+            block = block.copy()
+            self._blocks[number] = block
+            self._block_gens[number] = self._gen
+        return block
+
+    def _row(self, row: int) -> np.ndarray:
+        return self._blocks[row >> SEGMENT_SHIFT][row & SEGMENT_MASK]
+
+    def extend(self, entry_ids: Sequence[str], vectors: np.ndarray, normalized: bool = False) -> None:
+        """
+        Append many new embeddings at once.
+
+        Args:
+            entry_ids: IDs of the entries, none of which may already be present
+            vectors: Array of shape (len(entry_ids), dim)
+            normalized: Whether the rows are already unit length
+        """
+        if len(entry_ids) == 0:
+            return
+        block = np.asarray(vectors, dtype=np.float32)
+        if not normalized:
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            norms[norms == 0.0] = 1.0
+            block = block / norms
+        self._view = None
+        start = len(self._ids)
+        self._reserve(len(entry_ids))
+        done = 0
+        while done < len(entry_ids):
+            row = start + done
+            offset = row & SEGMENT_MASK
+            target = self._writable(row)
+            take = min(len(entry_ids) - done, target.shape[0] - offset)
+            target[offset: offset + take] = block[done: done + take]
+            done += take
+        for offset, entry_id in enumerate(entry_ids):
+            self._rows[entry_id] = start + offset
+            self._ids.append(entry_id)
+
+    def items(self) -> Tuple[List[str], np.ndarray]:
+        """Return the stored IDs and a copy of their normalized rows."""
+        return list(self._ids), _rows(self._blocks, len(self._ids), self.dim)
+
+    def upsert(self, entry_id: str, vector: Sequence[float]) -> None:
+        """
+        Insert or replace the embedding for an entry.
+
+        Args:
+            entry_id: ID of the memory entry
+            vector: Raw (unnormalized) embedding
+        """
+        self._view = None
+        row = self._rows.get(entry_id)
+        if row is None:
+            row = len(self._ids)
+            self._reserve(1)
+            self._ids.append(entry_id)
+            self._rows[entry_id] = row
+        self._writable(row)[row & SEGMENT_MASK] = self.normalize(vector)
+
+    def remove(self, entry_id: str) -> bool:
+        """
+        Remove an entry's embedding using swap-remove.
+
+        Returns:
+            True if the entry was present, False otherwise
+        """
+        row = self._rows.pop(entry_id, None)
+        if row is None:
+            return False
+        self._view = None
+        last = len(self._ids) - 1
+        if row != last:
+            moved_id = self._ids[last]
+            self._writable(row)[row & SEGMENT_MASK] = self._row(last)
+            self._ids[row] = moved_id
+            self._rows[moved_id] = row
+        self._ids.pop()
+        return True
+
+    def get(self, entry_id: str) -> Optional[np.ndarray]:
+        """Return a copy of the normalized embedding for an entry, if present."""
+        row = self._rows.get(entry_id)
+        if row is None:
+            return None
+        return self._row(row).copy()
+
+    def get_many(self, entry_ids: Sequence[str]) -> Tuple[np.ndarray, List[int]]:
+        """
+        Copy the normalized embeddings of several entries.
+
+        Returns:
+            Array of shape (len(entry_ids), dim) with zero rows for entries
+            that have no embedding, and the positions of those entries
+        """
+        out = np.zeros((len(entry_ids), self.dim), dtype=np.float32)
+        positions, rows, missing = [], [], []
+        for position, entry_id in enumerate(entry_ids):
+            row = self._rows.get(entry_id)
+            if row is None:
+                missing.append(position)
+            else:
+                positions.append(position)
+                rows.append(row)
+        if rows:
+            positions, rows = np.asarray(positions), np.asarray(rows)
+            blocks = rows >> SEGMENT_SHIFT
+            for number in np.unique(blocks).tolist():  # One gather per block
+                selected = blocks == number
+                out[positions[selected]] = self._blocks[number][rows[selected] & SEGMENT_MASK]
+        return out, missing
+
+    def score_ids(self, query: Sequence[float], entry_ids: Iterable[str]) -> List[Tuple[str, float]]:
+        """
+        Cosine similarity of the query to each given entry that has an embedding.
+
+        Args:
+            query: Raw (unnormalized) query embedding
+            entry_ids: Entries to score (e.g. a pre-filtered candidate set)
+
+        Returns:
+            List of (entry ID, similarity) pairs in input order
+        """
+        present = [entry_id for entry_id in entry_ids if entry_id in self._rows]
+        if not present:
+            return []
+        rows = np.stack([self._row(self._rows[entry_id]) for entry_id in present])
+        return list(zip(present, (rows @ self.normalize(query)).tolist()))
+
+    def clear(self) -> None:
+        """Remove all embeddings (snapshots keep the old blocks)."""
+        self._view = None
+        self._blocks = []
+        self._block_gens = []
+        self._frozen_length = 0
+        self._ids = CowColumn()
+        self._rows = {}
+
+    def snapshot(self) -> MatrixView:
+        """Return a read-only view; cached until the next write."""
+        if self._view is None:
+            self._gen += 1
+            self._frozen_length = len(self._ids)
+            self._view = MatrixView(list(self._blocks), self._ids.freeze())
+        return self._view
+
+    def search(self, query: Sequence[float], top_n: int, **kwargs) -> List[Tuple[str, float]]:
+        """
+        Return the entries with the highest cosine similarity to the query.
+
+        Args:
+            query: Raw (unnormalized) query embedding
+            top_n: Maximum number of results
+
+        Returns:
+            List of (entry ID, similarity) pairs, best match first
+        """
+        return self._search_normalized(self.normalize(query), top_n)
+
+    def _search_normalized(self, q: np.ndarray, top_n: int) -> List[Tuple[str, float]]:
+        """Top-k search for a query vector that is already unit length."""
+        return _top_k(self._blocks, len(self._ids), self._ids, q, top_n)
+
+
+def _ivf_search(centroids: Optional[np.ndarray], lists: Sequence, default_nprobe: int,
+                query: Sequence[float], top_n: int, nprobe: Optional[int]) -> List[Tuple[str, float]]:
+    """Scan the partitions closest to the query (all of them when untrained)."""
+    q = EmbeddingMatrix.normalize(query)
+    if centroids is None:
+        return lists[0]._search_normalized(q, top_n)
+
+    probes = max(1, min(nprobe or default_nprobe, len(lists)))
+    centroid_scores = centroids @ q
+    if probes < len(lists):
+        probe_lists = np.argpartition(-centroid_scores, probes - 1)[:probes]
+    else:
+        probe_lists = np.arange(len(lists))
+
+    candidates: List[Tuple[str, float]] = []
+    for list_no in probe_lists:
+        candidates.extend(lists[int(list_no)]._search_normalized(q, top_n))
+    return heapq.nlargest(top_n, candidates, key=lambda item: item[1])
+
+
+class IVFView:
+    """Read-only snapshot of an IVFFlatIndex."""
+
+    def __init__(self, centroids: Optional[np.ndarray], lists: List[MatrixView], nprobe: int, size: int):
+        self.centroids = centroids
+        self._lists = lists
+        self.nprobe = nprobe
+        self._size = size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def search(self, query: Sequence[float], top_n: int, nprobe: Optional[int] = None, **kwargs) -> List[Tuple[str, float]]:
+        """Return approximate top-k matches by scanning the closest partitions."""
+        if top_n <= 0 or not self._size:
+            return []
+        return _ivf_search(self.centroids, self._lists, self.nprobe, query, top_n, nprobe)
+
+
+# Partitions an IVFFlatIndex scans per query unless told otherwise
+DEFAULT_NPROBE = 8
+
+
+class TrainedPartitions(NamedTuple):
+    """Result of clustering an IVF snapshot, ready to be installed by IVFFlatIndex.finish_training."""
+    centroids: np.ndarray
+    ids: List[str]
+    data: np.ndarray  # Normalized rows of ids
+    assignments: np.ndarray  # Partition of each row
+
+
+class IVFFlatIndex(VectorIndex):
+    """
+    Approximate nearest-neighbour index using an inverted file (IVF-flat).
+
+    Vectors are partitioned by their nearest k-means centroid, and each
+    partition is stored as its own EmbeddingMatrix. A query scores the
+    centroids first and then scans only the ``nprobe`` closest partitions;
+    raising ``nprobe`` trades latency for recall. Until the index holds
+    ``train_threshold`` vectors it keeps a single partition, so searches are
+    exact for small stores. The centroids are due for retraining whenever
+    the index grows by ``retrain_growth`` since the last training.
+
+    ``nlist`` grows with the square root of the size while ``nprobe`` does
+    not, so recall at a fixed ``nprobe`` falls as the index grows (see
+    benchmarks/bench_ann_recall.py); stores only use the index when asked to.
+
+    Writes never train: ``training_due`` tells the owner when to, and
+    training is split so the clustering runs without the owner's lock
+    (``begin_training`` and ``finish_training`` under it, ``fit`` outside
+    it; train_outside_lock does all three). Writes made while ``fit`` runs
+    are replayed onto the new partitions when they are installed.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        nlist: Optional[int] = None,
+        nprobe: int = DEFAULT_NPROBE,
+        train_threshold: int = 20000,
+        retrain_growth: float = 4.0,
+        kmeans_iterations: int = 10,
+        seed: int = 0,
+    ):
+        """
+        Initialize an untrained IVF-flat index.
+
+        Args:
+            dim: Dimensionality of the stored embeddings
+            nlist: Number of partitions (default: about sqrt of the index size)
+            nprobe: Default number of partitions scanned per query
+            train_threshold: Minimum number of vectors before clustering
+            retrain_growth: Growth factor that triggers retraining
+            kmeans_iterations: Lloyd iterations per training run
+            seed: Seed for centroid initialization
+        """
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        self.retrain_growth = retrain_growth
+        self.kmeans_iterations = kmeans_iterations
+        self._rng = np.random.default_rng(seed)
+        self.centroids: Optional[np.ndarray] = None
+        self._trained_size = 0
+        self._lists: List[EmbeddingMatrix] = [EmbeddingMatrix(dim)]
+        self._assignment: Dict[str, int] = {}  # entry ID -> partition
+        self._training: Optional[IVFView] = None  # Snapshot being clustered, if a training is in flight
+        self._written: Set[str] = set()  # Entries written since that snapshot
+
+    def __len__(self) -> int:
+        return len(self._assignment)
+
+    def __contains__(self, entry_id: str) -> bool:
+        return entry_id in self._assignment
+
+    @property
+    def is_trained(self) -> bool:
+        """Whether the index has been partitioned by k-means centroids."""
+        return self.centroids is not None
+
+    def _nearest_centroids(self, block: np.ndarray, centroids: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return the nearest centroid (of the trained ones by default) for each row of a normalized block."""
+        centroids = self.centroids if centroids is None else centroids
+        assignments = np.empty(block.shape[0], dtype=np.int64)
+        for start in range(0, block.shape[0], 65536):
+            chunk = block[start: start + 65536]
+            assignments[start: start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+        return assignments
+
+    @property
+    def training_due(self) -> bool:
+        """Whether the index has grown enough to (re)train and no training is in flight."""
+        size = len(self._assignment)
+        if size < self.train_threshold or self._training is not None:
+            return False
+        return not self.is_trained or size >= self._trained_size * self.retrain_growth
+
+    def _touch(self, entry_ids: Iterable[str]) -> None:
+        """Record writes that a training in flight has not seen."""
+        if self._training is not None:
+            self._written.update(entry_ids)
+
+    def begin_training(self) -> Optional[IVFView]:
+        """
+        Start a training run. Call while holding the lock that serializes writes.
+
+        Returns:
+            The snapshot to pass to ``fit``, or None if a training is already in flight
+        """
+        if self._training is not None:
+            return None
+        self._training = self.snapshot()
+        self._written = set()
+        return self._training
+
+    def fit(self, view: IVFView) -> Optional[TrainedPartitions]:
+        """
+        Cluster a snapshot with spherical k-means. Needs no lock.
+
+        Training samples at most 64 vectors per centroid, then assigns every
+        vector of the snapshot to its nearest centroid.
+
+        Returns:
+            The partitions to install, or None if the snapshot is empty
+        """
+        ids: List[str] = []
+        blocks: List[np.ndarray] = []
+        for partition in view._lists:
+            part_ids, part_block = partition.items(self.dim)
+            ids.extend(part_ids)
+            blocks.append(part_block)
+        if not ids:
+            return None
+        data = np.concatenate(blocks) if len(blocks) > 1 else blocks[0]
+
+        nlist = self.nlist or max(1, int(math.sqrt(len(ids))))
+        nlist = min(nlist, len(ids))
+        sample_size = min(len(ids), nlist * 64)
+        sample = data[self._rng.choice(len(ids), size=sample_size, replace=False)]
+        centroids = sample[self._rng.choice(sample_size, size=nlist, replace=False)].copy()
+
+        for _ in range(self.kmeans_iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=nlist)
+            empty = counts == 0
+            if empty.any():
+                # Re-seed empty clusters with random sample points
+                sums[empty] = sample[self._rng.choice(sample_size, size=int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0.0] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+
+        return TrainedPartitions(centroids, ids, data, self._nearest_centroids(data, centroids))
+
+    def finish_training(self, view: IVFView, trained: Optional[TrainedPartitions]) -> bool:
+        """
+        End the training run started on ``view`` and install the result of
+        ``fit`` (None abandons the run). Call while holding the lock that
+        serializes writes.
+
+        Entries written or removed since the snapshot are not taken from it:
+        the ones still present are reassigned from their current vectors.
+
+        Returns:
+            True if the new partitions were installed, False if the run was
+            abandoned, the snapshot was empty or the index was cleared meanwhile
+        """
+        if view is not self._training:
+            return False
+        written, self._training, self._written = self._written, None, set()
+        if trained is None:
+            return False
+        current: Dict[str, np.ndarray] = {}
+        for entry_id in written:
+            list_no = self._assignment.get(entry_id)
+            if list_no is not None:
+                current[entry_id] = self._lists[list_no].get(entry_id)
+
+        nlist = trained.centroids.shape[0]
+        keep = np.fromiter((entry_id not in written and entry_id in self._assignment for entry_id in trained.ids),
+                           dtype=bool, count=len(trained.ids))
+        rows_kept = np.nonzero(keep)[0]
+        order = rows_kept[np.argsort(trained.assignments[rows_kept], kind="stable")]
+        bounds = np.searchsorted(trained.assignments[order], np.arange(nlist + 1))
+
+        self.centroids = trained.centroids
+        self._lists = []
+        self._assignment = {}
+        for list_no in range(nlist):
+            rows = order[bounds[list_no]: bounds[list_no + 1]]
+            partition = EmbeddingMatrix(self.dim, initial_capacity=max(16, len(rows)))
+            list_ids = [trained.ids[row] for row in rows]
+            partition.extend(list_ids, trained.data[rows], normalized=True)
+            self._lists.append(partition)
+            for entry_id in list_ids:
+                self._assignment[entry_id] = list_no
+        if current:
+            self.extend(list(current), np.stack(list(current.values())))
+        self._trained_size = len(self._assignment)
+        return True
+
+    def train(self) -> None:
+        """Cluster the stored vectors and rebuild the partitions, all at once (for callers without writers)."""
+        view = self.begin_training()
+        if view is not None:
+            self.finish_training(view, self.fit(view))
+
+    def extend(self, entry_ids: Sequence[str], vectors: np.ndarray) -> None:
+        """Append many new embeddings at once (IDs must not already be present)."""
+        if len(entry_ids) == 0:
+            return
+        block = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        norms[norms == 0.0] = 1.0
+        block = block / norms
+        self._touch(entry_ids)
+        if not self.is_trained:
+            self._lists[0].extend(entry_ids, block, normalized=True)
+            for entry_id in entry_ids:
+                self._assignment[entry_id] = 0
+        else:
+            assignments = self._nearest_centroids(block)
+            for list_no in np.unique(assignments):
+                rows = np.nonzero(assignments == list_no)[0]
+                list_ids = [entry_ids[row] for row in rows]
+                self._lists[int(list_no)].extend(list_ids, block[rows], normalized=True)
+                for entry_id in list_ids:
+                    self._assignment[entry_id] = int(list_no)
+
+    def upsert(self, entry_id: str, vector: Sequence[float]) -> None:
+        """Insert or replace an embedding, moving it to its nearest partition."""
+        vec = EmbeddingMatrix.normalize(vector)
+        self._touch((entry_id,))
+        list_no = 0
+        if self.is_trained:
+            list_no = int(np.argmax(self.centroids @ vec))
+        previous = self._assignment.get(entry_id)
+        if previous is not None and previous != list_no:
+            self._lists[previous].remove(entry_id)
+        self._lists[list_no].upsert(entry_id, vec)
+        self._assignment[entry_id] = list_no
+
+    def remove(self, entry_id: str) -> bool:
+        """Remove an embedding from its partition."""
+        list_no = self._assignment.pop(entry_id, None)
+        if list_no is None:
+            return False
+        self._touch((entry_id,))
+        return self._lists[list_no].remove(entry_id)
+
+    def clear(self) -> None:
+        """Remove all embeddings and discard the trained centroids (and any training in flight)."""
+        self._training = None
+        self._written = set()
+        self.centroids = None
+        self._trained_size = 0
+        self._lists = [EmbeddingMatrix(self.dim)]
+        self._assignment = {}
+
+    def search(self, query: Sequence[float], top_n: int, nprobe: Optional[int] = None, **kwargs) -> List[Tuple[str, float]]:
+        """
+        Return approximate top-k matches by scanning the closest partitions.
+
+        Args:
+            query: Raw (unnormalized) query embedding
+            top_n: Maximum number of results
+            nprobe: Number of partitions to scan (default: ``self.nprobe``)
+
+        Returns:
+            List of (entry ID, similarity) pairs, best match first
+        """
+        if top_n <= 0 or not self._assignment:
+            return []
+        return _ivf_search(self.centroids, self._lists, self.nprobe, query, top_n, nprobe)
+
+    def snapshot(self) -> IVFView:
+        """Return a read-only view; partitions that did not change reuse their cached views."""
+        return IVFView(self.centroids, [partition.snapshot() for partition in self._lists],
+                       self.nprobe, len(self._assignment))
+
+
+def train_outside_lock(index: Any, lock) -> bool:
+    """
+    Train an IVF index without holding the writers' lock while clustering.
+
+    The snapshot is taken and the trained partitions installed under
+    ``lock``; k-means runs in between without it, so readers and writers
+    are only blocked for the capture and the swap.
+
+    Returns:
+        True if new partitions were installed
+    """
+    with lock:
+        view = index.begin_training()
+    if view is None:
+        return False
+    try:
+        trained = index.fit(view)
+    except BaseException:
+        with lock:
+            index.finish_training(view, None)
+        raise
+    with lock:
+        return index.finish_training(view, trained)
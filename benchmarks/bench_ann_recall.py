@@ -0,0 +1,75 @@
+"""
+ANN Recall Benchmark for Oculus Dei Memory Store
+
+Measures recall@k and query latency of the IVF-flat index against the exact
+embedding-matrix scan. Data is drawn from a mixture of Gaussian clusters so
+that it has the neighbourhood structure of real embeddings.
+
+Usage:
+    python -m benchmarks.bench_ann_recall --sizes 100000,1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from backend.memory.vector_index import EmbeddingMatrix, IVFFlatIndex
+
+
+def make_dataset(size: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """Generate ``size`` vectors around ``clusters`` random centres."""
+    centres = rng.normal(size=(clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=size)
+    data = centres[labels] + 1.5 * rng.normal(size=(size, dim)).astype(np.float32)
+    return data.astype(np.float32)
+
+
+def run(size: int, dim: int, queries: int, k: int, nprobes: list, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    data = make_dataset(size, dim, clusters=max(16, size // 500), rng=rng)
+    ids = [str(i) for i in range(size)]
+
+    exact = EmbeddingMatrix(dim, initial_capacity=size)
+    exact.extend(ids, data)
+
+    start = time.perf_counter()
+    ann = IVFFlatIndex(dim, train_threshold=min(size, 20000))
+    ann.extend(ids, data)
+    ann.train()
+    build_s = time.perf_counter() - start
+
+    query_rows = rng.choice(size, size=queries, replace=False)
+    query_vecs = data[query_rows] + 0.5 * rng.normal(size=(queries, dim)).astype(np.float32)
+
+    start = time.perf_counter()
+    truth = [set(e for e, _ in exact.search(q, k)) for q in query_vecs]
+    exact_ms = (time.perf_counter() - start) * 1000 / queries
+
+    print(f"\nN={size:,} dim={dim} nlist={len(ann._lists)} build={build_s:.1f}s")
+    print(f"  exact scan      : {exact_ms:8.3f} ms/query  recall@{k}=1.000")
+    for nprobe in nprobes:
+        start = time.perf_counter()
+        found = [set(e for e, _ in ann.search(q, k, nprobe=nprobe)) for q in query_vecs]
+        ann_ms = (time.perf_counter() - start) * 1000 / queries
+        recall = sum(len(f & t) for f, t in zip(found, truth)) / (k * queries)
+        print(f"  ivf nprobe={nprobe:<4d}: {ann_ms:8.3f} ms/query  recall@{k}={recall:.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100000,1000000", help="Comma-separated index sizes")
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", default="1,4,8,16,32,64,128", help="Comma-separated nprobe values")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    nprobes = [int(p) for p in args.nprobe.split(",")]
+    for size in (int(s) for s in args.sizes.split(",")):
+        run(size, args.dim, args.queries, args.k, nprobes, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Async Indexing Benchmark for Oculus Dei Memory Store
+
+Compares POST /memory/manual latency when store() indexes synchronously
+with the opt-in background indexing mode, and reports how long the index
+watermark takes to catch up after the burst of writes. The API runs
+in-process with TestClient; both memory_writer and memory_api are pointed
+at the store under test.
+
+Usage:
+    python -m benchmarks.bench_async_indexing --size 20000 --writes 2000
+"""
+
+import argparse
+import random
+import time
+
+from fastapi.testclient import TestClient
+
+from backend.api import memory_api
+from backend.memory import memory_writer
+from backend.memory.memory_store import MemoryEntry, MemoryStore
+from backend.memory.vector_index import IVFFlatIndex
+
+WORDS = ("project", "decision", "meeting", "budget", "design", "review", "launch", "health",
+         "reading", "training", "finance", "travel", "family", "research", "deadline", "idea")
+
+
+def content(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run(async_indexing: bool, size: int, writes: int, words: int, seed: int, direct: bool):
+    rng = random.Random(seed)
+    store = MemoryStore(ann_index=IVFFlatIndex(dim=128), async_indexing=async_indexing)
+    store.store_many([MemoryEntry(type="event", content=content(rng, words)) for _ in range(size)])
+    store.wait_for_index()
+    memory_writer.memory_store = memory_api.memory_store = store
+    client = TestClient(memory_api.app)
+    bodies = [content(rng, words) for _ in range(writes)]
+
+    latencies = []
+    start = time.perf_counter()
+    for body in bodies:
+        began = time.perf_counter()
+        if direct:
+            store.store(MemoryEntry(type="event", content=body))
+        else:
+            client.post("/memory/manual", json={"type": "event", "content": body})
+        latencies.append((time.perf_counter() - began) * 1000)
+    burst = time.perf_counter() - start
+    lag = store.index_status()["pending"]
+    store.wait_for_index()
+    caught_up = time.perf_counter() - start
+    store.close()
+    return latencies, burst, caught_up, lag
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=60, help="Words per entry")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    original = memory_writer.memory_store, memory_api.memory_store
+    try:
+        print(f"N={args.size:,}, {args.writes:,} writes of {args.words} words")
+        print(f"{'path':<24}{'p50 ms':>9}{'p99 ms':>9}{'writes/s':>10}{'pending at end':>16}{'indexed after s':>17}")
+        for path, direct in (("POST /memory/manual", False), ("MemoryStore.store", True)):
+            for label, async_indexing in (("sync", False), ("async", True)):
+                latencies, burst, caught_up, lag = run(async_indexing, args.size, args.writes, args.words,
+                                                       args.seed, direct)
+                print(f"{path + ' ' + label:<24}{percentile(latencies, 0.5):>9.2f}"
+                      f"{percentile(latencies, 0.99):>9.2f}{args.writes / burst:>10.0f}{lag:>16}{caught_up:>17.2f}")
+    finally:
+        memory_writer.memory_store, memory_api.memory_store = original
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Storage Backend Benchmark for Oculus Dei Memory Store
+
+Loads the same synthetic memory into the in-memory MemoryStore and the
+SQLite backend, then times every memory_retriever function against each.
+The retriever reads the global store from memory_writer, so each backend is
+installed there in turn.
+
+Usage:
+    python -m benchmarks.bench_backends --size 100000 --repeat 20
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from backend.memory import memory_retriever, memory_writer
+from backend.memory.memory_store import MemoryEntry, MemoryStore
+from backend.memory.sqlite_store import SQLiteMemoryStore
+from backend.memory.vector_index import IVFFlatIndex
+
+WORDS = ("project", "decision", "meeting", "budget", "design", "review", "launch", "health",
+         "reading", "training", "finance", "travel", "family", "research", "deadline", "idea")
+TYPES = ("event", "decision", "insight", "error")
+PROJECTS = [f"Project {i}" for i in range(50)]
+
+
+def make_entries(size: int, seed: int):
+    """Synthetic entries spread over 30 days, linked to a few dozen projects."""
+    rng = random.Random(seed)
+    now = datetime.now()
+    entries = []
+    project_ids = []
+    for name in PROJECTS:
+        entry = MemoryEntry(type="project", content=f"Started {name}", metadata={"project_name": name},
+                            timestamp=now - timedelta(days=30))
+        project_ids.append(entry.id)
+        entries.append(entry)
+    for i in range(size - len(entries)):
+        project = rng.randrange(len(PROJECTS))
+        entries.append(MemoryEntry(
+            type=TYPES[i % len(TYPES)],
+            content=" ".join(rng.choice(WORDS) for _ in range(10)),
+            metadata={"related_to": project_ids[project], "category": rng.choice(WORDS),
+                      "activity_type": rng.choice(WORDS[:4])},
+            timestamp=now - timedelta(seconds=rng.uniform(0, 30 * 86400)),
+        ))
+    return entries
+
+
+CALLS = [
+    ("get_last_decisions", lambda: memory_retriever.get_last_decisions(5)),
+    ("find_entries_by_keyword", lambda: memory_retriever.find_entries_by_keyword("budget review")),
+    ("find_entries_by_keyword+type", lambda: memory_retriever.find_entries_by_keyword("budget", "decision")),
+    ("semantic_search", lambda: memory_retriever.semantic_search("design review meeting", 5)),
+    ("get_related_entries", lambda: memory_retriever.get_related_entries("category", "travel")),
+    ("get_decision_history_for_project",
+     lambda: memory_retriever.get_decision_history_for_project(PROJECTS[7])),
+    ("summarize_recent_events", lambda: memory_retriever.summarize_recent_events(3)),
+    ("get_recent_errors(1 day)", lambda: memory_retriever.get_recent_errors(1)),
+    ("get_entries_in_timeframe(1h)",
+     lambda: memory_retriever.get_entries_in_timeframe(datetime.now() - timedelta(hours=1))),
+    ("count_entries_by_type", lambda: memory_retriever.count_entries_by_type()),
+    ("find_patterns_in_events(1 day)", lambda: memory_retriever.find_patterns_in_events(1)),
+]
+
+
+def time_calls(store, repeat: int) -> dict:
+    memory_writer.memory_store = store
+    results = {}
+    for name, call in CALLS:
+        call()  # Warm up (loads the SQLite embedding matrix, trains nothing new)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            call()
+        results[name] = (time.perf_counter() - start) * 1000 / repeat
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    entries = make_entries(args.size, args.seed)
+    directory = tempfile.mkdtemp()
+    original = memory_writer.memory_store
+    try:
+        in_memory = MemoryStore(ann_index=IVFFlatIndex(dim=128))
+        start = time.perf_counter()
+        for entry in entries:
+            in_memory.store(entry)
+        memory_load = time.perf_counter() - start
+
+        sqlite = SQLiteMemoryStore(os.path.join(directory, "memory.sqlite3"), ann_index=IVFFlatIndex(dim=128))
+        start = time.perf_counter()
+        for entry in entries:
+            sqlite.store(entry)
+        sqlite_load = time.perf_counter() - start
+
+        print(f"N={args.size:,}  load: memory {memory_load:.1f}s, sqlite {sqlite_load:.1f}s")
+        memory_times = time_calls(in_memory, args.repeat)
+        sqlite_times = time_calls(sqlite, args.repeat)
+        print(f"{'retriever function':<34}{'memory ms':>12}{'sqlite ms':>12}")
+        for name, _ in CALLS:
+            print(f"{name:<34}{memory_times[name]:>12.3f}{sqlite_times[name]:>12.3f}")
+        sqlite.close()
+    finally:
+        memory_writer.memory_store = original
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
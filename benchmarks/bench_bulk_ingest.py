@@ -0,0 +1,109 @@
+"""
+Bulk Ingestion Benchmark for Oculus Dei Memory Store
+
+Compares entries/sec of the per-item write path with the batched one, both
+directly against MemoryStore (in memory and with a durable WAL) and through
+the HTTP API (POST /memory/manual per item versus POST /memory/bulk with a
+JSON array or an NDJSON body). The API runs in-process with TestClient, so
+the numbers exclude network time.
+
+Usage:
+    python -m benchmarks.bench_bulk_ingest --size 20000 --api-size 2000
+"""
+
+import argparse
+import json
+import random
+import shutil
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+from backend.api import memory_api
+from backend.memory.memory_store import MemoryEntry, MemoryStore
+from backend.memory.vector_index import IVFFlatIndex
+
+WORDS = ("project", "decision", "meeting", "budget", "design", "review", "launch", "health",
+         "reading", "training", "finance", "travel", "family", "research", "deadline", "idea")
+TYPES = ("event", "decision", "insight", "project")
+
+
+def make_items(size: int, seed: int):
+    rng = random.Random(seed)
+    return [{"type": TYPES[i % len(TYPES)], "content": " ".join(rng.choice(WORDS) for _ in range(10)),
+             "metadata": {"category": rng.choice(WORDS)}} for i in range(size)]
+
+
+def rate(size: int, seconds: float) -> str:
+    return f"{size / seconds:>10,.0f}"
+
+
+def bench_store(items, durability=None, batch_size=1000):
+    """Return (per-item seconds, batched seconds) for one store configuration."""
+    results = []
+    for batched in (False, True):
+        directory = tempfile.mkdtemp() if durability else None
+        store = (MemoryStore.open(directory, durability=durability, ann_index=IVFFlatIndex(dim=128))
+                 if durability else MemoryStore(ann_index=IVFFlatIndex(dim=128)))
+        entries = [MemoryEntry(**item) for item in items]
+        start = time.perf_counter()
+        if batched:
+            for i in range(0, len(entries), batch_size):
+                store.store_many(entries[i: i + batch_size])
+        else:
+            for entry in entries:
+                store.store(entry)
+        if durability:
+            store.persistence.sync()
+        results.append(time.perf_counter() - start)
+        if durability:
+            store.close()
+            shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def bench_api(items, api_items):
+    client = TestClient(memory_api.app)
+    memory_api.memory_store.clear()
+    start = time.perf_counter()
+    for item in api_items:
+        client.post("/memory/manual", json=item)
+    manual = time.perf_counter() - start
+
+    memory_api.memory_store.clear()
+    start = time.perf_counter()
+    client.post("/memory/bulk", json=items)
+    array = time.perf_counter() - start
+
+    memory_api.memory_store.clear()
+    body = "\n".join(json.dumps(item) for item in items)
+    start = time.perf_counter()
+    client.post("/memory/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+    ndjson = time.perf_counter() - start
+    memory_api.memory_store.clear()
+    return manual, array, ndjson
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--api-size", type=int, default=2000, help="Items sent one request at a time")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    items = make_items(args.size, args.seed)
+
+    print(f"N={args.size:,} (per-item API: {args.api_size:,})  entries/sec")
+    print(f"{'path':<34}{'per-item':>10}{'batched':>10}")
+    for label, durability in (("MemoryStore (in memory)", None), ("MemoryStore (WAL, always)", "always"),
+                              ("MemoryStore (WAL, batch)", "batch")):
+        single, batched = bench_store(items, durability)
+        print(f"{label:<34}{rate(args.size, single)}{rate(args.size, batched)}")
+
+    manual, array, ndjson = bench_api(items, items[: args.api_size])
+    print(f"{'API /memory/manual vs bulk JSON':<34}{rate(args.api_size, manual)}{rate(args.size, array)}")
+    print(f"{'API bulk NDJSON':<34}{'':>10}{rate(args.size, ndjson)}")
+
+
+if __name__ == "__main__":
+    main()
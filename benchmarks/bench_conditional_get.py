@@ -0,0 +1,56 @@
+"""
+Conditional GET Benchmark for Oculus Dei Memory API
+
+Polls the read endpoints the dashboard refreshes (/memory/last,
+/memory/insights, /memory/stats) through the ASGI test client, once
+unconditionally and once revalidating with If-None-Match, and reports the
+latency and body bytes per request for each.
+
+Usage:
+    python -m benchmarks.bench_conditional_get --size 10000
+"""
+
+import argparse
+import time
+
+from fastapi.testclient import TestClient
+
+from backend.api import memory_api
+from backend.memory.memory_store import MemoryEntry
+
+PATHS = ("/memory/last?n=100", "/memory/insights?limit=100", "/memory/stats")
+
+
+def poll(client: TestClient, path: str, requests: int, conditional: bool):
+    etag = client.get(path).headers["etag"]
+    headers = {"If-None-Match": etag} if conditional else {}
+    body_bytes = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        body_bytes += len(client.get(path, headers=headers).content)
+    return (time.perf_counter() - start) / requests * 1000, body_bytes / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    store = memory_api.get_memory_store()
+    store.clear()
+    store.store_many(MemoryEntry(type="insight" if i % 4 == 0 else "event",
+                                 content=f"entry {i} with a sentence of polled content")
+                     for i in range(args.size))
+    client = TestClient(memory_api.app)
+    print(f"{args.size:,} entries")
+    print(f"{'endpoint':<30}{'200 ms':>10}{'bytes':>10}{'304 ms':>10}{'bytes':>8}")
+    for path in PATHS:
+        full_ms, full_bytes = poll(client, path, args.requests, False)
+        cond_ms, cond_bytes = poll(client, path, args.requests, True)
+        print(f"{path:<30}{full_ms:>10.3f}{full_bytes:>10,.0f}{cond_ms:>10.3f}{cond_bytes:>8,.0f}")
+    store.clear()
+
+
+if __name__ == "__main__":
+    main()
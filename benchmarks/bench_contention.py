@@ -0,0 +1,97 @@
+"""
+Lock Contention Benchmark for Oculus Dei Memory Store
+
+Runs reader threads (similarity search, unanchored regex search and
+get_last, in rotation) against one writer thread that stores and updates
+entries, and reports read throughput and write latency for each reader
+count. Readers only hold the store lock while they pin a snapshot, so
+writer latency should stay flat as readers are added.
+
+Usage:
+    python -m benchmarks.bench_contention --size 20000 --duration 3
+"""
+
+import argparse
+import os
+import random
+import statistics
+import threading
+import time
+
+from backend.memory.memory_store import MemoryEntry, MemoryStore
+from backend.memory.vector_index import IVFFlatIndex
+
+WORDS = ("project", "decision", "meeting", "budget", "design", "review", "launch", "health",
+         "reading", "training", "finance", "travel", "family", "research", "deadline", "idea")
+
+READS = (
+    lambda store: store.search_by_similarity("design review meeting", top_n=10),
+    lambda store: store.search_by_regex(r"budget\s+\w+"),
+    lambda store: store.get_last(20),
+)
+
+
+def make_entry(rng: random.Random) -> MemoryEntry:
+    return MemoryEntry(type=rng.choice(("event", "decision", "insight")),
+                       content=" ".join(rng.choice(WORDS) for _ in range(10)),
+                       metadata={"category": rng.choice(WORDS)})
+
+
+def run(store: MemoryStore, readers: int, duration: float, seed: int):
+    """Return (reads/s, write latencies in ms) for one reader count."""
+    stop = threading.Event()
+    reads = [0] * readers
+
+    def reader(number: int) -> None:
+        i = number
+        while not stop.is_set():
+            READS[i % len(READS)](store)
+            reads[number] += 1
+            i += 1
+
+    threads = [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    for thread in threads:
+        thread.start()
+    rng = random.Random(seed)
+    latencies = []
+    written = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        if written and rng.random() < 0.2:
+            store.update_entry(rng.choice(written), content=" ".join(rng.choice(WORDS) for _ in range(10)))
+        else:
+            written.append(store.store(make_entry(rng)))
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.001)  # A steady write stream rather than a saturating one
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(reads) / duration, latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--readers", type=int, nargs="+", default=[0, 1, 2, 4, 8])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    store = MemoryStore(ann_index=IVFFlatIndex(dim=128))
+    for _ in range(args.size):
+        store.store(make_entry(rng))
+
+    print(f"N={args.size:,}  cpus={os.cpu_count()}  {args.duration:.0f}s per run")
+    print(f"{'readers':>8}{'reads/s':>10}{'writes/s':>10}{'write p50 ms':>14}{'write p99 ms':>14}")
+    for readers in args.readers:
+        throughput, latencies = run(store, readers, args.duration, args.seed + readers)
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{readers:>8}{throughput:>10.0f}{len(latencies) / args.duration:>10.0f}"
+              f"{statistics.median(latencies):>14.3f}{p99:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
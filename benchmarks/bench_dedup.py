@@ -0,0 +1,111 @@
+"""
+Near-Duplicate Benchmark for Oculus Dei Memory Store
+
+Simulates a reflection-heavy workload: the reflector re-derives the same
+handful of insights from slightly different wording every cycle, among a
+stream of distinct events. Reports, per duplicate policy, store() cost,
+entries kept and an estimate of the bytes saved. Then times one duplicate
+lookup (band keys plus bucket probe plus exact check) as the store grows,
+against comparing the new content with every stored entry of its type.
+
+Usage:
+    python -m benchmarks.bench_dedup --writes 20000
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from backend.memory.memory_store import MemoryEntry, MemoryStore
+from backend.memory.near_duplicates import band_keys, shingle_set, similarity
+from backend.memory.sqlite_store import SQLiteMemoryStore
+
+INSIGHTS = [
+    "You tend to skip workouts when work deadlines pile up early in the week",
+    "Your sleep improves on days you walk outside before noon",
+    "Spending spikes in the days after a stressful meeting with the team",
+    "Most of your project decisions are made late in the evening",
+    "You respond to family messages faster on weekends than on weekdays",
+    "Learning sessions are longest when scheduled right after breakfast",
+]
+VARIANTS = [lambda s: s, str.lower, lambda s: s + ".", lambda s: s.replace("the", "your", 1),
+            lambda s: s + " again", lambda s: "Note: " + s]
+
+
+def workload(writes: int, seed: int):
+    """One insight for every two events, insights drawn from a small repertoire."""
+    rng = random.Random(seed)
+    entries = []
+    for i in range(writes):
+        if i % 3 == 2:
+            content = rng.choice(VARIANTS)(rng.choice(INSIGHTS))
+            entries.append(MemoryEntry(type="insight", content=content, metadata={"source": "reflector"}))
+        else:
+            entries.append(MemoryEntry(type="event", content=f"event {i}: {rng.getrandbits(64):x} logged at desk {i % 7}"))
+    return entries
+
+
+def entry_bytes(entry: MemoryEntry) -> int:
+    """Rough in-memory size of one entry: content, metadata and its float32 embedding."""
+    return sys.getsizeof(entry.content) + sys.getsizeof(str(entry.metadata)) + 128 * 4
+
+
+def policies(entries) -> None:
+    print(f"{'store':<8}{'policy':<8}{'us/write':>10}{'entries':>10}{'absorbed':>10}{'KB saved':>10}")
+    for backend in ("memory", "sqlite"):
+        for policy in ("off", "drop", "count", "merge"):
+            store = (MemoryStore(duplicate_policy=policy) if backend == "memory"
+                     else SQLiteMemoryStore(":memory:", duplicate_policy=policy))
+            batch = [MemoryEntry(type=e.type, content=e.content, metadata=dict(e.metadata)) for e in entries]
+            start = time.perf_counter()
+            for entry in batch:
+                store.store(entry)
+            per_write = (time.perf_counter() - start) / len(batch) * 1e6
+            kept = store.count_entries()
+            saved = sum(entry_bytes(entry) for entry in batch if store.get_by_id(entry.id) is None)
+            print(f"{backend:<8}{policy:<8}{per_write:>10.1f}{kept:>10,}{store.duplicates_absorbed:>10,}"
+                  f"{saved / 1024:>10.0f}")
+            if backend == "sqlite":
+                store.close()
+
+
+def lookup_scaling(sizes, seed: int) -> None:
+    rng = random.Random(seed)
+    print(f"\n{'entries':>9}{'LSH lookup us':>15}{'linear scan us':>16}")
+    for size in sizes:
+        store = MemoryStore(duplicate_policy="drop")
+        contents = [f"insight {i}: " + " ".join(rng.choice(INSIGHTS).split()[rng.randrange(4):]) + f" {i * 7919:x}"
+                    for i in range(size)]
+        store.store_many([MemoryEntry(type="insight", content=content) for content in contents], deduplicate=False)
+        probes = [MemoryEntry(type="insight", content=f"brand new observation number {i} about the week")
+                  for i in range(200)]
+        start = time.perf_counter()
+        for probe in probes:
+            with store._lock:
+                store._find_duplicate(probe, band_keys(probe.content), True)
+        lsh = (time.perf_counter() - start) / len(probes) * 1e6
+
+        signed = [shingle_set(content) for content in contents]  # Precomputed, favouring the scan
+        scan_probes = probes[:5]
+        start = time.perf_counter()
+        for probe in scan_probes:
+            shingles = shingle_set(probe.content)
+            any(similarity(shingles, other) >= 0.8 for other in signed)
+        scan = (time.perf_counter() - start) / len(scan_probes) * 1e6
+        print(f"{size:>9,}{lsh:>15.1f}{scan:>16.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writes", type=int, default=20000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    policies(workload(args.writes, args.seed))
+    lookup_scaling(args.sizes, args.seed)
+
+
+if __name__ == "__main__":
+    main()
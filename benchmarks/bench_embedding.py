@@ -0,0 +1,75 @@
+"""
+Embedding Kernel Benchmark for Oculus Dei Memory Store
+
+Measures embeddings/sec of hashed_embedding for short (log line), medium
+(note) and long (journal entry) texts, against a reference copy of the
+original per-token md5 implementation, and checks both produce identical
+vectors. Words are drawn from a Zipf-like distribution over a 5,000-word
+vocabulary so the token cache sees a realistic mix of hits and misses.
+
+Usage:
+    python -m benchmarks.bench_embedding --count 5000
+"""
+
+import argparse
+import hashlib
+import random
+import re
+import time
+
+import numpy as np
+
+from backend.memory.memory_store import hashed_embedding
+
+LENGTHS = (("short (12 words)", 12), ("medium (60 words)", 60), ("long (300 words)", 300))
+
+
+def reference_embedding(text: str, dim: int) -> np.ndarray:
+    """The original implementation: md5 per token and per bigram, accumulated one by one."""
+    vector = np.zeros(dim, dtype=np.float32)
+    if not text:
+        return vector
+    tokens = re.findall(r"\w+", text.lower())
+    for i, token in enumerate(tokens):
+        idx = int(hashlib.md5(token.encode("utf-8")).hexdigest(), 16) % dim
+        vector[idx] += 1.0
+        if i + 1 < len(tokens):
+            bigram = f"{token}_{tokens[i + 1]}"
+            b_idx = int(hashlib.md5(bigram.encode("utf-8")).hexdigest(), 16) % dim
+            vector[b_idx] += 0.5
+    return vector
+
+
+def make_texts(count: int, words: int, rng: random.Random):
+    vocabulary = [f"w{i}" + "x" * (i % 7) for i in range(5000)]
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    return [" ".join(rng.choices(vocabulary, weights, k=words)) + "." for _ in range(count)]
+
+
+def throughput(function, texts, dim: int) -> float:
+    start = time.perf_counter()
+    for text in texts:
+        function(text, dim)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    print(f"{'text length':<20}{'reference/s':>14}{'current/s':>14}{'speedup':>10}")
+    for label, words in LENGTHS:
+        texts = make_texts(args.count, words, rng)
+        for text in texts[:200]:
+            assert np.array_equal(hashed_embedding(text, args.dim), reference_embedding(text, args.dim))
+        reference = throughput(reference_embedding, texts, args.dim)
+        current = throughput(hashed_embedding, texts, args.dim)
+        print(f"{label:<20}{reference:>14,.0f}{current:>14,.0f}{current / reference:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Export/Import Benchmark for Oculus Dei Memory Store
+
+Measures the throughput of streaming a store out and back in, per format
+and backend: MB/s of export bytes and entries per second, for export and
+for import into an empty store. The columnar format is run with its
+embeddings (reused on import) and without them (recomputed on import).
+
+Also compares the peak Python heap allocated while exporting (tracemalloc)
+with building the whole export in one go from the entry list, as a
+non-streaming endpoint would.
+
+Usage:
+    python -m benchmarks.bench_export --entries 100000
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+from backend.memory.export import export_stream, import_stream
+from backend.memory.memory_store import MemoryEntry, MemoryStore
+from backend.memory.sqlite_store import SQLiteMemoryStore
+
+WORDS = ("meeting", "workout", "budget", "call", "review", "deadline", "doctor", "lunch", "travel", "report")
+READ_SIZE = 64 * 1024  # Import chunks, as read from a file or request body
+
+
+def sample_entries(count: int, seed: int):
+    rng = random.Random(seed)
+    return [MemoryEntry(type=rng.choice(("event", "decision", "insight")),
+                        content=" ".join(rng.choice(WORDS) for _ in range(12)) + f" #{i}",
+                        metadata={"source": "bench", "priority": rng.randrange(5), "tags": [rng.choice(WORDS)]})
+            for i in range(count)]
+
+
+def read_blocks(data: bytes):
+    return (data[i:i + READ_SIZE] for i in range(0, len(data), READ_SIZE))
+
+
+def throughput(name: str, source, make_target, fmt: str, embeddings: bool = True) -> None:
+    start = time.perf_counter()
+    data = b"".join(export_stream(source, fmt, embeddings=embeddings))
+    export_seconds = time.perf_counter() - start
+    target = make_target()
+    start = time.perf_counter()
+    imported = import_stream(target, read_blocks(data), fmt)
+    import_seconds = time.perf_counter() - start
+    megabytes = len(data) / 2 ** 20
+    print(f"{name:<42}{megabytes:>8.1f}{megabytes / export_seconds:>13.1f}{imported / export_seconds:>13,.0f}"
+          f"{megabytes / import_seconds:>13.1f}{imported / import_seconds:>13,.0f}")
+    target.close()
+
+
+def peak_heap(source) -> None:
+    tracemalloc.start()
+    total = sum(len(chunk) for chunk in export_stream(source, "ndjson"))
+    streaming = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    tracemalloc.start()
+    materialized = "".join(json.dumps(entry.to_dict(), default=str) + "\n" for entry in source.entries)
+    whole = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"\nPeak heap for a {total / 2 ** 20:.1f} MB NDJSON export: streamed {streaming / 2 ** 20:.1f} MB, "
+          f"built from the entry list {whole / 2 ** 20:.1f} MB ({len(materialized) / 2 ** 20:.1f} MB of output)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    memory = MemoryStore()
+    memory.store_many(sample_entries(args.entries, args.seed))
+    sqlite = SQLiteMemoryStore(":memory:")
+    import_stream(sqlite, export_stream(memory, "columnar"))
+
+    print(f"{args.entries:,} entries")
+    print(f"{'source -> target, format':<42}{'MB':>8}{'export MB/s':>13}{'entries/s':>13}"
+          f"{'import MB/s':>13}{'entries/s':>13}")
+    for source_name, source in (("memory", memory), ("sqlite", sqlite)):
+        for target_name, make_target in (("memory", MemoryStore), ("sqlite", lambda: SQLiteMemoryStore(":memory:"))):
+            route = f"{source_name} -> {target_name}"
+            throughput(f"{route}, ndjson", source, make_target, "ndjson")
+            throughput(f"{route}, columnar", source, make_target, "columnar")
+            throughput(f"{route}, columnar w/o embeddings", source, make_target, "columnar", embeddings=False)
+    peak_heap(memory)
+    sqlite.close()
+
+
+if __name__ == "__main__":
+    main()
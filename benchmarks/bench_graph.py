@@ -0,0 +1,123 @@
+"""
+Graph Traversal Benchmark for Oculus Dei Memory Store
+
+Times a project timeline (the whole connected component of a project
+entry, oldest first) as the store grows while the component stays the
+same size: decisions linked to the project and events linked to the
+decisions. Compares the graph index (linked_component) with walking the
+links through the related_to metadata index, one lookup per entry in both
+directions, and with scanning every entry once per level of the walk.
+
+Usage:
+    python -m benchmarks.bench_graph --sizes 1000 10000 100000 --component 60
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from backend.memory.graph_index import link_targets
+from backend.memory.memory_store import MemoryEntry, MemoryStore
+from backend.memory.sqlite_store import SQLiteMemoryStore
+
+WORDS = ("meeting", "workout", "budget", "call", "review", "deadline", "doctor", "lunch", "travel", "report")
+
+
+def build(size: int, component: int, seed: int):
+    """A store of ``size`` entries in projects of ``component`` linked entries each."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    entries, roots = [], []
+    while len(entries) < size:
+        project = MemoryEntry(type="project", content=f"project {len(roots)}",
+                              metadata={"project_name": f"project {len(roots)}"},
+                              timestamp=start + timedelta(minutes=rng.randrange(10 ** 6)))
+        roots.append(project.id)
+        entries.append(project)
+        decisions = [project.id]
+        for i in range(component - 1):
+            entry_type = "decision" if i % 3 == 0 else "event"
+            entry = MemoryEntry(type=entry_type, content=" ".join(rng.choice(WORDS) for _ in range(8)),
+                                metadata={"related_to": rng.choice(decisions)},
+                                timestamp=start + timedelta(minutes=rng.randrange(10 ** 6)))
+            if entry_type == "decision":
+                decisions.append(entry.id)
+            entries.append(entry)
+    return entries[:size], roots
+
+
+def walk_metadata(store, root: str):
+    """Breadth-first walk with one related_to lookup and one get_by_id per visited entry."""
+    seen = {root}
+    frontier = [root]
+    while frontier:
+        next_frontier = []
+        for entry_id in frontier:
+            entry = store.get_by_id(entry_id)
+            neighbours = [e.id for e in store.search_by_metadata("related_to", entry_id)]
+            neighbours += link_targets(entry.metadata)
+            for other in neighbours:
+                if other not in seen:
+                    seen.add(other)
+                    next_frontier.append(other)
+        frontier = next_frontier
+    return sorted((store.get_by_id(entry_id) for entry_id in seen), key=lambda entry: entry.timestamp)
+
+
+def walk_scan(store, root: str):
+    """Breadth-first walk reading every entry once per level."""
+    seen = {root}
+    frontier = {root}
+    while frontier:
+        entries = store.entries
+        found = set()
+        for entry in entries:
+            targets = link_targets(entry.metadata)
+            if entry.id in frontier:
+                found.update(targets)
+            elif frontier.intersection(targets):
+                found.add(entry.id)
+        frontier = found - seen
+        seen |= frontier
+    return sorted((entry for entry in store.entries if entry.id in seen), key=lambda entry: entry.timestamp)
+
+
+def timed_ms(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--component", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--scan-limit", type=int, default=10000, help="Largest store the scan baseline runs on")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"Component of {args.component} entries")
+    print(f"{'store':<8}{'entries':>9}{'graph ms':>10}{'metadata walk ms':>18}{'scan walk ms':>14}")
+    for size in args.sizes:
+        entries, roots = build(size, args.component, args.seed)
+        for name in ("memory", "sqlite"):
+            store = MemoryStore() if name == "memory" else SQLiteMemoryStore(":memory:")
+            store.store_many(entries)
+            root = roots[len(roots) // 2]
+            expected = [entry.id for entry in store.linked_component([root])]
+            assert [entry.id for entry in walk_metadata(store, root)] == expected
+            graph = timed_ms(lambda: store.linked_component([root]), args.repeat)
+            metadata = timed_ms(lambda: walk_metadata(store, root), max(1, args.repeat // 4))
+            scan = "-"
+            if size <= args.scan_limit:
+                scan = f"{timed_ms(lambda: walk_scan(store, root), 1):.0f}"
+            print(f"{name:<8}{size:>9,}{graph:>10.2f}{metadata:>18.2f}{scan:>14}")
+            if name == "sqlite":
+                store.close()
+
+
+if __name__ == "__main__":
+    main()
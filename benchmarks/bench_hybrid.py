@@ -0,0 +1,96 @@
+"""
+Hybrid Retrieval Benchmark for Oculus Dei Memory Store
+
+Compares one GET /memory/hybrid request with what the frontend did before:
+GET /memory/search plus GET /memory/semantic and a reciprocal rank fusion of
+the two lists on the client. Queries are run unfiltered and with a one-week
+time window, which lets the hybrid endpoint score only the entries inside the
+window. The API runs in-process with TestClient, so the numbers exclude
+network time.
+
+Usage:
+    python -m benchmarks.bench_hybrid --size 50000 --queries 200
+"""
+
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from backend.api import memory_api
+from backend.memory.hybrid import RRF_K
+from backend.memory.memory_store import MemoryEntry
+
+WORDS = ("project", "decision", "meeting", "budget", "design", "review", "launch", "health",
+         "reading", "training", "finance", "travel", "family", "research", "deadline", "idea")
+TYPES = ("event", "decision", "insight", "project")
+
+
+def populate(size: int, rng: random.Random) -> None:
+    now = datetime.now()
+    entries = [MemoryEntry(type=TYPES[i % len(TYPES)],
+                           content=" ".join(rng.choice(WORDS) for _ in range(10)),
+                           timestamp=now - timedelta(minutes=rng.randrange(365 * 24 * 60)))
+               for i in range(size)]
+    memory_api.memory_store.clear()
+    for i in range(0, size, 1000):
+        memory_api.memory_store.store_many(entries[i: i + 1000])
+
+
+def client_side(client: TestClient, query: str, n: int, window):
+    """The two-request path: keyword and semantic lists merged by RRF in the client."""
+    keyword = client.get("/memory/search", params={"q": query, "n": 500}).json()["entries"]
+    semantic = client.get("/memory/semantic", params={"q": query, "n": 50}).json()["entries"]
+    if window:
+        keyword = [e for e in keyword if e["timestamp"] >= window["start"]]
+        semantic = [e for e in semantic if e["timestamp"] >= window["start"]]
+    scores = {}
+    for ranking in (keyword, semantic):
+        for rank, entry in enumerate(ranking, start=1):
+            scores[entry["id"]] = scores.get(entry["id"], 0.0) + 1.0 / (RRF_K + rank)
+    return sorted(scores, key=scores.get, reverse=True)[:n]
+
+
+def hybrid(client: TestClient, query: str, n: int, window):
+    params = {"q": query, "n": n, **(window or {})}
+    return [entry["id"] for entry in client.get("/memory/hybrid", params=params).json()["entries"]]
+
+
+def latencies(function, client, queries, n, window):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        function(client, query, n, window)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--n", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    populate(args.size, rng)
+    client = TestClient(memory_api.app)
+    queries = [" ".join(rng.sample(WORDS, 2)) for _ in range(args.queries)]
+    week = {"start": (datetime.now() - timedelta(days=7)).isoformat()}
+
+    print(f"{args.size:,} entries, {args.queries} queries, top {args.n}")
+    print(f"{'path':<40}{'p50 ms':>10}{'p95 ms':>10}")
+    for label, window in (("unfiltered", None), ("last 7 days", week)):
+        for name, function in (("search + semantic + merge", client_side), ("hybrid", hybrid)):
+            samples = sorted(latencies(function, client, queries, args.n, window))
+            p95 = samples[int(len(samples) * 0.95) - 1]
+            print(f"{name + ', ' + label:<40}{statistics.median(samples):>10.2f}{p95:>10.2f}")
+    memory_api.memory_store.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Memory Footprint Benchmark for Oculus Dei Memory Store
+
+Measures the bytes each stored entry costs once the caller has dropped its
+own MemoryEntry objects, split into primary storage and each index.
+Allocations are traced with tracemalloc, so the numbers are Python heap
+bytes (including NumPy buffers) rather than process RSS.
+
+Usage:
+    python -m benchmarks.bench_memory_footprint --size 100000
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from backend.memory.memory_store import MemoryEntry, MemoryStore
+
+WORDS = ("project", "decision", "meeting", "budget", "design", "review", "launch", "health",
+         "reading", "training", "finance", "travel", "family", "research", "deadline", "idea")
+
+# Attributes released one at a time to attribute memory to each structure
+COMPONENTS = ("content_trigrams", "metadata_trigrams", "text_index", "metadata_index",
+              "embeddings", "time_index", "type_index")
+
+
+def make_entry(i: int) -> MemoryEntry:
+    """An entry shaped like memory_writer output: ~70 characters and four metadata keys."""
+    words = " ".join(WORDS[(i * 7 + k * 3) % len(WORDS)] for k in range(8))
+    return MemoryEntry(
+        type=("event", "decision", "insight", "project")[i % 4],
+        content=f"Entry {i}: {words}",
+        metadata={"category": WORDS[i % len(WORDS)], "source": "benchmark",
+                  "event_time": "2024-05-17T09:30:12.123456", "priority": i % 3},
+    )
+
+
+def traced() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100000)
+    args = parser.parse_args()
+    n = args.size
+
+    tracemalloc.start()
+    base = traced()
+    store = MemoryStore()
+    for i in range(n):
+        store.store(make_entry(i))
+    total = traced() - base
+
+    print(f"N={n:,}  total {total / n:8.0f} bytes/entry  (x 1M = {total / n * 1e6 / 2 ** 30:.2f} GiB)")
+    for name in COMPONENTS:
+        before = traced()
+        setattr(store, name, None)
+        print(f"  {name:<18}{(before - traced()) / n:8.0f} bytes/entry")
+    before = traced()
+    del store
+    print(f"  {'entries + slots':<18}{(before - traced()) / n:8.0f} bytes/entry")
+
+
+if __name__ == "__main__":
+    main()
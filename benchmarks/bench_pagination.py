@@ -0,0 +1,98 @@
+"""
+Pagination Benchmark for Oculus Dei Memory Store
+
+Measures how page latency grows with depth for offset pagination (read the
+newest offset+limit entries and slice) versus keyset cursors
+(MemoryStore.page), and the throughput and peak Python heap of exporting
+the whole store through GET /memory/entries?format=ndjson versus building
+one JSON list of every entry. The API runs in-process with TestClient, so
+the numbers exclude network time; note that TestClient itself keeps the
+whole response body, which shows up in the stream's peak heap.
+
+Usage:
+    python -m benchmarks.bench_pagination --size 200000
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from backend.api import memory_api
+from backend.memory.memory_store import MemoryEntry
+
+PAGE = 100
+
+
+def populate(size: int) -> None:
+    base = datetime(2024, 1, 1)
+    memory_api.memory_store.clear()
+    for i in range(0, size, 1000):
+        memory_api.memory_store.store_many([
+            MemoryEntry(type="event", content=f"entry {j} with a short sentence of content",
+                        timestamp=base + timedelta(seconds=j), metadata={"category": "bench"})
+            for j in range(i, min(i + 1000, size))
+        ])
+
+
+def page_latency(depths):
+    store = memory_api.memory_store
+    print(f"{'depth':>10}{'offset ms':>12}{'cursor ms':>12}")
+    for depth in depths:
+        start = time.perf_counter()
+        store.get_last(depth + PAGE)[depth:]
+        offset = (time.perf_counter() - start) * 1000
+
+        after = None
+        for _ in range(depth // PAGE):
+            _, after = store.page(limit=PAGE, after=after)
+        start = time.perf_counter()
+        store.page(limit=PAGE, after=after)
+        cursor = (time.perf_counter() - start) * 1000
+        print(f"{depth:>10,}{offset:>12.2f}{cursor:>12.2f}")
+
+
+def export(size: int) -> None:
+    client = TestClient(memory_api.app)
+    print(f"\n{'export':<28}{'seconds':>10}{'MB/s':>10}{'peak heap MB':>14}")
+
+    def materialized():
+        entries = memory_api.memory_store.get_all()
+        return json.dumps([memory_api.memory_entry_to_response(e).model_dump() for e in entries]).encode()
+
+    def streamed():
+        total = 0
+        with client.stream("GET", "/memory/entries", params={"format": "ndjson"}) as response:
+            for chunk in response.iter_bytes():
+                total += len(chunk)
+        return total
+
+    for label, function in (("one JSON list", materialized), ("NDJSON stream", streamed)):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()  # Separate run: tracing slows allocation-heavy code several times over
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        size_bytes = result if isinstance(result, int) else len(result)
+        print(f"{label:<28}{elapsed:>10.2f}{size_bytes / elapsed / 1e6:>10.1f}{peak / 1e6:>14.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=200000)
+    args = parser.parse_args()
+
+    populate(args.size)
+    print(f"{args.size:,} entries, pages of {PAGE}")
+    page_latency([d for d in (0, 1000, 10000, 100000, 1000000) if d + PAGE <= args.size])
+    export(args.size)
+    memory_api.memory_store.clear()
+
+
+if __name__ == "__main__":
+    main()
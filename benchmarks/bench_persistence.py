@@ -0,0 +1,94 @@
+"""
+Persistence Benchmark for Oculus Dei Memory Store
+
+Measures write throughput of a durable MemoryStore under each WAL
+durability mode, and cold-start time (snapshot load plus WAL-tail replay,
+including rebuilding every index) for stores of increasing size.
+
+Usage:
+    python -m benchmarks.bench_persistence --writes 20000 --sizes 100000,1000000
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+
+from backend.memory.memory_store import MemoryEntry, MemoryStore
+from backend.memory.persistence import DurabilityMode
+
+WORDS = ("project", "decision", "meeting", "budget", "design", "review", "launch", "health",
+         "reading", "training", "finance", "travel", "family", "research", "deadline", "idea")
+
+
+def make_entry(i: int) -> MemoryEntry:
+    """A synthetic entry with a few words of content and typical metadata."""
+    words = " ".join(WORDS[(i * 7 + k * 3) % len(WORDS)] for k in range(8))
+    return MemoryEntry(
+        type=("event", "decision", "insight", "project")[i % 4],
+        content=f"Entry {i}: {words}",
+        metadata={"category": WORDS[i % len(WORDS)], "source": "benchmark"},
+    )
+
+
+def bench_writes(count: int) -> None:
+    print(f"\nWrite throughput ({count:,} stores)")
+    for mode in (None, DurabilityMode.OS, DurabilityMode.BATCH, DurabilityMode.ALWAYS):
+        # fsync per record is orders of magnitude slower; keep that run short
+        n = count if mode != DurabilityMode.ALWAYS else max(1, count // 20)
+        entries = [make_entry(i) for i in range(n)]
+        directory = tempfile.mkdtemp()
+        try:
+            store = MemoryStore() if mode is None else MemoryStore.open(
+                directory, durability=mode, snapshot_every=10 ** 9)
+            start = time.perf_counter()
+            for entry in entries:
+                store.store(entry)
+            store.close()
+            elapsed = time.perf_counter() - start
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        label = "in-memory" if mode is None else mode.value
+        print(f"  {label:<10}: {n / elapsed:10,.0f} writes/s  ({n:,} in {elapsed:.2f}s)")
+
+
+def bench_cold_start(size: int, tail: int) -> None:
+    directory = tempfile.mkdtemp()
+    try:
+        store = MemoryStore.open(directory, durability=DurabilityMode.OS, snapshot_every=10 ** 9)
+        for i in range(size - tail):
+            store.store(make_entry(i))
+        start = time.perf_counter()
+        store.snapshot()
+        snapshot_s = time.perf_counter() - start
+        for i in range(size - tail, size):
+            store.store(make_entry(i))
+        store.close()
+        del store
+
+        start = time.perf_counter()
+        restored = MemoryStore.open(directory, durability=DurabilityMode.OS)
+        restore_s = time.perf_counter() - start
+        assert restored.count_entries() == size
+        restored.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print(f"  N={size:>9,} (WAL tail {tail:,}): snapshot write {snapshot_s:6.2f}s  "
+          f"cold start {restore_s:6.2f}s  ({size / restore_s:,.0f} entries/s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writes", type=int, default=20000)
+    parser.add_argument("--sizes", default="100000,1000000")
+    parser.add_argument("--tail", type=int, default=10000, help="WAL records after the snapshot")
+    args = parser.parse_args()
+
+    bench_writes(args.writes)
+    print("\nCold start (snapshot + WAL tail, all indexes rebuilt)")
+    for size in (int(s) for s in args.sizes.split(",")):
+        bench_cold_start(size, min(args.tail, size))
+
+
+if __name__ == "__main__":
+    main()
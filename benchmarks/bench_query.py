@@ -0,0 +1,88 @@
+"""
+Query Planner Benchmark for Oculus Dei Memory Store
+
+Times MemoryStore.query against the single-purpose method plus Python
+post-filtering that callers used before, for filter combinations where
+one clause is much more selective than the other. Every pair is checked to
+return the same entries before it is timed.
+
+Usage:
+    python -m benchmarks.bench_query --size 100000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from backend.memory.columnar import time_key
+from backend.memory.memory_store import MemoryEntry, MemoryStore
+
+WORDS = ("project", "decision", "meeting", "budget", "design", "review", "launch", "health",
+         "reading", "training", "finance", "travel", "family", "research", "deadline", "idea")
+TYPES = ("event", "decision", "insight", "project")
+
+
+def populate(size: int, seed: int) -> MemoryStore:
+    rng = random.Random(seed)
+    now = datetime.now()
+    store = MemoryStore()
+    entries = [MemoryEntry(type=TYPES[i % len(TYPES)], content=" ".join(rng.choice(WORDS) for _ in range(10)),
+                           timestamp=now - timedelta(minutes=rng.randrange(365 * 24 * 60)),
+                           metadata={"project_name": f"project-{rng.randrange(1000)}",
+                                     "category": rng.choice(WORDS)})
+               for i in range(size)]
+    for i in range(0, size, 1000):
+        store.store_many(entries[i: i + 1000])
+    return store
+
+
+def cases(store: MemoryStore):
+    """(label, post-filtering function, planned query function) triples."""
+    week = datetime.now() - timedelta(days=7)
+
+    def newest(entries, limit):
+        return sorted(entries, key=lambda e: e.timestamp, reverse=True)[:limit]
+
+    return [
+        ("type + project",
+         lambda: newest(store.search_by_metadata("project_name", "project-7", entry_type="decision"), 50),
+         lambda: store.query(entry_type="decision", metadata={"project_name": "project-7"})[0]),
+        ("type + regex, newest 20",
+         lambda: newest([e for e in store.search_by_regex(r"budget \w+ travel") if e.type == "insight"], 20),
+         lambda: store.query(entry_type="insight", regex=r"budget \w+ travel", limit=20)[0]),
+        ("keyword + last 7 days",
+         lambda: [e for e in store.search_by_text("family deadline") if time_key(e.timestamp) >= time_key(week)],
+         lambda: store.query(keyword="family deadline", start=week, limit=store.count_entries())[0]),
+        ("category contains + type",
+         lambda: newest([e for e in store.search_by_metadata_value("category", "sear") if e.type == "event"], 50),
+         lambda: store.query(entry_type="event", metadata_contains={"category": "sear"})[0]),
+    ]
+
+
+def timed(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    store = populate(args.size, args.seed)
+    print(f"{args.size:,} entries")
+    print(f"{'query':<28}{'post-filter ms':>16}{'query() ms':>12}{'speedup':>10}")
+    for label, before, planned in cases(store):
+        assert {e.id for e in before()} == {e.id for e in planned()}, label
+        old = timed(before, args.repeat)
+        new = timed(planned, args.repeat)
+        print(f"{label:<28}{old:>16.2f}{new:>12.2f}{old / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Query Cache Benchmark for Oculus Dei Memory Store
+
+Times repeated keyword, regex, semantic and hybrid searches with the query
+result cache bypassed (use_cache=False) and with a warm cache, then replays
+a dashboard-like mix of repeated queries interleaved with writes and reports
+the hit rate and mean latency with and without the cache.
+
+Usage:
+    python -m benchmarks.bench_query_cache --size 100000
+"""
+
+import argparse
+import random
+import time
+
+from backend.memory.memory_store import MemoryEntry, MemoryStore
+
+TYPES = ("event", "decision", "insight", "project")
+WORDS = ("planning", "budget", "meeting", "review", "health", "training", "forecast", "family", "release", "travel")
+
+
+def make_entries(size: int, seed: int):
+    rng = random.Random(seed)
+    return [MemoryEntry(type=rng.choice(TYPES), content=" ".join(rng.choices(WORDS, k=8)) + f" note {i}")
+            for i in range(size)]
+
+
+QUERIES = (
+    ("keyword", lambda store, cache: store.search_by_text("planning budget", limit=20, use_cache=cache)),
+    ("regex", lambda store, cache: store.search_by_regex(r"review \w+ forecast", use_cache=cache)),
+    ("semantic", lambda store, cache: store.search_by_similarity("planning the release budget", 10,
+                                                                 use_cache=cache)),
+    ("hybrid", lambda store, cache: store.search_hybrid("training health", 10, use_cache=cache)),
+)
+
+
+def timed(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def repeats(store: MemoryStore, repeat: int) -> None:
+    print(f"{'query':<12}{'uncached ms':>14}{'cached ms':>12}")
+    for label, run in QUERIES:
+        run(store, True)  # Warm the cache
+        uncached = timed(lambda: run(store, False), repeat)
+        cached = timed(lambda: run(store, True), repeat * 100)
+        print(f"{label:<12}{uncached:>14.2f}{cached:>12.4f}")
+
+
+def mixed(store: MemoryStore, requests: int, write_every: int, seed: int) -> None:
+    rng = random.Random(seed)
+    plan = [rng.choice(QUERIES)[1] for _ in range(requests)]
+    print(f"\n{requests} repeated queries, one write every {write_every}")
+    for cache in (False, True):
+        before = store.query_cache.stats()
+        start = time.perf_counter()
+        for number, run in enumerate(plan, 1):
+            run(store, cache)
+            if number % write_every == 0:
+                store.store(MemoryEntry(type="event", content=f"planning update {number}"))
+        elapsed = (time.perf_counter() - start) / requests * 1000
+        after = store.query_cache.stats()
+        hits, misses = after["hits"] - before["hits"], after["misses"] - before["misses"]
+        rate = hits / (hits + misses) if hits + misses else 0.0
+        print(f"{'cached' if cache else 'uncached':<12}{elapsed:>10.2f} ms/query{rate:>10.1%} hit rate")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--write-every", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    store = MemoryStore()
+    entries = make_entries(args.size, args.seed)
+    for i in range(0, args.size, 1000):
+        store.store_many(entries[i: i + 1000])
+    print(f"{args.size:,} entries")
+    repeats(store, args.repeat)
+    mixed(store, args.requests, args.write_every, args.seed)
+
+
+if __name__ == "__main__":
+    main()
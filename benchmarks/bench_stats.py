@@ -0,0 +1,101 @@
+"""
+Statistics Benchmark for Oculus Dei Memory Store
+
+Times the statistics reads against what they replaced: counts by type
+by walking every entry (the old count_entries_by_type) and a daily time
+series by bucketing every entry, versus the counters both stores now
+maintain on each write. Also reports what maintaining the counters costs
+writers: EntryCounters.add per entry for the in-memory store, and SQLite
+store_many throughput with and without the counting triggers.
+
+Usage:
+    python -m benchmarks.bench_stats --size 100000
+"""
+
+import argparse
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from backend.memory.columnar import time_key
+from backend.memory.entry_counters import EntryCounters
+from backend.memory.memory_store import MemoryEntry, MemoryStore
+from backend.memory.sqlite_store import SQLiteMemoryStore
+
+TYPES = ("event", "decision", "insight", "project")
+CATEGORIES = ("work", "health", "finance", "family", "learning")
+
+
+def make_entries(size: int, seed: int):
+    rng = random.Random(seed)
+    now = datetime.now()
+    return [MemoryEntry(type=rng.choice(TYPES), content=f"entry {i} with a short sentence of content",
+                        timestamp=now - timedelta(minutes=rng.randrange(365 * 24 * 60)),
+                        metadata={"category": rng.choice(CATEGORIES)})
+            for i in range(size)]
+
+
+def timed(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def reads(store: MemoryStore, repeat: int) -> None:
+    def scan_types():
+        return dict(Counter(entry.type for entry in store.entries))
+
+    def scan_days():
+        days = Counter(entry.timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+                       for entry in store.entries)
+        return sorted(days.items())
+
+    assert scan_types() == store.count_by_type()
+    assert scan_days() == [(start, count) for start, count, _ in store.timeseries("day")]
+    print(f"{'read':<28}{'scan ms':>10}{'counters ms':>14}")
+    for label, scan, counted in (("counts by type", scan_types, store.count_by_type),
+                                 ("daily time series", scan_days, lambda: store.timeseries("day"))):
+        print(f"{label:<28}{timed(scan, repeat):>10.2f}{timed(counted, repeat * 100):>14.4f}")
+
+
+def write_cost(entries) -> None:
+    keys = [(entry.type, entry.metadata["category"], time_key(entry.timestamp)) for entry in entries]
+    counters = EntryCounters()
+    start = time.perf_counter()
+    for entry_type, category, key in keys:
+        counters.add(entry_type, category, key)
+    per_add = (time.perf_counter() - start) / len(keys) * 1e6
+    print(f"\nEntryCounters.add: {per_add:.2f} us per entry")
+
+    for label, triggers in (("with counting triggers", True), ("without", False)):
+        store = SQLiteMemoryStore(":memory:")
+        if not triggers:
+            store._conn.executescript("DROP TRIGGER entry_counts_insert;")
+        start = time.perf_counter()
+        for i in range(0, len(entries), 1000):
+            store.store_many(entries[i: i + 1000])
+        elapsed = time.perf_counter() - start
+        print(f"SQLite store_many {label:<24}{len(entries) / elapsed:>10,.0f} entries/s")
+        store.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    entries = make_entries(args.size, args.seed)
+    store = MemoryStore()
+    for i in range(0, args.size, 1000):
+        store.store_many(entries[i: i + 1000])
+    print(f"{args.size:,} entries")
+    reads(store, args.repeat)
+    write_cost(entries)
+
+
+if __name__ == "__main__":
+    main()
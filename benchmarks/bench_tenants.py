@@ -0,0 +1,134 @@
+"""
+Tenant Partitioning Benchmark for Oculus Dei Memory Store
+
+Compares per-request latency of one shared store, where every tenant's
+entries are mixed and a request filters by a ``tenant`` metadata field,
+with one partition per tenant behind TenantStores. Latency is measured for
+the newest 10 entries of a tenant and for a keyword search, as the number
+of tenants grows with a fixed number of entries each.
+
+A second pass runs a skewed (Zipf) request stream over every tenant with a
+memory budget that fits only a fraction of them, and reports how often a
+request had to load its tenant from disk and what those loads cost.
+
+Usage:
+    python -m benchmarks.bench_tenants --tenants 1 10 100 1000 --entries 100
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+from backend.memory.memory_store import MemoryEntry, MemoryStore
+from backend.memory.tenants import TenantStores
+
+WORDS = ("meeting", "workout", "budget", "call", "review", "deadline", "doctor", "lunch", "travel", "report")
+
+
+def tenant_entries(tenant_id: str, count: int, rng: random.Random):
+    return [MemoryEntry(type="event", content=f"{rng.choice(WORDS)} {rng.choice(WORDS)} note {i}",
+                        metadata={"tenant": tenant_id}) for i in range(count)]
+
+
+def timed_us(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def open_partitions(directory: str, budget: int, idle_seconds: float = 0) -> TenantStores:
+    return TenantStores(lambda tenant_id: MemoryStore.open(os.path.join(directory, tenant_id), durability="os"),
+                        MemoryStore(), memory_budget=budget, idle_seconds=idle_seconds)
+
+
+def scaling(tenant_counts, entries: int, repeat: int, seed: int) -> None:
+    print(f"{'tenants':>8}{'shared last us':>16}{'partition last us':>19}{'shared search us':>18}"
+          f"{'partition search us':>21}")
+    for count in tenant_counts:
+        rng = random.Random(seed)
+        ids = [f"tenant-{i}" for i in range(count)]
+        shared = MemoryStore(indexed_metadata_keys=("tenant",))
+        directory = tempfile.mkdtemp()
+        partitions = open_partitions(directory, budget=1 << 40)
+        for tenant_id in ids:
+            batch = tenant_entries(tenant_id, entries, rng)
+            shared.store_many(batch)
+            partitions.get(tenant_id).store_many([MemoryEntry(type=e.type, content=e.content, metadata=e.metadata)
+                                                  for e in batch])
+        probe = ids[len(ids) // 2]
+
+        def shared_last():
+            return shared.search_by_metadata("tenant", probe)[-10:]
+
+        def shared_search():
+            return [e for e in shared.search_by_text("budget") if e.metadata.get("tenant") == probe]
+
+        def partition_last():
+            return partitions.get(probe).get_last(10)
+
+        def partition_search():
+            return partitions.get(probe).search_by_text("budget")
+
+        assert len(shared_search()) == len(partition_search())
+        print(f"{count:>8,}{timed_us(shared_last, repeat):>16.1f}{timed_us(partition_last, repeat):>19.1f}"
+              f"{timed_us(shared_search, repeat):>18.1f}{timed_us(partition_search, repeat):>21.1f}")
+        partitions.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def eviction(tenants: int, entries: int, requests: int, resident_share: float, seed: int) -> None:
+    rng = random.Random(seed)
+    directory = tempfile.mkdtemp()
+    ids = [f"tenant-{i}" for i in range(tenants)]
+    loader = open_partitions(directory, budget=1 << 40)
+    for tenant_id in ids:
+        loader.get(tenant_id).store_many(tenant_entries(tenant_id, entries, rng))
+        loader.evict(tenant_id)
+    per_tenant = MemoryStore.open(os.path.join(directory, ids[0]), durability="os")
+    budget = int(per_tenant.approximate_bytes() * tenants * resident_share)
+    per_tenant.close()
+
+    partitions = open_partitions(directory, budget)
+    weights = [1 / (rank + 1) for rank in range(tenants)]  # Zipf: a few tenants are busy, most are idle
+    stream = rng.choices(ids, weights, k=requests)
+    warm, cold = [], []
+    for tenant_id in stream:
+        loads = partitions.loads
+        start = time.perf_counter()
+        partitions.get(tenant_id).get_last(10)
+        elapsed = (time.perf_counter() - start) * 1000
+        (cold if partitions.loads > loads else warm).append(elapsed)
+    stats = partitions.stats()
+    print(f"\n{tenants:,} tenants x {entries} entries, budget for {resident_share:.0%} of them, "
+          f"{requests:,} Zipf requests")
+    print(f"  resident tenants {len(stats['resident'])}, {stats['resident_bytes'] / 2 ** 20:.1f} of "
+          f"{stats['memory_budget'] / 2 ** 20:.1f} MiB; loads {stats['loads']:,}, evictions {stats['evictions']:,}")
+    print(f"  warm requests {len(warm):,}: median {statistics.median(warm):.3f} ms")
+    if cold:
+        print(f"  cold requests {len(cold):,} ({len(cold) / requests:.1%}): median {statistics.median(cold):.1f} ms, "
+              f"max {max(cold):.1f} ms (snapshot of the evicted tenant plus loading this one)")
+    partitions.close()
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--entries", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--resident-share", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    scaling(args.tenants, args.entries, args.repeat, args.seed)
+    eviction(max(args.tenants), args.entries, args.requests, args.resident_share, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -82,7 +82,7 @@ export const MemoryProvider: React.FC<{children: React.ReactNode}> = ({ children
     if (!query || query.length < 2) return [];
 
     try {
-      const res = await fetch(`${API_BASE_URL}/memory/search?q=${encodeURIComponent(query)}`);
+      const res = await fetch(`${API_BASE_URL}/memory/hybrid?q=${encodeURIComponent(query)}`);
       if (!res.ok) {
         throw new Error(`Error searching memories: ${res.status}`);
       }
@@ -113,12 +113,36 @@ export const MemoryProvider: React.FC<{children: React.ReactNode}> = ({ children
   useEffect(() => {
     refresh();
 
-    // Optional: Set up periodic refresh every 30 seconds
-    const intervalId = setInterval(() => {
-      refresh();
-    }, 30000);
-
-    return () => clearInterval(intervalId);
+    // Follow writes as they happen instead of polling. EventSource reconnects
+    // on its own and resumes from the last event it saw (Last-Event-ID).
+    const source = new EventSource(`${API_BASE_URL}/memory/stream`);
+    const parse = (event: Event) => JSON.parse((event as MessageEvent).data);
+
+    source.addEventListener('store', (event) => {
+      const { entry } = parse(event);
+      setEntries(prev =>
+        [entry, ...prev.filter(e => e.id !== entry.id)]
+          .sort((a, b) => b.timestamp.localeCompare(a.timestamp))
+          .slice(0, 20)
+      );
+    });
+    source.addEventListener('update', (event) => {
+      const { id, content, metadata } = parse(event);
+      setEntries(prev => prev.map(e => e.id !== id ? e : {
+        ...e,
+        content: content ?? e.content,
+        metadata: metadata ? { ...e.metadata, ...metadata } : e.metadata
+      }));
+    });
+    source.addEventListener('delete', (event) => {
+      const { id } = parse(event);
+      setEntries(prev => prev.filter(e => e.id !== id));
+    });
+    // After a clear, or a resync (this client fell behind), reload instead of patching
+    source.addEventListener('clear', () => refresh());
+    source.addEventListener('resync', () => refresh());
+
+    return () => source.close();
   }, [refresh]);
 
   return (
@@ -0,0 +1,75 @@
+import threading
+import unittest
+
+from backend.memory.change_feed import ChangeFeed
+from backend.memory.memory_store import MemoryEntry, MemoryStore
+
+
+class ChangeFeedTest(unittest.TestCase):
+    def setUp(self):
+        self.feed = ChangeFeed(history=5, max_pending=3)
+
+    def test_sequences_and_fan_out(self):
+        first = self.feed.subscribe()
+        second = self.feed.subscribe()
+        self.feed.publish([{"op": "delete", "id": "a"}, {"op": "delete", "id": "b"}])
+        for subscription in (first, second):
+            self.assertEqual([(c["seq"], c["id"]) for c in subscription.drain()], [(1, "a"), (2, "b")])
+        first.close()
+        self.feed.publish([{"op": "delete", "id": "c"}])
+        self.assertEqual(first.drain(), [])
+        self.assertEqual([c["seq"] for c in second.get(timeout=0)], [3])
+        self.assertEqual(self.feed.subscriber_count, 1)
+
+    def test_resume_from_history(self):
+        self.feed.publish([{"op": "delete", "id": str(i)} for i in range(4)])
+        with self.feed.subscribe(after=2) as subscription:
+            self.assertEqual([c["seq"] for c in subscription.drain()], [3, 4])
+        with self.feed.subscribe(after=4) as subscription:
+            self.assertEqual(subscription.drain(), [])
+
+    def test_resume_before_history_resyncs(self):
+        self.feed.publish([{"op": "delete", "id": str(i)} for i in range(8)])
+        with self.feed.subscribe(after=2) as subscription:
+            self.assertEqual(subscription.drain(), [{"seq": 8, "op": "resync"}])
+        with self.feed.subscribe(after=3) as subscription:  # Seqs 4-8 are all still buffered
+            self.assertEqual([c["seq"] for c in subscription.drain()], [4, 5, 6, 7, 8])
+
+    def test_slow_subscriber_is_dropped_to_resync(self):
+        woken = []
+        subscription = self.feed.subscribe(on_ready=lambda: woken.append(True))
+        self.feed.publish([{"op": "delete", "id": str(i)} for i in range(5)])
+        self.assertEqual(len(woken), 1)  # Only the empty -> non-empty transition wakes the consumer
+        self.assertEqual(subscription.drain(), [{"seq": 5, "op": "resync"}])
+        self.assertEqual(subscription.dropped, 5)
+        self.feed.publish([{"op": "delete", "id": "next"}])
+        self.assertEqual([c["seq"] for c in subscription.drain()], [6])
+
+    def test_get_waits_for_publisher(self):
+        subscription = self.feed.subscribe()
+        timer = threading.Timer(0.05, self.feed.publish, [[{"op": "clear", "entry_type": None}]])
+        timer.start()
+        self.assertEqual([c["op"] for c in subscription.get(timeout=5)], ["clear"])
+        timer.join()
+
+
+class MemoryStoreChangesTest(unittest.TestCase):
+    def test_store_mutations_are_published(self):
+        store = MemoryStore()
+        with store.changes.subscribe() as subscription:
+            entry = MemoryEntry(type="event", content="first")
+            store.store(entry)
+            store.store_many([MemoryEntry(type="insight", content="second")])
+            store.update_entry(entry.id, content="edited", metadata={"category": "work"})
+            store.delete(entry.id)
+            store.clear("insight")
+            changes = subscription.drain()
+        self.assertEqual([c["op"] for c in changes], ["store", "store", "update", "delete", "clear"])
+        self.assertEqual([c["seq"] for c in changes], [1, 2, 3, 4, 5])
+        self.assertEqual(changes[0]["entry"]["content"], "first")
+        self.assertEqual(changes[2]["metadata"], {"category": "work"})
+        self.assertEqual(changes[4]["entry_type"], "insight")
+
+
+if __name__ == "__main__":
+    unittest.main()
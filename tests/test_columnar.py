@@ -0,0 +1,86 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from backend.memory.columnar import EntryColumns, from_time_key, time_key
+from backend.memory.memory_store import MemoryEntry, MemoryStore
+
+
+class EntryColumnsTest(unittest.TestCase):
+    def test_time_key_round_trip(self):
+        naive = datetime(2024, 5, 17, 9, 30, 12, 123456)
+        self.assertEqual(from_time_key(time_key(naive)), naive)
+        aware = datetime(2024, 5, 17, 9, 30, tzinfo=timezone(timedelta(hours=2)))
+        restored = from_time_key(time_key(aware), aware.tzinfo)
+        self.assertEqual(restored, aware)
+        self.assertEqual(restored.utcoffset(), timedelta(hours=2))
+
+    def test_put_read_and_compact(self):
+        columns = EntryColumns()
+        first = MemoryEntry(type="event", content="Grüße aus Köln", metadata={"n": 1, "tags": ["a"]})
+        second = MemoryEntry(type="decision", content="second", metadata={"when": datetime(2024, 1, 1)})
+        columns.put(0, first, seq=0)
+        columns.put(1, second, seq=1)
+
+        self.assertEqual(columns.fields(0), first.model_dump())
+        # Values JSON cannot round-trip are kept as objects
+        self.assertEqual(columns.metadata(1), {"when": datetime(2024, 1, 1)})
+
+        columns.set_content(0, "replaced")
+        columns.release(1)
+        self.assertGreater(columns.garbage_bytes, 0)
+        compacted = columns.compacted([0])
+        self.assertEqual(len(compacted), 1)
+        self.assertEqual(compacted.garbage_bytes, 0)
+        self.assertEqual(compacted.content(0), "replaced")
+        self.assertEqual(compacted.metadata(0), {"n": 1, "tags": ["a"]})
+
+    def test_snapshot_keeps_old_values(self):
+        columns = EntryColumns()
+        entries = [MemoryEntry(type="event", content=f"entry {i}") for i in range(5000)]
+        for slot, entry in enumerate(entries):
+            columns.put(slot, entry, seq=slot)
+        view = columns.snapshot()
+        self.assertIs(columns.snapshot(), view)
+
+        columns.set_content(1, "changed")
+        columns.set_metadata(4500, {"when": datetime(2024, 1, 1)})
+        columns.release(2)
+        columns.put(2, MemoryEntry(type="decision", content="reused"), seq=5000)
+        columns.put(5000, MemoryEntry(type="event", content="appended"), seq=5001)
+
+        self.assertEqual(len(view), 5000)
+        self.assertEqual(view.content(1), "entry 1")
+        self.assertEqual(view.metadata(4500), {})
+        self.assertEqual(view.fields(2), entries[2].model_dump())
+        self.assertEqual(columns.content(1), "changed")
+        self.assertEqual(columns.type_of(2), "decision")
+        self.assertEqual(columns.metadata(4500), {"when": datetime(2024, 1, 1)})
+
+
+class ColumnarStoreTest(unittest.TestCase):
+    def test_returned_entries_are_copies(self):
+        store = MemoryStore()
+        entry = MemoryEntry(type="event", content="original", metadata={"k": "v"})
+        store.store(entry)
+        entry.metadata["k"] = "changed by caller"
+
+        loaded = store.get_by_id(entry.id)
+        self.assertEqual(loaded.metadata, {"k": "v"})
+        loaded.content = "mutated copy"
+        self.assertEqual(store.get_by_id(entry.id).content, "original")
+
+    def test_updates_are_reclaimed_by_compaction(self):
+        store = MemoryStore()
+        entry_id = store.store(MemoryEntry(type="event", content="version 0"))
+        for i in range(1, 20):
+            store.update_entry(entry_id, content=f"version {i}")
+        self.assertGreater(store._columns.garbage_bytes, 0)
+        store.compact()
+        self.assertEqual(store._columns.garbage_bytes, 0)
+        self.assertEqual(store.get_by_id(entry_id).content, "version 19")
+        self.assertEqual([e.id for e in store.search_by_regex("version 19")], [entry_id])
+        self.assertEqual(store.search_by_regex("version 3"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
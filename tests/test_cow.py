@@ -0,0 +1,80 @@
+import threading
+import unittest
+
+from backend.memory.cow import SEGMENT_SIZE, CowColumn
+from backend.memory.memory_store import MemoryEntry, MemoryStore
+
+
+class CowColumnTest(unittest.TestCase):
+    def test_frozen_view_survives_writes(self):
+        column = CowColumn("q")
+        column.extend(range(SEGMENT_SIZE + 10))
+        view = column.freeze()
+
+        column[0] = -1
+        column[SEGMENT_SIZE + 1] = -2
+        column.append(99)
+        for _ in range(20):
+            column.pop()
+        column.append(7)  # Lands inside the frozen range again
+
+        self.assertEqual(list(view), list(range(SEGMENT_SIZE + 10)))
+        self.assertEqual(view[0], 0)
+        self.assertEqual(len(column), SEGMENT_SIZE - 8)
+        self.assertEqual(column[0], -1)
+        self.assertEqual(column[len(column) - 1], 7)
+        with self.assertRaises(IndexError):
+            view[SEGMENT_SIZE + 10]
+
+    def test_appends_do_not_copy_segments(self):
+        column = CowColumn()
+        column.extend(range(10))
+        segment = column._segments[0]
+        view = column.freeze()
+        column.append(10)
+        self.assertIs(column._segments[0], segment)
+        self.assertEqual(len(view), 10)
+        column[3] = "x"
+        self.assertIsNot(column._segments[0], segment)
+        self.assertEqual(view[3], 3)
+
+
+class ConcurrentReadTest(unittest.TestCase):
+    def test_reads_during_writes_see_consistent_entries(self):
+        store = MemoryStore()
+        for i in range(200):
+            store.store(MemoryEntry(type="event", content=f"seed {i} alpha", metadata={"n": i}))
+        errors = []
+        done = threading.Event()
+
+        def reader():
+            try:
+                while not done.is_set():
+                    for entry in store.search_by_regex(r"alpha"):
+                        if str(entry.metadata["n"]) not in entry.content:
+                            errors.append(entry)
+                    store.search_by_similarity("seed alpha", top_n=5)
+                    store.get_last(5)
+            except Exception as exc:  # pragma: no cover - reported below
+                errors.append(exc)
+
+        threads = [threading.Thread(target=reader) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        ids = []
+        for i in range(200, 600):
+            ids.append(store.store(MemoryEntry(type="event", content=f"write {i} alpha", metadata={"n": i})))
+            if i % 3 == 0:
+                store.delete(ids.pop(0))
+            if i % 5 == 0 and ids:
+                store.update_entry(ids[-1], content=f"updated {i} alpha", metadata={"n": i})
+        done.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(store.count_entries(), 200 + len(ids))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from backend.memory.export import ColumnarDecoder, export_stream, import_stream
+from backend.memory.memory_store import MemoryEntry, MemoryStore
+from backend.memory.sqlite_store import SQLiteMemoryStore
+
+
+def sample_store(count: int = 25) -> MemoryStore:
+    store = MemoryStore()
+    start = datetime(2024, 3, 1, 9, 0)
+    store.store_many([
+        MemoryEntry(type="event" if i % 3 else "insight", content=f"entry {i} café ✓", metadata={"i": i, "tags": ["x"]},
+                    timestamp=(start + timedelta(minutes=i)).replace(tzinfo=timezone(timedelta(hours=2)))
+                    if i == 7 else start + timedelta(minutes=i))
+        for i in range(count)
+    ])
+    return store
+
+
+def chunked(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class ExportTest(unittest.TestCase):
+    def test_round_trip_between_backends(self):
+        source = sample_store()
+        for fmt in ("ndjson", "columnar"):
+            data = b"".join(export_stream(source, fmt, batch_size=4))
+            for target in (MemoryStore(), SQLiteMemoryStore(":memory:")):
+                with self.subTest(fmt=fmt, target=type(target).__name__):
+                    self.assertEqual(import_stream(target, chunked(data, 37), fmt), 25)
+                    self.assertEqual({e.id: e.to_dict() for e in target.entries},
+                                     {e.id: e.to_dict() for e in source.entries})
+                    offset = next(e for e in target.entries if e.content.startswith("entry 7 ")).timestamp
+                    self.assertEqual(offset.utcoffset(), timedelta(hours=2))
+                    self.assertEqual([e.id for e in target.search_by_similarity("entry 12", 3)],
+                                     [e.id for e in source.search_by_similarity("entry 12", 3)])
+
+    def test_columnar_reuses_embeddings(self):
+        source = sample_store(5)
+        data = b"".join(export_stream(source, "columnar"))
+        decoder = ColumnarDecoder(source.embedding_dim)
+        (entries, vectors), = decoder.feed(data)
+        decoder.finish()
+        expected, _ = source.embeddings.get_many([entry.id for entry in entries])
+        np.testing.assert_allclose(vectors, expected, rtol=1e-6)
+        entries, vectors = ColumnarDecoder(source.embedding_dim + 1).feed(data)[0]
+        self.assertIsNone(vectors)  # Another dimension: recomputed by the target store
+
+    def test_type_filter_and_sqlite_source(self):
+        source = SQLiteMemoryStore(":memory:")
+        import_stream(source, [b"".join(export_stream(sample_store(), "columnar"))])
+        data = b"".join(export_stream(source, "columnar", entry_type="insight", batch_size=2))
+        target = MemoryStore()
+        self.assertEqual(import_stream(target, [data]), 9)
+        self.assertEqual({e.type for e in target.entries}, {"insight"})
+
+    def test_rejects_malformed_input_and_existing_ids(self):
+        source = sample_store(3)
+        data = b"".join(export_stream(source, "columnar"))
+        with self.assertRaises(ValueError):
+            import_stream(MemoryStore(), [data[:-8]])  # End marker missing
+        with self.assertRaises(ValueError):
+            import_stream(MemoryStore(), [b"XXXX" + data[4:]])
+        with self.assertRaises(ValueError):
+            import_stream(MemoryStore(), [b'{"type": "event"}\n'], "ndjson")
+        with self.assertRaises(ValueError):
+            import_stream(source, [data])
+        self.assertEqual(source.count_entries(), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
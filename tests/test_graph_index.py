@@ -0,0 +1,42 @@
+import unittest
+
+from backend.memory.graph_index import GraphIndex, breadth_first, link_targets
+
+
+class GraphIndexTest(unittest.TestCase):
+    def test_links_are_indexed_both_ways(self):
+        self.assertEqual(link_targets({"related_to": ["a", 3, "b"]}), ["a", "b"])
+        self.assertEqual(link_targets({"related_to": None, "other": "x"}), [])
+
+        index = GraphIndex()
+        index.add("d", {"related_to": "p"})
+        index.add("e", {"related_to": ["d", "gone", "e"]})  # Self links are ignored
+        stored = {"p", "d", "e"}.__contains__
+        self.assertEqual(sorted(index.edges(["d"], stored)), [("d", "p"), ("e", "d")])
+        self.assertEqual(index.edges(["e"], stored), [("e", "d")])  # "gone" is not stored
+        self.assertEqual(len(index), 3)
+        index.remove("e")
+        self.assertEqual(index.edges(["d"], stored), [("d", "p")])
+        index.clear()
+        self.assertEqual(len(index), 0)
+
+    def test_breadth_first_levels_and_edges(self):
+        # p <- a <- b <- c, and b <- d: a chain with a branch
+        index = GraphIndex()
+        for source, target in (("a", "p"), ("b", "a"), ("c", "b"), ("d", "b")):
+            index.add(source, {"related_to": target})
+
+        def edges_of(ids):
+            return index.edges(ids, lambda entry_id: True)
+
+        hops, edges = breadth_first(["a"], edges_of, depth=1)
+        self.assertEqual(hops, {"a": 0, "p": 1, "b": 1})
+        self.assertEqual(sorted(edges), [("a", "p"), ("b", "a")])
+        hops, edges = breadth_first(["p"], edges_of)
+        self.assertEqual(hops, {"p": 0, "a": 1, "b": 2, "c": 3, "d": 3})
+        self.assertEqual(len(edges), 4)
+        self.assertEqual(breadth_first([], edges_of), ({}, []))
+
+
+if __name__ == "__main__":
+    unittest.main()
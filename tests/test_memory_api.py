@@ -0,0 +1,390 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from backend.api import memory_api
+from backend.api.memory_api import app
+
+client = TestClient(app)
+
+
+class BulkImportTest(unittest.TestCase):
+    def setUp(self):
+        memory_api.get_memory_store().clear()
+
+    def tearDown(self):
+        memory_api.get_memory_store().clear()
+
+    def test_json_array_with_per_item_errors(self):
+        items = [
+            {"type": "event", "content": "imported event", "timestamp": "2023-03-01T10:00:00"},
+            {"type": "unknown", "content": "bad type"},
+            {"type": "decision", "content": ""},
+            {"type": "project", "content": "imported project"},
+        ]
+        response = client.post("/memory/bulk", json=items)
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual([error["index"] for error in body["errors"]], [1, 2])
+        self.assertIsNone(body["ids"][1])
+        event = memory_api.get_memory_store().get_by_id(body["ids"][0])
+        self.assertEqual(event.timestamp.isoformat(), "2023-03-01T10:00:00")
+        project = memory_api.get_memory_store().get_by_id(body["ids"][3])
+        self.assertEqual(project.metadata["project_name"], "Unnamed Project")
+        self.assertEqual(memory_api.get_memory_store().count_entries(), 2)
+
+    def test_ndjson_stream(self):
+        lines = [json.dumps({"type": "insight", "content": f"line {i}"}) for i in range(memory_api.BULK_BATCH_SIZE + 5)]
+        lines.insert(3, "{not json")
+        response = client.post("/memory/bulk", content="\n".join(lines) + "\n",
+                               headers={"Content-Type": "application/x-ndjson"})
+        body = response.json()
+        self.assertEqual([error["index"] for error in body["errors"]], [3])
+        self.assertEqual(len(body["ids"]), len(lines))
+        self.assertEqual(memory_api.get_memory_store().count_entries("insight"), memory_api.BULK_BATCH_SIZE + 5)
+        self.assertEqual(memory_api.get_memory_store().get_by_id(body["ids"][0]).metadata["source"], "manual_api")
+
+    def test_rejected_item_does_not_fail_its_batch(self):
+        existing_id = memory_api.log_event("already stored")
+        to_entry = memory_api.bulk_item_to_entry
+
+        def colliding(item):
+            entry = to_entry(item)
+            if item.content == "collides":
+                entry.id = existing_id
+            return entry
+
+        items = [{"type": "event", "content": f"item {i}"} for i in range(4)]
+        items[2]["content"] = "collides"
+        with mock.patch.object(memory_api, "bulk_item_to_entry", colliding):
+            body = client.post("/memory/bulk", json=items).json()
+        self.assertEqual([error["index"] for error in body["errors"]], [2])
+        self.assertIn("already exists", body["errors"][0]["detail"])
+        self.assertIsNone(body["ids"][2])
+        self.assertEqual(sum(entry_id is not None for entry_id in body["ids"]), 3)
+        self.assertEqual(memory_api.get_memory_store().count_entries(), 4)
+
+    def test_rejects_non_array_body(self):
+        response = client.post("/memory/bulk", json={"type": "event", "content": "x"})
+        self.assertEqual(response.status_code, 400)
+
+
+class HybridSearchTest(unittest.TestCase):
+    def tearDown(self):
+        memory_api.get_memory_store().clear()
+
+    def test_hybrid_endpoint_returns_scores(self):
+        client.post("/memory/bulk", json=[
+            {"type": "event", "content": "travel budget approved"},
+            {"type": "decision", "content": "budget"},
+            {"type": "event", "content": "grocery shopping"},
+        ])
+        body = client.get("/memory/hybrid", params={"q": "travel budget", "n": 5}).json()
+        self.assertEqual(body["total"], 2)
+        self.assertEqual(body["entries"][0]["content"], "travel budget approved")
+        self.assertIsNotNone(body["entries"][0]["semantic_score"])
+        filtered = client.get("/memory/hybrid", params={"q": "travel budget", "type_filter": "decision",
+                                                        "fusion": "weighted"}).json()
+        self.assertEqual([entry["content"] for entry in filtered["entries"]], ["budget"])
+        self.assertEqual(client.get("/memory/hybrid", params={"q": "travel", "fusion": "x"}).status_code, 422)
+
+
+class QueryEndpointTest(unittest.TestCase):
+    def tearDown(self):
+        memory_api.get_memory_store().clear()
+
+    def test_query_with_explain(self):
+        client.post("/memory/bulk", json=[
+            {"type": "event", "content": "paid the rent", "metadata": {"category": "finance"}},
+            {"type": "event", "content": "went running", "metadata": {"category": "health"}},
+            {"type": "event", "content": "read a book", "metadata": {"category": "leisure"}},
+            {"type": "decision", "content": "budget for rent", "metadata": {"category": "finance"}},
+        ])
+        body = client.post("/memory/query", params={"explain": "true"},
+                           json={"type": "event", "metadata": {"category": "finance"}}).json()
+        self.assertEqual([entry["content"] for entry in body["entries"]], ["paid the rent"])
+        self.assertEqual(body["plan"]["steps"][0]["index"], "metadata_index")
+        self.assertTrue(all("actual_rows" in step for step in body["plan"]["steps"]))
+        plain = client.post("/memory/query", json={"keyword": "rent"}).json()
+        self.assertEqual(plain["total"], 2)
+        self.assertIsNone(plain["plan"])
+        self.assertEqual(client.post("/memory/query", json={"regex": "("}).status_code, 400)
+
+
+class PaginationTest(unittest.TestCase):
+    def setUp(self):
+        client.post("/memory/bulk", json=[
+            {"type": "event" if i % 2 else "decision", "content": f"item {i} apple",
+             "timestamp": f"2024-01-01T00:{i:02d}:00"}
+            for i in range(25)
+        ])
+
+    def tearDown(self):
+        memory_api.get_memory_store().clear()
+
+    def collect(self, path, **params):
+        contents, cursor = [], None
+        while True:
+            body = client.get(path, params={**params, **({"cursor": cursor} if cursor else {})}).json()
+            contents.extend(entry["content"] for entry in body["entries"])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                return contents
+
+    def test_cursors_walk_every_listing(self):
+        newest = [f"item {i} apple" for i in range(24, -1, -1)]
+        self.assertEqual(self.collect("/memory/last", n=10), newest)
+        self.assertEqual(self.collect("/memory/type/event", limit=4), [c for c in newest if int(c.split()[1]) % 2])
+        self.assertEqual(self.collect("/memory/search", q="apple", order="newest", n=7), newest)
+        self.assertEqual(self.collect("/memory/entries", order="oldest", limit=6), newest[::-1])
+
+    def test_search_endpoints_page(self):
+        oldest = [f"item {i} apple" for i in range(25)]
+        self.assertEqual(self.collect("/memory/search", q="apple", n=7), oldest)  # Equal scores keep insertion order
+        self.assertEqual(len(client.get("/memory/search", params={"q": "apple"}).json()["entries"]), 25)
+        self.assertEqual(self.collect("/memory/search_regex", pattern=r"item \d*[05] ", limit=2),
+                         [c for c in oldest if int(c.split()[1]) % 5 == 0])
+        self.assertEqual(self.collect("/memory/search_regex", pattern="apple", type_filter="event", limit=4),
+                         [c for c in oldest if int(c.split()[1]) % 2])
+        self.assertEqual(client.get("/memory/search_regex", params={"pattern": "("}).status_code, 400)
+        client.post("/memory/bulk", json=[
+            {"type": "event", "content": f"visit {i}", "metadata": {"place": "Downtown" if i % 3 else "Home"},
+             "timestamp": f"2024-01-02T00:{i:02d}:00"}
+            for i in range(10)
+        ])
+        self.assertEqual(self.collect("/memory/search_metadata", key="place", value="TOWN", limit=3),
+                         [f"visit {i}" for i in range(10) if i % 3])
+
+    def test_foreign_and_malformed_cursors_are_rejected(self):
+        cursor = client.get("/memory/last", params={"n": 2}).json()["next_cursor"]
+        self.assertEqual(client.get("/memory/type/event", params={"cursor": cursor}).status_code, 400)
+        self.assertEqual(client.get("/memory/last", params={"cursor": "bm90IGEgY3Vyc29y"}).status_code, 400)
+        self.assertEqual(client.get("/memory/search", params={"q": "apple", "cursor": cursor}).status_code, 400)
+        relevance = client.get("/memory/search", params={"q": "apple", "n": 2}).json()["next_cursor"]
+        self.assertEqual(client.get("/memory/search", params={"q": "item", "cursor": relevance}).status_code, 400)
+        self.assertEqual(client.get("/memory/search", params={"q": "apple", "order": "newest",
+                                                              "cursor": relevance}).status_code, 400)
+
+    def test_ndjson_stream(self):
+        cursor = client.get("/memory/entries", params={"limit": 5}).json()["next_cursor"]
+        response = client.get("/memory/entries", params={"format": "ndjson", "cursor": cursor,
+                                                         "type_filter": "decision"})
+        self.assertEqual(response.status_code, 400)  # The cursor belongs to the unfiltered listing
+        response = client.get("/memory/entries", params={"format": "ndjson", "cursor": cursor})
+        self.assertTrue(response.headers["content-type"].startswith("application/x-ndjson"))
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual([line["content"] for line in lines], [f"item {i} apple" for i in range(19, -1, -1)])
+
+
+class ChangeStreamTest(unittest.TestCase):
+    def tearDown(self):
+        memory_api.get_memory_store().clear()
+
+    def test_events_resume_and_resync(self):
+        feed = memory_api.get_memory_store().changes
+
+        async def follow(after=None, resync=False):
+            events = memory_api.change_events(feed, after, resync, heartbeat=0.01)
+            opening = await events.__anext__() if after is None else ""
+            client.post("/memory/manual", json={"type": "event", "content": "streamed"})
+            frame = await events.__anext__()
+            await events.aclose()
+            return opening, frame
+
+        opening, frame = asyncio.run(follow())
+        self.assertEqual(opening, f"id: {feed.epoch}-{feed.last_seq - 1}\n\n")
+        lines = frame.splitlines()
+        self.assertEqual(lines[0], f"id: {feed.epoch}-{feed.last_seq}")
+        self.assertEqual(lines[1], "event: store")
+        self.assertEqual(json.loads(lines[2][len("data: "):])["entry"]["content"], "streamed")
+        self.assertEqual(feed.subscriber_count, 0)
+
+        _, frame = asyncio.run(follow(after=feed.last_seq - 1))  # Replays the previous write first
+        self.assertIn(f"id: {feed.epoch}-{feed.last_seq - 1}", frame)
+        opening, _ = asyncio.run(follow(*memory_api.parse_event_id("0123abcd-5", feed)))
+        self.assertIn("event: resync", opening)
+
+    def test_event_ids(self):
+        feed = memory_api.get_memory_store().changes
+        self.assertEqual(memory_api.parse_event_id(None, feed), (None, False))
+        self.assertEqual(memory_api.parse_event_id(f"{feed.epoch}-12", feed), (12, False))
+        self.assertEqual(memory_api.parse_event_id(f"{feed.epoch}-x", feed), (None, True))
+
+
+class StatsTest(unittest.TestCase):
+    def tearDown(self):
+        memory_api.get_memory_store().clear()
+
+    def test_counts_and_timeseries(self):
+        client.post("/memory/bulk", json=[
+            {"type": "event", "content": f"stat {i}", "timestamp": f"2024-02-0{1 + i % 2}T10:00:00",
+             "metadata": {"category": "work"}}
+            for i in range(5)
+        ])
+        self.assertEqual(client.get("/memory/stats").json(), {"event": 5})
+        self.assertEqual(client.get("/memory/stats/categories").json(), {"work": 5})
+        body = client.get("/memory/stats/timeseries", params={"start": "2024-02-02T00:00:00"}).json()
+        self.assertEqual(body["buckets"], [{"start": "2024-02-02T00:00:00", "count": 2, "by_type": {"event": 2}}])
+        self.assertEqual(client.get("/memory/stats/timeseries", params={"interval": "hour"}).json()["total"], 5)
+        self.assertEqual(client.get("/memory/stats/timeseries", params={"interval": "week"}).status_code, 422)
+
+
+class DuplicatesTest(unittest.TestCase):
+    def tearDown(self):
+        memory_api.get_memory_store().clear()
+
+    def test_report(self):
+        client.post("/memory/bulk", json=[
+            {"type": "insight", "content": content}
+            for content in ("Mornings are your focus time", "mornings are your focus time.", "Lunch at noon")
+        ])
+        body = client.get("/memory/duplicates").json()
+        self.assertEqual((body["policy"], body["threshold"]), ("off", 0.8))
+        self.assertEqual([(group["type"], group["count"]) for group in body["groups"]], [("insight", 2)])
+        self.assertEqual(client.get("/memory/duplicates", params={"type_filter": "event"}).json()["groups"], [])
+
+
+class GraphTest(unittest.TestCase):
+    def tearDown(self):
+        memory_api.get_memory_store().clear()
+
+    def test_traversal_and_timelines(self):
+        project_id = client.post("/memory/manual", json={
+            "type": "project", "content": "Kickoff", "metadata": {"project_name": "Apollo"},
+        }).json()["id"]
+        decision_id = client.post("/memory/manual", json={
+            "type": "decision", "content": "Use Python", "metadata": {"related_to": project_id},
+        }).json()["id"]
+        event_id = client.post("/memory/manual", json={
+            "type": "event", "content": "Prototype done", "metadata": {"related_to": decision_id},
+        }).json()["id"]
+        body = client.get(f"/memory/graph/{project_id}").json()
+        self.assertEqual([(node["id"], node["depth"]) for node in body["nodes"]], [(project_id, 0), (decision_id, 1)])
+        self.assertEqual(body["edges"], [{"source": decision_id, "target": project_id}])
+        body = client.get(f"/memory/graph/{project_id}", params={"depth": 2}).json()
+        self.assertEqual(len(body["nodes"]), 3)
+        self.assertEqual(client.get("/memory/graph/missing").status_code, 404)
+
+        timeline = client.get(f"/memory/graph/{event_id}/timeline").json()
+        self.assertEqual([e["id"] for e in timeline["entries"]], [project_id, decision_id, event_id])
+        timeline = client.get("/memory/projects/Apollo/timeline", params={"type_filter": "decision"}).json()
+        self.assertEqual([e["id"] for e in timeline["entries"]], [decision_id])
+        self.assertEqual(client.get("/memory/graph/missing/timeline").status_code, 404)
+
+
+class TenantRoutingTest(unittest.TestCase):
+    def tearDown(self):
+        memory_api.get_memory_store().clear()
+        for tenant_id in ("acme", "globex"):
+            memory_api.tenant_stores.get(tenant_id).clear()
+
+    def test_header_and_path_prefix_select_a_partition(self):
+        client.post("/memory/manual", json={"type": "event", "content": "acme kickoff"}, headers={"X-Tenant-ID": "acme"})
+        client.post("/tenants/globex/memory/manual", json={"type": "event", "content": "globex kickoff"})
+        self.assertEqual([e["content"] for e in client.get("/tenants/acme/memory/last").json()["entries"]],
+                         ["acme kickoff"])
+        response = client.get("/memory/search", params={"q": "kickoff"}, headers={"X-Tenant-ID": "globex"})
+        self.assertEqual([e["content"] for e in response.json()["entries"]], ["globex kickoff"])
+        self.assertEqual(client.get("/memory/last").json()["entries"], [])  # Default tenant
+        self.assertIn("acme", [p["tenant"] for p in client.get("/memory/tenants").json()["resident"]])
+        self.assertEqual(client.get("/memory/last", headers={"X-Tenant-ID": "../x"}).status_code, 400)
+
+    def test_cursors_are_bound_to_their_tenant(self):
+        client.post("/memory/bulk", json=[{"type": "event", "content": f"acme {i}"} for i in range(3)],
+                    headers={"X-Tenant-ID": "acme"})
+        cursor = client.get("/tenants/acme/memory/last", params={"n": 1}).json()["next_cursor"]
+        self.assertEqual(client.get("/tenants/acme/memory/last", params={"cursor": cursor}).status_code, 200)
+        response = client.get("/memory/last", params={"cursor": cursor}, headers={"X-Tenant-ID": "globex"})
+        self.assertEqual(response.status_code, 400)
+
+
+class ExportImportTest(unittest.TestCase):
+    def tearDown(self):
+        memory_api.get_memory_store().clear()
+        memory_api.tenant_stores.get("restore").clear()
+
+    def test_export_then_import_into_another_tenant(self):
+        client.post("/memory/bulk", json=[{"type": "event", "content": f"backup {i}"} for i in range(30)])
+        for fmt in ("columnar", "ndjson"):
+            exported = client.get("/memory/export", params={"format": fmt})
+            self.assertEqual(exported.status_code, 200)
+            self.assertEqual(exported.headers["content-type"], memory_api.MEDIA_TYPES[memory_api.ExportFormat(fmt)])
+            response = client.post("/tenants/restore/memory/import", params={"format": fmt}, content=exported.content)
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.json(), {"format": fmt, "imported": 30})
+            self.assertEqual(memory_api.tenant_stores.get("restore").count_entries(), 30)
+            # Same IDs again
+            self.assertEqual(client.post("/tenants/restore/memory/import", params={"format": fmt},
+                                         content=exported.content).status_code, 409)
+            memory_api.tenant_stores.get("restore").clear()
+        self.assertEqual(client.post("/memory/import", content=b"not an export").status_code, 400)
+
+    def test_invalid_records_and_conflicts_are_told_apart(self):
+        def ndjson(*records):
+            return "\n".join(json.dumps({"type": "event", "content": content, "id": entry_id})
+                             for entry_id, content in records).encode("utf-8")
+
+        url = "/tenants/restore/memory/import?format=ndjson"
+        response = client.post(url, content=ndjson(("a", "first"), ("b", ""), ("c", "third")))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Record 2 (entry b)", response.json()["detail"])
+        response = client.post(url, content=ndjson(("a", "first"), ("a", "again")))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Record 2: entry a appears twice", response.json()["detail"])
+        self.assertEqual(memory_api.tenant_stores.get("restore").count_entries(), 0)
+
+        self.assertEqual(client.post(url, content=ndjson(("a", "first"))).status_code, 201)
+        response = client.post(url, content=ndjson(("d", "fourth"), ("a", "first")))
+        self.assertEqual(response.status_code, 409)
+        self.assertIn("Record 2: entry a already exists", response.json()["detail"])
+
+
+class IndexFreshnessTest(unittest.TestCase):
+    def test_search_reports_watermark(self):
+        client.post("/memory/manual", json={"type": "event", "content": "freshness probe"})
+        response = client.get("/memory/search", params={"q": "freshness", "fresh": "true"})
+        self.assertEqual(response.json()["total"], 1)
+        self.assertEqual(response.headers["X-Index-Watermark"], response.headers["X-Index-Committed"])
+        status = client.get("/memory/index/status").json()
+        self.assertEqual(status["pending"], 0)
+        memory_api.get_memory_store().clear()
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+class ConditionalGetTest(unittest.TestCase):
+    def setUp(self):
+        memory_api.get_memory_store().clear()
+        memory_api.log_insight("polled insight")
+
+    def tearDown(self):
+        memory_api.get_memory_store().clear()
+
+    def test_etag_revalidation(self):
+        for path in ("/memory/last", "/memory/insights", "/memory/stats"):
+            first = client.get(path)
+            self.assertEqual(first.status_code, 200)
+            etag = first.headers["etag"]
+            self.assertIn("no-cache", first.headers["cache-control"])
+            again = client.get(path, headers={"If-None-Match": etag})
+            self.assertEqual(again.status_code, 304)
+            self.assertEqual(again.content, b"")
+            self.assertEqual(again.headers["etag"], etag)
+            self.assertEqual(client.get(path, headers={"If-None-Match": f'"other", W/{etag}'}).status_code, 304)
+        etag = client.get("/memory/last").headers["etag"]
+        self.assertNotEqual(client.get("/memory/last", params={"n": 5}).headers["etag"], etag)
+        memory_api.log_event("new write")
+        changed = client.get("/memory/last", headers={"If-None-Match": etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers["etag"], etag)
+        self.assertEqual(changed.json()["entries"][0]["content"], "new write")
+
+    def test_tenants_have_distinct_etags(self):
+        etag = client.get("/memory/stats").headers["etag"]
+        response = client.get("/tenants/etag-tenant/memory/stats", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
@@ -1,8 +1,19 @@
+import hashlib
+import re
 import unittest
-from backend.memory.memory_writer import get_memory_store, log_event
+from datetime import datetime, timedelta
+
+import numpy as np
+from backend.memory.memory_writer import get_memory_store, log_event, log_decision, log_project
+from backend.memory.memory_retriever import (
+    find_entries_by_keyword,
+    get_decision_history_for_project,
+    get_project_timeline,
+)
 from backend.memory.memory_writer import delete_entry
 from backend.memory.memory_store import MemoryEntry
-from backend.memory.memory_store import MemoryStore
+from backend.memory.memory_store import EMBEDDING_CACHE_SIZE, MemoryStore, _bigram_bucket, hashed_embedding
+from backend.memory.vector_index import IVFFlatIndex
 
 
 class MemoryStoreTest(unittest.TestCase):
@@ -41,12 +52,47 @@ class MemoryStoreTest(unittest.TestCase):
         self.assertEqual(len(entries), 1)
         self.assertEqual(entries[0].content, "second")
 
+    def test_backdated_entries_keep_time_order(self):
+        now = datetime.now()
+        newest = self.store.store(MemoryEntry(type="event", content="today", timestamp=now))
+        oldest = self.store.store(MemoryEntry(type="event", content="last week", timestamp=now - timedelta(days=7)))
+        middle = self.store.store(MemoryEntry(type="decision", content="yesterday", timestamp=now - timedelta(days=1)))
+
+        self.assertEqual([e.id for e in self.store.get_last(3)], [newest, middle, oldest])
+        self.assertEqual([e.id for e in self.store.get_last(5, entry_type="event")], [newest, oldest])
+        in_range = self.store.get_range(now - timedelta(days=2), now - timedelta(hours=1))
+        self.assertEqual([e.id for e in in_range], [middle])
+        self.assertEqual([e.id for e in self.store.retrieve_by_type("event")], [oldest, newest])
+
     def test_delete_entry(self):
         entry_id = log_event("to delete")
         deleted = delete_entry(entry_id)
         self.assertTrue(deleted)
         self.assertIsNone(self.store.get_by_id(entry_id))
 
+    def test_deleted_slots_are_reused_and_compacted(self):
+        store = MemoryStore()
+        ids = [store.store(MemoryEntry(type="event", content=f"entry {i}")) for i in range(6)]
+        for entry_id in ids[:4]:
+            self.assertTrue(store.delete(entry_id))
+        self.assertFalse(store.delete(ids[0]))
+
+        new_id = store.store(MemoryEntry(type="event", content="reuses a slot"))
+        self.assertEqual(len(store._columns), 6)
+        self.assertEqual(store.get_by_id(new_id).content, "reuses a slot")
+
+        self.assertEqual(store.compact(), 3)
+        self.assertEqual(len(store._columns), 3)
+        self.assertEqual(store.count_entries(), 3)
+        for entry_id in ids[4:] + [new_id]:
+            self.assertEqual(store.get_by_id(entry_id).id, entry_id)
+
+    def test_store_rejects_duplicate_id(self):
+        entry = MemoryEntry(type="event", content="once")
+        self.store.store(entry)
+        with self.assertRaises(ValueError):
+            self.store.store(entry)
+
     def test_semantic_search(self):
         self.store.clear()
         id_ml = log_event("Started machine learning project")
@@ -55,6 +101,20 @@ class MemoryStoreTest(unittest.TestCase):
         results = self.store.search_by_similarity("ML project", top_n=1)
         self.assertEqual(results[0].id, id_ml)
 
+    def test_semantic_search_with_ann_index(self):
+        store = MemoryStore(ann_index=IVFFlatIndex(dim=128, nlist=4, train_threshold=20))
+        for i in range(30):
+            store.store(MemoryEntry(type="event", content=f"routine log line number {i}"))
+        target = MemoryEntry(type="event", content="Started machine learning project")
+        store.store(target)
+        self.assertTrue(store.wait_for_ann_training(timeout=30))
+        self.assertTrue(store.ann_index.is_trained)
+
+        results = store.search_by_similarity("machine learning project", top_n=1, nprobe=4)
+        self.assertEqual(results[0].id, target.id)
+        store.delete(target.id)
+        self.assertNotIn(target.id, [e.id for e in store.search_by_similarity("machine learning", nprobe=4)])
+
     def test_update_and_regex_search(self):
         entry_id = log_event("initial content")
         updated = self.store.update_entry(entry_id, content="new content about health")
@@ -63,6 +123,76 @@ class MemoryStoreTest(unittest.TestCase):
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0].id, entry_id)
 
+    def test_keyword_search_is_ranked_and_type_filtered(self):
+        log_event("budget review")
+        best = log_event("budget budget planning budget")
+        decision_id = log_decision("approved the budget")
+
+        results = find_entries_by_keyword("budget")
+        self.assertEqual(results[0].id, best)
+        self.assertEqual(len(results), 3)
+        self.assertEqual([e.id for e in find_entries_by_keyword("budget", "decision")], [decision_id])
+        self.assertEqual(find_entries_by_keyword("budget groceries"), [])
+
+    def test_decision_history_uses_metadata_index(self):
+        project_id = log_project("Kickoff", "Apollo")
+        linked = log_decision("Use Python", {"related_to": project_id})
+        named = log_decision("Hire designer", {"project_name": "Apollo"})
+        log_decision("Unrelated choice", {"related_to": "someone-else"})
+        log_event("Apollo sync", {"related_to": project_id})
+
+        history = get_decision_history_for_project("Apollo")
+        self.assertEqual([e.id for e in history], [linked, named])
+        self.assertEqual(get_decision_history_for_project("Missing"), [])
+
+    def test_decision_history_excludes_decisions_linked_through_other_entries(self):
+        apollo = log_project("Kickoff", "Apollo")
+        gemini = log_project("Kickoff", "Gemini")
+        shared = log_event("Joint review", {"related_to": [apollo, gemini]})
+        log_decision("Gemini budget", {"related_to": gemini})
+        log_decision("Follow-up", {"related_to": shared})
+        direct = log_decision("Apollo scope", {"related_to": apollo})
+
+        self.assertEqual([e.id for e in get_decision_history_for_project("Apollo")], [direct])
+        self.assertEqual(len(get_project_timeline("Apollo", "decision")), 3)  # The component view
+
+    def test_graph_traversal_and_project_timeline(self):
+        base = datetime(2024, 5, 1)
+        project = MemoryEntry(type="project", content="Kickoff", metadata={"project_name": "Apollo"}, timestamp=base)
+        decision = MemoryEntry(type="decision", content="Use Python", metadata={"related_to": project.id},
+                               timestamp=base + timedelta(days=2))
+        event = MemoryEntry(type="event", content="Prototype done", metadata={"related_to": [decision.id, "gone"]},
+                            timestamp=base + timedelta(days=1))
+        unrelated = MemoryEntry(type="event", content="Dentist", timestamp=base)
+        self.store.store_many([event, decision, project, unrelated])
+
+        nodes, edges = self.store.traverse(project.id, depth=1)
+        self.assertEqual([(entry.id, hops) for entry, hops in nodes], [(project.id, 0), (decision.id, 1)])
+        self.assertEqual(edges, [(decision.id, project.id)])
+        nodes, edges = self.store.traverse(event.id, depth=None)
+        self.assertEqual({entry.id: hops for entry, hops in nodes}, {event.id: 0, decision.id: 1, project.id: 2})
+        self.assertEqual(len(edges), 2)
+        self.assertIsNone(self.store.traverse("missing"))
+
+        self.assertEqual([e.id for e in get_project_timeline("Apollo")], [project.id, event.id, decision.id])
+        self.assertEqual([e.id for e in get_project_timeline("Apollo", "event")], [event.id])
+        self.store.update_entry(decision.id, metadata={"related_to": None})  # Unlinks the decision
+        self.assertEqual([e.id for e in get_project_timeline("Apollo")], [project.id])
+        self.store.delete(event.id)
+        self.assertEqual([e.id for e in self.store.linked_component([decision.id])], [decision.id])
+
+    def test_metadata_index_follows_updates_and_declarations(self):
+        entry_id = log_event("tagged", {"category": "work", "mood": "calm"})
+        self.store.update_entry(entry_id, metadata={"category": "health"})
+        self.assertEqual(self.store.search_by_metadata("category", "work"), [])
+        self.assertEqual([e.id for e in self.store.search_by_metadata("category", "health")], [entry_id])
+
+        self.store.declare_metadata_index("mood")
+        self.assertTrue(self.store.metadata_index.is_indexed("mood"))
+        self.assertEqual([e.id for e in self.store.search_by_metadata("mood", "calm")], [entry_id])
+        self.store.delete(entry_id)
+        self.assertEqual(self.store.search_by_metadata("mood", "calm"), [])
+
     def test_metadata_substring_search(self):
         log_event("gym session", {"category": "health-gym"})
         log_event("team meeting", {"category": "work"})
@@ -74,5 +204,232 @@ class MemoryStoreTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.store.store(entry)
 
+    def test_store_many_matches_store(self):
+        store = MemoryStore(ann_index=IVFFlatIndex(dim=128, nlist=4, train_threshold=50))
+        single = MemoryStore()
+        entries = [MemoryEntry(type=("event", "decision")[i % 2], content=f"bulk entry {i} about budget",
+                               metadata={"category": f"c{i % 3}"}) for i in range(120)]
+        self.assertEqual(store.store_many(entries), [entry.id for entry in entries])
+        for entry in entries:
+            single.store(entry)
+
+        self.assertEqual(store.count_entries("decision"), 60)
+        self.assertEqual([e.id for e in store.get_last(5)], [e.id for e in single.get_last(5)])
+        self.assertEqual([e.id for e in store.search_by_metadata("category", "c1")],
+                         [e.id for e in single.search_by_metadata("category", "c1")])
+        self.assertTrue(store.wait_for_ann_training(timeout=30))
+        self.assertTrue(store.ann_index.is_trained)
+        self.assertEqual(store.search_by_similarity("bulk entry 7", top_n=1, use_cache=False)[0].id, entries[7].id)
+
+    def test_store_many_is_all_or_nothing(self):
+        store = MemoryStore()
+        existing = MemoryEntry(type="event", content="already here")
+        store.store(existing)
+        with self.assertRaises(ValueError):
+            store.store_many([MemoryEntry(type="event", content="new"), existing])
+        with self.assertRaises(ValueError):
+            store.store_many([MemoryEntry(type="event", content="new"), MemoryEntry(type="event", content="")])
+        self.assertEqual(store.count_entries(), 1)
+        self.assertEqual(store.store_many([]), [])
+
+    def test_embedding_matches_md5_reference(self):
+        def reference(text, dim):
+            vector = np.zeros(dim, dtype=np.float32)
+            tokens = re.findall(r"\w+", text.lower())
+            for i, token in enumerate(tokens):
+                vector[int(hashlib.md5(token.encode("utf-8")).hexdigest(), 16) % dim] += 1.0
+                if i + 1 < len(tokens):
+                    bigram = f"{token}_{tokens[i + 1]}"
+                    vector[int(hashlib.md5(bigram.encode("utf-8")).hexdigest(), 16) % dim] += 0.5
+            return vector
+
+        for text in ("", "...", "Budget review, budget REVIEW again", "Grüße aus Köln — naïve café", "x " * 50):
+            for dim in (128, 100):
+                self.assertTrue(np.array_equal(hashed_embedding(text, dim), reference(text, dim)), (text, dim))
+        self.assertLessEqual(_bigram_bucket.cache_info().currsize, EMBEDDING_CACHE_SIZE)
+
+    def test_update_re_embeds_outside_the_lock(self):
+        store = MemoryStore()
+        entry_id = store.store(MemoryEntry(type="event", content="quarterly budget review"))
+        store.update_entry(entry_id, content="family travel plans", metadata={"where": "lisbon"})
+        self.assertEqual(store.search_by_similarity("family travel plans lisbon", top_n=1)[0].id, entry_id)
+        self.assertTrue(np.allclose(store.embeddings.get(entry_id),
+                                    store.embeddings.normalize(hashed_embedding("family travel plans lisbon", 128))))
+        self.assertFalse(store.update_entry("missing", content=""))
+
+    def test_hybrid_search_fuses_and_filters(self):
+        store = MemoryStore()
+        now = datetime.now()
+        old = store.store(MemoryEntry(type="event", content="budget for the travel plans",
+                                      timestamp=now - timedelta(days=30)))
+        both = store.store(MemoryEntry(type="event", content="travel budget approved"))
+        keyword_only = store.store(MemoryEntry(type="decision", content="budget"))
+        store.store(MemoryEntry(type="event", content="grocery shopping"))
+
+        hits = store.search_hybrid("travel budget")
+        self.assertEqual(hits[0][0].id, both)
+        self.assertEqual({hit[0].id for hit in hits}, {old, both, keyword_only})
+        entry, score, keyword_score, semantic_score = hits[0]
+        self.assertGreater(score, 0)
+        self.assertGreater(keyword_score, 0)
+        self.assertGreater(semantic_score, 0)
+
+        recent = store.search_hybrid("travel budget", start=now - timedelta(days=1))
+        self.assertNotIn(old, [hit[0].id for hit in recent])
+        store.hybrid_exact_limit = 0  # Wide-window path: global search, then filter
+        self.assertEqual([hit[0].id for hit in store.search_hybrid("travel budget", start=now - timedelta(days=1))],
+                         [hit[0].id for hit in recent])
+        events = store.search_hybrid("travel budget", entry_type="event", fusion="weighted", semantic_weight=1.0)
+        self.assertEqual({hit[0].id for hit in events}, {old, both})
+        self.assertTrue(all(hit[2] is None or hit[1] <= 1.0 for hit in events))
+        with self.assertRaises(ValueError):
+            store.search_hybrid("travel", fusion="borda")
+
+    def test_query_planner_uses_selective_index(self):
+        store = MemoryStore()
+        now = datetime.now()
+        for i in range(1000):
+            store.store(MemoryEntry(type="event" if i % 2 else "decision", content=f"note {i} about the garden",
+                                    timestamp=now - timedelta(hours=i),
+                                    metadata={"project_name": "Atlas" if i % 250 == 0 else "Other"}))
+
+        entries, plan = store.query(metadata={"project_name": "Atlas"}, entry_type="decision")
+        self.assertEqual([e.metadata["project_name"] for e in entries], ["Atlas"] * 4)
+        self.assertEqual(entries, sorted(entries, key=lambda e: e.timestamp, reverse=True))
+        access = plan.steps[0]
+        self.assertEqual((access.index, access.estimated_rows, access.actual_rows), ("metadata_index", 4, 4))
+
+        # Newest-first scans stop at the limit instead of reading the whole type
+        entries, plan = store.query(entry_type="event", regex=r"note \d+ about", limit=3)
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(plan.steps[0].index, "type_index")
+        self.assertEqual(plan.steps[0].estimated_rows, 500)
+        self.assertLess(plan.steps[0].actual_rows, 500)
+
+        entries, plan = store.query(keyword="garden note", start=now - timedelta(hours=9, minutes=30), limit=5)
+        self.assertEqual(len(entries), 5)
+        self.assertEqual(plan.order, "relevance")
+        self.assertEqual(plan.steps[0].index, "time_index")
+
+        entries, _ = store.query(similar_to="note 7 about the garden", entry_type="event", limit=2)
+        self.assertEqual(entries[0].content, "note 7 about the garden")
+        with self.assertRaises(ValueError):
+            store.query(regex="(")
+
+    def test_keyset_pages_are_stable_under_writes(self):
+        store = MemoryStore()
+        base = datetime(2024, 1, 1)
+        for i in range(10):
+            # Pairs share a timestamp, so ties are broken by sequence
+            store.store(MemoryEntry(type="event", content=f"entry {i} apple" if i % 2 else f"entry {i}",
+                                    timestamp=base + timedelta(minutes=i // 2)))
+        first, after = store.page(limit=4)
+        self.assertEqual([e.content.split()[1] for e in first], ["9", "8", "7", "6"])
+        store.store(MemoryEntry(type="event", content="newest"))
+        store.store(MemoryEntry(type="event", content="backdated", timestamp=base - timedelta(days=1)))
+        store.delete(first[-1].id)
+        rest = []
+        while after is not None:
+            page, after = store.page(limit=4, after=after)
+            rest.extend(e.content for e in page)
+        self.assertEqual(rest, [f"entry {i}" + (" apple" if i % 2 else "") for i in range(5, -1, -1)] + ["backdated"])
+
+        oldest, after = store.page(keyword="apple", limit=2, newest_first=False)
+        self.assertEqual([e.content for e in oldest], ["entry 1 apple", "entry 3 apple"])
+        page, after = store.page(keyword="apple", limit=2, newest_first=False, after=after)
+        self.assertEqual([e.content for e in page], ["entry 5 apple", "entry 7 apple"])
+        page, after = store.page(keyword="apple", limit=2, newest_first=False, after=after)
+        self.assertEqual(([e.content for e in page], after), (["entry 9 apple"], None))
+
+    def test_counters_follow_writes(self):
+        store = MemoryStore()
+        base = datetime(2024, 1, 1, 9, 30)
+        ids = store.store_many([
+            MemoryEntry(type="event" if i % 3 else "decision", content=f"entry {i}",
+                        timestamp=base + timedelta(minutes=20 * i), metadata={"category": "work" if i % 2 else "home"})
+            for i in range(12)
+        ])
+        store.delete(ids[0])
+        store.update_entry(ids[1], metadata={"category": "health"})
+        self.assertEqual(store.count_by_type(), {"event": 8, "decision": 3})
+        self.assertEqual(store.count_by_category(), {"home": 5, "work": 5, "health": 1})
+
+        hours = store.timeseries("hour")
+        self.assertEqual([(start.hour, count) for start, count, _ in hours], [(9, 1), (10, 3), (11, 3), (12, 3), (13, 1)])
+        self.assertEqual(hours[1][2], {"event": 2, "decision": 1})
+        self.assertEqual(store.timeseries("day", "decision"), [(datetime(2024, 1, 1), 3, {"decision": 3})])
+        window = store.timeseries("hour", start=base + timedelta(hours=1, minutes=45), end=base + timedelta(hours=2))
+        self.assertEqual([start.hour for start, _, _ in window], [11])
+        with self.assertRaises(ValueError):
+            store.timeseries("week")
+
+        store.clear("decision")
+        self.assertEqual(store.count_by_type(), {"event": 8})
+        store.clear()
+        self.assertEqual((store.count_by_type(), store.count_by_category(), store.timeseries()), ({}, {}, []))
+
+    def test_duplicate_policies(self):
+        first = "You tend to skip workouts when work deadlines pile up on Mondays"
+        again = "you tend to skip workouts when work deadlines pile up on Monday!"
+        for policy in ("drop", "count", "merge"):
+            store = MemoryStore(duplicate_policy=policy)
+            kept = store.store(MemoryEntry(type="insight", content=first, metadata={"source": "reflector"}))
+            other = store.store(MemoryEntry(type="event", content=first))  # Another type is never a duplicate
+            ids = store.store_many([MemoryEntry(type="insight", content=again, metadata={"mood": "low"}),
+                                    MemoryEntry(type="insight", content="Sleep improves after walks")])
+            self.assertEqual(ids[0], kept)
+            self.assertNotIn(other, ids)
+            self.assertEqual((store.count_entries(), store.duplicates_absorbed), (3, 1))
+            metadata = store.get_by_id(kept).metadata
+            self.assertEqual(metadata.get("duplicate_count"), None if policy == "drop" else 1)
+            self.assertEqual("mood" in metadata, policy == "merge")
+
+        store.update_entry(kept, content="Entirely new wording about budgets")  # Re-banded under its new content
+        self.assertNotEqual(store.store(MemoryEntry(type="insight", content=first)), kept)
+        store.delete(kept)
+        store.store(MemoryEntry(type="insight", content="Entirely new wording about budgets!"))
+        self.assertEqual(store.count_entries("insight"), 3)
+
+    def test_find_duplicates(self):
+        for policy in ("off", "count"):
+            store = MemoryStore(duplicate_policy=policy)
+            base = datetime(2024, 1, 1)
+            contents = ["Weekly review done, inbox at zero", "weekly review done; inbox at zero",
+                        "Booked the dentist for March", "Weekly review done, inbox at zero!"]
+            ids = store.store_many([MemoryEntry(type="event", content=content, timestamp=base + timedelta(days=i))
+                                    for i, content in enumerate(contents)], deduplicate=False)
+            clusters = store.find_duplicates()
+            self.assertEqual([[e.id for e in members] for members in clusters], [[ids[0], ids[1], ids[3]]])
+            self.assertEqual(store.find_duplicates("decision"), [])
+
+    def test_async_indexing_watermark(self):
+        store = MemoryStore(async_indexing=True, index_workers=2)
+        try:
+            with store._lock:  # Holding the lock keeps the workers from indexing
+                first = store.store(MemoryEntry(type="event", content="async budget review"))
+                second = store.store(MemoryEntry(type="event", content="async budget meeting"))
+                batch = store.store_many([MemoryEntry(type="decision", content=f"batched note {i}") for i in range(3)])
+                self.assertEqual(store.get_by_id(first).content, "async budget review")
+                self.assertEqual(len(store.get_last(10)), 5)
+                self.assertEqual(store.search_by_text("budget"), [])
+                self.assertEqual(store.index_status(),
+                                 {"committed": 3, "indexed": 0, "pending": 3, "async_indexing": True})
+                store.update_entry(first, content="async travel plans", metadata={"where": "lisbon"})
+                store.delete(second)
+
+            self.assertTrue(store.wait_for_index(timeout=5))
+            self.assertEqual(store.index_status()["pending"], 0)
+            self.assertEqual([e.id for e in store.search_by_text("travel")], [first])
+            self.assertEqual(store.search_by_text("budget"), [])
+            self.assertEqual(store.search_by_metadata_value("where", "lis")[0].id, first)
+            self.assertEqual(store.search_by_similarity("batched note 2", top_n=1)[0].id, batch[2])
+            self.assertEqual(len(store.embeddings), 4)
+
+            store.update_entry(first, content="async travel budget")
+            self.assertEqual([e.id for e in store.search_by_text("budget")], [first])
+        finally:
+            store.close()
+
+
 if __name__ == '__main__':
     unittest.main()
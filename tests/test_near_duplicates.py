@@ -0,0 +1,46 @@
+import unittest
+
+from backend.memory.near_duplicates import NearDuplicateIndex, band_keys, cluster, shingle_set, similarity
+
+REPEATED = "You tend to skip workouts when work deadlines pile up on Mondays"
+REWORDED = "you tend to skip workouts when work deadlines pile up on Monday!"
+DIFFERENT = "Your sleep improves on days you walk outside before noon"
+
+
+class NearDuplicatesTest(unittest.TestCase):
+    def test_similarity_ignores_case_and_punctuation(self):
+        self.assertEqual(similarity(shingle_set(REPEATED), shingle_set(REPEATED.upper() + ".")), 1.0)
+        self.assertGreaterEqual(similarity(shingle_set(REPEATED), shingle_set(REWORDED)), 0.8)
+        self.assertLess(similarity(shingle_set(REPEATED), shingle_set(DIFFERENT)), 0.2)
+        self.assertEqual(len(shingle_set("hi")), 1)  # Shorter than a shingle: padded, not empty
+
+    def test_band_keys_are_stable(self):
+        keys = band_keys(REPEATED)
+        self.assertEqual(len(keys), 8)
+        self.assertEqual(keys, band_keys(REPEATED.lower()))
+        self.assertTrue(set(keys) & set(band_keys(REWORDED)))
+        self.assertFalse(set(keys) & set(band_keys(DIFFERENT)))
+
+    def test_index_finds_and_forgets(self):
+        contents = {"a": REPEATED, "b": DIFFERENT}
+        index = NearDuplicateIndex()
+        for entry_id, content in contents.items():
+            index.add(entry_id, "insight", band_keys(content))
+        self.assertEqual(index.find("insight", band_keys(REWORDED), REWORDED, contents.get)[0], "a")
+        self.assertIsNone(index.find("event", band_keys(REWORDED), REWORDED, contents.get))  # Types are separate
+        index.remove("a", "insight", band_keys(REPEATED))
+        self.assertIsNone(index.find("insight", band_keys(REWORDED), REWORDED, contents.get))
+        index.remove("b", "insight", band_keys(DIFFERENT))
+        self.assertNotIn("insight", index)
+
+    def test_cluster_joins_transitively(self):
+        contents = {"a": REPEATED, "b": REWORDED, "c": REPEATED + ".", "d": DIFFERENT}
+        index = NearDuplicateIndex()
+        for entry_id, content in contents.items():
+            index.add(entry_id, "insight", band_keys(content))
+        clusters = cluster(index.shared_buckets(), contents.get)
+        self.assertEqual([(name, sorted(members)) for name, members in clusters], [("insight", ["a", "b", "c"])])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from backend.memory.memory_store import MemoryEntry, MemoryStore
+from backend.memory.persistence import SNAPSHOT_FILE, WriteAheadLog
+
+
+class PersistenceTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def reopen(self, store):
+        store.close()
+        return MemoryStore.open(self.directory, durability="os")
+
+    def test_mutations_survive_restart(self):
+        store = MemoryStore.open(self.directory, durability="always")
+        kept = store.store(MemoryEntry(type="event", content="first event", metadata={"category": "work"}))
+        dropped = store.store(MemoryEntry(type="event", content="second event"))
+        store.store(MemoryEntry(type="insight", content="an insight"))
+        store.update_entry(kept, content="first event updated", metadata={"mood": "good"})
+        store.delete(dropped)
+        store.clear("insight")
+
+        restored = self.reopen(store)
+        self.assertEqual(restored.count_entries(), 1)
+        entry = restored.get_by_id(kept)
+        self.assertEqual(entry.content, "first event updated")
+        self.assertEqual(entry.metadata, {"category": "work", "mood": "good"})
+        self.assertEqual([e.id for e in restored.search_by_text("updated")], [kept])
+        self.assertEqual([e.id for e in restored.search_by_metadata("category", "work")], [kept])
+        restored.close()
+
+    def test_replay_skips_duplicate_policy(self):
+        store = MemoryStore.open(self.directory, durability="os")
+        store.store(MemoryEntry(type="event", content="standup moved to ten"))
+        store.store(MemoryEntry(type="event", content="Standup moved to ten!"))
+        store.close()
+        restored = MemoryStore.open(self.directory, durability="os", duplicate_policy="drop")
+        self.assertEqual(restored.count_entries(), 2)
+        self.assertEqual([len(members) for members in restored.find_duplicates()], [2])
+        restored.close()
+
+    def test_snapshot_plus_wal_tail(self):
+        store = MemoryStore.open(self.directory, durability="batch")
+        before = [store.store(MemoryEntry(type="event", content=f"before {i}")) for i in range(5)]
+        store.snapshot()
+        after = store.store(MemoryEntry(type="event", content="after snapshot"))
+        store.delete(before[0])
+
+        self.assertTrue(os.path.exists(os.path.join(self.directory, SNAPSHOT_FILE)))
+        # Segments covered by the snapshot are gone; only the tail is replayed
+        self.assertEqual(len(WriteAheadLog.list_segments(self.directory)), 1)
+
+        restored = self.reopen(store)
+        self.assertEqual(restored.count_entries(), 5)
+        self.assertIsNone(restored.get_by_id(before[0]))
+        self.assertEqual(restored.get_last(1)[0].id, after)
+        restored.close()
+
+    def test_automatic_snapshot(self):
+        store = MemoryStore.open(self.directory, durability="os", snapshot_every=10)
+        for i in range(25):
+            store.store(MemoryEntry(type="event", content=f"entry {i}"))
+        store.snapshot()  # Waits for any background snapshot still writing
+
+        restored = self.reopen(store)
+        self.assertEqual(restored.count_entries(), 25)
+        restored.close()
+
+    def test_torn_final_record_is_ignored(self):
+        store = MemoryStore.open(self.directory, durability="always")
+        entry_id = store.store(MemoryEntry(type="event", content="complete record"))
+        store.close()
+        _, path = WriteAheadLog.list_segments(self.directory)[-1]
+        with open(path, "a", encoding="utf-8") as handle:
+            handle.write('{"op": "store", "entry": {"type": "ev')
+
+        restored = MemoryStore.open(self.directory, durability="os")
+        self.assertEqual(restored.count_entries(), 1)
+        self.assertIsNotNone(restored.get_by_id(entry_id))
+        restored.close()
+
+    def test_append_after_torn_record(self):
+        store = MemoryStore.open(self.directory, durability="always")
+        first_id = store.store(MemoryEntry(type="event", content="before the crash"))
+        store = self.reopen(store)  # The next segment starts at the next sequence number
+        store.close()
+        _, path = WriteAheadLog.list_segments(self.directory)[-1]
+        with open(path, "a", encoding="utf-8") as handle:
+            handle.write('{"op": "store", "entry": {"id": "x')
+
+        store = MemoryStore.open(self.directory, durability="always")
+        second_id = store.store(MemoryEntry(type="event", content="after the crash"))
+        restored = self.reopen(store)
+        self.assertIsNotNone(restored.get_by_id(first_id))
+        self.assertIsNotNone(restored.get_by_id(second_id))
+        self.assertEqual(restored.count_entries(), 2)
+        restored.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,8 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from backend.api import adaptive_plan_api
 from backend.core.project_registry import (
     Project,
     ProjectRegistry,
@@ -7,6 +12,7 @@ from backend.core.project_registry import (
     ProjectCategory,
 )
 
+
 def test_register_project():
     proj = Project(
         name="ML Bootcamp",
@@ -18,4 +24,24 @@ def test_register_project():
     )
     reg = ProjectRegistry()
     impact = reg.register_project(proj)
-    assert impact["reschedule_required"] is True 
\ No newline at end of file
+    assert impact["reschedule_required"] is True
+
+
+def test_list_projects_conditional_get():
+    client = TestClient(adaptive_plan_api.app)
+    with patch.object(adaptive_plan_api, "registry", ProjectRegistry()) as registry:
+        first = client.get("/projects")
+        etag = first.headers["etag"]
+        assert client.get("/projects", headers={"If-None-Match": etag}).status_code == 304
+        registry.register_project(Project(
+            name="Marathon",
+            description="Train for a marathon",
+            duration=Duration(value=16, unit="weeks"),
+            priority_level=PriorityLevel.MEDIUM,
+            category=ProjectCategory.HEALTH,
+            time_demand=TimeDemand(hours=5, frequency="per week"),
+        ))
+        changed = client.get("/projects", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+        assert [project["name"] for project in changed.json()] == ["Marathon"]
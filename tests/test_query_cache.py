@@ -0,0 +1,150 @@
+import os
+import tempfile
+import unittest
+
+from fastapi.testclient import TestClient
+
+from backend.api import memory_api
+from backend.api.memory_api import app
+from backend.memory.memory_store import MemoryEntry, MemoryStore
+from backend.memory.query_cache import QueryCache, cache_key
+from backend.memory.sqlite_store import SQLiteMemoryStore
+
+client = TestClient(app)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class QueryCacheTest(unittest.TestCase):
+    def test_key_ignores_order_and_omitted_defaults(self):
+        self.assertEqual(cache_key("text", {"keyword": "a", "limit": None, "entry_type": "event"}),
+                         cache_key("text", {"entry_type": "event", "keyword": "a"}))
+        self.assertNotEqual(cache_key("text", {"keyword": "a"}), cache_key("regex", {"keyword": "a"}))
+
+    def test_lru_eviction_and_ttl(self):
+        clock = FakeClock()
+        cache = QueryCache(max_entries=2, ttl_seconds=10, clock=clock)
+        cache.put(1, "a", "A")
+        cache.put(1, "b", "B")
+        self.assertEqual(cache.get(1, "a"), (True, "A"))
+        cache.put(1, "c", "C")  # Evicts b, the least recently used
+        self.assertEqual(cache.get(1, "b"), (False, None))
+        self.assertEqual(cache.get(2, "a"), (False, None))  # Other generation
+        clock.now = 11
+        self.assertEqual(cache.get(1, "c"), (False, None))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"], stats["expirations"]), (1, 3, 1, 1))
+        self.assertEqual(stats["size"], 1)
+
+    def test_failed_computation_is_not_cached(self):
+        cache = QueryCache()
+
+        def fail():
+            raise ValueError("bad query")
+
+        with self.assertRaises(ValueError):
+            cache.get_or_compute(0, "regex", {"pattern": "("}, fail)
+        self.assertEqual(cache.stats()["size"], 0)
+
+
+class StoreQueryCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.store = MemoryStore()
+        self.store.store(MemoryEntry(type="event", content="quarterly planning meeting"))
+        self.store.store(MemoryEntry(type="decision", content="move the planning meeting to Friday"))
+
+    def test_repeats_hit_and_writes_invalidate(self):
+        first = self.store.search_by_text("planning")
+        second = self.store.search_by_text(keyword="planning")
+        self.assertEqual([entry.id for entry in first], [entry.id for entry in second])
+        self.assertEqual(self.store.query_cache.hits, 1)
+
+        first.clear()  # Callers get their own list
+        self.assertEqual(len(self.store.search_by_text("planning")), 2)
+
+        entry_id = self.store.store(MemoryEntry(type="event", content="planning retrospective"))
+        self.assertEqual(len(self.store.search_by_text("planning")), 3)
+        self.store.update_entry(entry_id, content="retrospective")
+        self.assertEqual(len(self.store.search_by_regex("plan+ing")), 2)
+        self.store.delete(entry_id)
+        self.store.clear("decision")
+        self.assertEqual(len(self.store.search_by_text("planning")), 1)
+        self.store.clear()
+        self.assertEqual(self.store.search_by_text("planning"), [])
+
+    def test_mutating_returned_entries_does_not_reach_the_cache(self):
+        first = self.store.search_by_text("planning")
+        first[0].metadata["edited"] = True
+        first[0].content = "changed by the caller"
+        hybrid = self.store.search_hybrid("planning meeting", 2)
+        hybrid[0][0].metadata["edited"] = True
+
+        again = self.store.search_by_text("planning")
+        self.assertEqual(self.store.query_cache.hits, 1)
+        self.assertNotIn("edited", again[0].metadata)
+        self.assertNotEqual(again[0].content, "changed by the caller")
+        self.assertNotIn("edited", self.store.search_hybrid("planning meeting", 2)[0][0].metadata)
+        self.assertEqual(self.store.query_cache.hits, 2)
+
+    def test_opt_out_and_disabled_cache(self):
+        self.store.search_by_similarity("planning meeting", 2)
+        self.store.search_by_similarity("planning meeting", 2, use_cache=False)
+        self.assertEqual(self.store.query_cache_stats()["misses"], 1)
+        self.assertEqual(self.store.query_cache_stats()["hits"], 0)
+
+        uncached = MemoryStore(query_cache_size=0)
+        uncached.store(MemoryEntry(type="event", content="planning"))
+        self.assertEqual(len(uncached.search_by_text("planning")), 1)
+        self.assertEqual(uncached.query_cache_stats(), {"enabled": False})
+
+    def test_background_indexing_changes_generation(self):
+        store = MemoryStore(async_indexing=True)
+        try:
+            self.assertEqual(store.search_by_text("pending"), [])
+            store.store(MemoryEntry(type="event", content="pending write"))
+            self.assertTrue(store.wait_for_index(timeout=5))
+            self.assertEqual(len(store.search_by_text("pending")), 1)
+        finally:
+            store.close()
+
+    def test_sqlite_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = SQLiteMemoryStore(os.path.join(directory, "memory.sqlite3"))
+            try:
+                store.store(MemoryEntry(type="event", content="planning meeting"))
+                self.assertEqual(len(store.search_by_text("planning")), 1)
+                self.assertEqual(len(store.search_by_text("planning")), 1)
+                self.assertEqual(store.query_cache.hits, 1)
+                store.store(MemoryEntry(type="event", content="planning review"))
+                self.assertEqual(len(store.search_by_text("planning")), 2)
+            finally:
+                store.close()
+
+
+class QueryCacheApiTest(unittest.TestCase):
+    def setUp(self):
+        memory_api.get_memory_store().clear()
+        memory_api.log_event("cache api planning event")
+
+    def tearDown(self):
+        memory_api.get_memory_store().clear()
+
+    def test_cache_stats_and_opt_out(self):
+        before = client.get("/memory/cache/stats").json()
+        self.assertTrue(before["enabled"])
+        for _ in range(2):
+            self.assertEqual(client.get("/memory/search_regex", params={"pattern": "cache api"}).json()["total"], 1)
+        client.get("/memory/search_regex", params={"pattern": "cache api", "cache": "false"})
+        after = client.get("/memory/cache/stats").json()
+        self.assertEqual(after["hits"] - before["hits"], 1)
+        self.assertEqual(after["misses"] - before["misses"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
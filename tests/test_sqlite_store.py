@@ -0,0 +1,249 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from backend.memory.memory_store import MemoryEntry
+from backend.memory.sqlite_store import SQLiteMemoryStore, _metadata_expr
+
+
+class SQLiteMemoryStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "memory.sqlite3")
+        self.store = SQLiteMemoryStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_store_and_get_by_id(self):
+        entry = MemoryEntry(type="event", content="test event", metadata={"mood": "good", "score": 3})
+        self.store.store(entry)
+        loaded = self.store.get_by_id(entry.id)
+        self.assertEqual(loaded.content, "test event")
+        self.assertEqual(loaded.timestamp, entry.timestamp)
+        self.assertEqual(loaded.metadata, {"mood": "good", "score": 3})
+        self.assertIsNone(self.store.get_by_id("missing"))
+        with self.assertRaises(ValueError):
+            self.store.store(entry)
+        with self.assertRaises(ValueError):
+            self.store.store(MemoryEntry(type="event", content=""))
+
+    def test_store_many(self):
+        entries = [MemoryEntry(type="event", content=f"bulk entry {i}") for i in range(50)]
+        self.store.search_by_similarity("warm up", top_n=1)  # Loads the embedding cache
+        self.assertEqual(self.store.store_many(entries), [entry.id for entry in entries])
+        self.assertEqual(self.store.count_entries(), 50)
+        self.assertEqual(self.store.search_by_similarity("bulk entry 42", top_n=1)[0].id, entries[42].id)
+        with self.assertRaises(ValueError):
+            self.store.store_many([MemoryEntry(type="event", content="fresh"), entries[0]])
+        self.assertEqual(self.store.count_entries(), 50)
+
+    def test_hybrid_search(self):
+        now = datetime.now()
+        old = MemoryEntry(type="event", content="budget for the travel plans", timestamp=now - timedelta(days=30))
+        both = MemoryEntry(type="event", content="travel budget approved")
+        other = MemoryEntry(type="decision", content="budget")
+        for entry in (old, both, other):
+            self.store.store(entry)
+        hits = self.store.search_hybrid("travel budget")
+        self.assertEqual(hits[0][0].id, both.id)
+        self.assertEqual({hit[0].id for hit in hits}, {old.id, both.id, other.id})
+        recent = self.store.search_hybrid("travel budget", entry_type="event", start=now - timedelta(days=1))
+        self.assertEqual([hit[0].id for hit in recent], [both.id])
+
+    def test_query(self):
+        now = datetime.now()
+        for i in range(20):
+            self.store.store(MemoryEntry(type="event" if i % 2 else "decision", content=f"note {i} about the garden",
+                                         timestamp=now - timedelta(hours=i),
+                                         metadata={"project_name": "Atlas" if i % 5 == 0 else "Other"}))
+        entries, plan = self.store.query(metadata={"project_name": "Atlas"}, entry_type="decision")
+        self.assertEqual([e.content for e in entries], ["note 0 about the garden", "note 10 about the garden"])
+        self.assertTrue(plan.steps)
+        entries, _ = self.store.query(keyword="garden", metadata_contains={"project_name": "TLA"}, limit=3)
+        self.assertEqual(len(entries), 3)
+        entries, _ = self.store.query(similar_to="note 7 about the garden", entry_type="event", limit=1)
+        self.assertEqual(entries[0].content, "note 7 about the garden")
+
+    def test_keyset_pages(self):
+        base = datetime(2024, 1, 1)
+        for i in range(7):
+            self.store.store(MemoryEntry(type="event", content=f"entry {i}", timestamp=base + timedelta(minutes=i // 2)))
+        seen, after = [], None
+        while True:
+            page, after = self.store.page(limit=3, after=after)
+            seen.extend(e.content for e in page)
+            if after is None:
+                break
+        self.assertEqual(seen, [f"entry {i}" for i in range(6, -1, -1)])
+
+    def test_filtered_and_relevance_pages(self):
+        base = datetime(2024, 1, 1)
+        self.store.store_many([MemoryEntry(type="event", content=f"garden note {i}" + " garden" * (i % 3),
+                                           timestamp=base + timedelta(minutes=i),
+                                           metadata={"place": "Downtown" if i % 2 else "Home"})
+                               for i in range(9)])
+
+        def collect(read):
+            seen, after = [], None
+            while True:
+                page, after = read(after)
+                seen.extend(e.content.split(" garden")[0] for e in page)
+                if after is None:
+                    return seen
+
+        self.assertEqual(collect(lambda after: self.store.page(limit=2, after=after, newest_first=False,
+                                                               pattern=r"note [1-4]")),
+                         [f"garden note {i}" for i in range(1, 5)])
+        self.assertEqual(collect(lambda after: self.store.page(limit=2, after=after, newest_first=False,
+                                                               metadata=("place", "TOWN"))),
+                         [f"garden note {i}" for i in range(1, 9, 2)])
+        ranked = [e.content.split(" garden")[0] for e in self.store.search_by_text("garden")]
+        self.assertEqual(collect(lambda after: self.store.page_by_relevance("garden", limit=2, after=after)), ranked)
+        with self.assertRaises(ValueError):
+            self.store.page(pattern="(")
+
+    def test_counters_follow_writes(self):
+        base = datetime(2024, 1, 1, 9, 30)
+        ids = self.store.store_many([
+            MemoryEntry(type="event" if i % 3 else "decision", content=f"entry {i}",
+                        timestamp=base + timedelta(minutes=20 * i), metadata={"category": "work" if i % 2 else "home"})
+            for i in range(12)
+        ])
+        self.store.delete(ids[0])
+        self.store.update_entry(ids[1], metadata={"category": "health"})
+        self.assertEqual(self.store.count_by_type(), {"event": 8, "decision": 3})
+        self.assertEqual(self.store.count_by_category(), {"home": 5, "work": 5, "health": 1})
+        hours = self.store.timeseries("hour")
+        self.assertEqual([(start.hour, count) for start, count, _ in hours], [(9, 1), (10, 3), (11, 3), (12, 3), (13, 1)])
+        self.assertEqual(self.store.timeseries("day", "decision"), [(datetime(2024, 1, 1), 3, {"decision": 3})])
+        self.store.clear()
+        self.assertEqual(self.store.count_by_type(), {})
+
+    def test_duplicate_policy(self):
+        store = SQLiteMemoryStore(":memory:", duplicate_policy="count")
+        first = store.store(MemoryEntry(type="insight", content="You skip workouts when deadlines pile up"))
+        ids = store.store_many([MemoryEntry(type="insight", content="you skip workouts when deadlines pile up!"),
+                                MemoryEntry(type="insight", content="Sleep improves after evening walks"),
+                                MemoryEntry(type="insight", content="sleep improves after evening walks.")])
+        self.assertEqual((ids[0], ids[2]), (first, ids[1]))  # The last duplicates an entry of its own batch
+        self.assertEqual((store.count_entries(), store.duplicates_absorbed), (2, 2))
+        self.assertEqual(store.get_by_id(first).metadata["duplicate_count"], 1)
+        store.store(MemoryEntry(type="insight", content="Sleep improves after evening walks"), deduplicate=False)
+        self.assertEqual([len(members) for members in store.find_duplicates()], [2])
+        store.update_entry(first, content="Budget review moved to Fridays")
+        self.assertNotEqual(store.store(MemoryEntry(type="insight", content="You skip workouts when deadlines pile up")),
+                            first)
+        store.close()
+
+    def test_changes_are_published(self):
+        with self.store.changes.subscribe() as subscription:
+            entry_id = self.store.store(MemoryEntry(type="event", content="watched"))
+            self.store.update_entry(entry_id, content="watched again")
+            self.store.delete(entry_id)
+            self.store.clear()
+            self.assertEqual([c["op"] for c in subscription.drain()], ["store", "update", "delete", "clear"])
+
+    def test_time_ordering_with_backdated_entries(self):
+        now = datetime.now()
+        latest = self.store.store(MemoryEntry(type="event", content="latest", timestamp=now))
+        oldest = self.store.store(MemoryEntry(type="event", content="oldest", timestamp=now - timedelta(days=2)))
+        middle = self.store.store(MemoryEntry(type="decision", content="middle", timestamp=now - timedelta(days=1)))
+
+        self.assertEqual([e.id for e in self.store.get_last(3)], [latest, middle, oldest])
+        self.assertEqual([e.id for e in self.store.get_last(5, entry_type="event")], [latest, oldest])
+        self.assertEqual([e.id for e in self.store.retrieve_by_type("event")], [oldest, latest])
+        in_range = self.store.get_range(now - timedelta(days=1, hours=1), now - timedelta(hours=1))
+        self.assertEqual([e.id for e in in_range], [middle])
+
+    def test_search_by_text_requires_all_words_and_ranks(self):
+        strong = self.store.store(MemoryEntry(type="event", content="budget review budget"))
+        weak = self.store.store(MemoryEntry(type="event", content="budget review of the long quarterly plan"))
+        self.store.store(MemoryEntry(type="decision", content="budget only"))
+
+        self.assertEqual([e.id for e in self.store.search_by_text("Budget Review")], [strong, weak])
+        self.assertEqual(len(self.store.search_by_text("budget", entry_type="decision")), 1)
+        self.assertEqual(self.store.search_by_text(""), [])
+
+    def test_metadata_searches(self):
+        first = self.store.store(MemoryEntry(type="event", content="a", metadata={"project_name": "Alpha", "tags": ["x"]}))
+        self.store.store(MemoryEntry(type="decision", content="b", metadata={"project_name": "Beta"}))
+        third = self.store.store(MemoryEntry(type="decision", content="c", metadata={"project_name": "Alpha"}))
+
+        self.assertEqual([e.id for e in self.store.search_by_metadata("project_name", "Alpha")], [first, third])
+        self.assertEqual(
+            [e.id for e in self.store.search_by_metadata("project_name", "Alpha", entry_type="decision")], [third]
+        )
+        self.assertEqual([e.id for e in self.store.search_by_metadata("tags", ["x"])], [first])
+        self.assertEqual([e.id for e in self.store.search_by_metadata_value("project_name", "ALP")], [first, third])
+
+        # Declared keys are answered from their JSON1 expression index
+        plan = self.store._conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT id FROM entries WHERE {_metadata_expr('project_name')} = ?", ("Alpha",)
+        ).fetchall()
+        self.assertIn("entries_meta_", str(plan))
+
+    def test_regex_search(self):
+        match = self.store.store(MemoryEntry(type="event", content="Deploy v2 to production"))
+        self.store.store(MemoryEntry(type="event", content="Review the design"))
+        self.assertEqual([e.id for e in self.store.search_by_regex(r"deploy v\d")], [match])
+        self.assertEqual(self.store.search_by_regex(r"deploy v\d", entry_type="decision"), [])
+        self.assertEqual([e.id for e in self.store.search_by_regex(r"deploy", entry_type="event")], [match])
+        with self.assertRaises(ValueError):
+            self.store.search_by_regex("(")
+
+    def test_update_delete_and_clear(self):
+        entry_id = self.store.store(MemoryEntry(type="event", content="old words", metadata={"category": "work"}))
+        self.store.store(MemoryEntry(type="insight", content="an insight"))
+        self.assertEqual(self.store.search_by_similarity("old words")[0].id, entry_id)
+
+        self.assertTrue(self.store.update_entry(entry_id, content="new words", metadata={"category": "home"}))
+        self.assertEqual(self.store.search_by_text("old"), [])
+        self.assertEqual([e.id for e in self.store.search_by_text("new")], [entry_id])
+        self.assertEqual([e.id for e in self.store.search_by_metadata("category", "home")], [entry_id])
+        self.assertEqual(self.store.search_by_similarity("new words home")[0].id, entry_id)
+
+        self.assertEqual(self.store.clear("insight"), 1)
+        self.assertEqual(self.store.count_entries(), 1)
+        self.assertTrue(self.store.delete(entry_id))
+        self.assertFalse(self.store.delete(entry_id))
+        self.assertEqual(self.store.search_by_similarity("new words"), [])
+        self.assertEqual(self.store.count_entries(), 0)
+
+    def test_graph_traversal(self):
+        project = MemoryEntry(type="project", content="Kickoff", timestamp=datetime(2024, 5, 1))
+        decision = MemoryEntry(type="decision", content="Use Python", metadata={"related_to": project.id},
+                               timestamp=datetime(2024, 5, 3))
+        event = MemoryEntry(type="event", content="Prototype done", metadata={"related_to": [decision.id, "gone"]},
+                            timestamp=datetime(2024, 5, 2))
+        self.store.store_many([event, decision, project])
+        nodes, edges = self.store.traverse(project.id, depth=1)
+        self.assertEqual([(entry.id, hops) for entry, hops in nodes], [(project.id, 0), (decision.id, 1)])
+        self.assertEqual(edges, [(decision.id, project.id)])
+        self.assertIsNone(self.store.traverse("missing"))
+        self.assertEqual([e.id for e in self.store.linked_component([project.id])], [project.id, event.id, decision.id])
+
+        # A database created before the link table gets its links indexed on open
+        self.store._conn.executescript("DROP TABLE entry_links; DROP TRIGGER entry_links_insert; "
+                                       "DROP TRIGGER entry_links_delete; DROP TRIGGER entry_links_update;")
+        self.store.close()
+        self.store = SQLiteMemoryStore(self.path)
+        self.assertEqual(len(self.store.linked_component([event.id])), 3)
+        self.store.update_entry(decision.id, metadata={"related_to": None})
+        self.assertEqual([e.id for e in self.store.linked_component([project.id])], [project.id])
+        self.store.delete(event.id)
+        self.assertEqual(self.store.traverse(decision.id, depth=2)[1], [])
+
+    def test_data_survives_reopen(self):
+        entry_id = self.store.store(MemoryEntry(type="project", content="durable project"))
+        self.store.close()
+        self.store = SQLiteMemoryStore(self.path)
+        self.assertEqual(self.store.get_by_id(entry_id).content, "durable project")
+        self.assertEqual([e.id for e in self.store.search_by_similarity("durable project")], [entry_id])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from backend.memory.memory_store import ENTRY_OVERHEAD_BYTES, MemoryEntry, MemoryStore
+from backend.memory.tenants import DEFAULT_TENANT, TenantStores, validate_tenant_id
+
+
+class TenantStoresTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.default = MemoryStore()
+        self.opened = []
+
+        def open_store(tenant_id):
+            self.opened.append(tenant_id)
+            return MemoryStore.open(os.path.join(self.directory, tenant_id), durability="os")
+
+        # Room for about two tenants of three entries
+        self.tenants = TenantStores(open_store, self.default, memory_budget=7 * ENTRY_OVERHEAD_BYTES, idle_seconds=0)
+
+    def tearDown(self):
+        self.tenants.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def fill(self, tenant_id):
+        store = self.tenants.get(tenant_id)
+        store.store_many([MemoryEntry(type="event", content=f"{tenant_id} event {i}") for i in range(3)])
+        self.tenants.get(tenant_id)  # Accounts for the new entries
+
+    def test_partitions_are_isolated_and_lazy(self):
+        self.assertIs(self.tenants.get(DEFAULT_TENANT), self.default)
+        self.assertEqual(self.opened, [])
+        self.fill("alice")
+        self.assertEqual(self.tenants.get("bob").count_entries(), 0)
+        self.assertEqual([e.content for e in self.tenants.get("alice").search_by_text("event")][:1], ["alice event 0"])
+        self.assertEqual(self.opened, ["alice", "bob"])
+
+    def test_least_recently_used_idle_tenant_is_evicted(self):
+        for tenant_id in ("alice", "bob", "carol"):
+            self.fill(tenant_id)
+        stats = self.tenants.stats()
+        self.assertEqual([p["tenant"] for p in stats["resident"]], ["bob", "carol"])
+        self.assertEqual(stats["evictions"], 1)
+        self.assertLessEqual(stats["resident_bytes"], stats["memory_budget"])
+
+        alice = self.tenants.get("alice")  # Reloaded from its snapshot
+        self.assertEqual(alice.count_entries(), 3)
+        self.assertEqual(self.opened.count("alice"), 2)
+
+    def test_leased_tenant_is_not_evicted(self):
+        self.fill("alice")
+        with self.tenants.lease("alice"):
+            self.fill("bob")
+            self.fill("carol")
+            self.assertIn("alice", [p["tenant"] for p in self.tenants.stats()["resident"]])
+        self.assertFalse(self.tenants.evict("nobody"))
+        self.assertTrue(self.tenants.evict("alice"))
+
+    def test_invalid_tenant_ids(self):
+        for tenant_id in ("", "../etc", ".hidden", "a/b", "x" * 65):
+            with self.assertRaises(ValueError):
+                self.tenants.get(tenant_id)
+        self.assertEqual(validate_tenant_id("team-7.alpha"), "team-7.alpha")
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
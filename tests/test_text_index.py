@@ -0,0 +1,52 @@
+import unittest
+
+from backend.memory.text_index import InvertedIndex, tokenize
+
+
+class InvertedIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = InvertedIndex()
+        self.index.add("a", "event", "Morning run in the park")
+        self.index.add("b", "event", "Run run run: marathon training run")
+        self.index.add("c", "decision", "Decided to run the marathon")
+        self.index.add("d", "event", "Grocery shopping")
+
+    def test_tokenize_lowercases_words(self):
+        self.assertEqual(tokenize("ML-based Forecasting!"), ["ml", "based", "forecasting"])
+
+    def test_multi_term_query_intersects_postings(self):
+        ids = [entry_id for entry_id, _ in self.index.search("marathon run")]
+        self.assertEqual(sorted(ids), ["b", "c"])
+
+    def test_results_ranked_by_bm25(self):
+        ids = [entry_id for entry_id, _ in self.index.search("run")]
+        self.assertEqual(ids[0], "b")
+        self.assertEqual(len(ids), 3)
+
+    def test_match_any_and_candidate_restriction(self):
+        scores = dict(self.index.search("marathon shopping", match_all=False))
+        self.assertEqual(sorted(scores), ["b", "c", "d"])
+        both = dict(self.index.search("marathon run"))
+        self.assertAlmostEqual(dict(self.index.search("marathon run", match_all=False))["c"], both["c"])
+        ids = [entry_id for entry_id, _ in self.index.search("run", candidates={"a", "d"})]
+        self.assertEqual(ids, ["a"])
+
+    def test_type_filter_uses_partition(self):
+        ids = [entry_id for entry_id, _ in self.index.search("run", entry_type="decision")]
+        self.assertEqual(ids, ["c"])
+
+    def test_update_remove_and_clear(self):
+        self.index.add("d", "event", "Evening run")
+        self.assertIn("d", [e for e, _ in self.index.search("run")])
+        self.assertEqual(self.index.search("grocery"), [])
+
+        self.assertTrue(self.index.remove("b"))
+        self.assertNotIn("b", [e for e, _ in self.index.search("run")])
+
+        self.index.clear("event")
+        self.assertEqual([e for e, _ in self.index.search("run")], ["c"])
+        self.assertEqual(len(self.index), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from datetime import datetime, timedelta
+
+from backend.memory.time_index import TimeIndex
+
+
+class TimeIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.base = datetime(2024, 1, 1)
+        self.index = TimeIndex(chunk_size=2)
+        # Insert out of order so back-dated inserts and chunk splits are exercised
+        for seq, hours in enumerate([5, 1, 9, 3, 7, 0, 8, 2, 6, 4]):
+            self.index.add(f"h{hours}", self.base + timedelta(hours=hours), seq)
+
+    def test_iterates_in_timestamp_order(self):
+        self.assertEqual(list(self.index), [f"h{h}" for h in range(10)])
+        self.assertEqual(len(self.index), 10)
+
+    def test_latest(self):
+        self.assertEqual(self.index.latest(3), ["h9", "h8", "h7"])
+        self.assertEqual(len(self.index.latest()), 10)
+        self.assertEqual(self.index.latest(0), [])
+
+    def test_between_is_inclusive(self):
+        start = self.base + timedelta(hours=2)
+        end = self.base + timedelta(hours=5)
+        self.assertEqual(self.index.between(start, end), ["h2", "h3", "h4", "h5"])
+        self.assertEqual(self.index.between(start, end, limit=2), ["h2", "h3"])
+        self.assertEqual(self.index.between(end=self.base), ["h0"])
+        self.assertEqual(self.index.between(self.base + timedelta(days=1)), [])
+
+    def test_count_between(self):
+        def hour(h):
+            return self.base + timedelta(hours=h)
+
+        self.assertEqual(self.index.count_between(), 10)
+        self.assertEqual(self.index.count_between(hour(2), hour(5)), 4)
+        self.assertEqual(self.index.count_between(hour(3), hour(3)), 1)
+        self.assertEqual(self.index.count_between(hour(6), hour(2)), 0)
+        self.assertEqual(self.index.count_between(hour(20)), 0)
+
+    def test_scan_resumes_after_key(self):
+        def hour(h):
+            return self.base + timedelta(hours=h)
+
+        keys = list(self.index.scan(hour(2), hour(7), reverse=True))
+        self.assertEqual([key[2] for key in keys], ["h7", "h6", "h5", "h4", "h3", "h2"])
+        rest = self.index.scan(hour(2), hour(7), reverse=True, after=keys[2])
+        self.assertEqual([key[2] for key in rest], ["h4", "h3", "h2"])
+        forward = self.index.scan(hour(2), hour(7), after=keys[2])
+        self.assertEqual([key[2] for key in forward], ["h6", "h7"])
+        self.assertEqual([key[2] for key in self.index.scan()], [f"h{h}" for h in range(10)])
+
+    def test_equal_timestamps_ordered_by_sequence(self):
+        index = TimeIndex()
+        index.add("first", self.base, 1)
+        index.add("second", self.base, 2)
+        self.assertEqual(index.latest(1), ["second"])
+
+    def test_remove(self):
+        self.assertTrue(self.index.remove("h3", self.base + timedelta(hours=3), 3))
+        self.assertFalse(self.index.remove("h3", self.base + timedelta(hours=3), 3))
+        self.assertNotIn("h3", list(self.index))
+        for seq, hours in enumerate([5, 1, 9, 3, 7, 0, 8, 2, 6, 4]):
+            if hours != 3:
+                self.index.remove(f"h{hours}", self.base + timedelta(hours=hours), seq)
+        self.assertEqual(len(self.index), 0)
+        self.assertEqual(self.index.latest(5), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import re
+import unittest
+
+from backend.memory.memory_store import MemoryEntry, MemoryStore
+from backend.memory.trigram_index import TrigramIndex, required_literals
+
+
+class RequiredLiteralsTest(unittest.TestCase):
+    def test_plain_and_anchored_literals(self):
+        self.assertEqual(required_literals("Health"), ["health"])
+        self.assertEqual(required_literals(r"^\bgym\b$"), ["gym"])
+
+    def test_optional_parts_break_runs(self):
+        self.assertEqual(required_literals(r"colou?r"), ["colo", "r"])
+        self.assertEqual(required_literals(r"run(ning)+ fast"), ["run", "ning", " fast"])
+        self.assertEqual(required_literals(r"a.*b[cd]e"), ["a", "b", "e"])
+
+    def test_alternation_requires_nothing(self):
+        self.assertEqual(required_literals(r"cat|dog"), [])
+
+
+class TrigramIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = TrigramIndex()
+        self.index.add("a", "Morning Workout")
+        self.index.add("b", "Work meeting")
+        self.index.add("c", "Groceries")
+
+    def test_candidates_intersect_postings(self):
+        self.assertEqual(self.index.candidates(["work"]), {"a", "b"})
+        self.assertEqual(self.index.candidates(["work", "meet"]), {"b"})
+        self.assertEqual(self.index.candidates(["xyz"]), set())
+        self.assertIsNone(self.index.candidates(["wo"]))
+
+    def test_remove_and_replace(self):
+        self.index.remove("b", "Work meeting")
+        self.index.add("b", "Lunch")
+        self.assertEqual(self.index.candidates(["work"]), {"a"})
+        self.assertTrue(self.index.remove("a", "Morning Workout"))
+        self.assertFalse(self.index.remove("a", "Morning Workout"))
+        self.assertEqual(self.index.candidates(["work"]), set())
+
+
+class StoreTrigramSearchTest(unittest.TestCase):
+    def setUp(self):
+        self.store = MemoryStore()
+        self.gym = self.store.store(MemoryEntry(type="event", content="Gym session: legs", metadata={"place": "Downtown Gym"}))
+        self.meeting = self.store.store(MemoryEntry(type="event", content="Team meeting", metadata={"place": "Office"}))
+
+    def test_regex_results_match_full_scan(self):
+        for pattern in [r"gym\s+sess", r"meet(ing)?", r"(gym|team)", r"^T", r"leg."]:
+            expected = [e.id for e in self.store.entries if re.search(pattern, e.content, re.IGNORECASE)]
+            self.assertEqual(sorted(e.id for e in self.store.search_by_regex(pattern)), sorted(expected), pattern)
+
+    def test_regex_restricted_to_a_type(self):
+        decision = self.store.store(MemoryEntry(type="decision", content="Team meeting moved to Friday"))
+        self.assertEqual([e.id for e in self.store.search_by_regex("meeting", entry_type="decision")], [decision])
+        self.assertEqual([e.id for e in self.store.search_by_regex("^T", entry_type="event")], [self.meeting])
+        self.assertEqual([e.id for e in self.store.search_by_regex("e", entry_type="decision")], [decision])
+        self.assertEqual(self.store.search_by_regex("e", entry_type="missing"), [])
+
+    def test_case_insensitive_regex_sees_folded_characters(self):
+        entry_id = self.store.store(MemoryEntry(type="event", content="Reading on the ſUN deck"))
+        self.assertEqual([e.id for e in self.store.search_by_regex("sun deck")], [entry_id])
+
+    def test_metadata_substring_uses_trigrams(self):
+        self.assertEqual([e.id for e in self.store.search_by_metadata_value("place", "town")], [self.gym])
+        self.assertEqual(len(self.store.search_by_metadata_value("place", "o")), 2)
+        self.store.update_entry(self.gym, metadata={"place": "Home"})
+        self.assertEqual(self.store.search_by_metadata_value("place", "town"), [])
+        self.assertEqual(self.store.search_by_metadata_value("missing", "town"), [])
+
+    def test_regex_and_metadata_pages(self):
+        self.store.store_many([MemoryEntry(type="note" if i % 2 else "event", content=f"Task {i}",
+                                           metadata={"place": "Downtown" if i % 3 else "Home"})
+                               for i in range(300)])
+
+        def collect(**filters):
+            seen, after = [], None
+            while True:
+                page, after = self.store.page(limit=40, after=after, newest_first=False, **filters)
+                seen.extend(e.content for e in page)
+                if after is None:
+                    return seen
+
+        # "^T" and r"\d" have no trigram to narrow the listing, so these walk the time index
+        self.assertEqual(collect(pattern="^T"), ["Team meeting"] + [f"Task {i}" for i in range(300)])
+        self.assertEqual(collect(pattern=r"\d", entry_type="note"), [f"Task {i}" for i in range(1, 300, 2)])
+        self.assertEqual(collect(pattern="task 1[0-9]$"), [f"Task {i}" for i in range(10, 20)])
+        self.assertEqual(collect(metadata=("place", "town")),
+                         ["Gym session: legs"] + [f"Task {i}" for i in range(300) if i % 3])
+        self.assertEqual(collect(metadata=("missing", "town")), [])
+        with self.assertRaises(ValueError):
+            self.store.page(pattern="(")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import unittest
+
+import numpy as np
+
+from backend.memory.vector_index import EmbeddingMatrix, IVFFlatIndex
+
+
+class EmbeddingMatrixTest(unittest.TestCase):
+    def setUp(self):
+        self.matrix = EmbeddingMatrix(dim=4, initial_capacity=2)
+
+    def test_search_returns_best_match_first(self):
+        self.matrix.upsert("a", [1.0, 0.0, 0.0, 0.0])
+        self.matrix.upsert("b", [0.0, 2.0, 0.0, 0.0])
+        self.matrix.upsert("c", [1.0, 1.0, 0.0, 0.0])
+
+        results = self.matrix.search([0.0, 1.0, 0.0, 0.0], top_n=2)
+        self.assertEqual([entry_id for entry_id, _ in results], ["b", "c"])
+        self.assertAlmostEqual(results[0][1], 1.0, places=5)
+
+    def test_rows_are_normalized(self):
+        self.matrix.upsert("a", [3.0, 4.0, 0.0, 0.0])
+        self.assertAlmostEqual(float(np.linalg.norm(self.matrix.get("a"))), 1.0, places=5)
+
+    def test_swap_remove_keeps_mapping_consistent(self):
+        for i, entry_id in enumerate(["a", "b", "c"]):
+            vec = [0.0] * 4
+            vec[i] = 1.0
+            self.matrix.upsert(entry_id, vec)
+
+        self.assertTrue(self.matrix.remove("a"))
+        self.assertFalse(self.matrix.remove("a"))
+        self.assertEqual(len(self.matrix), 2)
+        self.assertEqual(self.matrix.search([0.0, 0.0, 1.0, 0.0], top_n=1)[0][0], "c")
+        self.assertEqual(self.matrix.search([0.0, 1.0, 0.0, 0.0], top_n=1)[0][0], "b")
+
+    def test_upsert_replaces_existing_row(self):
+        self.matrix.upsert("a", [1.0, 0.0, 0.0, 0.0])
+        self.matrix.upsert("a", [0.0, 1.0, 0.0, 0.0])
+        self.assertEqual(len(self.matrix), 1)
+        self.assertEqual(self.matrix.search([0.0, 1.0, 0.0, 0.0], top_n=5)[0][0], "a")
+
+    def test_snapshot_is_unaffected_by_later_writes(self):
+        matrix = EmbeddingMatrix(dim=4)
+        ids = [f"e{i}" for i in range(5000)]  # Spans two row blocks
+        vectors = np.eye(4, dtype=np.float32)[np.arange(5000) % 4]
+        matrix.extend(ids, vectors)
+        view = matrix.snapshot()
+        before = view.search([1.0, 0.0, 0.0, 0.0], top_n=3)
+
+        matrix.upsert("e0", [0.0, 1.0, 0.0, 0.0])
+        matrix.remove("e4")  # Swap-remove moves the last row into row 4
+        matrix.upsert("new", [1.0, 0.0, 0.0, 0.0])
+
+        self.assertEqual(len(view), 5000)
+        self.assertEqual(view.search([1.0, 0.0, 0.0, 0.0], top_n=3), before)
+        self.assertNotIn("new", [e for e, _ in view.search([1.0, 0.0, 0.0, 0.0], top_n=5000)])
+        self.assertEqual(len(matrix), 5000)
+        self.assertIsNot(matrix.snapshot(), view)
+
+
+class IVFFlatIndexTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.vectors = rng.normal(size=(400, 16)).astype(np.float32)
+        self.ids = [f"e{i}" for i in range(len(self.vectors))]
+        self.index = IVFFlatIndex(dim=16, nlist=8, nprobe=2, train_threshold=200)
+
+    def test_exact_until_trained(self):
+        self.index.extend(self.ids[:50], self.vectors[:50])
+        self.assertFalse(self.index.is_trained)
+        exact = EmbeddingMatrix(dim=16)
+        exact.extend(self.ids[:50], self.vectors[:50])
+        query = self.vectors[3]
+        self.assertEqual(self.index.search(query, 5), exact.search(query, 5))
+
+    def test_full_probe_matches_exact_scan(self):
+        for entry_id, vec in zip(self.ids, self.vectors):
+            self.index.upsert(entry_id, vec)
+        self.assertFalse(self.index.is_trained)  # Writes never train
+        self.assertTrue(self.index.training_due)
+        self.index.train()
+        self.assertTrue(self.index.is_trained)
+        self.assertFalse(self.index.training_due)
+
+        exact = EmbeddingMatrix(dim=16)
+        exact.extend(self.ids, self.vectors)
+        query = self.vectors[42]
+        approx = [entry_id for entry_id, _ in self.index.search(query, 10, nprobe=8)]
+        self.assertEqual(approx, [entry_id for entry_id, _ in exact.search(query, 10)])
+        self.assertEqual(self.index.search(query, 1, nprobe=1)[0][0], "e42")
+
+    def test_remove_and_update(self):
+        self.index.extend(self.ids, self.vectors)
+        self.index.train()
+        self.assertTrue(self.index.remove("e42"))
+        self.assertNotIn("e42", [e for e, _ in self.index.search(self.vectors[42], 10, nprobe=8)])
+
+        self.index.upsert("e1", self.vectors[42])
+        self.assertEqual(self.index.search(self.vectors[42], 1, nprobe=8)[0][0], "e1")
+        self.assertEqual(len(self.index), 399)
+
+    def test_snapshot_search_matches_live_index(self):
+        self.index.extend(self.ids, self.vectors)
+        self.index.train()
+        view = self.index.snapshot()
+        query = self.vectors[11]
+        self.assertEqual(view.search(query, 10, nprobe=3), self.index.search(query, 10, nprobe=3))
+        self.index.remove("e11")
+        self.assertEqual(view.search(query, 1, nprobe=8)[0][0], "e11")
+
+    def test_writes_during_training_are_replayed(self):
+        self.index.extend(self.ids[:300], self.vectors[:300])
+        view = self.index.begin_training()
+        self.assertIsNone(self.index.begin_training())  # One training at a time
+        trained = self.index.fit(view)
+
+        self.index.extend(self.ids[300:], self.vectors[300:])
+        self.index.remove("e5")
+        self.index.upsert("e7", self.vectors[42])
+        self.assertTrue(self.index.finish_training(view, trained))
+
+        self.assertTrue(self.index.is_trained)
+        self.assertEqual(len(self.index), 399)
+        self.assertNotIn("e5", self.index)
+        exact = EmbeddingMatrix(dim=16)
+        exact.extend(self.ids, self.vectors)
+        exact.remove("e5")
+        exact.upsert("e7", self.vectors[42])
+        query = self.vectors[350]
+        self.assertEqual([e for e, _ in self.index.search(query, 10, nprobe=8)],
+                         [e for e, _ in exact.search(query, 10)])
+        self.assertEqual({e for e, _ in self.index.search(self.vectors[42], 2, nprobe=8)}, {"e7", "e42"})
+
+    def test_clear_abandons_training(self):
+        self.index.extend(self.ids, self.vectors)
+        view = self.index.begin_training()
+        trained = self.index.fit(view)
+        self.index.clear()
+        self.assertFalse(self.index.finish_training(view, trained))
+        self.assertFalse(self.index.is_trained)
+        self.assertEqual(len(self.index), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()